@@ -8,11 +8,52 @@ import streamlit as st
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-from prompt_converter import convert_prompt_with_claude, convert_sns_prompt_with_claude, generate_sns_content_with_claude
-from image_generator import generate_image_with_gemini
-import base64
+import uuid
+from concurrent.futures import wait
 from datetime import datetime
-from PIL import Image
+
+from archive_export import DEFAULT_EXPORT_DIR, write_zip
+from asset_manifest import ASSET_MANIFEST
+from image_encoding import CHANNEL_PRESETS, ENCODER, default_channels
+from output_index import OUTPUT_INDEX
+from prefetch import PREFETCHER, prefetch_enabled
+from static_server import file_url, make_thumbnail, thumbnail_url
+
+# 静的なテンプレート・アイコン・CSSはプロセスごとに一度だけ読み込む
+from ui_catalog import (
+    CUSTOM_CSS,
+    TRAINERS,
+    LOCATIONS,
+    OUTPUT_MODES,
+    SITUATIONS,
+    SNS_POST_TYPES,
+    INSTAGRAM_THEMES,
+    HEADLINE_TEMPLATES,
+    SUBTEXT_TEMPLATES,
+    ACCENT_TEMPLATES,
+    PAGE_TYPES,
+    PAGE_PRESETS,
+    ICON_TYPES,
+    FONT_STYLES,
+    DECORATION_OPTIONS,
+    BORDER_STYLES,
+    MOOD_OPTIONS,
+    COLOR_INTENSITY_OPTIONS,
+    LAYOUT_STYLES,
+    TEXT_POSITIONS,
+    TEXT_SIZES,
+    BACKGROUND_STYLES,
+    ASPECT_RATIOS,
+    CLIENT_TYPES,
+    BRAND_COLORS,
+    BLOG_CATEGORIES,
+    BLOG_TONES,
+    BLOG_STRUCTURES,
+    BLOG_LENGTHS,
+    BLOG_KEYWORDS,
+    BLOG_TOPICS,
+    icon,
+)
 
 # 環境変数読み込み（ローカル用）
 load_dotenv(override=True)
@@ -30,1157 +71,349 @@ except Exception:
 # ページ設定
 st.set_page_config(
     page_title="FIREFITNESS 画像生成ツール",
-    page_icon="https://fav.farm/%F0%9F%94%A5",
+    # URL を渡すと Streamlit が画像として扱い、起動時に NumPy・PIL を読み込むので絵文字で渡す
+    page_icon="🔥",
     layout="wide",
     initial_sidebar_state="expanded"
 )
 
 # カスタムCSS（テック系企業風・ネイビーベース）
-st.markdown("""
-<style>
-    /* ===== 基本設定 ===== */
-    @import url('https://fonts.googleapis.com/css2?family=Noto+Sans+JP:wght@300;400;500;700&display=swap');
-
-    .stApp {
-        background: linear-gradient(135deg, #0a1628 0%, #0d2b45 50%, #0f3352 100%);
-        font-family: 'Noto Sans JP', -apple-system, BlinkMacSystemFont, sans-serif;
-    }
-
-    /* ===== サイドバー ===== */
-    section[data-testid="stSidebar"] {
-        background: linear-gradient(180deg, #0d2b45 0%, #081c30 100%);
-        border-right: 1px solid rgba(255, 107, 53, 0.2);
-    }
-
-    section[data-testid="stSidebar"] .stMarkdown {
-        color: #e8eef4;
-    }
-
-    section[data-testid="stSidebar"] h1,
-    section[data-testid="stSidebar"] h2,
-    section[data-testid="stSidebar"] h3 {
-        color: #ffffff !important;
-        font-weight: 500;
-        letter-spacing: 0.02em;
-    }
-
-    section[data-testid="stSidebar"] .stSelectbox label,
-    section[data-testid="stSidebar"] .stMultiSelect label,
-    section[data-testid="stSidebar"] .stCheckbox label,
-    section[data-testid="stSidebar"] .stRadio label {
-        color: #ffffff !important;
-        font-weight: 500;
-    }
-
-    section[data-testid="stSidebar"] hr {
-        border-color: rgba(255, 107, 53, 0.3);
-    }
-
-    /* ===== メインコンテンツ ===== */
-    .main .block-container {
-        padding-top: 2rem;
-    }
-
-    /* ヘッダー */
-    .main-header {
-        color: #ffffff;
-        font-size: 2rem;
-        font-weight: 700;
-        letter-spacing: 0.05em;
-        margin-bottom: 0.25rem;
-        text-shadow: 0 2px 4px rgba(0,0,0,0.3);
-    }
-
-    .sub-header {
-        color: rgba(255, 255, 255, 0.85);
-        font-size: 0.95rem;
-        font-weight: 400;
-        letter-spacing: 0.03em;
-        margin-bottom: 2rem;
-    }
-
-    /* 見出し */
-    .stMarkdown h1, .stMarkdown h2, .stMarkdown h3 {
-        color: #ffffff !important;
-        font-weight: 500;
-    }
-
-    .stMarkdown p, .stMarkdown li {
-        color: #ffffff;
-    }
-
-    /* ===== タブ ===== */
-    .stTabs [data-baseweb="tab-list"] {
-        background: rgba(13, 43, 69, 0.6);
-        border-radius: 8px 8px 0 0;
-        padding: 0.5rem 0.5rem 0;
-        gap: 4px;
-        border-bottom: 2px solid rgba(255, 107, 53, 0.4);
-    }
-
-    .stTabs [data-baseweb="tab"] {
-        background: transparent;
-        color: rgba(255, 255, 255, 0.6);
-        border: none;
-        border-radius: 6px 6px 0 0;
-        padding: 0.75rem 1.5rem;
-        font-weight: 500;
-        font-size: 0.9rem;
-        letter-spacing: 0.02em;
-        transition: all 0.2s ease;
-    }
-
-    .stTabs [data-baseweb="tab"]:hover {
-        background: rgba(255, 107, 53, 0.15);
-        color: #ffffff;
-    }
-
-    .stTabs [aria-selected="true"] {
-        background: rgba(255, 107, 53, 0.25) !important;
-        color: #ff6b35 !important;
-        border-bottom: 2px solid #ff6b35;
-    }
-
-    .stTabs [data-baseweb="tab-panel"] {
-        background: rgba(8, 28, 48, 0.5);
-        border-radius: 0 0 8px 8px;
-        padding: 1.5rem;
-        border: 1px solid rgba(255, 107, 53, 0.1);
-        border-top: none;
-    }
-
-    /* ===== フォーム要素 ===== */
-    .stSelectbox > div > div,
-    .stMultiSelect > div > div,
-    .stTextInput > div > div > input,
-    .stTextArea > div > div > textarea {
-        background: rgba(8, 28, 48, 0.8) !important;
-        border: 1px solid rgba(255, 107, 53, 0.2) !important;
-        border-radius: 6px !important;
-        color: #ffffff !important;
-        transition: all 0.2s ease;
-    }
-
-    .stSelectbox > div > div:hover,
-    .stMultiSelect > div > div:hover,
-    .stTextInput > div > div > input:hover,
-    .stTextArea > div > div > textarea:hover {
-        border-color: rgba(255, 107, 53, 0.5) !important;
-    }
-
-    .stSelectbox > div > div:focus-within,
-    .stMultiSelect > div > div:focus-within,
-    .stTextInput > div > div > input:focus,
-    .stTextArea > div > div > textarea:focus {
-        border-color: #ff6b35 !important;
-        box-shadow: 0 0 0 2px rgba(255, 107, 53, 0.2) !important;
-    }
-
-    .stSelectbox label,
-    .stMultiSelect label,
-    .stTextInput label,
-    .stTextArea label,
-    .stSlider label,
-    .stCheckbox label {
-        color: #ffffff !important;
-        font-weight: 500;
-        font-size: 0.9rem;
-    }
-
-    /* プレースホルダー */
-    .stTextInput > div > div > input::placeholder,
-    .stTextArea > div > div > textarea::placeholder {
-        color: rgba(184, 201, 217, 0.5) !important;
-    }
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
-    /* チェックボックス - ラベルテキストを白色に強制 */
-    .stCheckbox label,
-    .stCheckbox label span,
-    .stCheckbox label p,
-    .stCheckbox > label > span,
-    .stCheckbox [data-testid="stCheckbox"] label,
-    div[data-testid="stCheckbox"] label,
-    div[data-testid="stCheckbox"] label span,
-    div[data-testid="stCheckbox"] p {
-        color: #ffffff !important;
-    }
-
-    /* ラジオボタン - ラベルテキストを白色に強制 */
-    .stRadio label,
-    .stRadio label span,
-    .stRadio label p,
-    .stRadio > label > span,
-    div[data-testid="stRadio"] label,
-    div[data-testid="stRadio"] label span,
-    div[data-testid="stRadio"] p {
-        color: #ffffff !important;
-    }
-
-    /* スライダー */
-    .stSlider > div > div > div > div {
-        background: #ff6b35 !important;
-    }
-
-    /* ===== ボタン ===== */
-    .stButton > button {
-        background: linear-gradient(135deg, #ff6b35 0%, #e55a2b 100%);
-        color: #ffffff;
-        font-weight: 600;
-        border: none;
-        border-radius: 6px;
-        padding: 0.75rem 2rem;
-        font-size: 0.95rem;
-        letter-spacing: 0.03em;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 15px rgba(255, 107, 53, 0.3);
-    }
-
-    .stButton > button:hover {
-        background: linear-gradient(135deg, #ff7a4a 0%, #ff6b35 100%);
-        box-shadow: 0 6px 20px rgba(255, 107, 53, 0.4);
-        transform: translateY(-1px);
-    }
-
-    .stButton > button:active {
-        transform: translateY(0);
-    }
-
-    /* プライマリボタン */
-    .stButton > button[kind="primary"] {
-        background: linear-gradient(135deg, #ff6b35 0%, #e55a2b 100%);
-    }
-
-    /* ===== 情報ボックス ===== */
-    .stAlert {
-        background: rgba(13, 43, 69, 0.8) !important;
-        border: 1px solid rgba(255, 107, 53, 0.3) !important;
-        border-radius: 8px !important;
-        color: #e8eef4 !important;
-    }
-
-    .stAlert > div {
-        color: #e8eef4 !important;
-    }
-
-    /* 成功メッセージ */
-    .stSuccess {
-        background: rgba(39, 174, 96, 0.15) !important;
-        border: 1px solid rgba(39, 174, 96, 0.4) !important;
-    }
-
-    /* エラーメッセージ */
-    .stError {
-        background: rgba(231, 76, 60, 0.15) !important;
-        border: 1px solid rgba(231, 76, 60, 0.4) !important;
-    }
-
-    /* 警告メッセージ */
-    .stWarning {
-        background: rgba(241, 196, 15, 0.15) !important;
-        border: 1px solid rgba(241, 196, 15, 0.4) !important;
-    }
-
-    /* ===== エキスパンダー ===== */
-    .streamlit-expanderHeader {
-        background: rgba(13, 43, 69, 0.6) !important;
-        border: 1px solid rgba(255, 107, 53, 0.2) !important;
-        border-radius: 6px !important;
-        color: #ffffff !important;
-        font-weight: 500;
-    }
-
-    .streamlit-expanderHeader:hover {
-        border-color: rgba(255, 107, 53, 0.4) !important;
-    }
-
-    .streamlit-expanderContent {
-        background: rgba(8, 28, 48, 0.5) !important;
-        border: 1px solid rgba(255, 107, 53, 0.1) !important;
-        border-top: none !important;
-        border-radius: 0 0 6px 6px !important;
-    }
-
-    /* ===== 区切り線 ===== */
-    hr {
-        border-color: rgba(255, 107, 53, 0.2) !important;
-    }
-
-    /* ===== スピナー ===== */
-    .stSpinner > div {
-        border-top-color: #ff6b35 !important;
-    }
+# =====================================
+# ヘルパー関数
+# =====================================
 
-    /* ===== ダウンロードボタン ===== */
-    .stDownloadButton > button {
-        background: transparent !important;
-        border: 2px solid #ff6b35 !important;
-        color: #ff6b35 !important;
-    }
+# アセットパス
+ASSETS_DIR = Path(__file__).parent / "assets"
+TRAINERS_DIR = ASSETS_DIR / "trainers"
+BACKGROUNDS_DIR = ASSETS_DIR / "backgrounds"
+LOGOS_DIR = ASSETS_DIR / "logos"
+OUTPUTS_DIR = Path(__file__).parent / "outputs"
 
-    .stDownloadButton > button:hover {
-        background: rgba(255, 107, 53, 0.1) !important;
-    }
+# 出力ディレクトリ作成
+OUTPUTS_DIR.mkdir(exist_ok=True)
 
-    /* ===== コードブロック ===== */
-    .stCodeBlock {
-        background: rgba(8, 28, 48, 0.9) !important;
-        border: 1px solid rgba(255, 107, 53, 0.2) !important;
-        border-radius: 6px !important;
-    }
+# 宣材写真で一度に生成できる候補の数
+MAX_CANDIDATES = 5
 
-    /* ===== 全般的なテキスト要素を白色に ===== */
-    .stCaption,
-    .stCaption p,
-    div[data-testid="stCaptionContainer"] p,
-    .element-container p,
-    .stMarkdown small,
-    .stMarkdown em {
-        color: rgba(255, 255, 255, 0.8) !important;
-    }
+# カルーセルのZIPを作る前に、書き出し中のものを待つ最大秒数
+EXPORT_ZIP_WAIT_SECONDS = 30
 
-    /* ヘルプテキスト */
-    .stTooltipIcon,
-    div[data-testid="tooltipHoverTarget"] {
-        color: rgba(255, 255, 255, 0.6) !important;
-    }
+# 実行中の先読みを待つ最大秒数（過ぎたら先読みを使わずに Claude を呼ぶ）
+PREFETCH_WAIT_SECONDS = 60
 
-    /* 全てのspan, pタグのデフォルト色 */
-    .main .block-container span,
-    .main .block-container p {
-        color: #ffffff;
-    }
 
-    /* セレクトボックスの選択値 */
-    .stSelectbox > div > div,
-    .stMultiSelect > div > div {
-        color: #ffffff !important;
-    }
+def section_header(icon_name: str, title: str, color: str = "#ff6b35") -> None:
+    """セクションヘッダーを表示"""
+    st.markdown(f'''
+    <div style="display: flex; align-items: center; margin-bottom: 0.75rem; margin-top: 0.5rem;">
+        {icon(icon_name, color, 20)}
+        <span style="color: #ffffff; font-size: 1rem; font-weight: 500; letter-spacing: 0.02em;">{title}</span>
+    </div>
+    ''', unsafe_allow_html=True)
 
-    /* ===== 画像 ===== */
-    .stImage {
-        border-radius: 8px;
-        overflow: hidden;
-        box-shadow: 0 4px 20px rgba(0, 0, 0, 0.3);
-    }
 
-    /* ===== ラジオボタン ===== */
-    .stRadio > div {
-        background: transparent;
-    }
+def get_available_images(directory: Path) -> list:
+    """指定ディレクトリ内の画像ファイル一覧を取得（素材のマニフェストから。画像でないファイルは含めない）"""
+    return ASSET_MANIFEST.images(directory)
 
-    .stRadio > div > label {
-        color: #ffffff !important;
-    }
 
-    .stRadio > div > label > div {
-        color: #ffffff !important;
-    }
+def _call_prompt_converter(func_name: str, *args, **kwargs):
+    """prompt_converter の関数を呼ぶ（SDKの読み込みも先読みスレッド側で行うため遅延import）"""
+    import prompt_converter
+    return getattr(prompt_converter, func_name)(*args, **kwargs)
 
-    /* ラジオボタンのオプションテキスト */
-    .stRadio [data-baseweb="radio"] > div {
-        color: #ffffff !important;
-    }
 
-    /* ===== カスタムクラス ===== */
-    .tech-card {
-        background: rgba(13, 43, 69, 0.7);
-        border: 1px solid rgba(255, 107, 53, 0.2);
-        border-radius: 8px;
-        padding: 1.5rem;
-        margin: 1rem 0;
-        backdrop-filter: blur(10px);
-    }
+def schedule_prefetch(kind: str, payload: dict, func_name: str, *args, **kwargs) -> None:
+    """入力が止まったら Claude の呼び出しを裏で始めておく（PROMPT_PREFETCH=false で無効）"""
+    if not prefetch_enabled():
+        return
+    owner = st.session_state.setdefault("prefetch_owner", uuid.uuid4().hex)
+    PREFETCHER.schedule(owner, kind, payload, _call_prompt_converter, func_name, *args, **kwargs)
 
-    .accent-text {
-        color: #ff6b35;
-        font-weight: 600;
-    }
 
-    .muted-text {
-        color: rgba(255, 255, 255, 0.8);
-        font-size: 0.85rem;
-    }
+def take_prefetched(kind: str, payload: dict, consume: bool = False):
+    """先読み済みの結果を返す（先読みしていない・失敗した・PREFETCH_WAIT_SECONDS 秒で終わらない場合は None）"""
+    if not prefetch_enabled():
+        return None
+    return PREFETCHER.result(kind, payload, timeout=PREFETCH_WAIT_SECONDS, consume=consume)
 
-    /* フッター */
-    .footer-text {
-        color: rgba(255, 255, 255, 0.6);
-        font-size: 0.8rem;
-        text-align: center;
-        padding: 2rem 0;
-        border-top: 1px solid rgba(255, 107, 53, 0.1);
-        margin-top: 2rem;
-    }
 
-    /* ===== マルチセレクトのタグ ===== */
-    .stMultiSelect [data-baseweb="tag"] {
-        background: rgba(255, 107, 53, 0.2) !important;
-        border: 1px solid rgba(255, 107, 53, 0.4) !important;
-        color: #ffffff !important;
-    }
+# =====================================
+# 宣材写真モード
+# =====================================
 
-    /* ===== セレクトボックスのドロップダウン ===== */
-    [data-baseweb="popover"] {
-        background: #0d2b45 !important;
-        border: 1px solid rgba(255, 107, 53, 0.3) !important;
-    }
+def show_image(path, caption: str = None) -> None:
+    """
+    画像の表示（配信サーバーを使うときは縮小版のURLを渡す）
 
-    [data-baseweb="menu"] {
-        background: #0d2b45 !important;
-    }
+    URL だけを渡すので、リランのたびに画像を送り直さず、ブラウザのキャッシュが効く。
+    配信サーバーを使わない（既定）・使えないときは Streamlit から直接送る
+    """
+    st.image(thumbnail_url(path, 1280) or str(path), caption=caption, use_container_width=True)
 
-    [data-baseweb="menu"] li {
-        color: #ffffff !important;
-    }
 
-    /* セレクトボックスの選択されたテキスト */
-    .stSelectbox [data-baseweb="select"] > div {
-        color: #ffffff !important;
-    }
+def record_output(path, **fields) -> str:
+    """
+    生成画像を索引に記録し、表示に使うパスを返す
 
-    /* セレクトボックスのプレースホルダーとテキスト */
-    [data-baseweb="select"] span {
-        color: #ffffff !important;
-    }
+    ほぼ同じ画像がすでにあれば知らせる（OUTPUT_DEDUP=drop なら新しい方は保存せず、元の画像のパスを返す）
+    """
+    result = OUTPUT_INDEX.add(path, **fields)
+    original = result.get("duplicate_of")
+    if not original:
+        return path
+    if result["dropped"]:
+        st.info(f"ほぼ同じ画像がすでにあるため保存しませんでした。以前の画像（{Path(original).name}）を表示します")
+        return original
+    st.info(f"ほぼ同じ画像がすでにあります（{Path(original).name}）。ギャラリーでは以前の画像にまとめて表示します")
+    return path
 
-    /* Expander内のテキスト */
-    .streamlit-expanderContent p,
-    .streamlit-expanderContent li,
-    .streamlit-expanderContent span {
-        color: #ffffff !important;
-    }
 
-    /* info, success, warning, errorメッセージ内のテキスト */
-    .stAlert p {
-        color: #ffffff !important;
-    }
+def format_candidate_scores(candidate: dict) -> str:
+    """自動採点の内訳（image_scoring の点数）を1行にする"""
+    labels = {"sharpness": "ピント", "aspect": "比率", "palette": "色"}
+    parts = [f"{label} {candidate['scores'][key]:.2f}" for key, label in labels.items() if key in candidate["scores"]]
+    return " ・ ".join([f"総合 {candidate['score']:.2f}", *parts])
 
-    /* スライダーの値表示 */
-    .stSlider > div > div > div > span {
-        color: #ffffff !important;
-    }
 
-    /* トグルボタンのテキスト */
-    .stToggle label span {
-        color: #ffffff !important;
-    }
+def promote_candidate_output(image_path: str, logo: tuple, fields: dict) -> None:
+    """
+    自動採点で選ばれなかった候補をギャラリーに保存する（ボタンの on_click）
 
-    [data-baseweb="menu"] li:hover {
-        background: rgba(255, 107, 53, 0.2) !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+    候補は生の画像のまま残してあるので、ここで通常の名前に戻し、ロゴを重ねて索引に記録する
+    """
+    from image_generator import overlay_logo_on_image, promote_candidate
 
-# =====================================
-# 定数定義
-# =====================================
+    pending = st.session_state.get("promo_other_candidates")
+    if pending:
+        pending["candidates"] = [c for c in pending["candidates"] if c["image_path"] != image_path]
+    try:
+        image_path = promote_candidate(image_path)
+    except FileNotFoundError:
+        st.warning("この候補はすでに保存されたか、削除されています")
+        return
+    logo_path, logo_position, logo_size = logo
+    if logo_path:
+        try:
+            image_path = overlay_logo_on_image(image_path, logo_path, logo_position, logo_size)
+        except Exception as e:
+            st.warning(f"ロゴの追加に失敗しました: {str(e)}")
+    record_output(image_path, **fields)
+    st.toast(f"候補をギャラリーに保存しました（{Path(image_path).name}）", icon="✅")
 
-TRAINERS = {
-    "岡田": "okada",
-    "山本": "yamamoto",
-    "板倉": "itakura",
-    "葛本": "kuzumoto"
-}
-
-LOCATIONS = {
-    "島田本町": "shimadahonmachi",
-    "伊福町": "ifukucho"
-}
-
-# 宣材写真用シチュエーション
-SITUATIONS = {
-    "カウンセリング・相談": "consultation",
-    "姿勢チェック・診断": "posture_check",
-    "セッション風景（落ち着いた雰囲気）": "training_session",
-    "食事相談・説明": "nutrition_counseling",
-    "施設内観（人物なし）": "interior",
-    "図解・インフォグラフィック": "infographic",
-    "目標達成で喜ぶ風景": "goal_achievement"
-}
-
-# SNS投稿タイプ
-SNS_POST_TYPES = {
-    "Google Map": {
-        "月曜：3軸診断の紹介": "3axis_intro",
-        "火曜：お客様の成果報告": "customer_success",
-        "水曜：施設・設備の紹介": "facility_intro",
-        "木曜：トレーナー紹介": "trainer_intro",
-        "金曜：よくある質問": "faq",
-        "土曜：健康・運動の豆知識": "health_tips",
-        "日曜：空き状況・キャンペーン": "availability"
-    },
-    "Instagram": {
-        "教育系：セルフチェック・知識": "education",
-        "共感系：悩み→解決": "empathy",
-        "信頼系：お客様の声・実績": "trust"
-    }
-}
 
-# =====================================
-# Instagram複数ページ投稿用定義
-# =====================================
+def show_other_candidates():
+    """
+    自動採点で2位以下の候補を表示する（ロゴなし・ギャラリーに記録しないまま見せ、選んだものだけ保存する）
 
-# 投稿テーマ（大カテゴリ）
-INSTAGRAM_THEMES = {
-    "ジム継続の悩み": "gym_continuation",
-    "ダイエットの悩み": "diet_problem",
-    "姿勢改善": "posture_improvement",
-    "3軸診断の解説": "3axis_explanation",
-    "食事・栄養": "nutrition",
-    "運動習慣づくり": "exercise_habit",
-    "年代別のお悩み": "age_specific",
-    "お客様の声・成果": "customer_voice",
-    "トレーナー紹介": "trainer_intro",
-    "よくある質問": "faq",
-    "施設・設備紹介": "facility",
-    "キャンペーン・お知らせ": "campaign"
-}
-
-# 見出しテンプレート（テーマごと）
-HEADLINE_TEMPLATES = {
-    "ジム継続の悩み": [
-        "「ジムが続かない」本当の理由",
-        "なぜ3ヶ月で挫折するのか",
-        "意志が弱いから続かない？",
-        "ジム選びで失敗する人の特徴",
-        "続けられる人と続けられない人の違い",
-        "週1回でも効果は出る？",
-        "モチベーションが続かない時の対処法",
-        "「忙しい」は言い訳じゃない",
-        "完璧主義がジム継続を妨げる",
-        "パーソナルと24時間ジムの違い"
-    ],
-    "ダイエットの悩み": [
-        "食べないダイエットが失敗する理由",
-        "リバウンドを繰り返す人の共通点",
-        "糖質制限は本当に効果的？",
-        "40代からのダイエットが難しい理由",
-        "痩せたいのに痩せられない本当の原因",
-        "体重が減らない停滞期の乗り越え方",
-        "「食べてないのに太る」の真実",
-        "ダイエット成功に必要な3つのこと",
-        "極端な食事制限のリスク",
-        "健康的に痩せるペースとは"
-    ],
-    "姿勢改善": [
-        "デスクワークで姿勢が悪くなる理由",
-        "猫背を治すと印象が変わる",
-        "肩こり・腰痛と姿勢の関係",
-        "反り腰チェック方法",
-        "巻き肩の原因と改善法",
-        "ストレートネックのリスク",
-        "姿勢改善で得られる5つのメリット",
-        "座り方を変えるだけで変わる",
-        "姿勢と自律神経の関係",
-        "30秒でできる姿勢チェック"
-    ],
-    "3軸診断の解説": [
-        "3軸診断とは？",
-        "姿勢軸：体の土台を整える",
-        "食事軸：無理なく続ける食習慣",
-        "継続軸：習慣化のメカニズム",
-        "なぜ3軸が必要なのか",
-        "1軸だけでは効果が出ない理由",
-        "3軸診断の流れ",
-        "診断結果の見方",
-        "あなたに合ったアプローチ",
-        "3軸で変わった人の声"
-    ],
-    "食事・栄養": [
-        "タンパク質、足りてますか？",
-        "1日に必要なタンパク質量",
-        "プロテインは必要？",
-        "コンビニで選ぶ高タンパク食",
-        "外食でも太らない選び方",
-        "お酒とダイエットの関係",
-        "間食をやめられない時の対処法",
-        "朝食を抜くとどうなる？",
-        "水分摂取の重要性",
-        "食事記録をつけるメリット"
-    ],
-    "運動習慣づくり": [
-        "運動が苦手でも大丈夫",
-        "週何回運動すればいい？",
-        "朝と夜、どちらが効果的？",
-        "筋トレと有酸素運動の違い",
-        "自宅でできる簡単エクササイズ",
-        "運動を習慣化するコツ",
-        "「時間がない」を解決する方法",
-        "運動嫌いが運動好きになるまで",
-        "続けやすい運動の選び方",
-        "パーソナルトレーニングのメリット"
-    ],
-    "年代別のお悩み": [
-        "30代からの体型変化",
-        "40代、代謝が落ちてきた",
-        "50代からでも遅くない",
-        "産後の体型戻し",
-        "更年期と体重の関係",
-        "30代男性の健康管理",
-        "40代ビジネスマンの運動習慣",
-        "シニア世代の筋力維持",
-        "年齢に合った運動強度",
-        "世代別おすすめトレーニング"
-    ],
-    "お客様の声・成果": [
-        "3ヶ月で-5kg達成",
-        "姿勢が変わって肩こり改善",
-        "服のサイズが2サイズダウン",
-        "体重より見た目が変わった",
-        "運動習慣が身についた",
-        "食事の意識が変わった",
-        "自分に自信が持てるように",
-        "周りから「痩せた？」と言われる",
-        "健康診断の数値が改善",
-        "リバウンドしなくなった"
-    ],
-    "トレーナー紹介": [
-        "トレーナー紹介：岡田",
-        "トレーナー紹介：山本",
-        "トレーナー紹介：板倉",
-        "トレーナー紹介：葛本",
-        "私がトレーナーになった理由",
-        "得意な指導スタイル",
-        "お客様へのメッセージ",
-        "トレーナーの1日",
-        "資格・経歴紹介",
-        "トレーニングへのこだわり"
-    ],
-    "よくある質問": [
-        "Q. どれくらいで効果が出る？",
-        "Q. 運動経験がなくても大丈夫？",
-        "Q. 食事制限は厳しい？",
-        "Q. 週1回でも効果はある？",
-        "Q. 予約は取りやすい？",
-        "Q. キャンセルはできる？",
-        "Q. 持ち物は何が必要？",
-        "Q. 無料カウンセリングの内容は？",
-        "Q. 料金プランについて",
-        "Q. 他のジムとの違いは？"
-    ],
-    "施設・設備紹介": [
-        "完全個室でプライベート空間",
-        "最新のトレーニング機器",
-        "清潔で快適な空間",
-        "シャワー・更衣室完備",
-        "駅から徒歩〇分の好立地",
-        "駐車場完備で車でも安心",
-        "島田本町店のご紹介",
-        "伊福町店のご紹介",
-        "店内ツアー",
-        "こだわりの設備"
-    ],
-    "キャンペーン・お知らせ": [
-        "今週の空き状況",
-        "新規入会キャンペーン",
-        "期間限定特別プラン",
-        "無料カウンセリング受付中",
-        "友達紹介キャンペーン",
-        "年末年始の営業案内",
-        "GW特別プログラム",
-        "夏までに変わりたい方へ",
-        "新トレーナー加入のお知らせ",
-        "営業時間変更のお知らせ"
-    ]
-}
-
-# サブテキストテンプレート
-SUBTEXT_TEMPLATES = {
-    "問題提起": [
-        "こんな悩みありませんか？",
-        "こんな経験ありませんか？",
-        "当てはまる方は要注意",
-        "心当たりはありませんか？",
-        "実は多くの方が悩んでいます"
-    ],
-    "原因説明": [
-        "その原因は...",
-        "実は〇〇が原因かも",
-        "知っていましたか？",
-        "多くの人が知らない事実",
-        "専門家が解説します"
-    ],
-    "解決策提示": [
-        "解決策は3つ",
-        "ポイントは〇〇",
-        "まずはここから始めよう",
-        "簡単にできる方法",
-        "FIREFITNESSなら解決できます"
-    ],
-    "メリット訴求": [
-        "こんなメリットがあります",
-        "〇〇で得られる効果",
-        "変化を実感できる",
-        "多くの方が効果を実感",
-        "始めて良かったの声多数"
-    ],
-    "行動喚起": [
-        "まずは無料カウンセリングへ",
-        "お気軽にご相談ください",
-        "今すぐ始めませんか？",
-        "変わるなら今です",
-        "一歩踏み出してみませんか？"
-    ],
-    "数値・実績": [
-        "平均-5kg達成",
-        "継続率90%以上",
-        "満足度98%",
-        "累計〇〇名が体験",
-        "3ヶ月で効果を実感"
-    ],
-    "リスト形式": [
-        "①〇〇\n②〇〇\n③〇〇",
-        "・ポイント1\n・ポイント2\n・ポイント3",
-        "STEP1→STEP2→STEP3",
-        "Before → After",
-        "原因 → 対策 → 結果"
-    ]
-}
-
-# アクセントテキストテンプレート
-ACCENT_TEMPLATES = [
-    "意志の弱さではありません",
-    "それ、間違いかもしれません",
-    "実は逆効果です",
-    "ここが重要ポイント",
-    "多くの人が見落としがち",
-    "プロが教える秘訣",
-    "これが成功の鍵",
-    "今すぐチェック",
-    "無料カウンセリング受付中",
-    "期間限定",
-    "先着〇名様限定",
-    "お見逃しなく",
-    "詳しくはプロフィールから",
-    "保存してあとで見返そう",
-    "友達にもシェアしてね"
-]
-
-# ページタイプ定義（1〜8ページ目）
-PAGE_TYPES = {
-    1: {
-        "name": "タイトルページ",
-        "description": "目を引くタイトルで興味を惹く",
-        "layouts": ["テキスト中心（シンプル）", "写真メイン＋テキスト"]
-    },
-    2: {
-        "name": "問題提起ページ",
-        "description": "読者の悩みに共感する",
-        "layouts": ["テキスト中心（シンプル）", "カード型（情報整理）"]
-    },
-    3: {
-        "name": "原因説明ページ",
-        "description": "なぜその問題が起きるのか解説",
-        "layouts": ["図解・インフォグラフィック", "ステップ・手順説明"]
-    },
-    4: {
-        "name": "解決策ページ",
-        "description": "具体的な解決方法を提示",
-        "layouts": ["ステップ・手順説明", "図解・インフォグラフィック"]
-    },
-    5: {
-        "name": "詳細説明ページ",
-        "description": "ポイントを詳しく解説",
-        "layouts": ["カード型（情報整理）", "図解・インフォグラフィック"]
-    },
-    6: {
-        "name": "実績・証拠ページ",
-        "description": "お客様の声や数値で信頼性UP",
-        "layouts": ["引用・お客様の声", "ビフォーアフター風（数値）"]
-    },
-    7: {
-        "name": "まとめページ",
-        "description": "ポイントを簡潔にまとめる",
-        "layouts": ["テキスト中心（シンプル）", "カード型（情報整理）"]
-    },
-    8: {
-        "name": "CTA（行動喚起）ページ",
-        "description": "次のアクションを促す",
-        "layouts": ["テキスト中心（シンプル）", "写真メイン＋テキスト"]
-    }
-}
-
-# ページ構成プリセット
-PAGE_PRESETS = {
-    "3ページ構成（シンプル）": [1, 4, 8],
-    "4ページ構成（基本）": [1, 2, 4, 8],
-    "5ページ構成（標準）": [1, 2, 3, 4, 8],
-    "6ページ構成（詳細）": [1, 2, 3, 4, 6, 8],
-    "7ページ構成（充実）": [1, 2, 3, 4, 5, 6, 8],
-    "8ページ構成（フル）": [1, 2, 3, 4, 5, 6, 7, 8]
-}
-
-# アイコンタイプ選択肢
-ICON_TYPES = [
-    "なし",
-    "3軸アイコン（姿勢・食事・継続）",
-    "チェックマーク",
-    "番号リスト（1,2,3...）",
-    "矢印・フロー",
-    "人物シルエット",
-    "ダンベル・運動器具",
-    "フォーク・ナイフ（食事）",
-    "時計・カレンダー",
-    "グラフ・チャート",
-    "星・評価マーク",
-    "ハート・健康",
-    "脳・メンタル",
-    "体のパーツ（筋肉・骨格）",
-    "吹き出し・会話",
-    "メダル・達成",
-    "スマホ・デジタル",
-    "ビル・店舗"
-]
-
-# フォントスタイル選択肢
-FONT_STYLES = [
-    "ゴシック体（モダン）",
-    "明朝体（上品）",
-    "丸ゴシック（親しみやすい）",
-    "太ゴシック（力強い）",
-    "細ゴシック（洗練）",
-    "手書き風（カジュアル）"
-]
-
-# 装飾要素選択肢
-DECORATION_OPTIONS = [
-    "なし",
-    "吹き出し",
-    "引用符",
-    "アンダーライン",
-    "背景図形（四角）",
-    "背景図形（丸）",
-    "枠線",
-    "影付き",
-    "グラデーション背景",
-    "ドット模様",
-    "ストライプ模様"
-]
-
-# 枠線スタイル選択肢
-BORDER_STYLES = [
-    "なし",
-    "細い枠（ネイビー）",
-    "細い枠（オレンジ）",
-    "細い枠（白）",
-    "太い枠（ネイビー）",
-    "太い枠（オレンジ）",
-    "角丸枠（ネイビー）",
-    "角丸枠（オレンジ）",
-    "ダブルライン",
-    "点線",
-    "破線"
-]
-
-# 雰囲気選択肢
-MOOD_OPTIONS = [
-    "落ち着いた・信頼感",
-    "やや落ち着いた",
-    "ニュートラル",
-    "やや活気ある",
-    "活気ある・エネルギッシュ",
-    "高級感・プレミアム",
-    "親しみやすい・カジュアル",
-    "シンプル・ミニマル",
-    "情熱的・モチベーション"
-]
-
-# 色の強さ選択肢
-COLOR_INTENSITY_OPTIONS = [
-    "淡い・パステル",
-    "やや淡い",
-    "標準",
-    "やや濃い",
-    "濃い・ビビッド"
-]
-
-# SNS投稿用レイアウトスタイル
-LAYOUT_STYLES = {
-    "テキスト中心（シンプル）": "text_centered",
-    "図解・インフォグラフィック": "infographic",
-    "写真メイン＋テキスト": "photo_with_text",
-    "カード型（情報整理）": "card_layout",
-    "引用・お客様の声": "testimonial",
-    "ステップ・手順説明": "step_by_step",
-    "ビフォーアフター風（数値）": "before_after_numbers",
-    "Q&A形式": "qa_format"
-}
-
-# テキスト配置オプション
-TEXT_POSITIONS = {
-    "上部": "top",
-    "中央": "center",
-    "下部": "bottom",
-    "左上": "top_left",
-    "右上": "top_right",
-    "左下": "bottom_left",
-    "右下": "bottom_right"
-}
-
-# テキストサイズ
-TEXT_SIZES = {
-    "極小": "xs",
-    "小": "small",
-    "中": "medium",
-    "大": "large",
-    "特大": "xl",
-    "極大": "xxl"
-}
-
-# 背景スタイル
-BACKGROUND_STYLES = {
-    "単色（白）": {"type": "solid", "color": "#ffffff", "opacity": 100},
-    "単色（ダークネイビー）": {"type": "solid", "color": "#0d2b45", "opacity": 100},
-    "単色（ライトグレー）": {"type": "solid", "color": "#f5f5f5", "opacity": 100},
-    "グラデーション（ネイビー→白）": {"type": "gradient", "colors": ["#0d2b45", "#ffffff"], "opacity": 100},
-    "グラデーション（オレンジ→白）": {"type": "gradient", "colors": ["#ff6b35", "#ffffff"], "opacity": 100},
-    "写真背景（透明度50%）": {"type": "photo", "color": "#000000", "opacity": 50},
-    "写真背景（透明度30%）": {"type": "photo", "color": "#000000", "opacity": 30},
-    "写真背景（透明度70%）": {"type": "photo", "color": "#000000", "opacity": 70},
-    "写真背景（白オーバーレイ50%）": {"type": "photo", "color": "#ffffff", "opacity": 50},
-}
-
-# アスペクト比
-ASPECT_RATIOS = {
-    "1:1（正方形・Instagram）": "1:1",
-    "4:5（縦長・Instagram）": "4:5",
-    "9:16（ストーリー・リール）": "9:16",
-    "16:9（横長）": "16:9",
-    "4:3（Google Map推奨）": "4:3",
-    "3:2": "3:2"
-}
-
-CLIENT_TYPES = {
-    "なし（人物なし）": None,
-    "30代女性": "30s_female",
-    "30代男性": "30s_male",
-    "40代女性": "40s_female",
-    "40代男性ビジネスマン": "40s_businessman",
-    "50代女性": "50s_female",
-    "50代男性": "50s_male",
-    "シニア女性（60代以上）": "senior_female",
-    "シニア男性（60代以上）": "senior_male",
-    "主婦層": "housewife"
-}
-
-# ブランドカラー
-BRAND_COLORS = {
-    "ダークネイビー（メイン）": "#0d2b45",
-    "オレンジ（アクセント）": "#ff6b35",
-    "白": "#ffffff",
-    "ライトグレー": "#f5f5f5",
-    "黒": "#000000"
-}
+    候補は session_state に持つので、保存ボタンで再実行しても消えず、何枚でも保存できる
+    """
+    pending = st.session_state.get("promo_other_candidates")
+    if not pending or not pending["candidates"]:
+        return
+    candidates = pending["candidates"]
+    with st.expander(f"ほかの候補（{len(candidates)}枚・自動採点の順・ロゴなし）", expanded=True):
+        for candidate in candidates:
+            if not Path(candidate["image_path"]).exists():
+                continue
+            show_image(candidate["image_path"], caption=f"{candidate['rank']}位（{format_candidate_scores(candidate)}）")
+            st.button(
+                f"{candidate['rank']}位の候補をギャラリーに保存",
+                key=f"promo_promote_{candidate['rank']}",
+                on_click=promote_candidate_output,
+                args=(candidate["image_path"], pending["logo"], pending["fields"])
+            )
+            output_download_button(
+                candidate["image_path"],
+                label=f"{candidate['rank']}位の画像をダウンロード",
+                file_name=f"firefitness_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{candidate['rank']}.png",
+                mime="image/png",
+                key=f"promo_candidate_{candidate['rank']}"
+            )
 
-# =====================================
-# ブログ投稿用定義
-# =====================================
 
-# ブログ記事カテゴリ
-BLOG_CATEGORIES = {
-    "ダイエット・体重管理": "diet",
-    "姿勢改善・体の歪み": "posture",
-    "筋力トレーニング": "strength",
-    "食事・栄養": "nutrition",
-    "運動習慣・継続のコツ": "habit",
-    "お客様の声・成功事例": "testimonial",
-    "健康・ウェルネス": "wellness",
-    "よくある質問": "faq",
-    "トレーナー紹介": "trainer",
-    "施設・サービス紹介": "facility"
-}
-
-# ブログ記事トーン
-BLOG_TONES = {
-    "専門的・信頼感": "professional",
-    "親しみやすい・カジュアル": "friendly",
-    "やる気を引き出す・モチベーション": "motivational",
-    "教育的・わかりやすい": "educational"
-}
-
-# ブログ記事構成テンプレート
-BLOG_STRUCTURES = {
-    "問題提起→解決策": {
-        "description": "読者の悩みを明確にし、解決策を提示する構成",
-        "sections": ["導入（問題提起）", "原因の説明", "解決策", "実践のポイント", "まとめ・CTA"]
-    },
-    "ハウツー・手順説明": {
-        "description": "ステップバイステップで方法を説明する構成",
-        "sections": ["導入", "準備・前提条件", "手順1", "手順2", "手順3", "注意点", "まとめ"]
-    },
-    "比較・検討": {
-        "description": "複数の選択肢を比較し、最適解を提示する構成",
-        "sections": ["導入", "選択肢Aの説明", "選択肢Bの説明", "比較表", "おすすめ", "まとめ"]
-    },
-    "お客様事例紹介": {
-        "description": "実際のお客様の変化・成功を紹介する構成",
-        "sections": ["導入", "お客様の悩み", "取り組み内容", "結果・変化", "お客様の声", "まとめ・CTA"]
-    },
-    "Q&A形式": {
-        "description": "よくある質問に答える形式の構成",
-        "sections": ["導入", "Q1", "Q2", "Q3", "Q4", "Q5", "まとめ"]
-    }
-}
-
-# ブログ記事の長さ
-BLOG_LENGTHS = {
-    "短め（800〜1200字）": "short",
-    "標準（1500〜2000字）": "medium",
-    "長め（2500〜3500字）": "long"
-}
-
-# キーワード（SEO用）
-BLOG_KEYWORDS = [
-    "パーソナルトレーニング",
-    "岡山 ジム",
-    "ダイエット",
-    "姿勢改善",
-    "3軸診断",
-    "筋トレ",
-    "体重管理",
-    "健康",
-    "運動習慣",
-    "個室ジム",
-    "マンツーマン指導",
-    "食事指導"
-]
+def show_palette_check(result: dict):
+    """ブランドカラーへの適合（brand_palette の結果）を表示する。最低点に届かなければ警告"""
+    palette = result.get("palette")
+    if not palette:
+        return
+    labels = {"gold": "金", "red": "赤", "neon": "ネオン", "black": "黒"}
+    ng = [f"{label} {palette['ng'][key]:.0%}" for key, label in labels.items() if palette["ng"][key] >= 0.01]
+    details = [f"ブランドカラー {palette['brand_coverage']:.0%}"]
+    if ng:
+        details.append("NG の色 " + "・".join(ng))
+    if result.get("palette_retries"):
+        details.append(f"{result['palette_retries']}回作り直し")
+    st.caption(f"ブランドカラーの適合 {palette['score']:.2f}（{'、'.join(details)}）")
+    if not result.get("palette_ok", True):
+        st.warning("ブランドカラーの適合が基準を下回っています。色使いを確認してください")
+
+
+def format_legibility(legibility: dict) -> str:
+    """文字のコントラスト（text_contrast の結果）を1行にする"""
+    if legibility["min_contrast"] is None:
+        return "文字が見つかりませんでした"
+    level = next(r["level"] for r in legibility["regions"] if r["contrast"] == legibility["min_contrast"])
+    return f"見出し {legibility['headline_contrast']:.1f}:1 ・ 最も低い文字 {legibility['min_contrast']:.1f}:1（{level}）"
+
+
+def show_legibility(result: dict):
+    """SNS 画像の文字と背景のコントラストを表示する。読める目安に届かなければ警告"""
+    import io
+    from text_contrast import LEGIBLE_CONTRAST, analyze_legibility
+
+    # 生成時のバイト列があればファイルを読み直さない
+    source = io.BytesIO(result["image_data"]) if result.get("image_data") else result["image_path"]
+    try:
+        legibility = analyze_legibility(source)
+    except Exception as e:
+        print(f"⚠️ 文字のコントラストを調べられませんでした: {e}")
+        return
+    st.caption(f"文字のコントラスト: {format_legibility(legibility)}")
+    if legibility["legible"] is False:
+        st.warning(f"背景とのコントラストが低い文字があります（読める目安は {LEGIBLE_CONTRAST:.0f}:1 以上）。投稿前に確認してください")
+
+
+def location_of(background) -> str:
+    """背景画像のパスから店舗名を返す（店舗の背景でなければ None）"""
+    if not background:
+        return None
+    folder = Path(background).parent.name
+    return next((name for name, dir_name in LOCATIONS.items() if dir_name == folder), None)
+
+
+def output_download_button(path, label: str, file_name: str, mime: str, key: str = None,
+                           use_container_width: bool = False) -> None:
+    """ファイルのダウンロードボタン（配信サーバーを使うときはURLへのリンク。使わないときは押したときに読む）"""
+    url = file_url(path, download=file_name)
+    if url:
+        st.link_button(label, url, key=key, use_container_width=use_container_width)
+    else:
+        st.download_button(
+            label=label,
+            data=Path(path).read_bytes,
+            file_name=file_name,
+            mime=mime,
+            key=key,
+            use_container_width=use_container_width
+        )
 
-# =====================================
-# ヘルパー関数
-# =====================================
 
-# アセットパス
-ASSETS_DIR = Path(__file__).parent / "assets"
-TRAINERS_DIR = ASSETS_DIR / "trainers"
-BACKGROUNDS_DIR = ASSETS_DIR / "backgrounds"
-LOGOS_DIR = ASSETS_DIR / "logos"
-OUTPUTS_DIR = Path(__file__).parent / "outputs"
+def export_selector(key: str) -> list:
+    """用途別の書き出し形式の選択"""
+    return st.multiselect(
+        "書き出し形式",
+        options=list(CHANNEL_PRESETS.keys()),
+        default=default_channels(),
+        format_func=lambda c: CHANNEL_PRESETS[c]["label"],
+        help="生成後にバックグラウンドで書き出します（画像の表示は待ちません）",
+        key=key
+    )
 
-# 出力ディレクトリ作成
-OUTPUTS_DIR.mkdir(exist_ok=True)
 
-# =====================================
-# SVGアイコン定義
-# =====================================
-ICONS = {
-    "fire": '''<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M8.5 14.5A2.5 2.5 0 0 0 11 12c0-1.38-.5-2-1-3-1.072-2.143-.224-4.054 2-6 .5 2.5 2 4.9 4 6.5 2 1.6 3 3.5 3 5.5a7 7 0 1 1-14 0c0-1.153.433-2.294 1-3a2.5 2.5 0 0 0 2.5 2.5z"/></svg>''',
-    "settings": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="12" cy="12" r="3"/><path d="M19.4 15a1.65 1.65 0 0 0 .33 1.82l.06.06a2 2 0 0 1 0 2.83 2 2 0 0 1-2.83 0l-.06-.06a1.65 1.65 0 0 0-1.82-.33 1.65 1.65 0 0 0-1 1.51V21a2 2 0 0 1-2 2 2 2 0 0 1-2-2v-.09A1.65 1.65 0 0 0 9 19.4a1.65 1.65 0 0 0-1.82.33l-.06.06a2 2 0 0 1-2.83 0 2 2 0 0 1 0-2.83l.06-.06a1.65 1.65 0 0 0 .33-1.82 1.65 1.65 0 0 0-1.51-1H3a2 2 0 0 1-2-2 2 2 0 0 1 2-2h.09A1.65 1.65 0 0 0 4.6 9a1.65 1.65 0 0 0-.33-1.82l-.06-.06a2 2 0 0 1 0-2.83 2 2 0 0 1 2.83 0l.06.06a1.65 1.65 0 0 0 1.82.33H9a1.65 1.65 0 0 0 1-1.51V3a2 2 0 0 1 2-2 2 2 0 0 1 2 2v.09a1.65 1.65 0 0 0 1 1.51 1.65 1.65 0 0 0 1.82-.33l.06-.06a2 2 0 0 1 2.83 0 2 2 0 0 1 0 2.83l-.06.06a1.65 1.65 0 0 0-.33 1.82V9a1.65 1.65 0 0 0 1.51 1H21a2 2 0 0 1 2 2 2 2 0 0 1-2 2h-.09a1.65 1.65 0 0 0-1.51 1z"/></svg>''',
-    "building": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="4" y="2" width="16" height="20" rx="2" ry="2"/><path d="M9 22v-4h6v4"/><path d="M8 6h.01"/><path d="M16 6h.01"/><path d="M12 6h.01"/><path d="M12 10h.01"/><path d="M12 14h.01"/><path d="M16 10h.01"/><path d="M16 14h.01"/><path d="M8 10h.01"/><path d="M8 14h.01"/></svg>''',
-    "user": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M19 21v-2a4 4 0 0 0-4-4H9a4 4 0 0 0-4 4v2"/><circle cx="12" cy="7" r="4"/></svg>''',
-    "image": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="3" y="3" width="18" height="18" rx="2" ry="2"/><circle cx="8.5" cy="8.5" r="1.5"/><polyline points="21 15 16 10 5 21"/></svg>''',
-    "camera": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M14.5 4h-5L7 7H4a2 2 0 0 0-2 2v9a2 2 0 0 0 2 2h16a2 2 0 0 0 2-2V9a2 2 0 0 0-2-2h-3l-2.5-3z"/><circle cx="12" cy="13" r="3"/></svg>''',
-    "share": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="18" cy="5" r="3"/><circle cx="6" cy="12" r="3"/><circle cx="18" cy="19" r="3"/><line x1="8.59" y1="13.51" x2="15.42" y2="17.49"/><line x1="15.41" y1="6.51" x2="8.59" y2="10.49"/></svg>''',
-    "sliders": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><line x1="4" y1="21" x2="4" y2="14"/><line x1="4" y1="10" x2="4" y2="3"/><line x1="12" y1="21" x2="12" y2="12"/><line x1="12" y1="8" x2="12" y2="3"/><line x1="20" y1="21" x2="20" y2="16"/><line x1="20" y1="12" x2="20" y2="3"/><line x1="1" y1="14" x2="7" y2="14"/><line x1="9" y1="8" x2="15" y2="8"/><line x1="17" y1="16" x2="23" y2="16"/></svg>''',
-    "edit": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M11 4H4a2 2 0 0 0-2 2v14a2 2 0 0 0 2 2h14a2 2 0 0 0 2-2v-7"/><path d="M18.5 2.5a2.121 2.121 0 0 1 3 3L12 15l-4 1 1-4 9.5-9.5z"/></svg>''',
-    "type": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><polyline points="4 7 4 4 20 4 20 7"/><line x1="9" y1="20" x2="15" y2="20"/><line x1="12" y1="4" x2="12" y2="20"/></svg>''',
-    "palette": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="13.5" cy="6.5" r=".5"/><circle cx="17.5" cy="10.5" r=".5"/><circle cx="8.5" cy="7.5" r=".5"/><circle cx="6.5" cy="12.5" r=".5"/><path d="M12 2C6.5 2 2 6.5 2 12s4.5 10 10 10c.926 0 1.648-.746 1.648-1.688 0-.437-.18-.835-.437-1.125-.29-.289-.438-.652-.438-1.125a1.64 1.64 0 0 1 1.668-1.668h1.996c3.051 0 5.555-2.503 5.555-5.555C21.965 6.012 17.461 2 12 2z"/></svg>''',
-    "layout": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="3" y="3" width="18" height="18" rx="2" ry="2"/><line x1="3" y1="9" x2="21" y2="9"/><line x1="9" y1="21" x2="9" y2="9"/></svg>''',
-    "grid": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="3" y="3" width="7" height="7"/><rect x="14" y="3" width="7" height="7"/><rect x="14" y="14" width="7" height="7"/><rect x="3" y="14" width="7" height="7"/></svg>''',
-    "download": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"/><polyline points="7 10 12 15 17 10"/><line x1="12" y1="15" x2="12" y2="3"/></svg>''',
-    "book": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M4 19.5A2.5 2.5 0 0 1 6.5 17H20"/><path d="M6.5 2H20v20H6.5A2.5 2.5 0 0 1 4 19.5v-15A2.5 2.5 0 0 1 6.5 2z"/></svg>''',
-    "zap": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><polygon points="13 2 3 14 12 14 11 22 21 10 12 10 13 2"/></svg>''',
-    "check": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><polyline points="20 6 9 17 4 12"/></svg>''',
-    "sparkles": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="m12 3-1.912 5.813a2 2 0 0 1-1.275 1.275L3 12l5.813 1.912a2 2 0 0 1 1.275 1.275L12 21l1.912-5.813a2 2 0 0 1 1.275-1.275L21 12l-5.813-1.912a2 2 0 0 1-1.275-1.275L12 3Z"/><path d="M5 3v4"/><path d="M19 17v4"/><path d="M3 5h4"/><path d="M17 19h4"/></svg>''',
-    "send": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><line x1="22" y1="2" x2="11" y2="13"/><polygon points="22 2 15 22 11 13 2 9 22 2"/></svg>''',
-    "file-text": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M14 2H6a2 2 0 0 0-2 2v16a2 2 0 0 0 2 2h12a2 2 0 0 0 2-2V8z"/><polyline points="14 2 14 8 20 8"/><line x1="16" y1="13" x2="8" y2="13"/><line x1="16" y1="17" x2="8" y2="17"/><polyline points="10 9 9 9 8 9"/></svg>''',
-    "globe": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="12" cy="12" r="10"/><line x1="2" y1="12" x2="22" y2="12"/><path d="M12 2a15.3 15.3 0 0 1 4 10 15.3 15.3 0 0 1-4 10 15.3 15.3 0 0 1-4-10 15.3 15.3 0 0 1 4-10z"/></svg>''',
-}
-
-
-def icon(name: str, color: str = "#ff6b35", size: int = 18) -> str:
-    """SVGアイコンをHTMLとして返す"""
-    svg = ICONS.get(name, "")
-    styled_svg = svg.replace('width="18"', f'width="{size}"').replace('height="18"', f'height="{size}"').replace('width="24"', f'width="{size}"').replace('height="24"', f'height="{size}"')
-    return f'<span style="display: inline-flex; align-items: center; color: {color}; margin-right: 0.5rem;">{styled_svg}</span>'
+def show_exports(futures: dict, key_prefix: str) -> None:
+    """
+    書き出しの結果を、終わったものからダウンロードボタンで表示する
 
+    書き出し中のものがあるときだけ、この部分を1秒ごとに描画し直す（poll_exports）
+    """
+    if not futures:
+        return
+    if all(future.done() for future in futures.values()):
+        render_exports(futures, key_prefix)
+    else:
+        st.session_state[f"{key_prefix}_exports_done"] = False
+        poll_exports(futures, key_prefix)
 
-def section_header(icon_name: str, title: str, color: str = "#ff6b35") -> None:
-    """セクションヘッダーを表示"""
-    st.markdown(f'''
-    <div style="display: flex; align-items: center; margin-bottom: 0.75rem; margin-top: 0.5rem;">
-        {icon(icon_name, color, 20)}
-        <span style="color: #ffffff; font-size: 1rem; font-weight: 500; letter-spacing: 0.02em;">{title}</span>
-    </div>
-    ''', unsafe_allow_html=True)
 
+@st.fragment(run_every=1.0)
+def poll_exports(futures: dict, key_prefix: str) -> None:
+    """
+    書き出し中の間だけ1秒ごとに描画し直す fragment
 
-def get_available_images(directory: Path) -> list:
-    """指定ディレクトリ内の画像ファイル一覧を取得"""
-    if not directory.exists():
-        return []
-    extensions = {'.jpg', '.jpeg', '.png', '.webp'}
-    return [f for f in directory.iterdir() if f.suffix.lower() in extensions]
+    全部終わったら session_state に記録し、それ以降の再実行では終わるのを確かめずにボタンを描くだけにする
+    （Streamlit には run_every を途中で止める公開の API がないため、ブラウザからの再実行の要求は
+    次にアプリ全体を再実行したときに止まる）
+    """
+    done_key = f"{key_prefix}_exports_done"
+    if not st.session_state.get(done_key):
+        st.session_state[done_key] = all(future.done() for future in futures.values())
+    render_exports(futures, key_prefix)
+
+
+def render_exports(futures: dict, key_prefix: str) -> None:
+    """書き出しの状態とダウンロードボタン（ファイルはボタンを押したときに読む）"""
+    cols = st.columns(len(futures))
+    for col, (channel, future) in zip(cols, futures.items()):
+        label = CHANNEL_PRESETS[channel]["label"]
+        with col:
+            if not future.done():
+                st.caption(f"{label} を書き出し中...")
+                continue
+            result = future.result()
+            if not result["success"]:
+                st.caption(f"{label}: {result['error']}")
+                continue
+            output_download_button(
+                result["path"],
+                label=f"{label}（{result['bytes'] / 1024:.0f} KB）",
+                file_name=Path(result["path"]).name,
+                mime=CHANNEL_PRESETS[channel]["mime"],
+                key=f"{key_prefix}_{channel}"
+            )
 
 
-def load_image_as_base64(image_path: Path) -> str:
-    """画像をbase64エンコード"""
-    with open(image_path, "rb") as f:
-        return base64.b64encode(f.read()).decode()
+def archive_download_button(entries: list, manifest: dict, file_stem: str, key: str) -> None:
+    """複数の生成物を manifest.json と一緒に1つのZIPにまとめ、ダウンロードボタンを表示する"""
+    result = write_zip(entries, manifest, DEFAULT_EXPORT_DIR / f"{file_stem}.zip")
+    if not result["success"]:
+        st.warning(f"ZIPの作成に失敗しました: {result['error']}")
+        return
+    output_download_button(
+        result["path"],
+        label=f"まとめてダウンロード（ZIP・{result['bytes'] / 1024 / 1024:.1f} MB）",
+        file_name=Path(result["path"]).name,
+        mime="application/zip",
+        key=key,
+        use_container_width=True
+    )
 
 
-def overlay_logo_on_image(image_path: str, logo_path: Path, position: str = "右下", size: str = "中", padding: int = 20) -> str:
-    """生成画像にロゴを重ねる
+def export_entries(futures: dict, meta: dict, name_stem: str) -> tuple:
+    """
+    書き出し（ENCODER.submit の結果）のうち、終わってできたファイルを ZIP の entries にする
 
-    Args:
-        image_path: 生成された画像のパス
-        logo_path: ロゴ画像のパス
-        position: ロゴの位置（左上、中央上、右上、左中央、中央、右中央、左下、中央下、右下）
-        size: ロゴサイズ（極小、小、中、大、極大）
-        padding: 端からの余白（ピクセル）
+    書き出し中のものは待たずに除く（待つのは呼び出し側で wait_for_exports を使う）
 
     Returns:
-        ロゴを重ねた画像の保存パス
+        (entries, 書き出し中で含めなかった形式の名前のリスト)
     """
-    # 画像を開く
-    base_image = Image.open(image_path).convert("RGBA")
-    logo = Image.open(logo_path).convert("RGBA")
-
-    # サイズ比率を決定（画像の短辺に対する割合）
-    size_ratios = {
-        "極小": 0.08,
-        "小": 0.12,
-        "中": 0.18,
-        "大": 0.25,
-        "極大": 0.35
-    }
-    ratio = size_ratios.get(size, 0.18)
-
-    # ロゴをリサイズ
-    base_short_side = min(base_image.width, base_image.height)
-    target_width = int(base_short_side * ratio)
-    logo_aspect = logo.height / logo.width
-    target_height = int(target_width * logo_aspect)
-    logo = logo.resize((target_width, target_height), Image.Resampling.LANCZOS)
-
-    # 位置を計算
-    positions = {
-        "左上": (padding, padding),
-        "中央上": ((base_image.width - logo.width) // 2, padding),
-        "右上": (base_image.width - logo.width - padding, padding),
-        "左中央": (padding, (base_image.height - logo.height) // 2),
-        "中央": ((base_image.width - logo.width) // 2, (base_image.height - logo.height) // 2),
-        "右中央": (base_image.width - logo.width - padding, (base_image.height - logo.height) // 2),
-        "左下": (padding, base_image.height - logo.height - padding),
-        "中央下": ((base_image.width - logo.width) // 2, base_image.height - logo.height - padding),
-        "右下": (base_image.width - logo.width - padding, base_image.height - logo.height - padding)
-    }
-    pos = positions.get(position, positions["右下"])
-
-    # ロゴを合成
-    base_image.paste(logo, pos, logo)
+    entries = []
+    pending = []
+    for channel, future in futures.items():
+        if not future.done():
+            pending.append(CHANNEL_PRESETS[channel]["label"])
+            continue
+        result = future.result()
+        if result["success"]:
+            entries.append({
+                "path": result["path"],
+                "name": f"{name_stem}_{channel}{Path(result['path']).suffix}",
+                "meta": {**meta, "channel": channel},
+            })
+    return entries, pending
 
-    # RGBAからRGBに変換してPNGで保存
-    output_path = image_path.replace(".png", "_with_logo.png")
-    base_image_rgb = Image.new("RGB", base_image.size, (255, 255, 255))
-    base_image_rgb.paste(base_image, mask=base_image.split()[3] if base_image.mode == "RGBA" else None)
-    base_image_rgb.save(output_path, "PNG")
 
-    return output_path
+def wait_for_exports(futures: list) -> None:
+    """ZIP を作る前に、書き出し中のものを EXPORT_ZIP_WAIT_SECONDS 秒まで待つ"""
+    if all(future.done() for future in futures):
+        return
+    with st.spinner("書き出しの完了を待っています..."):
+        wait(futures, timeout=EXPORT_ZIP_WAIT_SECONDS)
 
 
-# =====================================
-# 宣材写真モード
-# =====================================
-
 def render_promo_photo_mode():
     """宣材写真生成モードのUI"""
 
@@ -1215,7 +448,7 @@ def render_promo_photo_mode():
                 format_func=lambda x: x.name,
                 key="promo_bg"
             )
-            st.image(str(selected_bg), caption="選択中の背景", use_container_width=True)
+            show_image(selected_bg, caption="選択中の背景")
         else:
             st.warning(f"背景画像がありません: {bg_dir}")
             selected_bg = None
@@ -1287,6 +520,8 @@ def render_promo_photo_mode():
                 st.warning(f"ロゴ画像がありません。assets/logos/ にロゴを配置してください。")
                 use_logo = False
 
+        export_channels = export_selector("promo_encodings")
+
     # 中央カラム: 画像設定
     with col_center:
         section_header("image", "画像設定")
@@ -1344,6 +579,14 @@ def render_promo_photo_mode():
                 key="promo_mood"
             )
 
+            candidate_count = st.select_slider(
+                "候補の数",
+                options=list(range(1, MAX_CANDIDATES + 1)),
+                value=1,
+                help="複数の候補を同時に生成し、ピント・アスペクト比・ブランドカラーで自動採点して良い順に並べます（生成の回数分の料金がかかります）",
+                key="promo_candidates"
+            )
+
     # 右カラム: プレビュー
     with col_right:
         section_header("sparkles", "生成プレビュー")
@@ -1357,6 +600,8 @@ def render_promo_photo_mode():
         if CLIENT_TYPES[selected_client]:
             summary_parts.append(f"**クライアント**: {selected_client}")
         summary_parts.append(f"**アスペクト比**: {selected_ratio}")
+        if candidate_count > 1:
+            summary_parts.append(f"**候補の数**: {candidate_count}")
 
         st.info("\n\n".join(summary_parts))
 
@@ -1366,6 +611,19 @@ def render_promo_photo_mode():
 
     st.divider()
 
+    # 入力が止まったらプロンプト変換を先に始めておく
+    generation_input = build_promo_input(
+        location=selected_location,
+        situation=selected_situation,
+        trainer_name=selected_trainer_name if use_trainer else None,
+        client=selected_client,
+        aspect_ratio=ASPECT_RATIOS[selected_ratio],
+        additional_prompt=additional_prompt,
+        image_text=image_text if include_text else None,
+        mood=mood
+    )
+    schedule_prefetch("promo", generation_input, "convert_prompt_with_claude", generation_input)
+
     # 生成ボタン
     col_btn1, col_btn2, col_btn3 = st.columns([1, 2, 1])
     with col_btn2:
@@ -1392,9 +650,13 @@ def render_promo_photo_mode():
             selected_bg=selected_bg,
             logo_path=selected_logo if use_logo else None,
             logo_position=logo_position,
-            logo_size=logo_size
+            logo_size=logo_size,
+            export_channels=export_channels,
+            candidates=candidate_count
         )
 
+    show_other_candidates()
+
 
 # =====================================
 # SNS投稿モード
@@ -1495,6 +757,8 @@ def render_sns_post_mode():
                 st.warning(f"ロゴ画像がありません")
                 include_logo = False
 
+        export_channels = export_selector("sns_encodings")
+
     with settings_col3:
         section_header("user", "トレーナー写真")
         include_trainer_photo = st.checkbox("トレーナー写真を含める", value=False, key="sns_include_trainer")
@@ -1543,7 +807,8 @@ def render_sns_post_mode():
             include_trainer_photo=include_trainer_photo,
             selected_trainer_name=selected_trainer_name,
             selected_trainer=selected_trainer,
-            trainer_photo_style=trainer_photo_style
+            trainer_photo_style=trainer_photo_style,
+            export_channels=export_channels
         )
         return
 
@@ -1704,7 +969,7 @@ def render_sns_post_mode():
                     format_func=lambda x: x.name,
                     key="sns_bg_image"
                 )
-                st.image(str(selected_bg), caption="選択中の背景", use_container_width=True)
+                show_image(selected_bg, caption="選択中の背景")
             else:
                 selected_bg = None
         else:
@@ -1835,6 +1100,40 @@ def render_sns_post_mode():
     if st.session_state.get("show_presets", False):
         render_preset_selector(platform, selected_post_type)
 
+    # SNS投稿用のパラメータを収集
+    sns_params = {
+        "platform": platform,
+        "post_type": selected_post_type if platform != "Instagram（複数ページ）" else "Instagram複数ページ",
+        "layout_style": layout_style,
+        "background_style": background_style,
+        "custom_opacity": custom_opacity if "写真背景" in background_style else 100,
+        "main_headline": main_headline,
+        "headline_color": BRAND_COLORS[headline_color],
+        "headline_size": TEXT_SIZES[headline_size],
+        "headline_position": TEXT_POSITIONS[headline_position],
+        "sub_text": sub_text if sub_text else "",
+        "sub_text_color": BRAND_COLORS.get(subtext_color, "#0d2b45") if subtext_category != "なし" else None,
+        "sub_text_size": TEXT_SIZES.get(subtext_size, "medium") if subtext_category != "なし" else None,
+        "accent_text": accent_text if accent_text != "なし" else "",
+        "accent_style": accent_style if accent_text != "なし" else None,
+        "include_logo": include_logo,
+        "logo_position": TEXT_POSITIONS.get(logo_position) if include_logo else None,
+        "logo_size": TEXT_SIZES.get(logo_size) if include_logo else None,
+        "include_trainer_photo": include_trainer_photo,
+        "trainer_photo_style": trainer_photo_style if include_trainer_photo else None,
+        "include_icons": include_icons,
+        "icon_type": icon_type if include_icons else None,
+        "font_style": font_style,
+        "text_shadow": text_shadow,
+        "border_style": border_style,
+        "decoration": decoration,
+        "overall_mood": overall_mood,
+        "color_intensity": color_intensity
+    }
+
+    # 入力が止まったらプロンプト変換を先に始めておく
+    schedule_prefetch("sns", sns_params, "convert_sns_prompt_with_claude", sns_params)
+
     # 生成ボタン
     col_btn1, col_btn2, col_btn3 = st.columns([1, 2, 1])
     with col_btn2:
@@ -1847,37 +1146,6 @@ def render_sns_post_mode():
 
     # 生成処理
     if generate_button:
-        # SNS投稿用のパラメータを収集
-        sns_params = {
-            "platform": platform,
-            "post_type": selected_post_type if platform != "Instagram（複数ページ）" else "Instagram複数ページ",
-            "layout_style": layout_style,
-            "background_style": background_style,
-            "custom_opacity": custom_opacity if "写真背景" in background_style else 100,
-            "main_headline": main_headline,
-            "headline_color": BRAND_COLORS[headline_color],
-            "headline_size": TEXT_SIZES[headline_size],
-            "headline_position": TEXT_POSITIONS[headline_position],
-            "sub_text": sub_text if sub_text else "",
-            "sub_text_color": BRAND_COLORS.get(subtext_color, "#0d2b45") if subtext_category != "なし" else None,
-            "sub_text_size": TEXT_SIZES.get(subtext_size, "medium") if subtext_category != "なし" else None,
-            "accent_text": accent_text if accent_text != "なし" else "",
-            "accent_style": accent_style if accent_text != "なし" else None,
-            "include_logo": include_logo,
-            "logo_position": TEXT_POSITIONS.get(logo_position) if include_logo else None,
-            "logo_size": TEXT_SIZES.get(logo_size) if include_logo else None,
-            "include_trainer_photo": include_trainer_photo,
-            "trainer_photo_style": trainer_photo_style if include_trainer_photo else None,
-            "include_icons": include_icons,
-            "icon_type": icon_type if include_icons else None,
-            "font_style": font_style,
-            "text_shadow": text_shadow,
-            "border_style": border_style,
-            "decoration": decoration,
-            "overall_mood": overall_mood,
-            "color_intensity": color_intensity
-        }
-
         run_sns_generation(
             sns_params=sns_params,
             aspect_ratio=ASPECT_RATIOS[selected_ratio],
@@ -1886,7 +1154,8 @@ def render_sns_post_mode():
             selected_bg=selected_bg,
             logo_path=selected_logo if include_logo else None,
             logo_position=logo_position,
-            logo_size=logo_size
+            logo_size=logo_size,
+            export_channels=export_channels
         )
 
 
@@ -1999,7 +1268,8 @@ def render_instagram_multipage_mode(
     include_trainer_photo: bool,
     selected_trainer_name: str,
     selected_trainer: list,
-    trainer_photo_style: str
+    trainer_photo_style: str,
+    export_channels: list = None
 ):
     """Instagram複数ページ投稿画像生成モードのUI（AI自動生成版）"""
 
@@ -2036,6 +1306,10 @@ def render_instagram_multipage_mode(
         8: "cta"
     }
 
+    # テーマが決まったら全ページ分のコンテンツを先に生成しておく
+    carousel_input = {"theme": selected_theme, "page_types": [PAGE_TYPE_KEYS[p] for p in selected_pages]}
+    schedule_prefetch("carousel", carousel_input, "generate_carousel_contents", **carousel_input)
+
     # ページの概要を表示
     for i, page_num in enumerate(selected_pages):
         page_info = PAGE_TYPES[page_num]
@@ -2125,12 +1399,23 @@ def render_instagram_multipage_mode(
 
     # 生成処理
     if generate_all_button:
+        # SDK（anthropic / google.genai）は重いので生成時に読み込む
+        from prompt_converter import convert_sns_prompt_with_claude, generate_sns_content_with_claude
+        from image_generator import generate_image_with_gemini
+
         st.info(f"AIがテーマ「{selected_theme}」に基づいてコンテンツを自動生成し、{len(selected_pages)}ページの画像を作成します...")
 
         generated_images = []
         generated_contents = []  # 一貫性のため生成済みコンテンツを保存
+        archive_pages = []  # ZIPにまとめるページ（画像・書き出し・内容）
         progress_bar = st.progress(0)
 
+        # 先読み済みならそれを使う（「毎回新しいコンテンツ」なので使った結果は捨てる）
+        with st.spinner("AIがコンテンツを準備中..."):
+            prefetched_contents = take_prefetched("carousel", carousel_input, consume=True)
+        if prefetched_contents:
+            print("⚡ 先読み済みのコンテンツを使用")
+
         for idx, page_num in enumerate(selected_pages):
             page_info = PAGE_TYPES[page_num]
             page_type_key = PAGE_TYPE_KEYS[page_num]
@@ -2139,13 +1424,16 @@ def render_instagram_multipage_mode(
 
             # AIでコンテンツを生成
             with st.spinner(f"ページ {idx+1} のコンテンツをAI生成中..."):
-                ai_content = generate_sns_content_with_claude(
-                    theme=selected_theme,
-                    page_type=page_type_key,
-                    page_number=idx + 1,
-                    total_pages=len(selected_pages),
-                    previous_content=generated_contents
-                )
+                if prefetched_contents:
+                    ai_content = dict(prefetched_contents[idx])
+                else:
+                    ai_content = generate_sns_content_with_claude(
+                        theme=selected_theme,
+                        page_type=page_type_key,
+                        page_number=idx + 1,
+                        total_pages=len(selected_pages),
+                        previous_content=generated_contents
+                    )
 
                 # 生成されたコンテンツを保存
                 ai_content["page_type"] = page_type_key
@@ -2243,17 +1531,40 @@ def render_instagram_multipage_mode(
 
                     if result["success"]:
                         st.success(f"ページ {idx+1} 完了")
-                        st.image(result["image_path"], caption=f"ページ {idx+1}: {ai_content.get('headline', '')}", use_container_width=True)
-                        generated_images.append(result["image_path"])
-
-                        with open(result["image_path"], "rb") as f:
-                            st.download_button(
-                                label=f"ページ {idx+1} をダウンロード",
-                                data=f,
-                                file_name=f"firefitness_instagram_{selected_theme.replace('/', '_')}_page{idx+1}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png",
-                                mime="image/png",
-                                key=f"download_page_{idx}"
-                            )
+                        page_path = record_output(
+                            result["image_path"], mode="carousel",
+                            trainer=selected_trainer_name if include_trainer_photo and idx == 0 else None,
+                            location=location_of(selected_bg) if "写真背景" in bg_style else None,
+                            caption=ai_content.get("headline", ""), prompt=optimized_prompt
+                        )
+                        show_image(page_path, caption=f"ページ {idx+1}: {ai_content.get('headline', '')}")
+                        show_palette_check(result)
+                        generated_images.append(page_path)
+
+                        page_name = f"firefitness_instagram_{selected_theme.replace('/', '_')}_page{idx+1}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+                        output_download_button(
+                            page_path,
+                            label=f"ページ {idx+1} をダウンロード",
+                            file_name=page_name,
+                            mime="image/png",
+                            key=f"download_page_{idx}"
+                        )
+                        export_futures = ENCODER.submit(page_path, export_channels or [])
+                        show_exports(export_futures, f"export_page_{idx}")
+                        archive_pages.append({
+                            "path": page_path,
+                            "name": page_name,
+                            "futures": export_futures,
+                            "meta": {
+                                "page": idx + 1,
+                                "page_type": page_type_key,
+                                "headline": ai_content.get("headline", ""),
+                                "sub_text": ai_content.get("sub_text", ""),
+                                "body_points": ai_content.get("body_points", []),
+                                "cta_text": ai_content.get("cta_text", ""),
+                                "prompt": optimized_prompt,
+                            },
+                        })
                     else:
                         st.error(f"ページ {idx+1} の生成に失敗: {result.get('error', '不明なエラー')}")
 
@@ -2273,6 +1584,47 @@ def render_instagram_multipage_mode(
             for i, content in enumerate(generated_contents):
                 st.markdown(f"**ページ {i+1}**: {content.get('headline', '')} - {content.get('sub_text', '')}")
 
+            # 全ページの文字のコントラストをまとめて調べ、読みにくい順に並べる
+            from text_contrast import LEGIBLE_CONTRAST, rank_legibility
+
+            pages_by_path = {str(page["path"]): page for page in archive_pages}
+            legibility_ranking = rank_legibility([page["path"] for page in archive_pages])
+            st.markdown("#### 文字の読みやすさ（読みにくい順）")
+            for legibility in legibility_ranking:
+                page = pages_by_path[legibility["image_path"]]
+                page["meta"]["min_contrast"] = legibility["min_contrast"]
+                mark = "⚠️ " if legibility["legible"] is False else ""
+                st.markdown(f"- {mark}ページ {page['meta']['page']}: {format_legibility(legibility)}")
+            illegible = [l for l in legibility_ranking if l["legible"] is False]
+            if illegible:
+                st.warning(f"{len(illegible)}ページに背景とのコントラストが低い文字があります（読める目安は {LEGIBLE_CONTRAST:.0f}:1 以上）")
+
+            # 全ページ・書き出し・内容の一覧を1つのZIPに
+            wait_for_exports([future for page in archive_pages for future in page["futures"].values()])
+            entries = []
+            pending_exports = []
+            for page in archive_pages:
+                entries.append({"path": page["path"], "name": page["name"], "meta": page["meta"]})
+                page_entries, pending = export_entries(page["futures"], {"page": page["meta"]["page"]}, Path(page["name"]).stem)
+                entries.extend(page_entries)
+                pending_exports.extend(f"ページ {page['meta']['page']} の{label}" for label in pending)
+            if pending_exports:
+                st.warning(
+                    f"書き出しが終わらなかった {len(pending_exports)} 件はZIPに含まれていません: {'、'.join(pending_exports)}"
+                    "（各ページのボタンから個別にダウンロードできます）"
+                )
+            archive_download_button(
+                entries,
+                {
+                    "kind": "instagram_carousel",
+                    "theme": selected_theme,
+                    "created": datetime.now().isoformat(timespec="seconds"),
+                    "pages": len(archive_pages),
+                },
+                f"firefitness_instagram_{selected_theme.replace('/', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                key="mp_download_zip"
+            )
+
             # ハッシュタグ
             st.markdown("---")
             st.markdown("#### 投稿のヒント")
@@ -2287,18 +1639,10 @@ def render_instagram_multipage_mode(
 # 生成処理
 # =====================================
 
-def run_generation(mode, location, situation, trainer_name, trainer_images, client,
-                   aspect_ratio, additional_prompt, image_text, mood, selected_bg,
-                   logo_path=None, logo_position="右下", logo_size="中"):
-    """宣材写真の生成処理"""
-
-    print("=" * 50)
-    print("🔥 生成ボタンが押されました")
-    print("=" * 50)
-    st.info("処理を開始します...")
-
-    # 入力データ収集
-    generation_input = {
+def build_promo_input(location, situation, trainer_name, client, aspect_ratio,
+                      additional_prompt, image_text, mood) -> dict:
+    """宣材写真の入力データ（convert_prompt_with_claude に渡す形）を作る"""
+    return {
         "location": location,
         "situation": situation,
         "trainer": trainer_name,
@@ -2310,6 +1654,29 @@ def run_generation(mode, location, situation, trainer_name, trainer_images, clie
         "mood": mood
     }
 
+
+def run_generation(mode, location, situation, trainer_name, trainer_images, client,
+                   aspect_ratio, additional_prompt, image_text, mood, selected_bg,
+                   logo_path=None, logo_position="右下", logo_size="中", export_channels=None, candidates=1):
+    """宣材写真の生成処理（candidates が2以上なら候補を並列に生成し、自動採点の順に表示）"""
+    from prompt_converter import convert_prompt_with_claude
+    from image_generator import discard_candidates, generate_image_with_gemini, overlay_logo_on_image
+
+    print("=" * 50)
+    print("🔥 生成ボタンが押されました")
+    print("=" * 50)
+    st.info("処理を開始します...")
+
+    # 前回の生成で保存しなかった候補は削除する
+    previous = st.session_state.pop("promo_other_candidates", None)
+    if previous and discard_candidates([c["image_path"] for c in previous["candidates"]]):
+        print("🗑️ 保存しなかった前回の候補を削除しました")
+
+    # 入力データ収集
+    generation_input = build_promo_input(
+        location, situation, trainer_name, client, aspect_ratio, additional_prompt, image_text, mood
+    )
+
     # 参照画像収集
     reference_images = []
 
@@ -2332,8 +1699,12 @@ def run_generation(mode, location, situation, trainer_name, trainer_images, clie
 
     with st.spinner("プロンプトを最適化中..."):
         try:
-            print("📝 Claude APIを呼び出し中...")
-            optimized_prompt = convert_prompt_with_claude(generation_input)
+            optimized_prompt = take_prefetched("promo", generation_input, consume=True)
+            if optimized_prompt:
+                print("⚡ 先読み済みのプロンプトを使用")
+            else:
+                print("📝 Claude APIを呼び出し中...")
+                optimized_prompt = convert_prompt_with_claude(generation_input)
             print(f"✅ プロンプト生成完了: {optimized_prompt[:100]}...")
 
             with st.expander("最適化されたプロンプト（確認用）"):
@@ -2353,35 +1724,52 @@ def run_generation(mode, location, situation, trainer_name, trainer_images, clie
                 prompt=optimized_prompt,
                 reference_images=reference_images,
                 aspect_ratio=aspect_ratio,
-                resolution="high"
+                resolution="high",
+                candidates=candidates
             )
 
             if result["success"]:
                 st.success("画像生成が完了しました")
 
-                # ロゴを重ねる処理
-                final_image_path = result["image_path"]
-                if logo_path:
-                    try:
-                        final_image_path = overlay_logo_on_image(
-                            result["image_path"],
-                            logo_path,
-                            logo_position,
-                            logo_size
-                        )
-                        st.info("ロゴを追加しました")
-                    except Exception as e:
-                        st.warning(f"ロゴの追加に失敗しました: {str(e)}")
+                def finish(image_path, image_data=None):
+                    """ロゴを重ねて索引に記録し、表示するパスを返す"""
+                    if logo_path:
+                        try:
+                            image_path = overlay_logo_on_image(image_path, logo_path, logo_position, logo_size,
+                                                               image_data=image_data)
+                        except Exception as e:
+                            st.warning(f"ロゴの追加に失敗しました: {str(e)}")
+                    return record_output(image_path, **record_fields)
 
-                st.image(final_image_path, caption="生成された画像", use_container_width=True)
+                record_fields = {"mode": "promo", "trainer": trainer_name, "location": location,
+                                 "caption": situation, "prompt": optimized_prompt}
 
-                with open(final_image_path, "rb") as f:
-                    st.download_button(
-                        label="画像をダウンロード",
-                        data=f,
-                        file_name=f"firefitness_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png",
-                        mime="image/png"
-                    )
+                final_image_path = finish(result["image_path"], result.get("image_data"))
+                if logo_path:
+                    st.info("ロゴを追加しました")
+                ranked = result.get("candidates", [])
+                if ranked:
+                    st.caption(f"{len(ranked)}枚の候補のうち自動採点で1位の画像です（{format_candidate_scores(ranked[0])}）")
+                    if result.get("failed_candidates"):
+                        st.warning(f"{result['failed_candidates']}枚の候補は生成に失敗しました")
+                show_image(final_image_path, caption="生成された画像")
+                show_palette_check(result)
+
+                output_download_button(
+                    final_image_path,
+                    label="画像をダウンロード",
+                    file_name=f"firefitness_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png",
+                    mime="image/png"
+                )
+                show_exports(ENCODER.submit(final_image_path, export_channels or []), "promo_export")
+
+                if len(ranked) > 1:
+                    # ほかの候補は生成ボタンの外（show_other_candidates）で表示し、再実行しても残す
+                    st.session_state["promo_other_candidates"] = {
+                        "candidates": ranked[1:],
+                        "logo": (logo_path, logo_position, logo_size),
+                        "fields": record_fields,
+                    }
 
                 if result.get("text_response"):
                     with st.expander("Geminiからのコメント"):
@@ -2396,8 +1784,10 @@ def run_generation(mode, location, situation, trainer_name, trainer_images, clie
 
 
 def run_sns_generation(sns_params, aspect_ratio, trainer_name, trainer_images, selected_bg,
-                       logo_path=None, logo_position="右下", logo_size="中"):
+                       logo_path=None, logo_position="右下", logo_size="中", export_channels=None):
     """SNS投稿画像の生成処理"""
+    from prompt_converter import convert_sns_prompt_with_claude
+    from image_generator import generate_image_with_gemini, overlay_logo_on_image
 
     print("=" * 50)
     print("📱 SNS投稿画像生成開始")
@@ -2426,8 +1816,12 @@ def run_sns_generation(sns_params, aspect_ratio, trainer_name, trainer_images, s
 
     with st.spinner("SNS投稿用プロンプトを生成中..."):
         try:
-            print("📝 Claude APIを呼び出し中（SNSモード）...")
-            optimized_prompt = convert_sns_prompt_with_claude(sns_params)
+            optimized_prompt = take_prefetched("sns", sns_params, consume=True)
+            if optimized_prompt:
+                print("⚡ 先読み済みのプロンプトを使用")
+            else:
+                print("📝 Claude APIを呼び出し中（SNSモード）...")
+                optimized_prompt = convert_sns_prompt_with_claude(sns_params)
             print(f"✅ プロンプト生成完了: {optimized_prompt[:100]}...")
 
             with st.expander("最適化されたプロンプト（確認用）"):
@@ -2461,23 +1855,30 @@ def run_sns_generation(sns_params, aspect_ratio, trainer_name, trainer_images, s
                             result["image_path"],
                             logo_path,
                             logo_position,
-                            logo_size
+                            logo_size,
+                            image_data=result.get("image_data")
                         )
                         st.info("ロゴを追加しました")
                     except Exception as e:
                         st.warning(f"ロゴの追加に失敗しました: {str(e)}")
 
-                st.image(final_image_path, caption="生成されたSNS投稿画像", use_container_width=True)
+                final_image_path = record_output(
+                    final_image_path, mode="sns", trainer=trainer_name, location=location_of(selected_bg),
+                    caption=sns_params.get("main_headline") or sns_params.get("post_type"), prompt=optimized_prompt
+                )
+                show_image(final_image_path, caption="生成されたSNS投稿画像")
+                show_palette_check(result)
+                show_legibility(result)
 
                 # ファイル名に投稿タイプを含める
                 platform = sns_params.get("platform", "sns").replace(" ", "_").lower()
-                with open(final_image_path, "rb") as f:
-                    st.download_button(
-                        label="画像をダウンロード",
-                        data=f,
-                        file_name=f"firefitness_{platform}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png",
-                        mime="image/png"
-                    )
+                output_download_button(
+                    final_image_path,
+                    label="画像をダウンロード",
+                    file_name=f"firefitness_{platform}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png",
+                    mime="image/png"
+                )
+                show_exports(ENCODER.submit(final_image_path, export_channels or []), "sns_export")
 
                 # 投稿用テキストのヒント
                 st.markdown("---")
@@ -2515,6 +1916,16 @@ def render_blog_post_mode():
     </div>
     ''', unsafe_allow_html=True)
 
+    blog_mode = st.radio(
+        "作成方法",
+        options=["1記事ずつ", "カレンダーで一括"],
+        horizontal=True,
+        key="blog_mode"
+    )
+    if blog_mode == "カレンダーで一括":
+        render_blog_calendar_mode()
+        return
+
     # メインエリア - 3カラム構成
     col_left, col_center, col_right = st.columns([1, 1, 1])
 
@@ -2567,6 +1978,7 @@ def render_blog_post_mode():
 
         blog_username = ""
         blog_password = ""
+        featured_image = None
         if blog_url:
             blog_username = st.text_input(
                 "ユーザー名",
@@ -2577,6 +1989,12 @@ def render_blog_post_mode():
                 type="password",
                 key="blog_password"
             )
+            featured_image = st.file_uploader(
+                "アイキャッチ画像（任意）",
+                type=["png", "jpg", "jpeg", "webp"],
+                help="生成した画像などをメディアにアップロードし、アイキャッチに設定します",
+                key="blog_featured_image"
+            )
 
     # 中央カラム: 記事内容設定
     with col_center:
@@ -2699,6 +2117,12 @@ def render_blog_post_mode():
         if st.button("テンプレートをリセット", key="blog_reset"):
             st.rerun()
 
+    regenerate = st.checkbox(
+        "同じ条件で生成済みでも作り直す",
+        help="オフなら、同じ条件の記事は保存済みのものを表示します（APIを呼びません）",
+        key="blog_regenerate"
+    )
+
     # 生成処理
     if generate_only or generate_and_post:
         run_blog_generation(
@@ -2715,93 +2139,175 @@ def render_blog_post_mode():
             should_post=generate_and_post,
             blog_url=blog_url if generate_and_post else None,
             blog_username=blog_username if generate_and_post and blog_url else None,
-            blog_password=blog_password if generate_and_post and blog_url else None
+            blog_password=blog_password if generate_and_post and blog_url else None,
+            featured_image=featured_image if generate_and_post and blog_url else None,
+            regenerate=regenerate
+        )
+
+
+def default_calendar_rows(count: int = 4) -> list:
+    """カレンダーの初期行（今日から1週間おきに、カテゴリのおすすめトピックを順に割り当てる）"""
+    from datetime import timedelta
+
+    categories = list(BLOG_CATEGORIES.keys())
+    today = datetime.now().date()
+    rows = []
+    for i in range(count):
+        category = categories[i % len(categories)]
+        topics = get_blog_topics_for_category(category)
+        rows.append({
+            "date": (today + timedelta(weeks=i)).isoformat(),
+            "category": category,
+            "topic": topics[(i // len(categories)) % len(topics)],
+            "structure": list(BLOG_STRUCTURES.keys())[0],
+            "tone": list(BLOG_TONES.keys())[0],
+            "length": list(BLOG_LENGTHS.keys())[1],
+            "keywords": "パーソナルトレーニング, 岡山 ジム",
+        })
+    return rows
+
+
+def render_blog_calendar_mode():
+    """コンテンツカレンダーの一括生成UI"""
+    section_header("calendar", "コンテンツカレンダー")
+    st.caption("1行が1記事です。表計算ソフトからの貼り付けや行の追加・削除もできます。")
+
+    rows = st.data_editor(
+        default_calendar_rows(),
+        num_rows="dynamic",
+        use_container_width=True,
+        column_config={
+            "date": st.column_config.TextColumn("公開予定日"),
+            "category": st.column_config.SelectboxColumn("カテゴリ", options=list(BLOG_CATEGORIES.keys()), required=True),
+            "topic": st.column_config.TextColumn("トピック", required=True, width="large"),
+            "structure": st.column_config.SelectboxColumn("構成", options=list(BLOG_STRUCTURES.keys()), required=True),
+            "tone": st.column_config.SelectboxColumn("トーン", options=list(BLOG_TONES.keys())),
+            "length": st.column_config.SelectboxColumn("長さ", options=list(BLOG_LENGTHS.keys())),
+            "keywords": st.column_config.TextColumn("キーワード（カンマ区切り）"),
+        },
+        key="blog_calendar_rows"
+    )
+
+    col_workers, col_post = st.columns([1, 2])
+    with col_workers:
+        max_workers = st.slider("同時に生成する記事数", min_value=1, max_value=8, value=3, key="blog_calendar_workers")
+        regenerate = st.checkbox("生成済みの記事も作り直す", key="blog_calendar_regenerate")
+    with col_post:
+        post_drafts = st.checkbox("生成できた記事を WordPress に下書き投稿", key="blog_calendar_post")
+        blog_url = blog_username = blog_password = ""
+        if post_drafts:
+            blog_url = st.text_input(
+                "ブログ投稿先URL",
+                placeholder="https://example.com/wp-json/wp/v2/posts",
+                key="blog_calendar_url"
+            )
+            blog_username = st.text_input("ユーザー名", key="blog_calendar_username")
+            blog_password = st.text_input(
+                "パスワード/アプリケーションパスワード", type="password", key="blog_calendar_password"
+            )
+
+    rows = [row for row in rows if any(str(value or "").strip() for value in row.values())]
+    if st.button(
+        f"{len(rows)}件の記事を生成",
+        type="primary",
+        disabled=not rows or (post_drafts and not blog_url),
+        use_container_width=True,
+        key="blog_calendar_generate"
+    ):
+        run_blog_calendar(rows, max_workers, blog_url if post_drafts else None, blog_username, blog_password, regenerate)
+
+
+def run_blog_calendar(rows, max_workers, blog_url, blog_username, blog_password, regenerate=False):
+    """カレンダーの一括生成処理（終わった記事から順に表示する）"""
+    from blog_calendar import run_calendar, validate_rows
+
+    errors = validate_rows(rows)
+    if errors:
+        for error in errors:
+            st.error(error)
+        return
+
+    wordpress = None
+    if blog_url:
+        from wordpress_client import get_wordpress_client
+        wordpress = get_wordpress_client(blog_url, blog_username, blog_password)
+
+    progress = st.progress(0.0, text=f"0 / {len(rows)} 件")
+    finished = st.container()
+    done = []
+
+    def show_result(result):
+        done.append(result)
+        progress.progress(len(done) / len(rows), text=f"{len(done)} / {len(rows)} 件")
+        row = result["row"]
+        with finished:
+            if result["success"]:
+                mark = "♻️" if result.get("cached") else "⚠️" if result.get("similar_articles") else "✅"
+                with st.expander(f"{mark} {row.get('date', '')} {result['title']}"):
+                    for item in result.get("similar_articles", [])[:3]:
+                        st.warning(f"過去の記事とほぼ同じ内容です: 「{item['title']}」（類似度 {item['similarity']:.0%}）")
+                    st.caption(result.get("meta_description", ""))
+                    st.markdown(result.get("content", ""))
+            else:
+                st.error(f"{row.get('date', '')} {row.get('topic', '')}: {result['error']}")
+
+    summary = run_calendar(
+        rows, max_workers=max_workers, on_result=show_result, wordpress=wordpress, regenerate=regenerate
+    )
+
+    message = f"完了: 成功 {summary['succeeded']}件 / 失敗 {summary['failed']}件（保存先: {summary['output_dir']}）"
+    if wordpress is not None:
+        message += f" / 下書き投稿 {summary['posted']}件"
+        for result in summary["results"]:
+            post = result.get("post")
+            if post and post.get("skipped"):
+                st.info(f"{result['title']}: {post.get('error')}")
+            elif post and not post.get("success"):
+                st.warning(f"投稿に失敗しました（{result['title']}）: {post.get('error')}")
+    if summary["failed"]:
+        st.warning(message)
+    else:
+        st.success(message)
+
+    if summary["succeeded"]:
+        archive_download_button(
+            [
+                {"path": r["path"], "meta": {"date": r["row"].get("date"), "title": r["title"]}}
+                for r in summary["results"] if r["success"]
+            ] + [{"path": Path(summary["output_dir"]) / "index.jsonl"}],
+            {
+                "kind": "blog_calendar",
+                "batch_id": summary["batch_id"],
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "articles": [
+                    {
+                        "date": r["row"].get("date"),
+                        "topic": r["row"].get("topic"),
+                        "title": r.get("title"),
+                        "meta_description": r.get("meta_description"),
+                        "keywords": r.get("used_keywords"),
+                        "success": r["success"],
+                    }
+                    for r in summary["results"]
+                ],
+            },
+            f"firefitness_blog_{summary['batch_id']}",
+            key="blog_calendar_zip"
         )
 
 
 def get_blog_topics_for_category(category: str) -> list:
     """カテゴリに基づいてブログトピックを取得"""
-    topics_map = {
-        "ダイエット・体重管理": [
-            "食べないダイエットが失敗する理由",
-            "リバウンドを繰り返す人の共通点",
-            "40代からのダイエットが難しい理由",
-            "健康的に痩せるペースとは",
-            "停滞期の乗り越え方"
-        ],
-        "姿勢改善・体の歪み": [
-            "デスクワークで姿勢が悪くなる理由",
-            "猫背を治すと印象が変わる",
-            "肩こり・腰痛と姿勢の関係",
-            "反り腰チェック方法",
-            "姿勢改善で得られるメリット"
-        ],
-        "筋力トレーニング": [
-            "筋トレ初心者が最初にやるべきこと",
-            "週何回筋トレすればいい？",
-            "自重トレーニングと器具トレーニングの違い",
-            "筋トレと有酸素運動の組み合わせ方",
-            "年齢別おすすめトレーニング"
-        ],
-        "食事・栄養": [
-            "タンパク質、足りてますか？",
-            "プロテインは必要？",
-            "コンビニで選ぶ高タンパク食",
-            "外食でも太らない選び方",
-            "朝食を抜くとどうなる？"
-        ],
-        "運動習慣・継続のコツ": [
-            "運動が苦手でも大丈夫",
-            "週何回運動すればいい？",
-            "運動を習慣化するコツ",
-            "「時間がない」を解決する方法",
-            "モチベーションが続かない時の対処法"
-        ],
-        "お客様の声・成功事例": [
-            "3ヶ月で-5kg達成された○○様",
-            "姿勢改善で肩こりが解消した事例",
-            "運動習慣が身についたお客様の声",
-            "体型変化を実感されたお客様",
-            "リバウンドしなくなった事例"
-        ],
-        "健康・ウェルネス": [
-            "運動と睡眠の関係",
-            "ストレス解消と運動の効果",
-            "健康診断の数値を改善する方法",
-            "自律神経を整える運動",
-            "免疫力を高める生活習慣"
-        ],
-        "よくある質問": [
-            "どれくらいで効果が出る？",
-            "運動経験がなくても大丈夫？",
-            "食事制限は厳しい？",
-            "週1回でも効果はある？",
-            "無料カウンセリングの内容は？"
-        ],
-        "トレーナー紹介": [
-            "トレーナーになった理由",
-            "得意な指導スタイル",
-            "お客様へのメッセージ",
-            "資格・経歴紹介",
-            "トレーニングへのこだわり"
-        ],
-        "施設・サービス紹介": [
-            "完全個室でプライベート空間",
-            "最新のトレーニング機器",
-            "清潔で快適な空間",
-            "アクセス・駐車場情報",
-            "料金プランのご案内"
-        ]
-    }
-    return topics_map.get(category, ["トピックを入力してください"])
+    return BLOG_TOPICS.get(category, ["トピックを入力してください"])
 
 
 def run_blog_generation(
     category, topic, structure, structure_info, tone, length,
     custom_title, keywords, additional_keywords, additional_instructions,
-    should_post, blog_url, blog_username, blog_password
+    should_post, blog_url, blog_username, blog_password, featured_image=None, regenerate=False
 ):
     """ブログ記事の生成・投稿処理"""
+    from blog_generator import stream_blog_with_claude, post_to_blog
 
     print("=" * 50)
     print("📝 ブログ記事生成開始")
@@ -2827,20 +2333,35 @@ def run_blog_generation(
 
     with st.spinner("ブログ記事を生成中..."):
         try:
-            # Claude APIでブログ記事を生成
-            generated_content = generate_blog_with_claude(blog_params)
+            # 生成中の記事はここに少しずつ表示し、完了後はそのまま最終版になる
+            status_placeholder = st.empty()
+            article_placeholder = st.empty()
+            article = article_placeholder.container()
+            title_placeholder = article.empty()
+            with article.expander("生成された記事（全文）", expanded=True):
+                content_placeholder = st.empty()
+
+            def show_article(title, content):
+                title_placeholder.markdown(f"### {title or 'タイトル'}")
+                content_placeholder.markdown(content)
+
+            # Claude APIでブログ記事を生成（ストリーミング）
+            generated_content = stream_blog_with_claude(
+                blog_params, on_update=show_article, regenerate=regenerate
+            )
 
             if generated_content.get("success"):
-                st.success("ブログ記事の生成が完了しました")
-
-                # タイトル表示
-                st.markdown(f"### {generated_content.get('title', 'タイトル')}")
-
-                # 本文をexpanderで表示
-                with st.expander("生成された記事（全文）", expanded=True):
-                    st.markdown(generated_content.get("content", ""))
-
-                # メタ情報
+                if generated_content.get("cached"):
+                    status_placeholder.info("同じ条件で生成済みの記事を表示しています（作り直す場合はチェックを入れてください）")
+                else:
+                    status_placeholder.success("ブログ記事の生成が完了しました")
+                similar = generated_content.get("similar_articles", [])
+                for item in similar[:3]:
+                    st.warning(f"過去の記事とほぼ同じ内容です: 「{item['title']}」（類似度 {item['similarity']:.0%}）")
+                if generated_content.get("first_content_seconds") is not None:
+                    print(f"⏱️ 最初の表示まで {generated_content['first_content_seconds']:.1f} 秒")
+
+                # メタ情報（生成完了後に確定する）
                 col_meta1, col_meta2 = st.columns(2)
                 with col_meta1:
                     st.markdown("**メタディスクリプション:**")
@@ -2857,8 +2378,10 @@ def run_blog_generation(
                     mime="text/markdown"
                 )
 
-                # 投稿処理
-                if should_post and blog_url:
+                # 投稿処理（ほぼ同じ内容の記事は投稿しない）
+                if should_post and blog_url and similar:
+                    st.warning("過去の記事とほぼ同じ内容のため、投稿を中止しました。条件を変えて作り直してください")
+                elif should_post and blog_url:
                     st.divider()
                     with st.spinner("ブログに投稿中..."):
                         post_result = post_to_blog(
@@ -2867,17 +2390,28 @@ def run_blog_generation(
                             password=blog_password,
                             title=generated_content.get("title", ""),
                             content=generated_content.get("content", ""),
-                            meta_description=generated_content.get("meta_description", "")
+                            meta_description=generated_content.get("meta_description", ""),
+                            featured_image=featured_image.getvalue() if featured_image else None,
+                            featured_image_name=featured_image.name if featured_image else None,
+                            article=generated_content
                         )
 
-                        if post_result.get("success"):
+                        if post_result.get("skipped"):
+                            st.info("この記事はすでに投稿済みのため、投稿しませんでした（もう一度投稿する場合は作り直してください）")
+                            if post_result.get("post_url"):
+                                st.markdown(f"[投稿済みの記事を確認する]({post_result.get('post_url')})")
+                        elif post_result.get("success"):
                             st.success(f"投稿が完了しました！")
                             if post_result.get("post_url"):
                                 st.markdown(f"[投稿を確認する]({post_result.get('post_url')})")
                         else:
                             st.error(f"投稿に失敗しました: {post_result.get('error', '不明なエラー')}")
             else:
+                article_placeholder.empty()
                 st.error(f"記事生成に失敗しました: {generated_content.get('error', '不明なエラー')}")
+                if generated_content.get("raw_text"):
+                    with st.expander("Claudeの応答（そのまま）"):
+                        st.code(generated_content["raw_text"], language="text")
 
         except Exception as e:
             st.error(f"エラーが発生しました: {str(e)}")
@@ -2885,176 +2419,132 @@ def run_blog_generation(
             st.code(traceback.format_exc())
 
 
-def generate_blog_with_claude(params: dict) -> dict:
-    """Claude APIを使用してブログ記事を生成"""
-    import anthropic
-
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
-        return {"success": False, "error": "ANTHROPIC_API_KEY が設定されていません"}
-
-    try:
-        client = anthropic.Anthropic(api_key=api_key)
-
-        # プロンプト構築
-        length_guide = {
-            "short": "800〜1200字程度",
-            "medium": "1500〜2000字程度",
-            "long": "2500〜3500字程度"
-        }
-
-        tone_guide = {
-            "professional": "専門的で信頼感のある文体。データや根拠を示しながら説明する。",
-            "friendly": "親しみやすくカジュアルな文体。読者に語りかけるように書く。",
-            "motivational": "やる気を引き出す前向きな文体。読者の行動を促す。",
-            "educational": "わかりやすく教育的な文体。初心者にも理解しやすく説明する。"
-        }
-
-        sections_str = "\n".join([f"- {s}" for s in params.get("sections", [])])
-        keywords_str = ", ".join(params.get("keywords", []))
-
-        prompt = f"""あなたはFIREFITNESS（岡山のパーソナルトレーニングジム）のブログ記事ライターです。
-以下の条件でブログ記事を作成してください。
-
-【FIREFITNESSについて】
-- 岡山市にある完全個室のパーソナルトレーニングジム
-- 「3軸診断」が特徴：姿勢軸・食事軸・継続軸の3つの観点からアプローチ
-- ターゲット：30〜50代の運動初心者、ダイエットに悩む方、姿勢改善したい方
-- 強み：完全個室、マンツーマン指導、続けやすいサポート体制
-
-【記事の条件】
-- カテゴリ: {params.get('category', '')}
-- トピック: {params.get('topic', '')}
-- 記事構成: {params.get('structure', '')}
-- 文体: {tone_guide.get(params.get('tone', 'professional'), '')}
-- 文字数: {length_guide.get(params.get('length', 'medium'), '')}
-
-【記事の構成セクション】
-{sections_str}
-
-【SEOキーワード（自然に含める）】
-{keywords_str}
-
-【追加指示】
-{params.get('additional_instructions', 'なし')}
-
-【出力形式】
-以下のJSON形式で出力してください：
-{{
-    "title": "記事タイトル（SEOを意識した魅力的なタイトル）",
-    "content": "記事本文（Markdown形式、見出しは##や###を使用）",
-    "meta_description": "メタディスクリプション（120文字以内）",
-    "used_keywords": ["実際に使用したキーワードのリスト"]
-}}
-
-{"カスタムタイトル: " + params.get('custom_title') if params.get('custom_title') else "タイトルは自動生成してください。"}
+# =====================================
+# メイン
+# =====================================
 
-記事はFIREFITNESSの価値観に沿い、読者に価値を提供する内容にしてください。
-最後には必ずCTA（無料カウンセリングへの誘導など）を含めてください。
-"""
+# =====================================
+# ギャラリー
+# =====================================
 
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4000,
-            messages=[{"role": "user", "content": prompt}]
+GALLERY_PAGE_SIZE = 24
+GALLERY_COLUMNS = 4
+
+
+@st.dialog("生成画像", width="large")
+def show_gallery_item(item: dict):
+    """選んだ画像を大きく表示する（ここで初めて表示用の画像を読む）"""
+    show_image(item["path"])
+    created = datetime.fromtimestamp(item["created"]).strftime("%Y/%m/%d %H:%M")
+    details = [OUTPUT_MODES.get(item["mode"], item["mode"]), created, item.get("trainer"), item.get("location")]
+    st.caption(" / ".join(d for d in details if d))
+    if item.get("duplicate_of"):
+        st.caption(f"ほぼ同じ画像: {Path(item['duplicate_of']).name}")
+    if item.get("caption"):
+        st.markdown(f"**{item['caption']}**")
+    if item.get("prompt"):
+        with st.expander("画像生成のプロンプト"):
+            st.write(item["prompt"])
+    output_download_button(
+        item["path"],
+        label="元の画像をダウンロード",
+        file_name=Path(item["path"]).name,
+        mime="image/png",
+        key="gallery_download"
+    )
+
+
+def _gallery_move(step: int):
+    st.session_state.gallery_page += step
+
+
+@st.fragment
+def render_gallery_mode():
+    """過去の生成画像の一覧（索引から1ページ分だけ読み、縮小版だけを表示する）"""
+    OUTPUT_INDEX.sync()
+
+    section_header("grid", "生成画像ギャラリー")
+
+    filter_col1, filter_col2, filter_col3, filter_col4 = st.columns(4)
+    with filter_col1:
+        mode = st.selectbox(
+            "モード",
+            options=[None, *OUTPUT_MODES.keys()],
+            format_func=lambda m: "すべて" if m is None else OUTPUT_MODES[m],
+            key="gallery_mode"
         )
-
-        response_text = response.content[0].text
-
-        # JSONをパース
-        import json
-        import re
-
-        # JSON部分を抽出
-        json_match = re.search(r'\{[\s\S]*\}', response_text)
-        if json_match:
-            result = json.loads(json_match.group())
-            result["success"] = True
-            return result
-        else:
-            return {
-                "success": True,
-                "title": params.get("topic", "ブログ記事"),
-                "content": response_text,
-                "meta_description": "",
-                "used_keywords": params.get("keywords", [])
-            }
-
-    except Exception as e:
-        return {"success": False, "error": str(e)}
-
-
-def post_to_blog(url: str, username: str, password: str, title: str, content: str, meta_description: str) -> dict:
-    """WordPress REST APIにブログ記事を投稿"""
-    import requests
-
-    try:
-        # WordPress REST API用の認証
-        auth = (username, password)
-
-        # Markdown to HTML変換（簡易）
-        html_content = markdown_to_html(content)
-
-        # 投稿データ
-        post_data = {
-            "title": title,
-            "content": html_content,
-            "status": "draft",  # 下書きとして保存
-            "excerpt": meta_description
-        }
-
-        response = requests.post(
-            url,
-            json=post_data,
-            auth=auth,
-            headers={"Content-Type": "application/json"}
+    with filter_col2:
+        dates = st.date_input("期間", value=(), format="YYYY/MM/DD", key="gallery_dates")
+    with filter_col3:
+        trainer = st.selectbox(
+            "トレーナー",
+            options=[None, *OUTPUT_INDEX.values("trainer")],
+            format_func=lambda v: v or "すべて",
+            key="gallery_trainer"
+        )
+    with filter_col4:
+        location = st.selectbox(
+            "店舗",
+            options=[None, *OUTPUT_INDEX.values("location")],
+            format_func=lambda v: v or "すべて",
+            key="gallery_location"
         )
 
-        if response.status_code in [200, 201]:
-            result = response.json()
-            return {
-                "success": True,
-                "post_id": result.get("id"),
-                "post_url": result.get("link")
-            }
-        else:
-            return {
-                "success": False,
-                "error": f"ステータスコード: {response.status_code}, 詳細: {response.text}"
-            }
-
-    except Exception as e:
-        return {"success": False, "error": str(e)}
-
-
-def markdown_to_html(markdown_text: str) -> str:
-    """MarkdownをHTMLに簡易変換"""
-    import re
-
-    html = markdown_text
-
-    # 見出し
-    html = re.sub(r'^### (.+)$', r'<h3>\1</h3>', html, flags=re.MULTILINE)
-    html = re.sub(r'^## (.+)$', r'<h2>\1</h2>', html, flags=re.MULTILINE)
-    html = re.sub(r'^# (.+)$', r'<h1>\1</h1>', html, flags=re.MULTILINE)
-
-    # 太字
-    html = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html)
-
-    # リスト
-    html = re.sub(r'^- (.+)$', r'<li>\1</li>', html, flags=re.MULTILINE)
-    html = re.sub(r'(<li>.*</li>\n?)+', r'<ul>\g<0></ul>', html)
-
-    # 段落
-    paragraphs = html.split('\n\n')
-    html = '\n'.join([f'<p>{p}</p>' if not p.startswith('<') else p for p in paragraphs if p.strip()])
+    hide_duplicates = st.checkbox("ほぼ同じ画像は1枚だけ表示する", value=True, key="gallery_hide_duplicates")
 
-    return html
+    filters = {
+        "hide_duplicates": hide_duplicates,
+        "mode": mode,
+        "trainer": trainer,
+        "location": location,
+        "date_from": dates[0] if len(dates) > 0 else None,
+        "date_to": dates[-1] if len(dates) > 0 else None,
+    }
+    # 絞り込みを変えたら1ページ目に戻る
+    if st.session_state.get("gallery_filters") != filters:
+        st.session_state.gallery_filters = filters
+        st.session_state.gallery_page = 1
+
+    result = OUTPUT_INDEX.page(filters, page=st.session_state.gallery_page, page_size=GALLERY_PAGE_SIZE)
+    st.session_state.gallery_page = result["page"]
+    if not result["total"]:
+        st.info("条件に合う画像がありません")
+        return
 
+    first = (result["page"] - 1) * GALLERY_PAGE_SIZE + 1
+    st.caption(f"{result['total']}件中 {first}〜{first + len(result['items']) - 1}件目（新しい順）")
+
+    missing = []
+    cols = st.columns(GALLERY_COLUMNS)
+    for i, item in enumerate(result["items"]):
+        path = Path(item["path"])
+        if not path.is_file():
+            missing.append(item["path"])
+            continue
+        with cols[i % GALLERY_COLUMNS]:
+            st.image(
+                thumbnail_url(path, 320) or str(make_thumbnail(path, 320)),
+                caption=item.get("caption") or datetime.fromtimestamp(item["created"]).strftime("%Y/%m/%d %H:%M"),
+                use_container_width=True
+            )
+            if st.button("拡大", key=f"gallery_open_{item['path']}", use_container_width=True):
+                show_gallery_item(item)
+    if missing:
+        OUTPUT_INDEX.remove_missing(missing)
+
+    nav_col1, nav_col2, nav_col3 = st.columns([1, 2, 1])
+    with nav_col1:
+        st.button("← 前へ", disabled=result["page"] <= 1, on_click=_gallery_move, args=(-1,),
+                  use_container_width=True, key="gallery_prev")
+    with nav_col2:
+        st.markdown(
+            f"<p style='text-align: center;'>{result['page']} / {result['pages']} ページ</p>",
+            unsafe_allow_html=True
+        )
+    with nav_col3:
+        st.button("次へ →", disabled=result["page"] >= result["pages"], on_click=_gallery_move, args=(1,),
+                  use_container_width=True, key="gallery_next")
 
-# =====================================
-# メイン
-# =====================================
 
 def main():
     # ヘッダー
@@ -3095,7 +2585,7 @@ ANTHROPIC_API_KEY=your_anthropic_api_key
         return
 
     # モード選択タブ
-    tab1, tab2, tab3 = st.tabs(["宣材写真", "SNS投稿", "ブログ投稿"])
+    tab1, tab2, tab3, tab4 = st.tabs(["宣材写真", "SNS投稿", "ブログ投稿", "ギャラリー"])
 
     with tab1:
         render_promo_photo_mode()
@@ -3106,6 +2596,9 @@ ANTHROPIC_API_KEY=your_anthropic_api_key
     with tab3:
         render_blog_post_mode()
 
+    with tab4:
+        render_gallery_mode()
+
     # フッター
     st.markdown('''
     <div class="footer-text">
@@ -0,0 +1,147 @@
+"""
+生成物のZIP書き出し
+カルーセルの全ページや一括生成の記事など、複数のファイルと内容の一覧（manifest.json）を1つのZIPにまとめる。
+ファイルは小さな単位で読みながら書き出すので、ファイル数・サイズが増えてもメモリ使用量は増えない
+"""
+
+import hashlib
+import io
+import json
+import os
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+# 1回に読み書きするサイズ
+CHUNK_SIZE = 64 * 1024
+
+DEFAULT_EXPORT_DIR = Path(__file__).parent / "outputs" / "exports"
+
+# すでに圧縮されている形式は、圧縮し直しても小さくならないので無圧縮で格納する
+_STORED_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".avif", ".zip"}
+
+
+class _ChunkSink(io.RawIOBase):
+    """ZipFile の書き込み先（シークできない）。書かれたバイト列を drain() で取り出す"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._offset = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip(entries: Iterable[Dict[str, Any]], manifest: Optional[Dict[str, Any]] = None) -> Iterator[bytes]:
+    """
+    ZIPのバイト列を少しずつ返す（HTTPレスポンスやファイルにそのまま流せる）
+
+    Args:
+        entries: [{"path": ファイルのパス, "name": ZIP内の名前（省略時はファイル名）, "meta": manifest に載せる情報}]
+        manifest: manifest.json の内容。"files"（格納したファイルの名前・サイズ・SHA-256・meta）と
+            "missing"（見つからなかったファイル）を足して最後に格納する。None なら manifest.json を入れない
+
+    Yields:
+        ZIPのバイト列の断片
+    """
+    sink = _ChunkSink()
+    files = []
+    missing = []
+    names = set()
+
+    with zipfile.ZipFile(sink, "w") as archive:
+        for entry in entries:
+            source = Path(entry["path"])
+            if not source.is_file():
+                missing.append(str(source))
+                continue
+
+            # 同じ名前が重なったら番号を付ける
+            name = entry.get("name") or source.name
+            stem, suffix, n = Path(name).stem, Path(name).suffix, 1
+            while name in names:
+                n += 1
+                name = f"{stem}_{n}{suffix}"
+            names.add(name)
+
+            info = zipfile.ZipInfo.from_file(source, name)
+            info.compress_type = zipfile.ZIP_STORED if source.suffix.lower() in _STORED_SUFFIXES else zipfile.ZIP_DEFLATED
+            digest = hashlib.sha256()
+            with open(source, "rb") as src, archive.open(info, "w") as dst:
+                while True:
+                    chunk = src.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    dst.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            files.append({"name": name, "bytes": info.file_size, "sha256": digest.hexdigest(), **entry.get("meta", {})})
+
+        if manifest is not None:
+            body = {**manifest, "files": files}
+            if missing:
+                body["missing"] = missing
+            archive.writestr(
+                "manifest.json",
+                json.dumps(body, ensure_ascii=False, indent=2, default=str),
+                compress_type=zipfile.ZIP_DEFLATED
+            )
+
+    # 末尾のセントラルディレクトリ
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def write_zip(
+    entries: Iterable[Dict[str, Any]],
+    manifest: Optional[Dict[str, Any]] = None,
+    output_path: Optional[Path] = None
+) -> Dict[str, Any]:
+    """
+    ZIPをファイルに書き出す（書き終わるまでは .part に書き、完成してから置き換える）
+
+    Args:
+        entries: iter_zip と同じ
+        manifest: iter_zip と同じ
+        output_path: 保存先（既定: outputs/exports/firefitness_<日時>.zip）
+
+    Returns:
+        {"success": True, "path", "bytes", "seconds"} または {"success": False, "error"}
+    """
+    path = Path(output_path) if output_path else DEFAULT_EXPORT_DIR / f"firefitness_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    part = path.with_name(path.name + ".part")
+    start = time.perf_counter()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(part, "wb") as f:
+            for chunk in iter_zip(entries, manifest):
+                f.write(chunk)
+        os.replace(part, path)
+    except Exception as e:
+        part.unlink(missing_ok=True)
+        print(f"⚠️ ZIPの書き出しに失敗しました: {e}")
+        return {"success": False, "error": str(e)}
+
+    size = path.stat().st_size
+    seconds = time.perf_counter() - start
+    print(f"📦 ZIPを書き出しました: {path.name}（{size / 1024 / 1024:.1f} MB, {seconds:.2f}秒）")
+    return {"success": True, "path": str(path), "bytes": size, "seconds": round(seconds, 3)}
@@ -0,0 +1,194 @@
+"""
+ブログ記事のキャッシュと類似記事チェック
+同じ条件（params）・同じモデルで生成した記事は保存済みのものを返し、Claude を呼び直さない。
+また、新しく生成した記事が過去の記事とほぼ同じ内容でないかを、文字 n-gram（シングル）の
+Jaccard 類似度で調べる
+
+類似度は全シングルではなく、ハッシュ値の小さい方から k 個（bottom-k スケッチ）だけを保存して推定する。
+記事が増えても1件あたりの保存量・比較コストは一定
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from prefetch import input_key
+
+
+# キーに含めるバージョン（プロンプトや出力形式を変えたら上げて、古いキャッシュを使わないようにする）
+CACHE_VERSION = 1
+
+# これ以上の類似度なら「ほぼ同じ記事」とみなす
+DUPLICATE_THRESHOLD = 0.8
+
+SHINGLE_SIZE = 5
+SKETCH_SIZE = 128
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / "outputs" / "cache" / "blog"
+
+_MARKDOWN_NOISE = re.compile(r"[#*`>|\-\[\]()_~\s]+")
+
+
+def article_key(params: Dict[str, Any], model: str) -> str:
+    """記事の条件とモデルからキャッシュキーを作る（辞書の順序に依存しない）"""
+    return input_key("blog_article", {"params": params, "model": model, "version": CACHE_VERSION})
+
+
+def _normalize(text: str) -> str:
+    """表記ゆれ・Markdown記号・空白を除いて比較用の文字列にする"""
+    return _MARKDOWN_NOISE.sub("", unicodedata.normalize("NFKC", text).lower())
+
+
+def sketch(text: str, k: int = SKETCH_SIZE) -> List[int]:
+    """
+    本文の bottom-k スケッチ（シングルの64bitハッシュのうち小さい方から k 個）
+
+    Args:
+        text: 記事本文
+        k: 保存するハッシュの数
+
+    Returns:
+        昇順のハッシュ値のリスト
+    """
+    normalized = _normalize(text)
+    if len(normalized) < SHINGLE_SIZE:
+        shingles = {normalized} if normalized else set()
+    else:
+        shingles = {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+    hashes = {
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+        for s in shingles
+    }
+    return sorted(hashes)[:k]
+
+
+def similarity(a: List[int], b: List[int], k: int = SKETCH_SIZE) -> float:
+    """2つのスケッチから Jaccard 類似度を推定する"""
+    if not a or not b:
+        return 0.0
+    union = sorted(set(a) | set(b))[:k]
+    set_a, set_b = set(a), set(b)
+    both = sum(1 for h in union if h in set_a and h in set_b)
+    return both / len(union)
+
+
+class ArticleCache:
+    """
+    記事1件を1つのJSONファイルとして保存するキャッシュ（プロセス内で共有、スレッドセーフ）
+
+    スケッチは初回アクセス時に全件読み込み、以降はメモリ上で比較する
+    """
+
+    def __init__(self, directory: Path = DEFAULT_CACHE_DIR):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._sketches: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _load_sketches(self) -> Dict[str, Dict[str, Any]]:
+        """保存済みの全記事のタイトルとスケッチを読む（ロック内で呼ぶ）"""
+        if self._sketches is None:
+            self._sketches = {}
+            for path in self.directory.glob("*.json"):
+                try:
+                    entry = json.loads(path.read_text(encoding="utf-8"))
+                    self._sketches[path.stem] = {"title": entry["article"].get("title", ""), "sketch": entry["sketch"]}
+                except (OSError, ValueError, KeyError):
+                    continue
+        return self._sketches
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        保存済みの記事を返す（なければ None）
+
+        "wordpress_posts" に、この記事を投稿したサイトごとの投稿（{APIベース: {"post_id", "post_url", "posted"}}）を含める
+        """
+        try:
+            entry = json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if entry.get("article") is None:
+            return None
+        return {**entry["article"], "wordpress_posts": entry.get("wordpress_posts", {})}
+
+    def record_post(self, key: str, site: str, post: Dict[str, Any]) -> None:
+        """
+        記事を WordPress に投稿したことを記録する（同じ記事をキャッシュから表示したときに二重に投稿しないため）
+
+        Args:
+            key: 記事のキャッシュキー
+            site: 投稿先の REST API のベース（wordpress_client.api_base_from_url の値）
+            post: post_article の結果（post_id・post_url）
+        """
+        with self._lock:
+            try:
+                entry = json.loads(self._path(key).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                return
+            entry.setdefault("wordpress_posts", {})[site] = {
+                "post_id": post.get("post_id"),
+                "post_url": post.get("post_url"),
+                "posted": time.time(),
+            }
+            tmp = self._path(key).with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self._path(key))
+
+    def put(self, key: str, params: Dict[str, Any], model: str, article: Dict[str, Any]) -> None:
+        """記事を保存する（同じキーは上書き）"""
+        fields = ("title", "content", "meta_description", "used_keywords")
+        entry = {
+            "created": time.time(),
+            "model": model,
+            "params": params,
+            "article": {field: article.get(field) for field in fields},
+            "sketch": sketch(article.get("content", "")),
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # 同じキーを同時に保存しても一時ファイルがぶつからないよう、スレッドごとの名前にする
+        tmp = self._path(key).with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        with self._lock:
+            os.replace(tmp, self._path(key))
+            self._load_sketches()[key] = {"title": entry["article"]["title"], "sketch": entry["sketch"]}
+
+    def find_similar(
+        self,
+        content: str,
+        threshold: float = DUPLICATE_THRESHOLD,
+        exclude_key: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        過去の記事から、本文がほぼ同じものを探す
+
+        Args:
+            content: 調べる記事本文
+            threshold: この類似度以上を返す
+            exclude_key: 除外するキー（同じ記事自身）
+
+        Returns:
+            [{"key", "title", "similarity"}]（類似度の高い順）
+        """
+        target = sketch(content)
+        with self._lock:
+            entries = list(self._load_sketches().items())
+        matches = []
+        for key, entry in entries:
+            if key == exclude_key:
+                continue
+            score = similarity(target, entry["sketch"])
+            if score >= threshold:
+                matches.append({"key": key, "title": entry["title"], "similarity": round(score, 3)})
+        return sorted(matches, key=lambda m: m["similarity"], reverse=True)
+
+
+# プロセス内で1つだけ使う
+ARTICLE_CACHE = ArticleCache(Path(os.getenv("BLOG_CACHE_DIR", str(DEFAULT_CACHE_DIR))))
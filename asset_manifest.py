@@ -0,0 +1,295 @@
+"""
+素材（assets/）のマニフェスト
+背景・トレーナー・ロゴの画像ごとに、パス・内容の SHA-256・実際の MIME タイプ（先頭のバイトから判定）・
+縦横のサイズ・EXIF の向き・派生ファイル（縮小版・顔切り出し）のパスを assets/manifest.json に記録する
+
+更新は差分のみ: フォルダを一覧してサイズ・更新時刻を比べ、変わったファイルだけ読み直す。
+画面の一覧や生成時は記録を使うので、画像の中身を知るためだけに画像を開くことはない
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import static_server
+
+
+BASE_DIR = Path(__file__).parent
+
+DEFAULT_ASSETS_DIR = BASE_DIR / "assets"
+
+MANIFEST_NAME = "manifest.json"
+
+# 記録の形式を変えたら上げる（古い記録は読み直す）
+MANIFEST_VERSION = 1
+
+# 拡張子からの推定（MIME タイプを判定できなかったとき・assets/ の外のファイル用）
+SUFFIX_MIME_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+    ".avif": "image/avif",
+}
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def _walk(root: Path):
+    """フォルダ以下（サブフォルダを含む）のファイルの os.DirEntry を返す。. で始まるファイル・フォルダは除く"""
+    pending = [root] if root.is_dir() else []
+    while pending:
+        with os.scandir(pending.pop()) as it:
+            for item in it:
+                if item.name.startswith("."):
+                    continue
+                if item.is_dir():
+                    pending.append(Path(item.path))
+                elif item.is_file():
+                    yield item
+
+
+def sniff_mime(head: bytes) -> Optional[str]:
+    """ファイルの先頭（16バイト以上）から画像の MIME タイプを判定する（画像でなければ None）"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[:4] in (b"II*\x00", b"MM\x00*"):
+        return "image/tiff"
+    if head[:2] == b"BM":
+        return "image/bmp"
+    if head[4:8] == b"ftyp":
+        brand = head[8:12]
+        if brand in (b"avif", b"avis"):
+            return "image/avif"
+        if brand in (b"heic", b"heix", b"mif1", b"msf1"):
+            return "image/heic"
+    return None
+
+
+def file_sha256(path: Path) -> str:
+    """ファイルの内容の SHA-256（16進）。mmap で読み、ファイルの内容を Python のバイト列に写さない"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            digest.update(mapped)
+    return digest.hexdigest()
+
+
+def _describe(path: Path, relative: str, stat: os.stat_result) -> Dict[str, Any]:
+    """1ファイル分の記録を作る（ヘッダーだけ読み、画素は展開しない）"""
+    from PIL import Image
+
+    with open(path, "rb") as f:
+        head = f.read(32)
+    entry = {
+        "path": relative,
+        "bytes": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_sha256(path),
+        "mime": sniff_mime(head),
+        "width": None,
+        "height": None,
+        "orientation": 1,
+        "variants": {},
+    }
+    if entry["mime"] is None:
+        return entry
+
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+            orientation = int(image.getexif().get(0x0112, 1) or 1)
+    except Exception as e:
+        print(f"⚠️ 素材の情報を読めませんでした: {relative}: {e}")
+        return entry
+    # 5〜8 は90度回転（表示するときの縦横は入れ替わる）
+    if orientation in (5, 6, 7, 8):
+        width, height = height, width
+    entry.update({"width": width, "height": height, "orientation": orientation})
+
+    variants = {
+        "thumbnails": {
+            str(w): (static_server.THUMBNAIL_DIR / str(w) / "assets" / f"{relative}.webp").relative_to(BASE_DIR).as_posix()
+            for w in static_server.THUMBNAIL_WIDTHS
+        }
+    }
+    if relative.startswith("trainers/"):
+        from face_crop import cache_path
+
+        variants["face_crop"] = cache_path(entry["sha256"]).relative_to(BASE_DIR).as_posix()
+    entry["variants"] = variants
+    return entry
+
+
+class AssetManifest:
+    """assets/ のマニフェスト（JSONに保存、プロセス内で共有、スレッドセーフ）"""
+
+    def __init__(self, assets_dir: Path = DEFAULT_ASSETS_DIR, manifest_path: Optional[Path] = None):
+        self.assets_dir = Path(assets_dir)
+        self._root = os.path.abspath(self.assets_dir)
+        self.manifest_path = Path(manifest_path) if manifest_path else self.assets_dir / MANIFEST_NAME
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """保存済みの記録を読む（ロック内で呼ぶ）"""
+        if self._entries is None:
+            try:
+                data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+                self._entries = data["files"] if data.get("version") == MANIFEST_VERSION else {}
+            except (OSError, ValueError, KeyError, AttributeError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self) -> None:
+        """記録を書き出す（ロック内で呼ぶ）"""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_name(self.manifest_path.name + f".{threading.get_ident()}.tmp")
+        data = {"version": MANIFEST_VERSION, "files": dict(sorted(self._entries.items()))}
+        tmp.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+
+    def _relative(self, path) -> Optional[str]:
+        """assets/ からの相対パス（assets/ の外なら None。シンボリックリンクはたどらない）"""
+        absolute = os.path.abspath(path)
+        if absolute == self._root:
+            return "."
+        if not absolute.startswith(self._root + os.sep):
+            return None
+        return absolute[len(self._root) + 1:].replace(os.sep, "/")
+
+    def refresh(self, directory: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        フォルダ（既定: assets/ 全体。サブフォルダを含む）の記録を差分で更新する
+
+        Returns:
+            {"success": bool, "files": int, "added": int, "updated": int, "removed": int, "seconds": float}
+        """
+        start = time.perf_counter()
+        root = Path(directory) if directory else self.assets_dir
+        prefix = self._relative(root)
+        if prefix is None:
+            return {"success": False, "error": f"assets/ の外のフォルダです: {root}"}
+        prefix = "" if prefix == "." else prefix + "/"
+
+        # 一覧とサイズ・更新時刻の取得だけ（ファイルは開かない）
+        found: Dict[str, tuple] = {}
+        for item in _walk(root):
+            if Path(item.name).suffix.lower() in IMAGE_SUFFIXES:
+                found[prefix + Path(item.path).relative_to(root).as_posix()] = (Path(item.path), item.stat())
+
+        counts = {"added": 0, "updated": 0, "removed": 0}
+        with self._lock:
+            entries = self._load()
+            for relative in [r for r in entries if r.startswith(prefix) and r not in found]:
+                del entries[relative]
+                counts["removed"] += 1
+            for relative, (path, stat) in found.items():
+                entry = entries.get(relative)
+                if entry and entry["bytes"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                    continue
+                try:
+                    entries[relative] = _describe(path, relative, stat)
+                except OSError as e:
+                    print(f"⚠️ 素材を読めませんでした: {relative}: {e}")
+                    continue
+                counts["updated" if entry else "added"] += 1
+            if any(counts.values()):
+                self._save()
+
+        return {"success": True, "files": len(found), **counts, "seconds": round(time.perf_counter() - start, 4)}
+
+    def other_files(self) -> List[Dict[str, Any]]:
+        """
+        assets/ 以下で記録の対象にならないファイル（拡張子が IMAGE_SUFFIXES にないもの。manifest.json は除く）
+
+        .heic・.gif・.tiff などは画面の一覧にも生成にも使われないので、置いたことに気づけるよう一覧にする
+
+        Returns:
+            [{"path": assets/ からの相対パス, "suffix": 拡張子, "mime": 先頭のバイトから判定した MIME タイプ（画像でなければ None）}]
+        """
+        files = []
+        for item in _walk(self.assets_dir):
+            path = Path(item.path)
+            if path.suffix.lower() in IMAGE_SUFFIXES or path == self.manifest_path:
+                continue
+            try:
+                with open(path, "rb") as f:
+                    mime = sniff_mime(f.read(32))
+            except OSError:
+                mime = None
+            files.append({"path": self._relative(path), "suffix": path.suffix.lower(), "mime": mime})
+        return sorted(files, key=lambda f: f["path"])
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """すべての記録（パス順。更新はしない）"""
+        with self._lock:
+            return [dict(entry) for _, entry in sorted(self._load().items())]
+
+    def get(self, path) -> Optional[Dict[str, Any]]:
+        """
+        1ファイル分の記録（assets/ の外・存在しないファイルは None）
+
+        サイズ・更新時刻が記録と違えば、そのファイルだけ読み直す
+        """
+        relative = self._relative(path)
+        if relative is None:
+            return None
+        try:
+            stat = Path(path).stat()
+        except OSError:
+            return None
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(relative)
+            if entry and entry["bytes"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                return entry
+            entry = entries[relative] = _describe(Path(path), relative, stat)
+            self._save()
+            return entry
+
+    def images(self, directory: Path) -> List[Path]:
+        """
+        フォルダ直下の画像（先頭のバイトが画像のもの）を名前順で返す（directory の下のパスとして）
+
+        assets/ の外のフォルダは拡張子で判定する
+        """
+        directory = Path(directory)
+        if not directory.exists():
+            return []
+        prefix = self._relative(directory)
+        if prefix is None:
+            return sorted(f for f in directory.iterdir() if f.suffix.lower() in IMAGE_SUFFIXES)
+
+        self.refresh(directory)
+        prefix = "" if prefix == "." else prefix + "/"
+        with self._lock:
+            relatives = [
+                relative for relative, entry in self._load().items()
+                if relative.startswith(prefix) and "/" not in relative[len(prefix):] and entry["mime"]
+            ]
+        return [directory / relative[len(prefix):] for relative in sorted(relatives)]
+
+    def mime_type(self, path) -> str:
+        """MIME タイプ（記録があれば先頭のバイトから判定したもの、なければ拡張子から推定）"""
+        entry = self.get(path)
+        if entry and entry["mime"]:
+            return entry["mime"]
+        return SUFFIX_MIME_TYPES.get(Path(path).suffix.lower(), "image/jpeg")
+
+
+ASSET_MANIFEST = AssetManifest()
@@ -0,0 +1,4 @@
+"""
+FIREFITNESS 画像生成ツール - ベンチマーク
+ローカルのスタブサーバー（Claude / Gemini）に対してパイプラインを計測する
+"""
@@ -0,0 +1,98 @@
+"""
+ZIP書き出しベンチマーク
+カルーセル（既定: 8ページ）の合成PNGを、
+
+- 以前の方式に近いもの: 全ファイルを読み込んでメモリ上（BytesIO）でZIPを作る
+- archive_export.write_zip: ファイルを少しずつ読みながらディスクに書き出す
+
+でまとめ、所要時間と Python のメモリ使用量のピーク（tracemalloc）を比べる
+
+実行例:
+    python -m benchmarks.bench_archive
+    python -m benchmarks.bench_archive --pages 8 --size 2048 --json results/archive.json
+"""
+
+import argparse
+import io
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.stub_servers import make_png
+
+
+def in_memory_zip(paths: List[Path], output_path: Path) -> None:
+    """比較用: 全ページを読み込んでメモリ上でZIPを作り、最後にまとめて書く"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for path in paths:
+            archive.writestr(path.name, path.read_bytes())
+        archive.writestr("manifest.json", json.dumps({"pages": len(paths)}))
+    output_path.write_bytes(buffer.getvalue())
+
+
+def measure(name: str, func: Callable[[], Any]) -> Dict[str, Any]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    wall = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"case": name, "wall_s": round(wall, 3), "peak_mb": round(peak / 1024 / 1024, 2)}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="ZIP書き出しの計測")
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--size", type=int, default=2048, help="ページ画像の一辺（px）")
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    args = parser.parse_args(argv)
+
+    from archive_export import write_zip
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        paths = []
+        for i in range(args.pages):
+            path = workdir / f"page{i + 1}.png"
+            path.write_bytes(make_png(args.size, args.size, seed=i))
+            paths.append(path)
+        total_mb = sum(p.stat().st_size for p in paths) / 1024 / 1024
+
+        results = [
+            measure("メモリ上でZIP", lambda: in_memory_zip(paths, workdir / "memory.zip")),
+            measure("write_zip", lambda: write_zip(
+                [{"path": p, "meta": {"page": i + 1}} for i, p in enumerate(paths)],
+                {"pages": len(paths)},
+                workdir / "stream.zip"
+            )),
+        ]
+
+    print()
+    print(f"📦 ZIP書き出しベンチマーク（{args.pages}ページ、{args.size}px、合計 {total_mb:.1f} MB）")
+    print("-" * 56)
+    print(f"{'方式':<16} {'秒':>8} {'メモリのピーク(MB)':>20}")
+    for r in results:
+        print(f"{r['case']:<16} {r['wall_s']:>8.2f} {r['peak_mb']:>20.2f}")
+    print()
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📄 保存しました: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+素材マニフェストのベンチマーク
+一時フォルダに合成PNGの素材（既定: 60枚、3フォルダ）を作り、asset_manifest.AssetManifest の
+
+- 初回の作成（全ファイルのハッシュ・ヘッダー読み込み）
+- 変更なしの更新（一覧とサイズ・更新時刻の比較のみ）
+- 1ファイルだけ差し替えたあとの更新
+
+の所要時間と、1枚あたりの情報（MIME タイプ・縦横）の取得を、画像を開く方法と記録を引く方法で比べる
+
+実行例:
+    python -m benchmarks.bench_asset_manifest
+    python -m benchmarks.bench_asset_manifest --files 300 --size 1024 --json results/asset_manifest.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.stub_servers import make_png
+
+
+def timed(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def open_image_info(path: Path) -> Dict[str, Any]:
+    """比較用: 画像を開いて形式と縦横を調べる"""
+    from PIL import Image
+
+    with Image.open(path) as image:
+        return {"mime": Image.MIME.get(image.format), "width": image.width, "height": image.height}
+
+
+def manifest_info(manifest, path: Path) -> Dict[str, Any]:
+    """マニフェストの記録から形式と縦横を調べる"""
+    entry = manifest.get(path)
+    return {"mime": entry["mime"], "width": entry["width"], "height": entry["height"]}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="素材マニフェストの計測")
+    parser.add_argument("--files", type=int, default=60)
+    parser.add_argument("--size", type=int, default=1024, help="素材画像の一辺（px）")
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    args = parser.parse_args(argv)
+
+    from asset_manifest import AssetManifest
+
+    with tempfile.TemporaryDirectory() as tmp:
+        assets_dir = Path(tmp) / "assets"
+        paths = []
+        for i in range(args.files):
+            directory = assets_dir / ("backgrounds", "trainers", "logos")[i % 3] / "sample"
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"image_{i:04d}.png"
+            path.write_bytes(make_png(args.size, args.size, seed=i))
+            paths.append(path)
+
+        manifest = AssetManifest(assets_dir)
+        build_seconds = timed(manifest.refresh)
+        unchanged_seconds = timed(manifest.refresh)
+
+        changed = paths[0]
+        changed.write_bytes(make_png(args.size, args.size, seed=args.files))
+        stat = changed.stat()
+        os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        one_changed_seconds = timed(manifest.refresh)
+
+        opened = [timed(lambda p=p: open_image_info(p)) for p in paths]
+        looked_up = [timed(lambda p=p: manifest_info(manifest, p)) for p in paths]
+
+    result = {
+        "files": args.files,
+        "build_ms": round(build_seconds * 1000, 1),
+        "unchanged_ms": round(unchanged_seconds * 1000, 2),
+        "one_changed_ms": round(one_changed_seconds * 1000, 2),
+        "open_image_us": round(statistics.median(opened) * 1e6, 1),
+        "manifest_us": round(statistics.median(looked_up) * 1e6, 1),
+    }
+
+    print()
+    print(f"🗂️ 素材マニフェストベンチマーク（{args.files}枚、{args.size}px）")
+    print("-" * 56)
+    print(f"初回の作成:               {result['build_ms']:>10.1f} ms")
+    print(f"変更なしの更新:           {result['unchanged_ms']:>10.2f} ms")
+    print(f"1枚差し替えたあとの更新:  {result['one_changed_ms']:>10.2f} ms")
+    print(f"1枚の情報（画像を開く）:  {result['open_image_us']:>10.1f} µs")
+    print(f"1枚の情報（記録を引く）:  {result['manifest_us']:>10.1f} µs")
+    print()
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"📄 保存しました: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
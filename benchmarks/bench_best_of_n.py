@@ -0,0 +1,98 @@
+"""
+複数候補（best-of-N）生成のベンチマーク
+スタブの Gemini（遅延を注入）に対して、
+
+- 以前の使い方: 1枚ずつ N 回生成する（ボタンを N 回押して待つ）
+- generate_image_with_gemini(candidates=N): N 枚を並列に生成して自動採点する
+
+の所要時間と、自動採点（image_scoring.rank_images）の1枚あたりの時間を比べる
+
+実行例:
+    python -m benchmarks.bench_best_of_n
+    python -m benchmarks.bench_best_of_n --candidates 3,5 --gemini-latency lognormal:20000:0.3 --json results/best_of_n.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.stub_servers import merge_config, parse_latency_spec, start_stub_servers, stop_stub_servers
+
+
+def run(count: int, output_dir: Path) -> Dict[str, Any]:
+    from image_generator import generate_image_with_gemini
+
+    start = time.perf_counter()
+    for _ in range(count):
+        generate_image_with_gemini("benchmark", [], output_dir=output_dir)
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = generate_image_with_gemini("benchmark", [], output_dir=output_dir, candidates=count)
+    parallel = time.perf_counter() - start
+
+    paths = [c["image_path"] for c in result.get("candidates", [])]
+    from image_scoring import rank_images
+
+    start = time.perf_counter()
+    rank_images(paths)
+    scoring = (time.perf_counter() - start) / max(len(paths), 1)
+
+    return {
+        "candidates": count,
+        "sequential_s": round(sequential, 2),
+        "best_of_n_s": round(parallel, 2),
+        "speedup": round(sequential / parallel, 1),
+        "scoring_ms_per_image": round(scoring * 1000, 1),
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="複数候補生成の計測")
+    parser.add_argument("--candidates", default="3,5", help="候補の数（カンマ区切り）")
+    parser.add_argument("--gemini-latency", default="fixed:2000")
+    parser.add_argument("--png-size", default="1024x1024")
+    parser.add_argument("--claude-port", type=int, default=8701)
+    parser.add_argument("--gemini-port", type=int, default=8702)
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    args = parser.parse_args(argv)
+
+    width, height = (int(v) for v in args.png_size.split("x"))
+    stubs = start_stub_servers(merge_config({
+        "gemini": {"latency": parse_latency_spec(args.gemini_latency), "png_width": width, "png_height": height},
+    }), args.claude_port, args.gemini_port)
+    os.environ.update(stubs["env"])
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = [run(int(n), Path(tmp)) for n in args.candidates.split(",") if n.strip()]
+    finally:
+        stop_stub_servers(stubs)
+
+    print()
+    print(f"🏅 複数候補生成ベンチマーク（Gemini の遅延 {args.gemini_latency}、{args.png_size}）")
+    print("-" * 64)
+    print(f"{'候補数':>6} {'1枚ずつ(秒)':>12} {'まとめて(秒)':>12} {'倍':>6} {'採点(ms/枚)':>12}")
+    for r in results:
+        print(f"{r['candidates']:>6} {r['sequential_s']:>12.2f} {r['best_of_n_s']:>12.2f} {r['speedup']:>6.1f} {r['scoring_ms_per_image']:>12.1f}")
+    print()
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📄 保存しました: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
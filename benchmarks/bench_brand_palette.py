@@ -0,0 +1,113 @@
+"""
+ブランドカラー適合チェックのベンチマーク
+色使いの違う合成PNG（ブランドカラー・落ち着いた写真風・金赤黒・ネオン）を作り、brand_palette.analyze_palette の
+
+- 点数（ブランドカラーに沿った画像ほど高く、NG の色の画像ほど低いか）
+- 1枚あたりの時間（ファイルを開いて縮小・Lab 変換・ヒストグラムまで、と縮小後の解析のみ）
+
+を画像サイズごとに表示する。比較として縮小せずに全画素を解析した時間も測る
+
+実行例:
+    python -m benchmarks.bench_brand_palette
+    python -m benchmarks.bench_brand_palette --sizes 1024,2048,4096 --repeat 10 --json results/brand_palette.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+
+# 合成画像の色（縦の帯で並べ、全体になめらかな明暗とノイズを足す）
+SAMPLES = {
+    "brand": [(13, 43, 69), (245, 245, 245), (255, 255, 255), (255, 107, 53)],
+    "photo": [(186, 160, 132), (122, 110, 98), (214, 210, 200), (92, 74, 62)],
+    "gold_red_black": [(230, 190, 30), (210, 20, 30), (8, 8, 8)],
+    "neon": [(20, 255, 80), (255, 20, 230), (30, 240, 255)],
+}
+
+
+def make_sample(path: Path, colors: List[tuple], size: int) -> None:
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(size)
+    band = np.repeat(np.arange(len(colors)), -(-size // len(colors)))[:size]
+    pixels = np.array(colors, dtype=np.float32)[band][None, :, :].repeat(size, axis=0)
+    shade = np.linspace(0.9, 1.05, size, dtype=np.float32)[:, None, None]
+    pixels = pixels * shade + rng.normal(0, 4, (size, size, 3))
+    Image.fromarray(pixels.clip(0, 255).astype(np.uint8)).save(path, "PNG", compress_level=1)
+
+
+def median_ms(func, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def run(size: int, repeat: int, tmp: Path) -> List[Dict[str, Any]]:
+    import numpy as np
+    from PIL import Image
+    from brand_palette import analyze_palette, analyze_rgb, downscale
+
+    results = []
+    for name, colors in SAMPLES.items():
+        path = tmp / f"{name}_{size}.png"
+        make_sample(path, colors, size)
+        palette = analyze_palette(path)
+        with Image.open(path) as image:
+            full = np.asarray(image.convert("RGB"))
+            small = downscale(image)
+        results.append({
+            "size": size,
+            "sample": name,
+            "score": palette["score"],
+            "ng_coverage": palette["ng_coverage"],
+            "analyze_ms": round(median_ms(lambda: analyze_palette(path), repeat), 1),
+            "analyze_only_ms": round(median_ms(lambda: analyze_rgb(small), repeat), 1),
+            "full_resolution_ms": round(median_ms(lambda: analyze_rgb(full), max(1, repeat // 3)), 1),
+        })
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="ブランドカラー適合チェックの計測")
+    parser.add_argument("--sizes", default="1024,2048", help="画像の一辺（カンマ区切り）")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [r for s in args.sizes.split(",") if s.strip() for r in run(int(s), args.repeat, Path(tmp))]
+
+    print()
+    print("🎨 ブランドカラー適合チェックのベンチマーク")
+    print("-" * 84)
+    print(f"{'サイズ':>6} {'画像':<16} {'点数':>6} {'NG の色':>8} {'読み込み込み(ms)':>16} {'解析のみ(ms)':>12} {'縮小なし(ms)':>14}")
+    for r in results:
+        print(f"{r['size']:>6} {r['sample']:<16} {r['score']:>6.2f} {r['ng_coverage']:>8.0%} "
+              f"{r['analyze_ms']:>16.1f} {r['analyze_only_ms']:>12.1f} {r['full_resolution_ms']:>14.1f}")
+    print()
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📄 保存しました: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
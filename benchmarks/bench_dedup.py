@@ -0,0 +1,112 @@
+"""
+知覚ハッシュ・重複検索ベンチマーク
+
+- ハッシュ計算: 合成PNG（1024px / 2048px）の読み込み + pHash + dHash の時間
+- 検索: N件のハッシュから距離8以内を探す時間を、全件との比較と image_hash.MultiIndex で比べる
+  （ハッシュはランダム。実際の画像のハッシュは偏るので候補数はこれより増えることがある）
+
+実行例:
+    python -m benchmarks.bench_dedup
+    python -m benchmarks.bench_dedup --sizes 1000,10000,100000 --json results/dedup.json
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.stub_servers import make_png
+
+
+def bench_hashing(repeat: int) -> List[Dict[str, Any]]:
+    from image_hash import image_hashes
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (1024, 2048):
+            path = Path(tmp) / f"image_{size}.png"
+            path.write_bytes(make_png(size, size))
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                image_hashes(path)
+                timings.append(time.perf_counter() - start)
+            results.append({"size": size, "ms": round(statistics.median(timings) * 1000, 1)})
+    return results
+
+
+def bench_search(count: int, queries: int, seed: int = 0) -> Dict[str, Any]:
+    from image_hash import PHASH_DISTANCE, MultiIndex, hamming
+
+    rng = random.Random(seed)
+    hashes = [rng.getrandbits(64) for _ in range(count)]
+    index = MultiIndex()
+    for i, value in enumerate(hashes):
+        index.add(value, i)
+    # 既存のハッシュから数ビット変えたもの（ほぼ同じ画像）を探す
+    targets = []
+    for _ in range(queries):
+        value = hashes[rng.randrange(count)]
+        for bit in rng.sample(range(64), rng.randint(0, 4)):
+            value ^= 1 << bit
+        targets.append(value)
+
+    start = time.perf_counter()
+    linear = [[i for i, h in enumerate(hashes) if hamming(value, h) <= PHASH_DISTANCE] for value in targets]
+    linear_seconds = (time.perf_counter() - start) / queries
+
+    start = time.perf_counter()
+    indexed = [index.search(value) for value in targets]
+    index_seconds = (time.perf_counter() - start) / queries
+
+    assert all(sorted(a) == sorted(i for _, i in b) for a, b in zip(linear, indexed)), "検索結果が一致しません"
+    return {
+        "count": count,
+        "linear_ms": round(linear_seconds * 1000, 3),
+        "index_ms": round(index_seconds * 1000, 3),
+        "speedup": round(linear_seconds / index_seconds, 1),
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="知覚ハッシュ・重複検索の計測")
+    parser.add_argument("--sizes", default="1000,10000,50000", help="登録するハッシュの件数（カンマ区切り）")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    args = parser.parse_args(argv)
+
+    hashing = bench_hashing(args.repeat)
+    search = [bench_search(int(n), args.queries) for n in args.sizes.split(",") if n.strip()]
+
+    print()
+    print("🔎 知覚ハッシュ・重複検索ベンチマーク")
+    print("-" * 56)
+    for r in hashing:
+        print(f"ハッシュ計算 {r['size']}px: {r['ms']:.1f} ms（PNGの読み込みを含む）")
+    print()
+    print(f"{'件数':>8} {'全件比較(ms)':>14} {'MultiIndex(ms)':>16} {'倍':>6}")
+    for r in search:
+        print(f"{r['count']:>8} {r['linear_ms']:>14.3f} {r['index_ms']:>16.3f} {r['speedup']:>6.1f}")
+    print()
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"hashing": hashing, "search": search}, f, ensure_ascii=False, indent=2)
+        print(f"📄 保存しました: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
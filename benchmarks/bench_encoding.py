@@ -0,0 +1,105 @@
+"""
+出力画像の書き出しベンチマーク
+合成画像（グラデーション + ノイズ）を 1024px / 2048px で作り、
+
+- 以前の保存（PNG、Pillow 既定の圧縮）
+- 生成直後の保存（PNG、compress_level=1。画面に出すまでの待ち時間）
+- image_encoding.CHANNEL_PRESETS の各形式（バックグラウンドで書き出す分）
+
+のファイルサイズと所要時間を比べる
+
+実行例:
+    python -m benchmarks.bench_encoding
+    python -m benchmarks.bench_encoding --sizes 1024,2048,4096 --json results/encoding.json
+"""
+
+import argparse
+import io
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.stub_servers import make_png
+
+
+def _time_png_save(image, repeat: int, **options) -> Dict[str, Any]:
+    """PNG としてメモリに保存する時間とサイズ"""
+    timings = []
+    for _ in range(repeat):
+        buffer = io.BytesIO()
+        start = time.perf_counter()
+        image.save(buffer, "PNG", **options)
+        timings.append(time.perf_counter() - start)
+    return {"bytes": buffer.tell(), "seconds": statistics.median(timings)}
+
+
+def run_size(size: int, repeat: int, workdir: Path) -> List[Dict[str, Any]]:
+    from PIL import Image
+
+    from image_encoding import CHANNEL_PRESETS, PRIMARY_PNG_OPTIONS, encode_image
+
+    source = workdir / f"source_{size}.png"
+    source.write_bytes(make_png(size, size))
+    image = Image.open(source).convert("RGB")
+
+    rows = [
+        {"size": size, "case": "PNG（以前の保存）", **_time_png_save(image, repeat)},
+        {"size": size, "case": "PNG（生成直後の保存）", **_time_png_save(image, repeat, **PRIMARY_PNG_OPTIONS)},
+    ]
+    for channel in CHANNEL_PRESETS:
+        timings = []
+        for _ in range(repeat):
+            result = encode_image(str(source), channel, output_dir=workdir)
+            if not result["success"]:
+                break
+            timings.append(result["seconds"])
+        if not timings:
+            rows.append({"size": size, "case": channel, "error": result["error"]})
+            continue
+        rows.append({"size": size, "case": channel, "bytes": result["bytes"], "seconds": statistics.median(timings)})
+    return rows
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="出力画像の書き出しの計測")
+    parser.add_argument("--sizes", default="1024,2048", help="画像の一辺（カンマ区切り）")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [row for size in sizes for row in run_size(size, args.repeat, Path(tmp))]
+
+    print()
+    print(f"🗜️ 書き出しベンチマーク（中央値、{args.repeat}回）")
+    print("-" * 64)
+    print(f"{'サイズ':>6}  {'形式':<24} {'KB':>8} {'ms':>8}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['size']:>6}  {r['case']:<24} {r['error']}")
+            continue
+        print(f"{r['size']:>6}  {r['case']:<24} {r['bytes'] / 1024:>8.0f} {r['seconds'] * 1000:>8.0f}")
+    print()
+    print("Instagram・Googleマップは長辺を縮小してから JPEG にする。印刷は元のサイズのまま")
+    print()
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📄 保存しました: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
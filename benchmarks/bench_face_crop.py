@@ -0,0 +1,113 @@
+"""
+トレーナー参照画像の顔切り出しベンチマーク
+assets/trainers/ の画像（または --images で指定した画像）を face_crop.crop_face で切り出し、
+
+- 送るバイト数（元の画像 / 切り出し後）
+- 顔の枠が画像に占める割合（元の画像 / 切り出し後）
+- 切り出しの所要時間（初回 / キャッシュ）
+
+を比べる。キャッシュは一時ディレクトリに作るので outputs/ は変わらない
+
+実行例:
+    python -m benchmarks.bench_face_crop
+    python -m benchmarks.bench_face_crop --images path/to/a.jpg,path/to/b.jpg --json results/face_crop.json
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def face_fraction(path: Path) -> float:
+    """画像の中で検出した顔の枠が占める割合"""
+    from PIL import Image, ImageOps
+    from face_crop import detect_face
+
+    with Image.open(path) as opened:
+        image = ImageOps.exif_transpose(opened).convert("RGB")
+    face = detect_face(image)
+    if face is None:
+        return 0.0
+    _, _, w, h = face["box"]
+    return w * h / (image.width * image.height)
+
+
+def bench_image(path: Path, cache_dir: Path) -> Dict[str, Any]:
+    from face_crop import crop_face
+
+    start = time.perf_counter()
+    first = crop_face(path, cache_dir=cache_dir)
+    first_seconds = time.perf_counter() - start
+    if not first["success"]:
+        return {"image": path.name, "error": first["error"]}
+
+    start = time.perf_counter()
+    crop_face(path, cache_dir=cache_dir)
+    cached_seconds = time.perf_counter() - start
+
+    return {
+        "image": path.name,
+        "method": first["method"],
+        "source_kb": round(first["source_bytes"] / 1024, 1),
+        "crop_kb": round(first["bytes"] / 1024, 1),
+        "face_before": round(face_fraction(path), 3),
+        "face_after": round(face_fraction(Path(first["path"])), 3),
+        "first_ms": round(first_seconds * 1000, 1),
+        "cached_ms": round(cached_seconds * 1000, 2),
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="顔切り出しの計測")
+    parser.add_argument("--images", help="計測する画像（カンマ区切り。既定: assets/trainers/ の全画像）")
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    args = parser.parse_args(argv)
+
+    if args.images:
+        paths = [Path(p.strip()) for p in args.images.split(",") if p.strip()]
+    else:
+        paths = sorted(
+            p for p in (ROOT_DIR / "assets" / "trainers").rglob("*") if p.suffix.lower() in IMAGE_SUFFIXES
+        )
+    if not paths:
+        print("⚠️ 計測する画像がありません（assets/trainers/ に画像を置くか --images で指定してください）")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [bench_image(path, Path(tmp)) for path in paths]
+
+    print()
+    print("🙂 顔切り出しベンチマーク")
+    print("-" * 72)
+    print(f"{'画像':<24} {'方式':>7} {'KB(元→後)':>16} {'顔の割合':>14} {'初回ms':>8} {'再利用ms':>9}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['image'][:24]:<24} ⚠️ {r['error']}")
+            continue
+        print(
+            f"{r['image'][:24]:<24} {r['method']:>7} {r['source_kb']:>7.1f}→{r['crop_kb']:<7.1f}"
+            f" {r['face_before']:>6.1%}→{r['face_after']:<6.1%} {r['first_ms']:>8.1f} {r['cached_ms']:>9.2f}"
+        )
+    print()
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📄 保存しました: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
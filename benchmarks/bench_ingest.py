@@ -0,0 +1,92 @@
+"""
+写真の取り込みベンチマーク
+iPhone の写真に近い合成JPEG（既定: 12枚、4032x3024、EXIF の向き=6）を一時フォルダの inbox/ に置き、
+ingest.Ingester で取り込む時間を並列数ごとに比べる。取り込み前後の合計サイズも表示する
+（縮小版・顔切り出しの作成を含む。素材・記録は一時フォルダに作るので assets/ は変わらない）
+
+実行例:
+    python -m benchmarks.bench_ingest
+    python -m benchmarks.bench_ingest --files 24 --workers 1,4,8 --json results/ingest.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+
+def make_photos(inbox: Path, count: int) -> int:
+    """EXIF で縦向きを指定した横長のJPEGを作る。合計バイト数を返す"""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(0)
+    # 乱数だけの画像は JPEG が極端に大きくなるので、なめらかな模様にノイズを少し足す
+    y, x = np.mgrid[0:3024, 0:4032]
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    total = 0
+    for i in range(count):
+        directory = inbox / ("岡田", "山本", "伊福町")[i % 3]
+        directory.mkdir(parents=True, exist_ok=True)
+        base = (np.sin(x / (50 + i)) + np.cos(y / (70 + i))) * 60 + 128
+        pixels = np.stack([base, base * 0.8, base * 0.6], axis=-1) + rng.normal(0, 8, (3024, 4032, 3))
+        path = directory / f"IMG_{i:04d}.JPG"
+        Image.fromarray(pixels.clip(0, 255).astype(np.uint8)).save(path, "JPEG", quality=92, exif=exif)
+        total += path.stat().st_size
+    return total
+
+
+def run(workers: int, count: int) -> Dict[str, Any]:
+    from ingest import Ingester
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        source_bytes = make_photos(tmp / "inbox", count)
+        ingester = Ingester(tmp / "inbox", assets_dir=tmp / "assets", log_path=tmp / "ingested.json", workers=workers)
+        result = ingester.run_once(stable_seconds=0)
+        output_bytes = sum(p.stat().st_size for p in (tmp / "assets").rglob("*.jpg"))
+    return {
+        "workers": workers,
+        "seconds": result["seconds"],
+        "ingested": result["ingested"],
+        "source_mb": round(source_bytes / 1024 / 1024, 1),
+        "output_mb": round(output_bytes / 1024 / 1024, 1),
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="写真の取り込みの計測")
+    parser.add_argument("--files", type=int, default=12)
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 4}", help="並列数（カンマ区切り）")
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    args = parser.parse_args(argv)
+
+    results = [run(int(w), args.files) for w in args.workers.split(",") if w.strip()]
+
+    print()
+    print(f"📥 写真の取り込みベンチマーク（{args.files}枚、4032x3024）")
+    print("-" * 56)
+    print(f"{'並列数':>6} {'秒':>8} {'枚/秒':>8} {'元(MB)':>8} {'取り込み後(MB)':>14}")
+    for r in results:
+        print(f"{r['workers']:>6} {r['seconds']:>8.2f} {r['ingested'] / r['seconds']:>8.2f} {r['source_mb']:>8.1f} {r['output_mb']:>14.1f}")
+    print()
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📄 保存しました: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
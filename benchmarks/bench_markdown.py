@@ -0,0 +1,123 @@
+"""
+Markdown → HTML 変換ベンチマーク
+3,500字（通常の記事）と 50,000字の記事、長い箇条書きだけの入力で、
+以前の正規表現チェーン版と markdown_html.markdown_to_html の変換時間を比べる
+
+1文字あたりの時間が入力の長さでどれだけ増えるか（線形性）も表示し、
+50,000字で 3,500字の --max-scaling 倍を超えたら終了コード1を返す
+
+実行例:
+    python -m benchmarks.bench_markdown
+    python -m benchmarks.bench_markdown --repeat 50 --json results/markdown.json
+"""
+
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.stub_servers import make_article
+
+
+def legacy_markdown_to_html(markdown_text: str) -> str:
+    """比較用: 以前の blog_generator.markdown_to_html（正規表現を全文に順にかける）"""
+    html = markdown_text
+    html = re.sub(r'^### (.+)$', r'<h3>\1</h3>', html, flags=re.MULTILINE)
+    html = re.sub(r'^## (.+)$', r'<h2>\1</h2>', html, flags=re.MULTILINE)
+    html = re.sub(r'^# (.+)$', r'<h1>\1</h1>', html, flags=re.MULTILINE)
+    html = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html)
+    html = re.sub(r'^- (.+)$', r'<li>\1</li>', html, flags=re.MULTILINE)
+    html = re.sub(r'(<li>.*</li>\n?)+', r'<ul>\g<0></ul>', html)
+    paragraphs = html.split('\n\n')
+    return '\n'.join([f'<p>{p}</p>' if not p.startswith('<') else p for p in paragraphs if p.strip()])
+
+
+def make_long_list(chars: int) -> str:
+    """箇条書きだけが続く入力（以前の版でバックトラックが増える形）"""
+    lines = []
+    total = 0
+    while total < chars:
+        line = f"- ポイント{len(lines) + 1}: **正しいフォーム**で無理なく続ける"
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines)
+
+
+def _time_calls(func: Callable[[], object], repeat: int) -> List[float]:
+    """func を repeat 回呼び、1 回ごとの所要時間（ms）を返す"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def bench_inputs(repeat: int) -> Dict[str, Dict[str, float]]:
+    """入力ごとに新旧の変換時間（中央値 ms）を計測"""
+    from markdown_html import markdown_to_html
+
+    inputs = {
+        "article_3500": make_article(3500),
+        "article_50000": make_article(50000),
+        "list_50000": make_long_list(50000),
+    }
+    results = {}
+    for name, text in inputs.items():
+        markdown_to_html(text)  # 初回（正規表現のコンパイルなど）は計測しない
+        current = statistics.median(_time_calls(lambda: markdown_to_html(text), repeat))
+        legacy = statistics.median(_time_calls(lambda: legacy_markdown_to_html(text), repeat))
+        results[name] = {
+            "chars": len(text),
+            "current_ms": round(current, 3),
+            "legacy_ms": round(legacy, 3),
+            "current_us_per_char": round(current * 1000 / len(text), 4),
+        }
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Markdown → HTML 変換の計測")
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--max-scaling", type=float, default=2.0,
+                        help="50,000字の1文字あたり時間が3,500字の何倍までなら線形とみなすか")
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    args = parser.parse_args(argv)
+
+    results = bench_inputs(args.repeat)
+    scaling = results["article_50000"]["current_us_per_char"] / results["article_3500"]["current_us_per_char"]
+
+    print()
+    print("📝 Markdown → HTML 変換ベンチマーク")
+    print("-" * 64)
+    print(f"{'入力':<16} {'文字数':>8} {'現行 ms':>10} {'旧版 ms':>10} {'µs/文字':>9}")
+    for name, r in results.items():
+        print(f"{name:<16} {r['chars']:>8,} {r['current_ms']:>10.3f} {r['legacy_ms']:>10.3f} {r['current_us_per_char']:>9.4f}")
+    print()
+    print(f"1文字あたりの時間（50,000字 / 3,500字）: {scaling:.2f} 倍（上限 {args.max_scaling} 倍）")
+    print("旧版は表・リンク・番号付きリスト・エスケープに対応していないため、出力は同じではありません")
+    print()
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"inputs": results, "scaling": round(scaling, 3)}, f, ensure_ascii=False, indent=2)
+        print(f"📄 保存しました: {args.json}")
+
+    if scaling > args.max_scaling:
+        print("❌ 入力の長さに対して変換時間が線形に増えていません")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
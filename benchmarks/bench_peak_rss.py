@@ -0,0 +1,169 @@
+"""
+4K 出力の最大メモリ（ピーク RSS）のベンチマーク
+スタブの Gemini が 4096x4096 の PNG を返す条件で、参照画像（既定: トレーナー3枚＋背景1枚、4032x3024 の JPEG）を付けた生成と、
+ロゴの合成の最大メモリを測る。ピーク RSS はプロセスごとの最大値なので、計測ごとに子プロセスを起動する
+（スタブサーバーは親プロセスで動かし、子プロセスの計測に含めない）
+
+- generate: generate_image_with_gemini（参照画像の読み込み・送信・受信・保存・ブランドカラーの解析）
+- logo_legacy: 以前のロゴ合成（ファイルを開き直し、RGBA に広げて白背景の RGB に戻す）
+- logo: overlay_logo_on_image（ファイルから）
+- logo_bytes: overlay_logo_on_image（生成時のバイト列から。ファイルを読み直さない）
+
+実行例:
+    python -m benchmarks.bench_peak_rss
+    python -m benchmarks.bench_peak_rss --size 4096 --references 6 --json results/peak_rss.json
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.stub_servers import make_png, merge_config, start_stub_servers, stop_stub_servers
+
+MODES = ["generate", "logo_legacy", "logo", "logo_bytes"]
+
+
+def peak_rss_mb() -> float:
+    """
+    このプロセスのピーク RSS（MB）
+    Linux の ru_maxrss は exec の前（親プロセス）の値を引き継ぐので、/proc の VmHWM を優先する
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def overlay_logo_legacy(image_path: str, logo_path: Path) -> str:
+    """比較用: 以前の overlay_logo_on_image（右下・中）"""
+    from PIL import Image
+
+    base_image = Image.open(image_path).convert("RGBA")
+    logo = Image.open(logo_path).convert("RGBA")
+    width = int(min(base_image.size) * 0.18)
+    logo = logo.resize((width, int(width * logo.height / logo.width)), Image.Resampling.LANCZOS)
+    base_image.paste(logo, (base_image.width - logo.width - 20, base_image.height - logo.height - 20), logo)
+    output_path = image_path.replace(".png", "_legacy_logo.png")
+    rgb = Image.new("RGB", base_image.size, (255, 255, 255))
+    rgb.paste(base_image, mask=base_image.split()[3])
+    rgb.save(output_path, "PNG", compress_level=1)
+    return output_path
+
+
+def child(mode: str, workdir: Path) -> Dict[str, Any]:
+    """子プロセスで1つの計測を行う"""
+    import image_generator  # noqa: F401  SDK・PIL・NumPy の読み込みを基準に含める
+    from image_generator import generate_image_with_gemini, overlay_logo_on_image
+
+    logo = workdir / "logo.png"
+    output = workdir / "output.png"
+    image_data = output.read_bytes() if mode == "logo_bytes" else None
+    base = peak_rss_mb()
+
+    start = time.perf_counter()
+    if mode == "generate":
+        references = json.loads((workdir / "references.json").read_text())
+        result = generate_image_with_gemini("benchmark", references, aspect_ratio="1:1", resolution="4K", output_dir=workdir / "out")
+        if not result["success"]:
+            raise RuntimeError(result["error"])
+    elif mode == "logo_legacy":
+        overlay_logo_legacy(str(output), logo)
+    else:
+        overlay_logo_on_image(str(output), logo, image_data=image_data)
+    seconds = time.perf_counter() - start
+
+    return {"mode": mode, "base_mb": round(base, 1), "peak_mb": round(peak_rss_mb(), 1),
+            "added_mb": round(peak_rss_mb() - base, 1), "seconds": round(seconds, 2)}
+
+
+def prepare(workdir: Path, size: int, references: int) -> None:
+    """参照画像・ロゴ・比較用の出力画像を作る"""
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:3024, 0:4032]
+    entries = []
+    for i in range(references):
+        base = (np.sin(x / (40 + i)) + np.cos(y / (60 + i))) * 60 + 128
+        pixels = np.stack([base, base * 0.85, base * 0.7], axis=-1) + rng.normal(0, 8, (3024, 4032, 3))
+        path = workdir / f"reference_{i}.jpg"
+        Image.fromarray(pixels.clip(0, 255).astype(np.uint8)).save(path, "JPEG", quality=92)
+        entries.append({"path": str(path), "type": "background" if i == references - 1 else "trainer", "description": ""})
+    (workdir / "references.json").write_text(json.dumps(entries))
+
+    logo = Image.new("RGBA", (600, 200), (0, 0, 0, 0))
+    logo.paste((255, 107, 53, 255), (20, 20, 580, 180))
+    logo.save(workdir / "logo.png")
+    (workdir / "output.png").write_bytes(make_png(size, size))
+    (workdir / "out").mkdir()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="4K 出力のピーク RSS の計測")
+    parser.add_argument("--size", type=int, default=4096, help="生成画像の一辺（px）")
+    parser.add_argument("--references", type=int, default=4, help="参照画像の枚数（最後の1枚は背景）")
+    parser.add_argument("--claude-port", type=int, default=8711)
+    parser.add_argument("--gemini-port", type=int, default=8712)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(child(args.child, Path(args.workdir))))
+        return 0
+
+    stubs = start_stub_servers(merge_config({
+        "gemini": {"png_width": args.size, "png_height": args.size},
+    }), args.claude_port, args.gemini_port)
+    # 参照画像は元の大きさのまま送る（顔切り出しで小さくしない）
+    env = {**os.environ, **stubs["env"], "FACE_CROP": "false", "BRAND_PALETTE_MIN_SCORE": "0"}
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            workdir = Path(tmp)
+            prepare(workdir, args.size, args.references)
+            for mode in MODES:
+                completed = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_peak_rss", "--child", mode, "--workdir", str(workdir)],
+                    cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True,
+                )
+                results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    finally:
+        stop_stub_servers(stubs)
+
+    print()
+    print(f"🧠 ピーク RSS ベンチマーク（出力 {args.size}x{args.size}、参照画像 {args.references}枚）")
+    print("-" * 60)
+    print(f"{'計測':<12} {'基準(MB)':>10} {'ピーク(MB)':>11} {'増加(MB)':>10} {'秒':>7}")
+    for r in results:
+        print(f"{r['mode']:<12} {r['base_mb']:>10.1f} {r['peak_mb']:>11.1f} {r['added_mb']:>10.1f} {r['seconds']:>7.2f}")
+    print()
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📄 保存しました: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,400 @@
+"""
+オフライン E2E ベンチマーク
+ローカルのスタブサーバーに対して、宣材写真・SNS投稿・Instagram複数ページ・ブログ生成の
+各フローを実行し、スループット・p50/p95/p99レイテンシ・ピークRSSを計測する
+
+実行例:
+    python -m benchmarks.bench_pipeline --flow all --iterations 20 --concurrency 4
+    python -m benchmarks.bench_pipeline --flow promo --gemini-latency lognormal:200:0.5 --gemini-error-rate 0.1
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Callable
+
+from benchmarks.stub_servers import (
+    merge_config,
+    parse_latency_spec,
+    start_stub_servers,
+    stop_stub_servers,
+    fetch_stub_stats,
+)
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+ASSETS_DIR = ROOT_DIR / "assets"
+
+FLOWS = ["promo", "sns", "multipage", "blog", "blog_stream"]
+
+
+# =====================================
+# 集計ヘルパー
+# =====================================
+
+def percentile(values: List[float], q: float) -> float:
+    """線形補間でパーセンタイルを計算（q: 0〜100）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize_latencies(latencies: List[float]) -> Dict[str, float]:
+    """レイテンシ（秒）のリストを ms 単位の要約にする"""
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(max(latencies) * 1000, 1) if latencies else 0.0,
+    }
+
+
+def peak_rss_mb() -> float:
+    """このプロセスのピークRSS（MB）"""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux は KB、macOS はバイト単位
+    if sys.platform == "darwin":
+        return round(maxrss / 1024 / 1024, 1)
+    return round(maxrss / 1024, 1)
+
+
+def _first_image(directory: Path) -> Path:
+    extensions = {'.jpg', '.jpeg', '.png', '.webp'}
+    for path in sorted(directory.rglob("*")):
+        if path.suffix.lower() in extensions:
+            return path
+    return None
+
+
+# =====================================
+# フロー定義（app.py の run_* と同じ呼び出し順）
+# =====================================
+
+def flow_promo(output_dir: Path) -> None:
+    """run_generation 相当: プロンプト変換 → 画像生成 → ロゴ合成"""
+    from prompt_converter import convert_prompt_with_claude
+    from image_generator import generate_image_with_gemini, overlay_logo_on_image
+
+    generation_input = {
+        "location": "島田本町",
+        "situation": "カウンセリング・相談",
+        "trainer": "岡田",
+        "client": "30代女性",
+        "aspect_ratio": "1:1",
+        "resolution": "high",
+        "additional_prompt": "窓から自然光が入っている、和やかな雰囲気",
+        "image_text": None,
+        "mood": "やや落ち着いた"
+    }
+    reference_images = []
+    bg = _first_image(ASSETS_DIR / "backgrounds")
+    if bg:
+        reference_images.append({"path": bg, "type": "background", "description": "店舗背景"})
+    trainer = _first_image(ASSETS_DIR / "trainers")
+    if trainer:
+        reference_images.append({"path": trainer, "type": "trainer_face", "description": "トレーナー"})
+
+    prompt = convert_prompt_with_claude(generation_input)
+    result = generate_image_with_gemini(
+        prompt=prompt,
+        reference_images=reference_images,
+        aspect_ratio="1:1",
+        resolution="high",
+        output_dir=output_dir
+    )
+    if not result["success"]:
+        raise RuntimeError(result.get("error"))
+
+    logo = _first_image(ASSETS_DIR / "logos")
+    if logo:
+        overlay_logo_on_image(result["image_path"], logo, "右下", "中")
+
+
+def _sns_params(headline: str, sub_text: str) -> Dict[str, Any]:
+    return {
+        "platform": "Instagram",
+        "post_type": "共感系：悩み→解決",
+        "layout_style": "テキスト中心（シンプル）",
+        "background_style": "単色（白）",
+        "custom_opacity": 100,
+        "main_headline": headline,
+        "headline_color": "#0d2b45",
+        "headline_size": "large",
+        "headline_position": "center",
+        "sub_text": sub_text,
+        "sub_text_color": "#0d2b45",
+        "sub_text_size": "medium",
+        "accent_text": "",
+        "accent_style": None,
+        "include_logo": True,
+        "logo_position": "bottom_right",
+        "logo_size": "medium",
+        "include_trainer_photo": False,
+        "trainer_photo_style": None,
+        "include_icons": False,
+        "icon_type": None,
+        "font_style": "ゴシック体（モダン）",
+        "text_shadow": "なし",
+        "border_style": "なし",
+        "decoration": "なし",
+        "overall_mood": "やや落ち着いた",
+        "color_intensity": "標準"
+    }
+
+
+def flow_sns(output_dir: Path) -> None:
+    """run_sns_generation 相当: SNSプロンプト変換 → 画像生成 → ロゴ合成"""
+    from prompt_converter import convert_sns_prompt_with_claude
+    from image_generator import generate_image_with_gemini, overlay_logo_on_image
+
+    prompt = convert_sns_prompt_with_claude(_sns_params("「ジムが続かない」本当の理由", "意志の弱さではありません"))
+    result = generate_image_with_gemini(
+        prompt=prompt,
+        reference_images=[],
+        aspect_ratio="1:1",
+        resolution="high",
+        output_dir=output_dir
+    )
+    if not result["success"]:
+        raise RuntimeError(result.get("error"))
+
+    logo = _first_image(ASSETS_DIR / "logos")
+    if logo:
+        overlay_logo_on_image(result["image_path"], logo, "右下", "中")
+
+
+def flow_multipage(output_dir: Path, page_types: List[str] = None) -> None:
+    """render_instagram_multipage_mode 相当: ページごとにコンテンツ生成 → プロンプト変換 → 画像生成"""
+    from prompt_converter import convert_sns_prompt_with_claude, generate_sns_content_with_claude
+    from image_generator import generate_image_with_gemini
+
+    page_types = page_types or ["title", "problem", "cause", "solution", "cta"]
+    generated_contents = []
+    for idx, page_type in enumerate(page_types):
+        content = generate_sns_content_with_claude(
+            theme="ジム継続の悩み",
+            page_type=page_type,
+            page_number=idx + 1,
+            total_pages=len(page_types),
+            previous_content=generated_contents
+        )
+        content["page_type"] = page_type
+        generated_contents.append(content)
+
+        prompt = convert_sns_prompt_with_claude(_sns_params(content.get("headline", ""), content.get("sub_text", "")))
+        result = generate_image_with_gemini(
+            prompt=prompt,
+            reference_images=[],
+            aspect_ratio="1:1",
+            resolution="high",
+            output_dir=output_dir
+        )
+        if not result["success"]:
+            raise RuntimeError(result.get("error"))
+
+
+def _blog_params() -> Dict[str, Any]:
+    return {
+        "category": "ダイエット・体重管理",
+        "topic": "食べないダイエットが失敗する理由",
+        "structure": "問題提起→解決策",
+        "sections": ["導入（問題提起）", "原因の説明", "解決策", "実践のポイント", "まとめ・CTA"],
+        "tone": "professional",
+        "length": "long",
+        "custom_title": None,
+        "keywords": ["パーソナルトレーニング", "岡山 ジム"],
+        "additional_instructions": ""
+    }
+
+
+def flow_blog(output_dir: Path) -> None:
+    """記事生成（一括） → HTML変換"""
+    from blog_generator import generate_blog_with_claude, markdown_to_html
+
+    result = generate_blog_with_claude(_blog_params(), regenerate=True)
+    if not result.get("success"):
+        raise RuntimeError(result.get("error"))
+    markdown_to_html(result.get("content", ""))
+
+
+def flow_blog_stream(output_dir: Path) -> Dict[str, Any]:
+    """run_blog_generation 相当: 記事生成（ストリーミング） → HTML変換"""
+    from blog_generator import stream_blog_with_claude, markdown_to_html
+
+    result = stream_blog_with_claude(_blog_params(), on_update=lambda title, content: None, regenerate=True)
+    if not result.get("success"):
+        raise RuntimeError(result.get("error"))
+    markdown_to_html(result.get("content", ""))
+    return {"first_content_seconds": result.get("first_content_seconds")}
+
+
+FLOW_FUNCTIONS: Dict[str, Callable[[Path], Any]] = {
+    "promo": flow_promo,
+    "sns": flow_sns,
+    "multipage": flow_multipage,
+    "blog": flow_blog,
+    "blog_stream": flow_blog_stream,
+}
+
+
+# =====================================
+# 実行
+# =====================================
+
+def run_flow(name: str, iterations: int, concurrency: int, stubs: Dict[str, Any], output_dir: Path) -> Dict[str, Any]:
+    """1フローを iterations 回、concurrency 並列で実行して計測"""
+    from structured_output import parse_metrics, reset_metrics
+
+    flow = FLOW_FUNCTIONS[name]
+    latencies: List[float] = []
+    first_content: List[float] = []
+    errors: List[str] = []
+
+    def one(_):
+        start = time.perf_counter()
+        try:
+            metrics = flow(output_dir) or {}
+            latencies.append(time.perf_counter() - start)
+            if metrics.get("first_content_seconds") is not None:
+                first_content.append(metrics["first_content_seconds"])
+        except Exception as e:
+            errors.append(str(e))
+
+    reset_metrics()
+    before = {key: fetch_stub_stats(stubs[f"{key}_url"]) for key in ("claude", "gemini")}
+    wall_start = time.perf_counter()
+    # SDK・生成処理のログ出力は計測ノイズになるので捨てる
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(one, range(iterations)))
+    wall = time.perf_counter() - wall_start
+    after = {key: fetch_stub_stats(stubs[f"{key}_url"]) for key in ("claude", "gemini")}
+
+    injected = sum(after[k]["injected_seconds"] - before[k]["injected_seconds"] for k in after)
+    requests = {k: after[k]["requests"] - before[k]["requests"] for k in after}
+    completed = len(latencies)
+
+    result = {
+        "flow": name,
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "completed": completed,
+        "errors": len(errors),
+        "throughput_per_s": round(completed / wall, 2) if wall else 0.0,
+        "wall_s": round(wall, 2),
+        **summarize_latencies(latencies),
+        # スタブが注入した待ち時間を除いた、パイプライン自身のオーバーヘッド（1回あたり）
+        "overhead_ms_per_run": round((sum(latencies) - injected) / completed * 1000, 1) if completed and concurrency == 1 else None,
+        "stub_requests": requests,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    structured = parse_metrics()
+    if structured:
+        # 構造化出力の検証結果（種類ごとの成功・修正・失敗）
+        result["structured_output"] = structured
+    if first_content:
+        # 最初のタイトル・本文が表示されるまでの時間（ストリーミングのフローのみ）
+        result["first_content_p50_ms"] = round(percentile(first_content, 50) * 1000, 1)
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    """計測結果を表形式で表示"""
+    print()
+    print(f"{'flow':<12} {'ok/n':>7} {'thr/s':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'overhead':>9} {'RSS MB':>8}")
+    print("-" * 78)
+    for r in results:
+        overhead = f"{r['overhead_ms_per_run']:.1f}" if r["overhead_ms_per_run"] is not None else "-"
+        print(
+            f"{r['flow']:<12} {r['completed']:>3}/{r['iterations']:<3} {r['throughput_per_s']:>7.2f} "
+            f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} {overhead:>9} {r['peak_rss_mb']:>8.1f}"
+        )
+    for r in results:
+        if "first_content_p50_ms" in r:
+            print(f"{r['flow']}: 最初の表示まで p50 {r['first_content_p50_ms']:.1f} ms")
+    for r in results:
+        for kind, m in r.get("structured_output", {}).items():
+            print(
+                f"{r['flow']}: {kind} 構造化出力 {m['calls']}回 "
+                f"（修正 {m['repaired']} / 失敗 {m['failed']}、失敗率 {m['failure_rate']:.1%}）"
+            )
+    print()
+    print("レイテンシは ms。overhead は concurrency=1 のときのみ（スタブの注入遅延を差し引いた値）")
+
+
+def main(argv: List[str] = None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="オフライン E2E ベンチマーク")
+    parser.add_argument("--flow", choices=FLOWS + ["all"], default="all")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--claude-latency", default="fixed:50")
+    parser.add_argument("--gemini-latency", default="fixed:100")
+    parser.add_argument("--claude-error-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    parser.add_argument("--claude-output-cps", type=float, default=0, help="Claudeの出力速度（文字/秒）。0 なら即時")
+    parser.add_argument("--claude-schema-error-rate", type=float, default=0.0,
+                        help="ツール出力で必須項目を落とす確率（修正依頼の経路を計測）")
+    parser.add_argument("--png-size", default="1024x1024")
+    parser.add_argument("--claude-port", type=int, default=8701)
+    parser.add_argument("--gemini-port", type=int, default=8702)
+    parser.add_argument("--json", dest="json_path", help="結果をJSONで保存するパス")
+    args = parser.parse_args(argv)
+
+    width, height = (int(v) for v in args.png_size.split("x"))
+    stub_config = merge_config({
+        "claude": {
+            "latency": parse_latency_spec(args.claude_latency),
+            "error_rate": args.claude_error_rate,
+            "output_chars_per_second": args.claude_output_cps,
+            "schema_error_rate": args.claude_schema_error_rate,
+        },
+        "gemini": {
+            "latency": parse_latency_spec(args.gemini_latency),
+            "error_rate": args.gemini_error_rate,
+            "png_width": width,
+            "png_height": height,
+        },
+    })
+
+    stubs = start_stub_servers(stub_config, args.claude_port, args.gemini_port)
+    os.environ.update(stubs["env"])
+    output_dir = Path(tempfile.mkdtemp(prefix="firefitness_bench_"))
+    # 記事キャッシュは計測用の一時ディレクトリに書く（blog_generator の読み込み前に設定する）
+    os.environ.setdefault("BLOG_CACHE_DIR", str(output_dir / "article_cache"))
+
+    results = []
+    try:
+        flows = FLOWS if args.flow == "all" else [args.flow]
+        for name in flows:
+            results.append(run_flow(name, args.iterations, args.concurrency, stubs, output_dir))
+    finally:
+        stop_stub_servers(stubs)
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    print_report(results)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"💾 結果を保存: {args.json_path}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
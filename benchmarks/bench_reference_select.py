@@ -0,0 +1,114 @@
+"""
+トレーナー参照画像の選択ベンチマーク
+1枚のトレーナー画像から、写りの悪いもの（ぼけ・暗い・小さい）と、ほぼ同じもの（複製）・
+左右反転（違う向き）を混ぜた候補を作り、
+
+- 以前の方式: 先頭の3枚（iterdir() の順。ここではファイル名順）
+- reference_index.ReferenceIndex.select: 採点して、写りが良く互いに違う3枚
+
+で選ばれる画像と、採点の所要時間（初回 / 保存済み）を比べる
+
+実行例:
+    python -m benchmarks.bench_reference_select
+    python -m benchmarks.bench_reference_select --image path/to/trainer.jpg --json results/reference_select.json
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+DEFAULT_IMAGE = ROOT_DIR / "assets" / "trainers" / "okada" / "FullSizeRenderのコピー.jpg"
+
+
+def make_candidates(source: Path, workdir: Path) -> List[Path]:
+    """写りの悪いものを名前順で先に並べた候補を作る"""
+    from PIL import Image, ImageEnhance, ImageFilter, ImageOps
+
+    with Image.open(source) as opened:
+        image = ImageOps.exif_transpose(opened).convert("RGB")
+
+    variants = {
+        "a_blurred": image.filter(ImageFilter.GaussianBlur(6)),
+        "b_dark": ImageEnhance.Brightness(image).enhance(0.25),
+        "c_small": image.resize((image.width // 4, image.height // 4)),
+        "d_copy1": image,
+        "e_copy2": image,
+        "f_mirrored": ImageOps.mirror(image),
+    }
+    paths = []
+    for name, variant in variants.items():
+        path = workdir / f"{name}.jpg"
+        variant.save(path, "JPEG", quality=92)
+        paths.append(path)
+    return paths
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="トレーナー参照画像の選択の計測")
+    parser.add_argument("--image", default=str(DEFAULT_IMAGE), help="元にするトレーナー画像")
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    args = parser.parse_args(argv)
+
+    from reference_index import ReferenceIndex
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        paths = make_candidates(Path(args.image), workdir)
+        index = ReferenceIndex(workdir / "trainer_refs.json")
+
+        start = time.perf_counter()
+        selected = index.select(paths, 3)
+        first_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index.select(paths, 3)
+        cached_seconds = time.perf_counter() - start
+
+        scores = index.scores(paths)
+        rows: List[Dict[str, Any]] = []
+        for path in paths:
+            entry = scores[str(path.resolve())]
+            rows.append({
+                "image": path.stem,
+                **{k: entry[k] for k in ("sharpness", "face", "exposure", "quality")},
+            })
+
+    result = {
+        "candidates": rows,
+        "first_three": [p.stem for p in paths[:3]],
+        "selected": [p.stem for p in selected],
+        "first_ms": round(first_seconds * 1000, 1),
+        "cached_ms": round(cached_seconds * 1000, 2),
+    }
+
+    print()
+    print(f"🎯 トレーナー参照画像の選択ベンチマーク（候補 {len(paths)} 枚）")
+    print("-" * 64)
+    print(f"{'画像':<12} {'sharpness':>10} {'face':>8} {'exposure':>10} {'総合':>8}")
+    for r in rows:
+        print(f"{r['image']:<12} {r['sharpness']:>10.3f} {r['face']:>8.3f} {r['exposure']:>10.3f} {r['quality']:>8.3f}")
+    print()
+    print(f"先頭の3枚: {', '.join(result['first_three'])}")
+    print(f"select:    {', '.join(result['selected'])}")
+    print(f"所要時間: 初回 {result['first_ms']:.1f} ms / 採点済み {result['cached_ms']:.2f} ms")
+    print()
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"📄 保存しました: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
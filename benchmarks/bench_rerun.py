@@ -0,0 +1,136 @@
+"""
+リラン時間ベンチマーク
+Streamlit の AppTest で app.py を繰り返し再実行し、1 リランあたりの時間を計測する
+あわせて、UIカタログ（ui_catalog.py）をリランごとに組み立て直した場合のコストと、
+icon() のキャッシュ有無の差を表示する
+
+実行例:
+    python -m benchmarks.bench_rerun
+    python -m benchmarks.bench_rerun --reruns 50 --json results/rerun.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+
+def _time_calls(func: Callable[[], object], repeat: int) -> List[float]:
+    """func を repeat 回呼び、1 回ごとの所要時間（ms）を返す"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def bench_app_reruns(reruns: int) -> List[float]:
+    """AppTest で app.py を再実行した時間（ms）"""
+    from streamlit.testing.v1 import AppTest
+
+    # キーがないと app.py は警告を出して終了するため、ダミーを入れて全タブを描画させる
+    os.environ.setdefault("GEMINI_API_KEY", "bench-key")
+    os.environ.setdefault("ANTHROPIC_API_KEY", "bench-key")
+    app_test = AppTest.from_file(str(ROOT_DIR / "app.py"), default_timeout=60)
+    app_test.run()  # 初回（import・キャッシュ作成）は計測しない
+    if app_test.exception:
+        raise RuntimeError(app_test.exception[0].message)
+    return _time_calls(app_test.run, reruns)
+
+
+def bench_catalog_build(repeat: int) -> Dict[str, List[float]]:
+    """
+    カタログをリランごとに作り直す場合と、モジュールキャッシュを使う場合の比較
+
+    Returns:
+        {"rebuild": [...], "cached": [...]}（ms）
+    """
+    import ui_catalog
+
+    source = Path(ui_catalog.__file__).read_text(encoding="utf-8")
+    code = compile(source, ui_catalog.__file__, "exec")
+
+    def rebuild():
+        exec(code, {"__name__": "ui_catalog_rebuild"})
+
+    def cached():
+        __import__("ui_catalog")
+
+    return {"rebuild": _time_calls(rebuild, repeat), "cached": _time_calls(cached, repeat)}
+
+
+def bench_icons(repeat: int) -> Dict[str, List[float]]:
+    """全アイコンを描画する時間（ms）: 毎回組み立てる場合とキャッシュ済みの場合"""
+    from ui_catalog import ICONS, icon
+
+    names = list(ICONS)
+
+    def uncached():
+        for name in names:
+            icon.__wrapped__(name, "#ff6b35", 20)
+
+    def cached():
+        for name in names:
+            icon(name, "#ff6b35", 20)
+
+    cached()
+    return {"uncached": _time_calls(uncached, repeat), "cached": _time_calls(cached, repeat)}
+
+
+def _summary(timings: List[float]) -> Dict[str, float]:
+    return {"median_ms": statistics.median(timings), "min_ms": min(timings), "max_ms": max(timings)}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="リラン時間の計測")
+    parser.add_argument("--reruns", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=200, help="カタログ・アイコン計測の反復回数")
+    parser.add_argument("--skip-app", action="store_true", help="AppTest による計測を省略")
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    args = parser.parse_args(argv)
+
+    import ui_catalog
+
+    results = {
+        "catalog": {key: _summary(value) for key, value in bench_catalog_build(args.repeat).items()},
+        "icons": {key: _summary(value) for key, value in bench_icons(args.repeat).items()},
+        "css_bytes": len(ui_catalog.CUSTOM_CSS.encode("utf-8")),
+    }
+    if not args.skip_app:
+        results["app_rerun"] = _summary(bench_app_reruns(args.reruns))
+
+    print()
+    print("🔁 リラン時間ベンチマーク")
+    print("-" * 56)
+    if "app_rerun" in results:
+        rerun = results["app_rerun"]
+        print(f"app.py リラン           中央値 {rerun['median_ms']:8.2f} ms (最小 {rerun['min_ms']:.2f} ms)")
+    catalog = results["catalog"]
+    print(f"カタログ再構築          中央値 {catalog['rebuild']['median_ms']:8.3f} ms / リラン")
+    print(f"カタログ（キャッシュ）  中央値 {catalog['cached']['median_ms']:8.3f} ms / リラン")
+    icons = results["icons"]
+    print(f"アイコン全種（毎回）    中央値 {icons['uncached']['median_ms']:8.3f} ms")
+    print(f"アイコン全種（キャッシュ）中央値 {icons['cached']['median_ms']:6.3f} ms")
+    print(f"CSS 送信サイズ          {results['css_bytes']:,} bytes / リラン")
+    print()
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📄 保存しました: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+起動時間（import コスト）ベンチマーク
+新しいインタプリタで `python -X importtime -c "import app"` を繰り返し実行し、
+app.py の読み込みにかかる時間と、重いモジュールの内訳を表示する
+
+Streamlit はリランのたびに app.py を再実行するが、import はプロセス内で
+キャッシュされるため、ここで計測するのはコールドスタート（初回表示）のコスト
+
+実行例:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --module prompt_converter --runs 10
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# 生成処理まで読み込みを遅らせたいモジュール
+DEFERRED_MODULES = [
+    "anthropic", "google.genai", "prompt_converter", "image_generator", "blog_generator",
+    # 画像の解析・ハッシュ・サムネイルでだけ使う
+    "numpy", "PIL",
+]
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def measure_import(module: str) -> Dict[str, int]:
+    """
+    新しいプロセスで module を import し、-X importtime の結果を返す
+
+    Returns:
+        {モジュール名: 累積時間(us)}（ネストの浅い順に最初に現れた値）
+    """
+    env = dict(os.environ)
+    # ベア実行時の Streamlit の警告を抑える
+    env.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(ROOT_DIR),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+
+    cumulative: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            name = match.group(4)
+            cumulative.setdefault(name, int(match.group(2)))
+    return cumulative
+
+
+def top_level_imports(runs: List[Dict[str, int]], module: str) -> List[tuple]:
+    """トップレベルパッケージごとの累積時間（中央値）を大きい順に返す"""
+    names = {name.split(".")[0] for run in runs for name in run if name != module}
+    rows = []
+    for name in sorted(names):
+        values = [run.get(name, 0) for run in runs]
+        rows.append((name, statistics.median(values)))
+    return sorted(rows, key=lambda row: row[1], reverse=True)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="import コストの計測")
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    runs = [measure_import(args.module) for _ in range(args.runs)]
+    totals_ms = [run.get(args.module, 0) / 1000 for run in runs]
+
+    print()
+    print(f"📦 import {args.module}: 中央値 {statistics.median(totals_ms):.0f} ms "
+          f"(最小 {min(totals_ms):.0f} ms / 最大 {max(totals_ms):.0f} ms, {args.runs} 回)")
+    print()
+    print(f"{'module':<28} {'cumulative ms':>14}")
+    print("-" * 44)
+    for name, us in top_level_imports(runs, args.module)[:args.top]:
+        print(f"{name:<28} {us / 1000:>14.1f}")
+    print()
+
+    if args.module == "app":
+        loaded = [name for name in DEFERRED_MODULES if any(name in run for run in runs)]
+        if loaded:
+            print(f"⚠️  起動時に読み込まれている重いモジュール: {', '.join(loaded)}")
+            return 1
+        print(f"✅ {', '.join(DEFERRED_MODULES)} は起動時に読み込まれていません")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+文字のコントラスト解析のベンチマーク
+文字色・背景色の違う合成のカルーセル（既定: 10ページ、1080x1080、見出し＋小さめの文字）を作り、
+text_contrast.rank_legibility でまとめて調べる時間と、1ページあたりの時間（読み込み込み・解析のみ）を測る
+あわせて、描いた色から計算したコントラスト比と、推定したコントラスト比を並べて表示する
+
+実行例:
+    python -m benchmarks.bench_text_contrast
+    python -m benchmarks.bench_text_contrast --pages 20 --size 2048 --json results/text_contrast.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+
+# (背景色, 文字色)
+PAIRS = [
+    ((255, 255, 255), (13, 43, 69)),
+    ((13, 43, 69), (255, 255, 255)),
+    ((245, 245, 245), (255, 107, 53)),
+    ((230, 230, 230), (170, 170, 170)),
+    ((13, 43, 69), (255, 107, 53)),
+    ((255, 107, 53), (255, 255, 255)),
+    ((200, 200, 200), (120, 120, 120)),
+]
+
+
+def luminance(color: tuple) -> float:
+    channels = [c / 255 for c in color]
+    linear = [c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4 for c in channels]
+    return 0.2126 * linear[0] + 0.7152 * linear[1] + 0.0722 * linear[2]
+
+
+def make_pages(directory: Path, count: int, size: int) -> List[Dict[str, Any]]:
+    from PIL import Image, ImageDraw, ImageFont
+
+    from text_contrast import contrast_ratio
+
+    headline = ImageFont.load_default(size=size // 12)
+    body = ImageFont.load_default(size=size // 27)
+    pages = []
+    for i in range(count):
+        background, text = PAIRS[i % len(PAIRS)]
+        image = Image.new("RGB", (size, size), background)
+        draw = ImageDraw.Draw(image)
+        draw.text((size // 13, size // 5), "Why no change?", font=headline, fill=text)
+        draw.text((size // 13, size * 5 // 9), "Posture x Food x Habit", font=body, fill=text)
+        path = directory / f"page_{i + 1:02d}.png"
+        image.save(path, "PNG", compress_level=1)
+        pages.append({"path": path, "expected": round(contrast_ratio(luminance(text), luminance(background)), 2)})
+    return pages
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="文字のコントラスト解析の計測")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--size", type=int, default=1080, help="ページの一辺（px）")
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    args = parser.parse_args(argv)
+
+    from PIL import Image
+
+    from brand_palette import downscale
+    from text_contrast import ANALYSIS_LONG_EDGE, analyze_rgb, rank_legibility
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pages = make_pages(Path(tmp), args.pages, args.size)
+
+        start = time.perf_counter()
+        ranking = rank_legibility([page["path"] for page in pages])
+        batch_seconds = time.perf_counter() - start
+
+        analyze_only = []
+        for page in pages:
+            with Image.open(page["path"]) as image:
+                pixels = downscale(image, ANALYSIS_LONG_EDGE)
+            start = time.perf_counter()
+            analyze_rgb(pixels)
+            analyze_only.append(time.perf_counter() - start)
+
+    expected = {str(page["path"]): page["expected"] for page in pages}
+    result = {
+        "pages": args.pages,
+        "size": args.size,
+        "batch_ms": round(batch_seconds * 1000, 1),
+        "per_page_ms": round(batch_seconds * 1000 / args.pages, 1),
+        "analyze_only_ms": round(statistics.median(analyze_only) * 1000, 1),
+        "ranking": [
+            {"page": Path(r["image_path"]).stem, "expected": expected[r["image_path"]], "estimated": r["min_contrast"], "legible": r["legible"]}
+            for r in ranking
+        ],
+    }
+
+    print()
+    print(f"🔤 文字のコントラスト解析ベンチマーク（{args.pages}ページ、{args.size}px）")
+    print("-" * 56)
+    print(f"まとめて解析:             {result['batch_ms']:>10.1f} ms")
+    print(f"1ページ（読み込み込み）:  {result['per_page_ms']:>10.1f} ms")
+    print(f"1ページ（解析のみ）:      {result['analyze_only_ms']:>10.1f} ms")
+    print()
+    print(f"{'ページ':<10} {'描いた色の比':>12} {'推定した比':>10} {'読める':>6}")
+    for r in result["ranking"]:
+        estimated = f"{r['estimated']:.2f}" if r["estimated"] is not None else "-"
+        legible = {True: "○", False: "×", None: "-"}[r["legible"]]
+        print(f"{r['page']:<10} {r['expected']:>12.2f} {estimated:>10} {legible:>6}")
+    print()
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"📄 保存しました: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
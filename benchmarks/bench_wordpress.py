@@ -0,0 +1,145 @@
+"""
+WordPress 一括投稿ベンチマーク
+モックの WordPress（benchmarks/mock_wordpress.py）に、アイキャッチ画像付きの下書きを一括投稿する
+
+- 以前の方式: 記事ごとに requests.post を直接呼ぶ（Session・タイムアウト・リトライなし、画像なし）
+- WordPressClient: 接続プール付きの Session を使い回し、（画像アップロード→）下書き作成を並列に実行
+
+所要時間・成功数・開いたTCP接続数を比べる。--error-rate で 503 を混ぜるとリトライの効果も見られる
+
+実行例:
+    python -m benchmarks.bench_wordpress --posts 20 --concurrency 4
+    python -m benchmarks.bench_wordpress --posts 20 --error-rate 0.1 --latency lognormal:80:0.4
+"""
+
+import argparse
+import json
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.mock_wordpress import MOCK_PASSWORD, MOCK_USERNAME, start_mock_wordpress, stop_mock_wordpress
+from benchmarks.stub_servers import make_article, make_png, parse_latency_spec
+
+
+def _mock_stats(mock: Dict[str, Any]) -> Dict[str, Any]:
+    base = mock["url"].split("/wp-json", 1)[0]
+    with urllib.request.urlopen(f"{base}/__stats", timeout=5) as response:
+        return json.loads(response.read())
+
+
+def _articles(count: int, image: bytes) -> List[Dict[str, Any]]:
+    content = make_article(3500)
+    return [
+        {
+            "title": f"ジムが続かない本当の理由 その{i + 1}",
+            "content": content,
+            "meta_description": "ジムが続かないのは意志の弱さではありません。",
+            "featured_image": image,
+            "featured_image_name": f"firefitness_{i + 1}.png",
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_post(url: str, article: Dict[str, Any]) -> bool:
+    """比較用: 以前の post_to_blog と同じ、1回ごとの requests.post（画像は送れない）"""
+    import requests
+    from markdown_html import markdown_to_html
+
+    try:
+        response = requests.post(
+            url,
+            json={
+                "title": article["title"],
+                "content": markdown_to_html(article["content"]),
+                "status": "draft",
+                "excerpt": article["meta_description"],
+            },
+            auth=(MOCK_USERNAME, MOCK_PASSWORD),
+            headers={"Content-Type": "application/json"},
+        )
+        return response.status_code in (200, 201)
+    except Exception:
+        return False
+
+
+def run_case(name: str, mock: Dict[str, Any], func) -> Dict[str, Any]:
+    before = _mock_stats(mock)
+    start = time.perf_counter()
+    successes = func()
+    wall = time.perf_counter() - start
+    after = _mock_stats(mock)
+    return {
+        "case": name,
+        "ok": successes,
+        "wall_s": round(wall, 3),
+        "requests": after["requests"] - before["requests"],
+        "errors_injected": after["errors"] - before["errors"],
+        # 統計の取得自体の1接続を除く
+        "connections": after["connections"] - before["connections"] - 1,
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="WordPress 一括投稿の計測")
+    parser.add_argument("--posts", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", default="fixed:20", help="モックの遅延（例: lognormal:80:0.4）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 を返す確率")
+    parser.add_argument("--json", help="結果をJSONで保存するパス")
+    args = parser.parse_args(argv)
+
+    from wordpress_client import WordPressClient
+
+    mock = start_mock_wordpress(0, {"latency": parse_latency_spec(args.latency), "error_rate": args.error_rate})
+    articles = _articles(args.posts, make_png(512, 512))
+    try:
+        legacy = run_case(
+            "requests.post", mock,
+            lambda: sum(legacy_post(mock["url"], article) for article in articles)
+        )
+        with WordPressClient(mock["url"], MOCK_USERNAME, MOCK_PASSWORD,
+                             pool_size=args.concurrency, backoff=0.05) as client:
+            text_only = run_case(
+                "Client（画像なし）", mock,
+                lambda: sum(r["success"] for r in client.bulk_post(
+                    [{**article, "featured_image": None} for article in articles]
+                ))
+            )
+            pooled = run_case(
+                "Client（画像あり）", mock,
+                lambda: sum(r["success"] for r in client.bulk_post(articles))
+            )
+    finally:
+        stop_mock_wordpress(mock)
+
+    results = [legacy, text_only, pooled]
+    print()
+    print(f"📮 WordPress 一括投稿ベンチマーク（{args.posts}件、同時 {args.concurrency}）")
+    print("-" * 72)
+    print(f"{'方式':<18} {'成功':>6} {'秒':>8} {'リクエスト':>10} {'503':>5} {'TCP接続':>8}")
+    for r in results:
+        print(f"{r['case']:<18} {r['ok']:>3}/{args.posts:<3} {r['wall_s']:>7.2f} "
+              f"{r['requests']:>10} {r['errors_injected']:>5} {r['connections']:>8}")
+    print()
+    print("画像ありは1件につき画像・代替テキスト・記事の3リクエスト。TCP接続は統計取得の分を除く")
+    print()
+
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📄 保存しました: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,412 @@
+"""
+Streamlit アプリの同時セッション負荷テスト
+実際に `streamlit run app.py` を起動し、N 個のセッションを WebSocket で同時に接続して
+宣材写真・SNS投稿・Instagram複数ページの各モードをスタブサーバーに対して操作する
+
+同時セッション数ごとに、サーバープロセスの CPU・メモリ、通常リランとジョブ
+（生成ボタン）のレイテンシ、リランごとの受信バイト数を計測する
+
+実行例:
+    python -m benchmarks.load_test --concurrency 1,2,4,8 --rounds 2
+    python -m benchmarks.load_test --save-baseline      # ベースラインを更新
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from benchmarks.bench_pipeline import summarize_latencies
+from benchmarks.stub_servers import merge_config, parse_latency_spec, start_stub_servers, stop_stub_servers
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+APP_PATH = ROOT_DIR / "app.py"
+OUTPUTS_DIR = ROOT_DIR / "outputs"
+# 負荷テストの後に消す生成物のあるフォルダ（生成画像・書き出し形式・カルーセルの ZIP）
+GENERATED_DIRS = [OUTPUTS_DIR, OUTPUTS_DIR / "exports"]
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "load_test.json"
+
+MODES = ["promo", "sns", "multipage"]
+
+# 回帰とみなす悪化率（ベースライン比）
+DEFAULT_TOLERANCE = 0.25
+
+
+# =====================================
+# Streamlit サーバー
+# =====================================
+
+def start_streamlit_server(port: int, env: Dict[str, str]) -> subprocess.Popen:
+    """app.py をヘッドレスで起動し、ヘルスチェックが通るまで待つ"""
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", str(APP_PATH),
+            "--server.headless", "true",
+            "--server.port", str(port),
+            "--server.enableXsrfProtection", "false",
+            "--server.fileWatcherType", "none",
+            "--browser.gatherUsageStats", "false",
+        ],
+        cwd=str(ROOT_DIR),
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Streamlit サーバーの起動がタイムアウトしました")
+
+
+def process_cpu_seconds(pid: int) -> float:
+    """/proc から対象プロセスの CPU 時間（user + system 秒）を取得"""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def process_rss_mb(pid: int) -> float:
+    """/proc から対象プロセスの現在の RSS（MB）を取得"""
+    with open(f"/proc/{pid}/statm") as f:
+        pages = int(f.read().split()[1])
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024, 1)
+
+
+class StreamlitSession:
+    """
+    ブラウザの代わりに WebSocket（/_stcore/stream）で Streamlit に接続するクライアント
+
+    ウィジェットは key で指定する。key 付きウィジェットの ID は末尾が "-{key}" になるので、
+    受信した要素から key → ID の対応を学習して BackMsg に詰める
+    """
+
+    def __init__(self, port: int):
+        from websockets.sync.client import connect
+
+        self.ws = connect(
+            f"ws://127.0.0.1:{port}/_stcore/stream",
+            subprotocols=["streamlit"],
+            max_size=None,
+            open_timeout=30,
+        )
+        self.widget_ids: Dict[str, str] = {}
+
+    def close(self) -> None:
+        self.ws.close()
+
+    def rerun(self, widgets: Optional[Dict[str, Any]] = None, timeout: float = 600) -> Dict[str, Any]:
+        """
+        ウィジェット状態を送ってスクリプトを再実行し、完了まで待つ
+
+        Args:
+            widgets: {key: 値}。True はボタンのトリガー、str は選択肢・テキストの値
+
+        Returns:
+            Dict: {"seconds": float, "bytes": int, "errors": List[str]}
+        """
+        from streamlit.proto.Alert_pb2 import Alert
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        back_msg = BackMsg()
+        back_msg.rerun_script.SetInParent()
+        for key, value in (widgets or {}).items():
+            state = back_msg.rerun_script.widget_states.widgets.add()
+            state.id = self.widget_ids[key]
+            if value is True:
+                state.trigger_value = True
+            else:
+                state.string_value = value
+
+        start = time.perf_counter()
+        self.ws.send(back_msg.SerializeToString())
+
+        received = 0
+        errors: List[str] = []
+        while True:
+            data = self.ws.recv(timeout=timeout)
+            received += len(data)
+            msg = ForwardMsg()
+            msg.ParseFromString(data)
+            msg_type = msg.WhichOneof("type")
+
+            if msg_type == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                kind = element.WhichOneof("type")
+                inner = getattr(element, kind)
+                widget_id = getattr(inner, "id", "")
+                if widget_id:
+                    self.widget_ids[widget_id.rsplit("-", 1)[-1]] = widget_id
+                if kind == "exception":
+                    errors.append(inner.message)
+                elif kind == "alert" and inner.format == Alert.ERROR:
+                    errors.append(inner.body)
+            elif msg_type == "script_finished":
+                if msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    break
+
+        return {"seconds": time.perf_counter() - start, "bytes": received, "errors": errors}
+
+
+# =====================================
+# セッション操作
+# =====================================
+
+def drive_session(port: int, mode: str, rounds: int, metrics: Dict[str, List[float]], errors: List[str]) -> None:
+    """
+    1セッション分の操作を実行
+
+    フォーム操作による通常のリランと、生成ボタンによるジョブ実行を rounds 回繰り返す
+    """
+    try:
+        _drive_session(port, mode, rounds, metrics, errors)
+    except Exception as e:
+        errors.append(f"{mode}: {type(e).__name__}: {e}")
+
+
+def _record(result: Dict[str, Any], kind: str, metrics: Dict[str, List[float]], errors: List[str], mode: str) -> None:
+    metrics[kind].append(result["seconds"])
+    metrics[f"{kind}_bytes"].append(result["bytes"])
+    errors.extend(f"{mode}: {e}" for e in result["errors"])
+
+
+def _drive_session(port: int, mode: str, rounds: int, metrics: Dict[str, List[float]], errors: List[str]) -> None:
+    session = StreamlitSession(port)
+    try:
+        _record(session.rerun(), "rerun", metrics, errors, mode)
+
+        # SNS系はプラットフォームを毎回送る（送らないウィジェットは初期値に戻るため）
+        base: Dict[str, Any] = {}
+        if mode in ("sns", "multipage"):
+            base["sns_platform"] = "Instagram（複数ページ）" if mode == "multipage" else "Instagram（単体）"
+            _record(session.rerun(base), "rerun", metrics, errors, mode)
+
+        for round_idx in range(rounds):
+            # フォーム操作（ユーザーが入力している間のリラン）
+            if mode == "promo":
+                form = {"promo_additional": f"窓から自然光が入っている {round_idx}"}
+                button_key = "promo_generate"
+            elif mode == "sns":
+                form = {"sns_layout": "カード型（情報整理）"}
+                button_key = "sns_generate"
+            else:
+                form = {"mp_common_mood": "ニュートラル"}
+                button_key = "mp_generate_all"
+            state = {**base, **form}
+            _record(session.rerun(state), "rerun", metrics, errors, mode)
+
+            # 生成ジョブ
+            _record(session.rerun({**state, button_key: True}), "job", metrics, errors, mode)
+    finally:
+        session.close()
+
+
+def run_level(port: int, server_pid: int, concurrency: int, rounds: int, modes: List[str]) -> Dict[str, Any]:
+    """concurrency 個のセッションを同時に動かして計測"""
+    metrics = {"rerun": [], "job": [], "rerun_bytes": [], "job_bytes": []}
+    errors: List[str] = []
+    rss_samples: List[float] = []
+    stop = threading.Event()
+
+    def sample_rss():
+        while not stop.is_set():
+            rss_samples.append(process_rss_mb(server_pid))
+            stop.wait(0.2)
+
+    sampler = threading.Thread(target=sample_rss, daemon=True)
+    sessions = [
+        threading.Thread(target=drive_session, args=(port, modes[i % len(modes)], rounds, metrics, errors))
+        for i in range(concurrency)
+    ]
+
+    cpu_start = process_cpu_seconds(server_pid)
+    wall_start = time.perf_counter()
+    sampler.start()
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join()
+    wall = time.perf_counter() - wall_start
+    cpu = process_cpu_seconds(server_pid) - cpu_start
+    stop.set()
+    sampler.join()
+
+    def mean_kb(values: List[int]) -> float:
+        return round(sum(values) / len(values) / 1024, 1) if values else 0.0
+
+    return {
+        "concurrency": concurrency,
+        "jobs": len(metrics["job"]),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "wall_s": round(wall, 2),
+        # 1コア = 100%
+        "cpu_percent": round(cpu / wall * 100, 1) if wall else 0.0,
+        "rss_mb_max": max(rss_samples) if rss_samples else process_rss_mb(server_pid),
+        "rerun": {**summarize_latencies(metrics["rerun"]), "mean_kb": mean_kb(metrics["rerun_bytes"])},
+        "job": {**summarize_latencies(metrics["job"]), "mean_kb": mean_kb(metrics["job_bytes"])},
+    }
+
+
+# =====================================
+# ベースライン比較
+# =====================================
+
+def compare_with_baseline(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """ベースラインより tolerance 以上悪化した指標を列挙"""
+    by_level = {b["concurrency"]: b for b in baseline}
+    regressions = []
+    for r in results:
+        b = by_level.get(r["concurrency"])
+        if not b:
+            continue
+        checks = [
+            ("rerun p95_ms", r["rerun"]["p95_ms"], b["rerun"]["p95_ms"]),
+            ("job p95_ms", r["job"]["p95_ms"], b["job"]["p95_ms"]),
+            ("rerun mean_kb", r["rerun"]["mean_kb"], b["rerun"]["mean_kb"]),
+            ("cpu_percent", r["cpu_percent"], b["cpu_percent"]),
+            ("rss_mb_max", r["rss_mb_max"], b["rss_mb_max"]),
+        ]
+        for name, value, base in checks:
+            if base and value > base * (1 + tolerance):
+                regressions.append(
+                    f"concurrency={r['concurrency']} {name}: {value} (baseline {base}, +{(value / base - 1) * 100:.0f}%)"
+                )
+        if r["errors"] > b.get("errors", 0):
+            regressions.append(f"concurrency={r['concurrency']} errors: {r['errors']} (baseline {b.get('errors', 0)})")
+    return regressions
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    print()
+    print(
+        f"{'N':>3} {'jobs':>5} {'err':>4} {'CPU%':>7} {'RSS MB':>8} "
+        f"{'rerun p50':>10} {'rerun p95':>10} {'rerun KB':>9} {'job p50':>9} {'job p95':>9}"
+    )
+    print("-" * 82)
+    for r in results:
+        print(
+            f"{r['concurrency']:>3} {r['jobs']:>5} {r['errors']:>4} {r['cpu_percent']:>7.1f} {r['rss_mb_max']:>8.1f} "
+            f"{r['rerun']['p50_ms']:>10.1f} {r['rerun']['p95_ms']:>10.1f} {r['rerun']['mean_kb']:>9.1f} "
+            f"{r['job']['p50_ms']:>9.1f} {r['job']['p95_ms']:>9.1f}"
+        )
+    print()
+    print("レイテンシは ms。CPU% はサーバープロセスの値（1コア = 100%）")
+
+
+def generated_files() -> set:
+    """outputs/ にある生成物（firefitness_* のファイル。索引・キャッシュ・フォルダは含めない）"""
+    return {
+        path for directory in GENERATED_DIRS if directory.exists()
+        for path in directory.glob("firefitness_*") if path.is_file()
+    }
+
+
+def remove_generated(paths: set) -> None:
+    """負荷テストで生成したファイルを削除し、生成画像の索引からも除く"""
+    for path in paths:
+        path.unlink(missing_ok=True)
+    images = [str(path) for path in paths if path.parent == OUTPUTS_DIR and path.suffix == ".png"]
+    if images:
+        from output_index import OutputIndex
+
+        OutputIndex(OUTPUTS_DIR).remove_missing(images)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Streamlit 同時セッション負荷テスト")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="カンマ区切りの同時セッション数")
+    parser.add_argument("--rounds", type=int, default=2, help="1セッションあたりの生成回数")
+    parser.add_argument("--modes", default=",".join(MODES), help="使用するモード（promo,sns,multipage）")
+    parser.add_argument("--claude-latency", default="fixed:50")
+    parser.add_argument("--gemini-latency", default="fixed:100")
+    parser.add_argument("--png-size", default="1024x1024")
+    parser.add_argument("--port", type=int, default=0, help="Streamlit のポート（0 で空きポート）")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--save-baseline", action="store_true", help="結果をベースラインとして保存")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    width, height = (int(v) for v in args.png_size.split("x"))
+    stubs = start_stub_servers(merge_config({
+        "claude": {"latency": parse_latency_spec(args.claude_latency)},
+        "gemini": {"latency": parse_latency_spec(args.gemini_latency), "png_width": width, "png_height": height},
+    }))
+    port = args.port or _free_port()
+
+    existing_outputs = generated_files()
+    levels = [int(v) for v in args.concurrency.split(",")]
+    modes = args.modes.split(",")
+
+    results = []
+    server = None
+    try:
+        server = start_streamlit_server(port, stubs["env"])
+        for level in levels:
+            print(f"⏱  同時セッション数 {level} ...", file=sys.stderr)
+            results.append(run_level(port, server.pid, level, args.rounds, modes))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+        stop_stub_servers(stubs)
+        # 負荷テストで生成した画像は outputs/ に残さない（索引・キャッシュ・フォルダはそのまま）
+        remove_generated(generated_files() - existing_outputs)
+
+    print_report(results)
+
+    baseline_path = Path(args.baseline)
+    record = {
+        "config": {
+            "rounds": args.rounds,
+            "modes": modes,
+            "claude_latency": args.claude_latency,
+            "gemini_latency": args.gemini_latency,
+            "png_size": args.png_size,
+        },
+        "results": results,
+    }
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(record, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"💾 ベースラインを保存: {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print("ℹ️  ベースラインがありません（--save-baseline で作成できます）")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    if baseline.get("config") != record["config"]:
+        print("⚠️  ベースラインと設定が異なるため、比較結果は参考値です")
+    regressions = compare_with_baseline(results, baseline["results"], args.tolerance)
+    if regressions:
+        print(f"❌ ベースラインから {args.tolerance * 100:.0f}% 以上悪化した指標:")
+        for line in regressions:
+            print(f"   {line}")
+        return 1
+    print("✅ ベースラインからの悪化はありません")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+WordPress REST API のローカルモックサーバー
+wordpress_client.WordPressClient を実サイトなしで動かすためのもの。
+投稿（/wp-json/wp/v2/posts）とメディア（/wp-json/wp/v2/media）を受け付け、
+遅延・エラー率（503）を設定できる。TCP接続数も数えるので、接続が使い回されているか確認できる
+
+単体起動:
+    python -m benchmarks.mock_wordpress --port 8703
+"""
+
+import argparse
+import base64
+import json
+import random
+import threading
+from http.server import ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from benchmarks.stub_servers import _StubHandler, parse_latency_spec
+
+MOCK_USERNAME = "bench"
+MOCK_PASSWORD = "bench-app-password"
+
+DEFAULT_MOCK_CONFIG = {
+    "latency": {"dist": "fixed", "ms": 20},
+    "error_rate": 0.0,
+    "seed": 0,
+}
+
+
+class MockWordPressHandler(_StubHandler):
+    """/wp-json/wp/v2/posts・media・media/{id} の模倣（Basic認証あり）"""
+
+    # ヘッダーと本文が別々に書き込まれるため、keep-alive の接続で Nagle による待ちが入らないようにする
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.state["lock"]:
+            self.state["stats"]["connections"] += 1
+
+    def _authorized(self) -> bool:
+        expected = base64.b64encode(f"{MOCK_USERNAME}:{MOCK_PASSWORD}".encode()).decode()
+        return self.headers.get("Authorization") == f"Basic {expected}"
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def do_POST(self):
+        body = self._read_body()
+        if not self._authorized():
+            self._send_json(401, {"code": "rest_not_logged_in", "message": "認証が必要です"})
+            return
+        if self._delay(self.state["config"]):
+            # 処理せずに断ったことを示す Retry-After を付ける（POST はこのときだけ再試行される）
+            self._send_json(503, {"code": "service_unavailable", "message": "Service Unavailable (mock)"}, {"Retry-After": "0"})
+            return
+
+        path = self.path.split("?", 1)[0].rstrip("/")
+        state = self.state
+        if path.endswith("/wp/v2/posts"):
+            data = json.loads(body or b"{}")
+            with state["lock"]:
+                post_id = len(state["posts"]) + 1
+                state["posts"][post_id] = data
+            self._send_json(201, {
+                "id": post_id,
+                "status": data.get("status", "draft"),
+                "link": f"http://127.0.0.1/?p={post_id}",
+                "featured_media": data.get("featured_media", 0),
+            })
+        elif path.endswith("/wp/v2/media"):
+            if not self.headers.get("Content-Disposition", "").startswith("attachment"):
+                self._send_json(400, {"code": "rest_upload_no_content_disposition", "message": "ファイル名がありません"})
+                return
+            with state["lock"]:
+                media_id = 1000 + len(state["media"]) + 1
+                state["media"][media_id] = {"bytes": len(body), "mime_type": self.headers.get("Content-Type")}
+            self._send_json(201, {
+                "id": media_id,
+                "source_url": f"http://127.0.0.1/wp-content/uploads/{media_id}",
+                "mime_type": self.headers.get("Content-Type"),
+            })
+        elif "/wp/v2/media/" in path:
+            media_id = int(path.rsplit("/", 1)[1])
+            with state["lock"]:
+                media = state["media"].get(media_id)
+                if media is not None:
+                    media.update(json.loads(body or b"{}"))
+            if media is None:
+                self._send_json(404, {"code": "rest_post_invalid_id", "message": "メディアがありません"})
+            else:
+                self._send_json(200, {"id": media_id, **media})
+        else:
+            self._send_json(404, {"code": "rest_no_route", "message": self.path})
+
+    def do_GET(self):
+        if self.path == "/__stats":
+            with self.state["lock"]:
+                stats = dict(self.state["stats"])
+                stats["posts"] = len(self.state["posts"])
+                stats["media"] = len(self.state["media"])
+            self._send_json(200, stats)
+        else:
+            super().do_GET()
+
+
+def start_mock_wordpress(port: int = 0, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    モックサーバーをバックグラウンドのスレッドで起動
+
+    Args:
+        port: 0 なら空いているポート
+        config: latency / error_rate / seed（DEFAULT_MOCK_CONFIG を上書き）
+
+    Returns:
+        {"server", "url"（投稿エンドポイント）, "state"}
+    """
+    merged = {**DEFAULT_MOCK_CONFIG, **(config or {})}
+    state = {
+        "config": merged,
+        "lock": threading.Lock(),
+        "rng": random.Random(merged["seed"]),
+        "stats": {"requests": 0, "errors": 0, "injected_seconds": 0.0, "connections": 0},
+        "posts": {},
+        "media": {},
+    }
+    handler = type("MockWordPressHandler", (MockWordPressHandler,), {"state": state})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/wp-json/wp/v2/posts"
+    return {"server": server, "url": url, "state": state}
+
+
+def stop_mock_wordpress(mock: Dict[str, Any]) -> None:
+    mock["server"].shutdown()
+    mock["server"].server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WordPress REST API モックサーバー")
+    parser.add_argument("--port", type=int, default=8703)
+    parser.add_argument("--latency", default="fixed:20", help="例: lognormal:200:0.4")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    mock = start_mock_wordpress(args.port, {
+        "latency": parse_latency_spec(args.latency),
+        "error_rate": args.error_rate,
+    })
+    print(f"🧪 WordPress モック: {mock['url']}")
+    print(f"   ユーザー名: {MOCK_USERNAME} / アプリケーションパスワード: {MOCK_PASSWORD}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stop_mock_wordpress(mock)
@@ -0,0 +1,556 @@
+"""
+Claude / Gemini API のローカルスタブサーバー
+Anthropic Messages API と Gemini generate_content API を模倣し、
+遅延分布・エラー率・合成PNGを設定できる
+
+単体起動:
+    python -m benchmarks.stub_servers --claude-port 8701 --gemini-port 8702
+"""
+
+import argparse
+import base64
+import json
+import math
+import multiprocessing
+import random
+import struct
+import threading
+import time
+import urllib.request
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+
+# =====================================
+# 設定
+# =====================================
+
+DEFAULT_STUB_CONFIG = {
+    "claude": {
+        # 遅延分布: fixed / uniform / lognormal（ミリ秒）
+        "latency": {"dist": "fixed", "ms": 50},
+        "error_rate": 0.0,
+        # ブログ記事本文の文字数
+        "article_chars": 3500,
+        # 出力速度（文字/秒）。0 なら遅延のあと一括で返す。ストリーミング時はこの速さで少しずつ送る
+        "output_chars_per_second": 0,
+        # ツール出力で必須項目を1つ落とす確率（修正依頼の経路を試すため。修正依頼には正しく返す）
+        "schema_error_rate": 0.0,
+    },
+    "gemini": {
+        "latency": {"dist": "fixed", "ms": 100},
+        "error_rate": 0.0,
+        "png_width": 1024,
+        "png_height": 1024,
+        # 0〜8: 下位ビットのノイズ量（大きいほど圧縮が効かず実画像に近いサイズになる）
+        "png_noise_bits": 4,
+    },
+    "seed": 0,
+}
+
+
+def parse_latency_spec(spec: str) -> Dict[str, Any]:
+    """
+    コマンドライン用の遅延指定を辞書に変換
+
+    例: "fixed:50" / "uniform:20:200" / "lognormal:800:0.4"（中央値ms:シグマ）
+    """
+    parts = spec.split(":")
+    dist = parts[0]
+    if dist == "fixed":
+        return {"dist": "fixed", "ms": float(parts[1])}
+    if dist == "uniform":
+        return {"dist": "uniform", "min_ms": float(parts[1]), "max_ms": float(parts[2])}
+    if dist == "lognormal":
+        return {"dist": "lognormal", "median_ms": float(parts[1]), "sigma": float(parts[2])}
+    raise ValueError(f"不明な遅延分布: {spec}")
+
+
+def sample_latency(latency: Dict[str, Any], rng: random.Random) -> float:
+    """遅延分布から1回分の遅延（秒）をサンプリング"""
+    dist = latency.get("dist", "fixed")
+    if dist == "fixed":
+        ms = latency.get("ms", 0)
+    elif dist == "uniform":
+        ms = rng.uniform(latency["min_ms"], latency["max_ms"])
+    elif dist == "lognormal":
+        ms = rng.lognormvariate(math.log(latency["median_ms"]), latency.get("sigma", 0.5))
+    else:
+        raise ValueError(f"不明な遅延分布: {dist}")
+    return max(ms, 0) / 1000
+
+
+# =====================================
+# 合成ペイロード
+# =====================================
+
+def make_png(width: int, height: int, noise_bits: int = 4, seed: int = 0) -> bytes:
+    """
+    グラデーション + ノイズの合成PNGを作成（PIL不要）
+
+    Args:
+        width: 幅（ピクセル）
+        height: 高さ（ピクセル）
+        noise_bits: 各チャンネルの下位何ビットをノイズにするか（0〜8）
+        seed: 乱数シード
+
+    Returns:
+        PNGバイト列
+    """
+    rng = random.Random(seed)
+    row_len = width * 3
+    mask = (1 << noise_bits) - 1
+    noise_table = bytes(b & mask for b in range(256))
+    keep = 0xFF ^ mask
+
+    base_row = bytearray(row_len)
+    for x in range(width):
+        base_row[x * 3] = (x * 255 // max(width - 1, 1)) & keep
+        base_row[x * 3 + 1] = 0x2b & keep
+        base_row[x * 3 + 2] = 0x45 & keep
+    base_int = int.from_bytes(base_row, "big")
+
+    raw = bytearray()
+    for y in range(height):
+        noise = rng.randbytes(row_len).translate(noise_table)
+        row = (base_int | int.from_bytes(noise, "big")).to_bytes(row_len, "big")
+        raw += b"\x00" + row
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", ihdr)
+        + chunk(b"IDAT", zlib.compress(bytes(raw), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def make_article(chars: int) -> str:
+    """ブログ記事風のMarkdown本文を指定文字数程度で作成"""
+    blocks = [
+        "## はじめに\n\nジムに通っても続かない、そんな経験はありませんか？**3軸診断**で原因を特定します。",
+        "## 続かない本当の理由\n\n- 意志の弱さではない\n- 方法が合っていなかった\n- 根本原因を見逃していた",
+        "### 姿勢軸\n\n姿勢の歪みは運動効率を下げます。正しいフォームで怪我を防ぎましょう。",
+        "### 食事軸\n\n1. 極端な制限はしない\n2. 生活に合わせた提案\n3. 知識を身につける",
+        "### 継続軸\n\n意志の力に頼らない仕組みづくりが大切です。小さな成功体験を積み重ねましょう。",
+        "### 3軸の比較\n\n| 軸 | 見るポイント | 改善の例 |\n|---|---|---|\n"
+        "| 姿勢 | 骨盤・肩の位置 | ストレッチ |\n| 食事 | 食事の内容 | 糖質の見直し |\n| 継続 | 通う頻度 | 予約の固定 |",
+        "### 通い方の例\n\n- 週2回のトレーニング\n  - 1回50分\n  - 完全個室\n- 食事の記録\n  - 写真を送るだけ",
+        "## まとめ\n\nまずは[無料カウンセリング](https://example.com/counseling)へお気軽にどうぞ。",
+    ]
+    parts = []
+    total = 0
+    i = 0
+    while total < chars:
+        block = blocks[i % len(blocks)]
+        parts.append(block)
+        total += len(block)
+        i += 1
+    return "\n\n".join(parts)
+
+
+_STUB_SNS_CONTENT = {
+    "headline": "続かないのは意志のせいじゃない",
+    "sub_text": "3軸診断で原因を特定",
+    "accent_text": "3軸",
+    "body_points": ["姿勢を整える", "食事を見直す", "仕組みで続ける"],
+    "cta_text": "プロフィールのリンクから予約",
+    "icon_suggestion": "three_axis",
+    "layout_suggestion": "card_layout",
+}
+
+_STUB_THEMES = ["続かない理由", "リバウンドの原因", "姿勢と代謝", "食事の基本", "習慣化のコツ"]
+
+_STUB_BLOG_META = {
+    "meta_description": "ジムが続かないのは意志の弱さではありません。3軸診断で原因を特定します。",
+    "used_keywords": ["パーソナルトレーニング", "岡山 ジム"],
+}
+
+
+def _stub_blog_article(config: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title": "ジムが続かない本当の理由と3軸診断",
+        "content": make_article(config.get("article_chars", 3500)),
+        **_STUB_BLOG_META,
+    }
+
+
+def _claude_tool_input(body: Dict[str, Any], config: Dict[str, Any], rng: random.Random) -> tuple:
+    """
+    ツール呼び出し（tool_choice 指定）への応答を作る
+
+    Returns:
+        (ツール名, ツールの入力)
+    """
+    tool = body["tools"][0]
+    choice = body.get("tool_choice") or {}
+    name = choice.get("name", tool["name"])
+    schema = tool.get("input_schema", {})
+
+    if name == "record_sns_content":
+        data = dict(_STUB_SNS_CONTENT)
+    elif name == "record_theme_variations":
+        count = schema.get("properties", {}).get("themes", {}).get("maxItems", len(_STUB_THEMES))
+        data = {"themes": [_STUB_THEMES[i % len(_STUB_THEMES)] for i in range(count)]}
+    elif name == "record_blog_article":
+        data = _stub_blog_article(config)
+    else:
+        data = {}
+
+    # 修正依頼（最後のメッセージが tool_result）には常に正しい形で返す
+    messages = body.get("messages", [])
+    last = messages[-1].get("content", "") if messages else ""
+    is_repair = isinstance(last, list) and any(
+        isinstance(block, dict) and block.get("type") == "tool_result" for block in last
+    )
+    required = schema.get("required", [])
+    if required and not is_repair and rng.random() < config.get("schema_error_rate", 0.0):
+        data.pop(required[0], None)
+    return name, data
+
+
+def _claude_response_text(body: Dict[str, Any], config: Dict[str, Any]) -> str:
+    """リクエスト内容から、呼び出し元が期待する形式の応答テキストを作る"""
+    messages = body.get("messages", [])
+    user_text = ""
+    if messages:
+        content = messages[-1].get("content", "")
+        if isinstance(content, list):
+            content = "".join(block.get("text", "") for block in content if isinstance(block, dict))
+        user_text = content
+
+    if "===メタ情報===" in user_text:
+        # stream_blog_with_claude の区切り形式
+        return (
+            "タイトル: ジムが続かない本当の理由と3軸診断\n"
+            "===本文===\n"
+            + make_article(config.get("article_chars", 3500))
+            + "\n===メタ情報===\n"
+            + json.dumps(_STUB_BLOG_META, ensure_ascii=False)
+        )
+    return (
+        "A calm consultation scene in a bright Japanese personal training studio. "
+        "Natural light, clean minimal interior, thoughtful expressions, professional photography."
+    )
+
+
+# =====================================
+# HTTPハンドラ
+# =====================================
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Claude / Gemini スタブ共通のハンドラ"""
+
+    protocol_version = "HTTP/1.1"
+    state: Dict[str, Any] = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length) if length else b"{}"
+        return json.loads(raw or b"{}")
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _delay(self, service_config: Dict[str, Any]) -> bool:
+        """遅延を注入し、エラーを返すべきかどうかを返す"""
+        state = self.state
+        with state["lock"]:
+            delay = sample_latency(service_config["latency"], state["rng"])
+            failed = state["rng"].random() < service_config.get("error_rate", 0.0)
+            state["stats"]["requests"] += 1
+            state["stats"]["injected_seconds"] += delay
+            if failed:
+                state["stats"]["errors"] += 1
+        time.sleep(delay)
+        return failed
+
+    def do_GET(self):
+        if self.path == "/__stats":
+            with self.state["lock"]:
+                self._send_json(200, dict(self.state["stats"]))
+        else:
+            self._send_json(404, {"error": "not found"})
+
+
+class ClaudeStubHandler(_StubHandler):
+    """Anthropic Messages API（POST /v1/messages）の模倣"""
+
+    def do_POST(self):
+        if not self.path.startswith("/v1/messages"):
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+            return
+
+        body = self._read_json()
+        config = self.state["config"]["claude"]
+        if self._delay(config):
+            self._send_json(529, {"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded (stub)"}})
+            return
+
+        if body.get("tools"):
+            self._send_tool_use(body, config)
+            return
+
+        text = _claude_response_text(body, config)
+        chars_per_second = config.get("output_chars_per_second", 0)
+        output_seconds = len(text) / chars_per_second if chars_per_second else 0.0
+        with self.state["lock"]:
+            self.state["stats"]["injected_seconds"] += output_seconds
+
+        if body.get("stream"):
+            self._send_stream(body, text, output_seconds)
+            return
+
+        time.sleep(output_seconds)
+        self._send_json(200, {
+            "id": f"msg_stub_{self.state['stats']['requests']}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "claude-stub"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": len(json.dumps(body)) // 4, "output_tokens": len(text) // 2},
+        })
+
+    def _send_tool_use(self, body: Dict[str, Any], config: Dict[str, Any]) -> None:
+        """tool_use ブロック1つの応答を返す（call_with_schema 用）"""
+        with self.state["lock"]:
+            name, data = _claude_tool_input(body, config, self.state["rng"])
+        output_chars = len(json.dumps(data, ensure_ascii=False))
+        chars_per_second = config.get("output_chars_per_second", 0)
+        output_seconds = output_chars / chars_per_second if chars_per_second else 0.0
+        with self.state["lock"]:
+            self.state["stats"]["injected_seconds"] += output_seconds
+        time.sleep(output_seconds)
+
+        request_id = self.state["stats"]["requests"]
+        self._send_json(200, {
+            "id": f"msg_stub_{request_id}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "claude-stub"),
+            "content": [{"type": "tool_use", "id": f"toolu_stub_{request_id}", "name": name, "input": data}],
+            "stop_reason": "tool_use",
+            "stop_sequence": None,
+            "usage": {"input_tokens": len(json.dumps(body)) // 4, "output_tokens": output_chars // 2},
+        })
+
+    def _send_stream(self, body: Dict[str, Any], text: str, output_seconds: float) -> None:
+        """Server-Sent Events で text を少しずつ送る（messages.stream 用）"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(name: str, data: Dict[str, Any]) -> None:
+            payload = json.dumps({"type": name, **data}, ensure_ascii=False)
+            self.wfile.write(f"event: {name}\ndata: {payload}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        usage = {"input_tokens": len(json.dumps(body)) // 4, "output_tokens": 1}
+        event("message_start", {"message": {
+            "id": f"msg_stub_{self.state['stats']['requests']}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "claude-stub"),
+            "content": [],
+            "stop_reason": None,
+            "stop_sequence": None,
+            "usage": usage,
+        }})
+        event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+
+        # 実際のAPIと同じく、数文字ずつのデルタで送る
+        chunk_chars = 4
+        chunks = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)]
+        interval = output_seconds / len(chunks) if chunks else 0.0
+        for chunk in chunks:
+            if interval:
+                time.sleep(interval)
+            event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": chunk}})
+
+        event("content_block_stop", {"index": 0})
+        event("message_delta", {
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": len(text) // 2},
+        })
+        event("message_stop", {})
+
+
+class GeminiStubHandler(_StubHandler):
+    """Gemini generate_content API（POST .../models/{model}:generateContent）の模倣"""
+
+    def do_POST(self):
+        if ":generateContent" not in self.path:
+            self._send_json(404, {"error": {"code": 404, "message": self.path, "status": "NOT_FOUND"}})
+            return
+
+        self._read_json()
+        config = self.state["config"]["gemini"]
+        if self._delay(config):
+            self._send_json(503, {"error": {"code": 503, "message": "The model is overloaded (stub)", "status": "UNAVAILABLE"}})
+            return
+
+        self._send_json(200, {
+            "candidates": [{
+                "content": {
+                    "role": "model",
+                    "parts": [
+                        {"text": "Here is the generated image."},
+                        {"inlineData": {"mimeType": "image/png", "data": self.state["png_b64"]}},
+                    ],
+                },
+                "finishReason": "STOP",
+            }],
+            "usageMetadata": {"promptTokenCount": 100, "candidatesTokenCount": 1290, "totalTokenCount": 1390},
+        })
+
+
+def _make_server(handler_cls, port: int, config: Dict[str, Any]) -> ThreadingHTTPServer:
+    """設定ごとに独立した状態を持つサーバーを作成"""
+    state = {
+        "config": config,
+        "lock": threading.Lock(),
+        "rng": random.Random(config.get("seed", 0)),
+        "stats": {"requests": 0, "errors": 0, "injected_seconds": 0.0},
+    }
+    if handler_cls is GeminiStubHandler:
+        gemini = config["gemini"]
+        png = make_png(gemini["png_width"], gemini["png_height"], gemini["png_noise_bits"], config.get("seed", 0))
+        state["png_b64"] = base64.b64encode(png).decode("ascii")
+        state["png_bytes"] = len(png)
+
+    handler = type(handler_cls.__name__, (handler_cls,), {"state": state})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve_stubs(config: Dict[str, Any], claude_port: int, gemini_port: int, ready=None) -> None:
+    """Claude / Gemini スタブを起動してブロックする"""
+    claude = _make_server(ClaudeStubHandler, claude_port, config)
+    gemini = _make_server(GeminiStubHandler, gemini_port, config)
+    threading.Thread(target=claude.serve_forever, daemon=True).start()
+    if ready is not None:
+        ready.set()
+    gemini.serve_forever()
+
+
+def merge_config(overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """デフォルト設定に上書き設定をマージ"""
+    config = json.loads(json.dumps(DEFAULT_STUB_CONFIG))
+    for key, value in (overrides or {}).items():
+        if isinstance(value, dict) and isinstance(config.get(key), dict):
+            config[key].update(value)
+        else:
+            config[key] = value
+    return config
+
+
+def start_stub_servers(
+    config: Optional[Dict[str, Any]] = None,
+    claude_port: int = 8701,
+    gemini_port: int = 8702
+) -> Dict[str, Any]:
+    """
+    スタブサーバーを別プロセスで起動
+    （計測対象プロセスのRSSにスタブ側のメモリが混ざらないようにするため）
+
+    Returns:
+        Dict: {
+            "process": multiprocessing.Process,
+            "claude_url": str,
+            "gemini_url": str,
+            "env": Dict[str, str]  # SDKをスタブへ向ける環境変数
+        }
+    """
+    config = merge_config(config)
+    ready = multiprocessing.Event()
+    process = multiprocessing.Process(
+        target=serve_stubs,
+        args=(config, claude_port, gemini_port, ready),
+        daemon=True
+    )
+    process.start()
+    if not ready.wait(timeout=60):
+        process.terminate()
+        raise RuntimeError("スタブサーバーの起動がタイムアウトしました")
+
+    claude_url = f"http://127.0.0.1:{claude_port}"
+    gemini_url = f"http://127.0.0.1:{gemini_port}"
+    return {
+        "process": process,
+        "claude_url": claude_url,
+        "gemini_url": gemini_url,
+        "env": {
+            "ANTHROPIC_API_KEY": "stub-anthropic-key",
+            "ANTHROPIC_BASE_URL": claude_url,
+            "GEMINI_API_KEY": "stub-gemini-key",
+            "GOOGLE_GEMINI_BASE_URL": gemini_url,
+        },
+    }
+
+
+def stop_stub_servers(stubs: Dict[str, Any]) -> None:
+    """start_stub_servers で起動したプロセスを停止"""
+    stubs["process"].terminate()
+    stubs["process"].join(timeout=5)
+
+
+def fetch_stub_stats(url: str) -> Dict[str, Any]:
+    """スタブのリクエスト数・エラー数・注入した遅延の合計を取得"""
+    with urllib.request.urlopen(f"{url}/__stats", timeout=5) as response:
+        return json.loads(response.read())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Claude / Gemini スタブサーバー")
+    parser.add_argument("--claude-port", type=int, default=8701)
+    parser.add_argument("--gemini-port", type=int, default=8702)
+    parser.add_argument("--claude-latency", default="fixed:50", help="例: lognormal:800:0.4")
+    parser.add_argument("--gemini-latency", default="fixed:100", help="例: lognormal:20000:0.3")
+    parser.add_argument("--claude-error-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    parser.add_argument("--claude-output-cps", type=float, default=0, help="Claudeの出力速度（文字/秒）")
+    parser.add_argument("--claude-schema-error-rate", type=float, default=0.0,
+                        help="ツール出力で必須項目を落とす確率")
+    parser.add_argument("--png-size", default="1024x1024", help="合成PNGのサイズ（例: 2048x2048）")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.png_size.split("x"))
+    stub_config = merge_config({
+        "claude": {
+            "latency": parse_latency_spec(args.claude_latency),
+            "error_rate": args.claude_error_rate,
+            "output_chars_per_second": args.claude_output_cps,
+            "schema_error_rate": args.claude_schema_error_rate,
+        },
+        "gemini": {
+            "latency": parse_latency_spec(args.gemini_latency),
+            "error_rate": args.gemini_error_rate,
+            "png_width": width,
+            "png_height": height,
+        },
+    })
+
+    print(f"🧪 Claude スタブ: http://127.0.0.1:{args.claude_port}")
+    print(f"🧪 Gemini スタブ: http://127.0.0.1:{args.gemini_port}")
+    print("   ANTHROPIC_BASE_URL / GOOGLE_GEMINI_BASE_URL をこのURLに設定してください")
+    serve_stubs(stub_config, args.claude_port, args.gemini_port)
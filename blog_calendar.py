@@ -0,0 +1,220 @@
+"""
+コンテンツカレンダーの一括生成
+（日付・カテゴリ・トピック・構成・トーン・長さ・キーワード）の行ごとにブログ記事を並列生成し、
+できあがった順に outputs/blog/ に保存する。1件の失敗で全体は止めず、
+必要なら生成済みの記事から WordPress への下書き投稿を続けて行う
+"""
+
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from article_cache import ARTICLE_CACHE, article_key
+from ui_catalog import BLOG_LENGTHS, BLOG_STRUCTURES, BLOG_TONES
+
+
+CALENDAR_COLUMNS = ("date", "category", "topic", "structure", "tone", "length", "keywords")
+
+DEFAULT_OUTPUT_DIR = Path(__file__).parent / "outputs" / "blog"
+
+
+def split_keywords(value: Any) -> List[str]:
+    """キーワード欄（カンマ・読点・スラッシュ区切りの文字列またはリスト）をリストにする"""
+    if isinstance(value, (list, tuple)):
+        return [str(k).strip() for k in value if str(k).strip()]
+    return [k.strip() for k in re.split(r"[,、/;]", value or "") if k.strip()]
+
+
+def row_to_params(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    カレンダーの1行を generate_blog_with_claude の params に変換
+
+    トーン・長さは画面の表示名（"専門的・信頼感" など）と内部名（"professional" など）のどちらでもよい
+    """
+    structure = BLOG_STRUCTURES.get(row.get("structure"), {})
+    return {
+        "category": row.get("category", ""),
+        "topic": row.get("topic", ""),
+        "structure": row.get("structure", ""),
+        "sections": list(structure.get("sections", [])),
+        "tone": BLOG_TONES.get(row.get("tone"), row.get("tone") or "professional"),
+        "length": BLOG_LENGTHS.get(row.get("length"), row.get("length") or "medium"),
+        "custom_title": None,
+        "keywords": split_keywords(row.get("keywords")),
+        "additional_instructions": row.get("additional_instructions") or "なし",
+    }
+
+
+def validate_rows(rows: List[Dict[str, Any]]) -> List[str]:
+    """生成前に行の不備を調べる（空の行は呼び出し側で取り除いておく）"""
+    errors = []
+    for i, row in enumerate(rows, 1):
+        if not (row.get("topic") or "").strip():
+            errors.append(f"{i}行目: トピックが空です")
+        if row.get("structure") not in BLOG_STRUCTURES:
+            errors.append(f"{i}行目: 構成テンプレート「{row.get('structure')}」がありません")
+    return errors
+
+
+class ArticleStore:
+    """
+    生成済み記事の保存先（outputs/blog/<バッチID>/）
+
+    記事ごとに Markdown を1ファイル書き、index.jsonl に1行ずつ追記する。
+    途中で止まっても、それまでに完了した記事は残る
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.directory / "index.jsonl"
+        self._lock = threading.Lock()
+
+    def save_article(self, index: int, row: Dict[str, Any], article: Dict[str, Any]) -> Path:
+        slug = re.sub(r"[^0-9A-Za-z_-]", "", str(row.get("date") or "")) or "article"
+        path = self.directory / f"{index + 1:03d}_{slug}.md"
+        path.write_text(f"# {article.get('title', '')}\n\n{article.get('content', '')}\n", encoding="utf-8")
+        return path
+
+    def append(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock, open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _generate_one(params: Dict[str, Any], regenerate: bool) -> Dict[str, Any]:
+    """1行分の記事を生成（例外は結果の辞書にまとめる）"""
+    from blog_generator import generate_blog_with_claude
+
+    try:
+        return generate_blog_with_claude(params, regenerate=regenerate)
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def _handle_result(i, rows, article, store, poster, wordpress, post_status, post_futures, duplicate_row):
+    """1件分の結果を保存し、必要なら投稿を予約して、結果の辞書を返す"""
+    record = {"index": i, "row": rows[i], "success": bool(article.get("success"))}
+    if record["success"]:
+        record.update({
+            "title": article.get("title", ""),
+            "meta_description": article.get("meta_description", ""),
+            "used_keywords": article.get("used_keywords", []),
+            "cached": article.get("cached", False),
+            "similar_articles": article.get("similar_articles", []),
+            "path": str(store.save_article(i, rows[i], article)),
+        })
+        previous = article.get("wordpress_posts", {}).get(wordpress.api_base) if poster is not None else None
+        if poster is not None and duplicate_row:
+            record["post"] = {"success": False, "skipped": True, "error": "同じ条件の行の記事と同じため投稿しませんでした"}
+        elif previous:
+            record["post"] = {"success": False, "skipped": True, "error": "同じ記事を投稿済みのため投稿しませんでした", **previous}
+        elif poster is not None and record["similar_articles"]:
+            record["post"] = {"success": False, "skipped": True, "error": "過去の記事とほぼ同じ内容のため投稿しませんでした"}
+        elif poster is not None:
+            post_futures[i] = poster.submit(
+                wordpress.post_article,
+                title=article.get("title", ""),
+                content=article.get("content", ""),
+                meta_description=article.get("meta_description", ""),
+                status=post_status
+            )
+        print(f"✅ [{i + 1}/{len(rows)}] {record['title']}")
+    else:
+        record["error"] = article.get("error", "不明なエラー")
+        print(f"❌ [{i + 1}/{len(rows)}] {rows[i].get('topic')}: {record['error']}")
+
+    store.append(record)
+    return {**record, "content": article.get("content", "")}
+
+
+def run_calendar(
+    rows: List[Dict[str, Any]],
+    max_workers: int = 3,
+    output_dir: Optional[Path] = None,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    wordpress=None,
+    post_status: str = "draft",
+    regenerate: bool = False
+) -> Dict[str, Any]:
+    """
+    カレンダーの全行を並列に生成する
+
+    Args:
+        rows: CALENDAR_COLUMNS を持つ辞書のリスト
+        max_workers: 同時に生成する記事数の上限
+        output_dir: 保存先の親ディレクトリ（既定: outputs/blog）
+        on_result: 1件終わるごとに呼ぶコールバック（呼び出し元のスレッドで呼ぶので Streamlit の描画に使える）
+        wordpress: WordPressClient。渡すと生成できた記事から順に下書き投稿する
+            （過去の記事とほぼ同じ内容のもの・キャッシュから返した記事で同じサイトに投稿済みのものは投稿しない）
+        post_status: 投稿時のステータス
+        regenerate: True ならキャッシュを使わずに生成し直す
+
+    Returns:
+        {"batch_id", "output_dir", "results"（rows と同じ順）, "succeeded", "failed", "posted"}
+    """
+    from blog_generator import BLOG_MODEL
+
+    batch_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    store = ArticleStore((output_dir or DEFAULT_OUTPUT_DIR) / batch_id)
+    results: List[Optional[Dict[str, Any]]] = [None] * len(rows)
+    post_futures = {}
+    # 投稿できた記事をキャッシュに記録し、次のカレンダーでキャッシュから返したときに投稿し直さない
+    cache_keys: Dict[int, Optional[str]] = {}
+
+    print(f"📅 カレンダー一括生成: {len(rows)}件（同時 {max_workers}件）→ {store.directory}")
+
+    poster_context = (
+        ThreadPoolExecutor(max_workers=wordpress.pool_size, thread_name_prefix="blog-calendar-post")
+        if wordpress is not None else nullcontext()
+    )
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="blog-calendar") as executor, \
+            poster_context as poster:
+        # 同じ条件の行は1回だけ生成する
+        futures: Dict[Any, List[int]] = {}
+        submitted: Dict[str, Any] = {}
+        for i, row in enumerate(rows):
+            params = row_to_params(row)
+            key = article_key(params, BLOG_MODEL)
+            if key not in submitted:
+                submitted[key] = executor.submit(_generate_one, params, regenerate)
+                futures[submitted[key]] = []
+            futures[submitted[key]].append(i)
+
+        # 終わった順に保存・通知する
+        for future in as_completed(futures):
+            article = future.result()
+            for n, i in enumerate(futures[future]):
+                cache_keys[i] = article.get("cache_key")
+                results[i] = _handle_result(
+                    i, rows, article, store, poster, wordpress, post_status, post_futures, duplicate_row=n > 0
+                )
+                if on_result:
+                    on_result(results[i])
+
+        for i, future in post_futures.items():
+            try:
+                post = future.result()
+            except Exception as e:
+                post = {"success": False, "error": str(e)}
+            results[i]["post"] = post
+            store.append({"index": i, "post": post})
+            if post.get("success") and cache_keys.get(i):
+                ARTICLE_CACHE.record_post(cache_keys[i], wordpress.api_base, post)
+
+    succeeded = sum(1 for r in results if r["success"])
+    posted = sum(1 for r in results if r.get("post", {}).get("success"))
+    print(f"📅 完了: 成功 {succeeded} / 失敗 {len(rows) - succeeded}" + (f" / 投稿 {posted}" if wordpress else ""))
+    return {
+        "batch_id": batch_id,
+        "output_dir": str(store.directory),
+        "results": results,
+        "succeeded": succeeded,
+        "failed": len(rows) - succeeded,
+        "posted": posted,
+    }
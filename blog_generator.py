@@ -0,0 +1,426 @@
+"""
+Claude APIを使用したブログ記事生成モジュール
+記事生成 → Markdown/HTML変換 → WordPress投稿
+"""
+
+import os
+import re
+import json
+import time
+import anthropic
+
+from article_cache import ARTICLE_CACHE, article_key
+from markdown_html import markdown_to_html
+from structured_output import BLOG_ARTICLE_SCHEMA, BLOG_META_SCHEMA, call_with_schema, record_outcome, validate
+
+
+BLOG_MODEL = "claude-sonnet-4-20250514"
+
+# ストリーミング時の出力区切り（JSONだと本文が閉じるまで表示できないため）
+BLOG_TITLE_PREFIX = "タイトル:"
+BLOG_BODY_MARKER = "===本文==="
+BLOG_META_MARKER = "===メタ情報==="
+
+BLOG_TOOL_FORMAT = """record_blog_article ツールを使い、以下の項目を出力してください：
+{
+    "title": "記事タイトル（SEOを意識した魅力的なタイトル）",
+    "content": "記事本文（Markdown形式、見出しは##や###を使用）",
+    "meta_description": "メタディスクリプション（120文字以内）",
+    "used_keywords": ["実際に使用したキーワードのリスト"]
+}"""
+
+BLOG_STREAM_FORMAT = f"""以下の形式で、この順番どおりに出力してください（全体をJSONにはしないでください）：
+{BLOG_TITLE_PREFIX} 記事タイトル（SEOを意識した魅力的なタイトル）
+{BLOG_BODY_MARKER}
+記事本文（Markdown形式、見出しは##や###を使用）
+{BLOG_META_MARKER}
+{{"meta_description": "メタディスクリプション（120文字以内）", "used_keywords": ["実際に使用したキーワードのリスト"]}}"""
+
+
+def build_blog_prompt(params: dict, output_format: str = BLOG_TOOL_FORMAT) -> str:
+    """
+    ブログ記事生成用のプロンプトを組み立てる
+
+    Args:
+        params: 記事の条件（category, topic, structure, sections, tone, length など）
+        output_format: 【出力形式】の指示（ツール出力 / ストリーミング用の区切り形式）
+
+    Returns:
+        Claudeに渡すプロンプト
+    """
+    length_guide = {
+        "short": "800〜1200字程度",
+        "medium": "1500〜2000字程度",
+        "long": "2500〜3500字程度"
+    }
+
+    tone_guide = {
+        "professional": "専門的で信頼感のある文体。データや根拠を示しながら説明する。",
+        "friendly": "親しみやすくカジュアルな文体。読者に語りかけるように書く。",
+        "motivational": "やる気を引き出す前向きな文体。読者の行動を促す。",
+        "educational": "わかりやすく教育的な文体。初心者にも理解しやすく説明する。"
+    }
+
+    sections_str = "\n".join([f"- {s}" for s in params.get("sections", [])])
+    keywords_str = ", ".join(params.get("keywords", []))
+
+    return f"""あなたはFIREFITNESS（岡山のパーソナルトレーニングジム）のブログ記事ライターです。
+以下の条件でブログ記事を作成してください。
+
+【FIREFITNESSについて】
+- 岡山市にある完全個室のパーソナルトレーニングジム
+- 「3軸診断」が特徴：姿勢軸・食事軸・継続軸の3つの観点からアプローチ
+- ターゲット：30〜50代の運動初心者、ダイエットに悩む方、姿勢改善したい方
+- 強み：完全個室、マンツーマン指導、続けやすいサポート体制
+
+【記事の条件】
+- カテゴリ: {params.get('category', '')}
+- トピック: {params.get('topic', '')}
+- 記事構成: {params.get('structure', '')}
+- 文体: {tone_guide.get(params.get('tone', 'professional'), '')}
+- 文字数: {length_guide.get(params.get('length', 'medium'), '')}
+
+【記事の構成セクション】
+{sections_str}
+
+【SEOキーワード（自然に含める）】
+{keywords_str}
+
+【追加指示】
+{params.get('additional_instructions', 'なし')}
+
+【出力形式】
+{output_format}
+
+{"カスタムタイトル: " + params.get('custom_title') if params.get('custom_title') else "タイトルは自動生成してください。"}
+
+記事はFIREFITNESSの価値観に沿い、読者に価値を提供する内容にしてください。
+最後には必ずCTA（無料カウンセリングへの誘導など）を含めてください。
+"""
+
+
+def _cached_article(params: dict, regenerate: bool):
+    """キャッシュキーと、保存済みの記事（再生成する場合・未生成なら None）を返す"""
+    key = article_key(params, BLOG_MODEL)
+    if regenerate:
+        return key, None
+    article = ARTICLE_CACHE.get(key)
+    if article is None:
+        return key, None
+    print("♻️ 同じ条件の記事をキャッシュから使用")
+    return key, {**article, "success": True, "cached": True, "cache_key": key, "similar_articles": []}
+
+
+def _store_article(key: str, params: dict, article: dict) -> dict:
+    """生成した記事を保存し、過去の記事とほぼ同じなら similar_articles に挙げる"""
+    similar = ARTICLE_CACHE.find_similar(article.get("content", ""), exclude_key=key)
+    if similar:
+        print(f"⚠️ 類似記事があります: {[(s['title'], s['similarity']) for s in similar[:3]]}")
+    ARTICLE_CACHE.put(key, params, BLOG_MODEL, article)
+    article["cached"] = False
+    article["cache_key"] = key
+    article["wordpress_posts"] = {}
+    article["similar_articles"] = similar
+    return article
+
+
+def generate_blog_with_claude(params: dict, regenerate: bool = False) -> dict:
+    """
+    Claude APIを使用してブログ記事を生成
+
+    Args:
+        params: 記事の条件（category, topic, structure, sections, tone, length など）
+        regenerate: True ならキャッシュを使わずに生成し直す
+
+    Returns:
+        {"success", "title", "content", "meta_description", "used_keywords",
+         "cached"（キャッシュから返したか）, "cache_key", "similar_articles"（ほぼ同じ過去記事）,
+         "wordpress_posts"（この記事を投稿済みのサイト。post_to_blog が記録する）}
+    """
+
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        return {"success": False, "error": "ANTHROPIC_API_KEY が設定されていません"}
+
+    key, cached = _cached_article(params, regenerate)
+    if cached is not None:
+        return cached
+
+    try:
+        client = anthropic.Anthropic(api_key=api_key)
+
+        # スキーマ付きのツールで出力させ、検証する（不正なら1回だけ修正を依頼）
+        article = call_with_schema(
+            client,
+            kind="blog_article",
+            tool_name="record_blog_article",
+            tool_description="生成したブログ記事を記録する",
+            schema=BLOG_ARTICLE_SCHEMA,
+            messages=[{"role": "user", "content": build_blog_prompt(params)}],
+            model=BLOG_MODEL,
+            max_tokens=4000
+        )
+        if article is None:
+            return {"success": False, "error": "記事の出力形式が不正でした（修正依頼後も検証に失敗）"}
+
+        article["success"] = True
+        return _store_article(key, params, article)
+
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def _strip_partial_marker(text: str, marker: str) -> str:
+    """末尾が区切り文字列の途中で終わっていれば、その部分を取り除く"""
+    for length in range(min(len(marker), len(text)), 0, -1):
+        if text.endswith(marker[:length]):
+            return text[:-length]
+    return text
+
+
+def split_streamed_article(text: str) -> tuple:
+    """
+    ストリーミング中（または完了後）のテキストを タイトル・本文・メタ情報 に分ける
+
+    Args:
+        text: ここまでに届いたテキスト（BLOG_STREAM_FORMAT 形式）
+
+    Returns:
+        (title, content, meta)。まだ届いていない部分は空文字
+    """
+    head, has_body, rest = text.partition(BLOG_BODY_MARKER)
+    if not has_body:
+        head = _strip_partial_marker(head, BLOG_BODY_MARKER)
+    title = head.strip().split("\n")[0] if head.strip() else ""
+    if title.startswith(BLOG_TITLE_PREFIX):
+        title = title[len(BLOG_TITLE_PREFIX):].strip()
+    elif BLOG_TITLE_PREFIX.startswith(title):
+        title = ""
+    if not has_body:
+        return title, "", ""
+
+    content, has_meta, meta = rest.partition(BLOG_META_MARKER)
+    if not has_meta:
+        content = _strip_partial_marker(content, BLOG_META_MARKER)
+    return title, content.strip(), meta.strip()
+
+
+def _first_json_object(text: str):
+    """
+    テキストの中で最初に読めるJSONオブジェクト（dict）を返す
+
+    最初の { から最後の } までをまとめて読むと、前後の説明文や本文中の {} を巻き込んで壊れるので、
+    { の位置ごとに1つのオブジェクトだけを読む
+
+    Returns:
+        (dict, None) または 読めなければ (None, エラーの内容)
+    """
+    decoder = json.JSONDecoder()
+    error = "JSONが見つかりません"
+    for match in re.finditer(r"\{", text):
+        try:
+            data, _ = decoder.raw_decode(text, match.start())
+        except json.JSONDecodeError as e:
+            error = f"JSONを読めません: {e}"
+            continue
+        if isinstance(data, dict):
+            return data, None
+    return None, error
+
+
+def _parse_blog_response(response_text: str, params: dict) -> dict:
+    """
+    区切りを守らなかったストリーミング応答を記事データに変換
+
+    JSONで返ってきた場合は BLOG_ARTICLE_SCHEMA で検証し、読めない・項目が足りない場合は
+    {"success": False, "error", "raw_text"} を返す（応答は raw_text に残す）。
+    JSONでなければ（{ を含まなければ）全文を本文として扱う
+    """
+    if "{" in response_text:
+        data, error = _first_json_object(response_text)
+        errors = [error] if data is None else validate(data, BLOG_ARTICLE_SCHEMA)
+        if errors:
+            record_outcome("blog_stream_fallback", "failed")
+            print(f"⚠️ 記事の応答を読めませんでした: {errors[:3]}")
+            return {
+                "success": False,
+                "error": "記事の出力形式が不正でした（" + "、".join(errors[:3]) + "）",
+                "raw_text": response_text
+            }
+        record_outcome("blog_stream_fallback", "ok")
+        return {**{field: data[field] for field in BLOG_ARTICLE_SCHEMA["required"]}, "success": True}
+    return {
+        "success": True,
+        "title": params.get("topic", "ブログ記事"),
+        "content": response_text,
+        "meta_description": "",
+        "used_keywords": params.get("keywords", [])
+    }
+
+
+def _parse_blog_meta(meta: str, params: dict) -> dict:
+    """
+    メタ情報（JSON）を読み取り、BLOG_META_SCHEMA で検証する
+
+    本文は届いているので記事は失敗にしない。読めない・型の違う項目は既定の値
+    （空のメタディスクリプション・指定したキーワード）にする
+    """
+    defaults = {"meta_description": "", "used_keywords": params.get("keywords", [])}
+    data, error = _first_json_object(meta)
+    if data is None:
+        record_outcome("blog_stream_meta", "failed")
+        print(f"⚠️ メタ情報を読めませんでした: {error}")
+        return defaults
+
+    errors = validate(data, BLOG_META_SCHEMA)
+    if errors:
+        record_outcome("blog_stream_meta", "failed")
+        print(f"⚠️ メタ情報の一部を使いません: {errors[:3]}")
+    else:
+        record_outcome("blog_stream_meta", "ok")
+    return {
+        field: data[field] if field in data and not validate(data[field], BLOG_META_SCHEMA["properties"][field]) else default
+        for field, default in defaults.items()
+    }
+
+
+def stream_blog_with_claude(params: dict, on_update=None, update_interval: float = 0.1,
+                            regenerate: bool = False) -> dict:
+    """
+    Claude APIのストリーミングでブログ記事を生成
+
+    タイトルと本文は届いた分から on_update(title, content) で通知し、
+    メタディスクリプション・使用キーワードは生成完了後に読み取る
+
+    Args:
+        params: generate_blog_with_claude と同じ記事の条件
+        on_update: 途中経過を受け取るコールバック（title, content）
+        update_interval: on_update を呼ぶ最小間隔（秒）。再描画の回数を抑えるため
+        regenerate: True ならキャッシュを使わずに生成し直す
+
+    Returns:
+        generate_blog_with_claude と同じ形式の辞書
+        （first_content_seconds: タイトル・本文が最初に届くまでの秒数 を追加）
+    """
+
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        return {"success": False, "error": "ANTHROPIC_API_KEY が設定されていません"}
+
+    key, cached = _cached_article(params, regenerate)
+    if cached is not None:
+        if on_update:
+            on_update(cached.get("title", ""), cached.get("content", ""))
+        cached["first_content_seconds"] = 0.0
+        return cached
+
+    try:
+        client = anthropic.Anthropic(api_key=api_key)
+
+        start = time.perf_counter()
+        first_content_seconds = None
+        last_update = 0.0
+        chunks = []
+
+        with client.messages.stream(
+            model=BLOG_MODEL,
+            max_tokens=4000,
+            messages=[{"role": "user", "content": build_blog_prompt(params, BLOG_STREAM_FORMAT)}]
+        ) as stream:
+            for chunk in stream.text_stream:
+                chunks.append(chunk)
+                now = time.perf_counter()
+                if first_content_seconds is not None and now - last_update < update_interval:
+                    continue
+
+                title, content, _ = split_streamed_article("".join(chunks))
+                if not (title or content):
+                    continue
+                if first_content_seconds is None:
+                    first_content_seconds = now - start
+                if on_update:
+                    on_update(title, content)
+                last_update = now
+
+        response_text = "".join(chunks)
+        if BLOG_BODY_MARKER in response_text:
+            title, content, meta = split_streamed_article(response_text)
+            result = {
+                "success": True,
+                "title": title or params.get("topic", "ブログ記事"),
+                "content": content,
+                **_parse_blog_meta(meta, params)
+            }
+        else:
+            # 区切りを守らなかった場合はJSON／全文として読む
+            result = _parse_blog_response(response_text, params)
+
+        if not result["success"]:
+            # 読めなかった応答はキャッシュに入れない
+            return result
+        if on_update:
+            on_update(result.get("title", ""), result.get("content", ""))
+        result["first_content_seconds"] = first_content_seconds
+        return _store_article(key, params, result)
+
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+def post_to_blog(
+    url: str,
+    username: str,
+    password: str,
+    title: str,
+    content: str,
+    meta_description: str,
+    featured_image=None,
+    featured_image_name: str = None,
+    article: dict = None
+) -> dict:
+    """
+    WordPress REST APIにブログ記事を下書き投稿
+
+    article（generate_blog_with_claude・stream_blog_with_claude の結果）を渡すと、同じ記事を同じサイトに
+    投稿済みなら投稿せずに {"success": False, "skipped": True, "post_id", "post_url"} を返し、
+    投稿できたらキャッシュに記録する（キャッシュから表示した記事を二重に投稿しない）
+
+    Args:
+        url: 投稿エンドポイント（https://example.com/wp-json/wp/v2/posts など）
+        username, password: ユーザー名とアプリケーションパスワード
+        title, content, meta_description: 記事（content は Markdown）
+        featured_image: アイキャッチ画像（バイト列またはファイルパス、任意）
+        featured_image_name: アイキャッチ画像のファイル名
+        article: 生成結果（cache_key・wordpress_posts を使う。省略時は投稿済みかを調べない）
+
+    Returns:
+        {"success": True, "post_id", "post_url", "media_id"} または {"success": False, "error"}
+    """
+    from wordpress_client import api_base_from_url, get_wordpress_client
+
+    site = api_base_from_url(url)
+    previous = (article or {}).get("wordpress_posts", {}).get(site)
+    if previous:
+        return {
+            "success": False,
+            "skipped": True,
+            "error": "この記事はすでに投稿済みです（同じ条件で生成済みの記事を表示しています）",
+            **previous
+        }
+
+    try:
+        # 同じ投稿先への接続はリランをまたいで使い回す
+        client = get_wordpress_client(url, username, password)
+        result = client.post_article(
+            title=title,
+            content=content,
+            meta_description=meta_description,
+            featured_image=featured_image,
+            featured_image_name=featured_image_name
+        )
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+    if result.get("success") and (article or {}).get("cache_key"):
+        ARTICLE_CACHE.record_post(article["cache_key"], site, result)
+    return result
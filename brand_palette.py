@@ -0,0 +1,214 @@
+"""
+ブランドカラーの適合チェック（ローカル・NumPy）
+生成画像の色がブランドガイドライン（prompt_converter.BRAND_GUIDELINES）に沿っているかを点数にする
+
+- 縮小した画像を Lab 色空間で量子化したヒストグラムと、ブランドカラー
+  （ネイビー #0d2b45・オレンジ #ff6b35・ライトグレー #f5f5f5・白 #ffffff）との距離
+- NG の色（ギラギラした金・赤、ネオン、大きな黒つぶれ）が占める割合
+
+写真の肌・床・壁などの彩度の低い色はブランドカラーから遠くても減点しない（写真トーンは「彩度控えめ」）
+"""
+
+import os
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Union
+
+import numpy as np
+
+
+# ブランドカラー
+BRAND_PALETTE = {
+    "navy": "#0d2b45",
+    "orange": "#ff6b35",
+    "light_gray": "#f5f5f5",
+    "white": "#ffffff",
+}
+
+# 解析は縮小した画像で行う（長辺）
+ANALYSIS_LONG_EDGE = 256
+
+# Lab の量子化の幅（L・a・b とも）
+LAB_BIN = 8.0
+
+# 彩度（Lab の chroma）がこれ以下の色は中間色として減点しない
+NEUTRAL_CHROMA = 25.0
+
+# ヒストグラムの平均距離（ΔE）がこれ以上なら distance=0
+DISTANCE_LIMIT = 30.0
+
+# ブランドカラーから ΔE がこれ以内の画素を「ブランドカラー」として数える
+BRAND_MATCH_DELTA_E = 15.0
+
+# NG の色がこの割合を占めたら ng=0
+NG_COVERAGE_LIMIT = 0.3
+
+# 総合点の重み
+COMPLIANCE_WEIGHTS = {"distance": 0.5, "ng": 0.5}
+
+
+def hex_to_rgb(color: str) -> tuple:
+    color = color.lstrip("#")
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """sRGB（0〜255、最後の軸が RGB）を Lab（D65）に変換する"""
+    c = np.asarray(rgb, dtype=np.float32) / 255.0
+    linear = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    matrix = np.array([
+        [0.4124564 / 0.95047, 0.3575761 / 0.95047, 0.1804375 / 0.95047],
+        [0.2126729, 0.7151522, 0.0721750],
+        [0.0193339 / 1.08883, 0.1191920 / 1.08883, 0.9503041 / 1.08883],
+    ], dtype=np.float32)
+    xyz = linear @ matrix.T
+    f = np.where(xyz > 216 / 24389, np.cbrt(xyz), (24389 / 27 * xyz + 16) / 116)
+    return np.stack([
+        116 * f[..., 1] - 16,
+        500 * (f[..., 0] - f[..., 1]),
+        200 * (f[..., 1] - f[..., 2]),
+    ], axis=-1)
+
+
+_BRAND_LAB = rgb_to_lab(np.array([hex_to_rgb(c) for c in BRAND_PALETTE.values()], dtype=np.float32))
+
+
+def lab_histogram(lab: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Lab を LAB_BIN 幅で量子化したヒストグラム
+
+    Returns:
+        {"centers": (K, 3) 使われているビンの中心, "weights": (K,) 画素の割合}
+    """
+    bins = np.floor(lab.reshape(-1, 3) / LAB_BIN).astype(np.int32)
+    # a・b は -128〜127 なので 0 以上にずらして1つの整数にまとめる
+    offset = int(128 // LAB_BIN) + 1
+    span = 2 * offset + 1
+    keys = (bins[:, 0] * span + bins[:, 1] + offset) * span + bins[:, 2] + offset
+    unique, counts = np.unique(keys, return_counts=True)
+    l_bin, rest = np.divmod(unique, span * span)
+    a_bin, b_bin = np.divmod(rest, span)
+    centers = (np.stack([l_bin, a_bin - offset, b_bin - offset], axis=-1) + 0.5) * LAB_BIN
+    return {"centers": centers.astype(np.float32), "weights": counts / counts.sum()}
+
+
+def ng_color_masks(rgb: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    ブランドで NG の色の画素（rgb は 0〜255 の (H, W, 3) 配列）
+
+    金: 色相 40〜60°・彩度 0.55 以上・明度 0.55 以上
+    赤: 色相 350〜10°・彩度 0.65 以上・明度 0.35 以上（アクセントのオレンジ #ff6b35 は色相 16° なので含まない）
+    ネオン: 彩度 0.85 以上・明度 0.85 以上
+    黒つぶれ: 明度 0.06 未満
+    """
+    pixels = rgb.astype(np.float32) / 255.0
+    value = pixels.max(axis=-1)
+    chroma = value - pixels.min(axis=-1)
+    saturation = np.divide(chroma, value, out=np.zeros_like(value), where=value > 0)
+
+    r, g, b = pixels[..., 0], pixels[..., 1], pixels[..., 2]
+    safe = np.where(chroma > 0, chroma, 1)
+    hue = np.select(
+        [value == r, value == g],
+        [((g - b) / safe) % 6, (b - r) / safe + 2],
+        (r - g) / safe + 4,
+    ) * 60
+    hue = np.where(chroma > 0, hue, -1)
+
+    return {
+        "gold": (hue >= 40) & (hue <= 60) & (saturation >= 0.55) & (value >= 0.55),
+        "red": ((hue >= 350) | ((hue >= 0) & (hue <= 10))) & (saturation >= 0.65) & (value >= 0.35),
+        "neon": (saturation >= 0.85) & (value >= 0.85),
+        "black": value < 0.06,
+    }
+
+
+def analyze_rgb(rgb: np.ndarray) -> Dict[str, Any]:
+    """
+    縮小済みの画像（0〜255 の (H, W, 3) 配列）を解析する
+
+    Returns:
+        {
+            "score": 0〜1（高いほどブランドカラーに沿っている）,
+            "distance": ヒストグラムとブランドカラーの平均距離（ΔE）,
+            "brand_coverage": ブランドカラーに近い画素の割合,
+            "ng_coverage": NG の色の画素の割合,
+            "ng": {"gold", "red", "neon", "black"} 色ごとの割合
+        }
+    """
+    histogram = lab_histogram(rgb_to_lab(rgb))
+    centers, weights = histogram["centers"], histogram["weights"]
+
+    # ビンごとに、いちばん近いブランドカラーとの距離。彩度の低い色は中間色として、彩度の超過分だけを距離にする
+    delta_e = np.linalg.norm(centers[:, None, :] - _BRAND_LAB[None, :, :], axis=-1).min(axis=1)
+    excess_chroma = np.maximum(np.hypot(centers[:, 1], centers[:, 2]) - NEUTRAL_CHROMA, 0)
+    distance = float((np.minimum(delta_e, excess_chroma) * weights).sum())
+    brand_coverage = float(weights[delta_e <= BRAND_MATCH_DELTA_E].sum())
+
+    masks = ng_color_masks(rgb)
+    ng = {name: float(mask.mean()) for name, mask in masks.items()}
+    ng_coverage = float(np.logical_or.reduce(list(masks.values())).mean())
+
+    scores = {
+        "distance": max(0.0, 1 - distance / DISTANCE_LIMIT),
+        "ng": max(0.0, 1 - ng_coverage / NG_COVERAGE_LIMIT),
+    }
+    return {
+        "score": round(sum(COMPLIANCE_WEIGHTS[k] * v for k, v in scores.items()), 4),
+        "distance": round(distance, 2),
+        "brand_coverage": round(brand_coverage, 4),
+        "ng_coverage": round(ng_coverage, 4),
+        "ng": {k: round(v, 4) for k, v in ng.items()},
+    }
+
+
+def analyze_palette(source: Union[str, Path, BinaryIO, Any]) -> Dict[str, Any]:
+    """
+    画像ファイル（パス・ファイルオブジェクト、または PIL の画像）を縮小してブランドカラーへの適合を調べる
+
+    Returns:
+        analyze_rgb と同じ辞書
+    """
+    from PIL import Image
+
+    if isinstance(source, Image.Image):
+        return analyze_rgb(downscale(source))
+    with Image.open(source) as image:
+        return analyze_rgb(downscale(image))
+
+
+def downscale(image, long_edge: int = ANALYSIS_LONG_EDGE) -> np.ndarray:
+    """
+    PIL の画像を長辺 long_edge 以下の RGB 配列にする
+
+    先に整数分の1に縮小（reduce）してから RGB に変換し、元の大きさの画像の複製を作らない
+    （4K の PNG を convert してから縮小すると、展開した画像がもう1枚分メモリに乗る）
+    """
+    from PIL import Image
+
+    image.draft("RGB", (long_edge, long_edge))
+    if image.mode not in ("RGB", "RGBA", "L"):
+        image = image.convert("RGB")
+    factor = max(image.size) // long_edge
+    if factor > 1:
+        image = image.reduce(factor)
+    image = image.convert("RGB")
+    scale = long_edge / max(image.size)
+    if scale < 1.0:
+        image = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))), Image.Resampling.BILINEAR)
+    return np.asarray(image)
+
+
+def min_palette_score() -> float:
+    """これより低い画像は作り直す（環境変数 BRAND_PALETTE_MIN_SCORE、既定: 0 = 作り直さない）"""
+    try:
+        return min(1.0, max(0.0, float(os.getenv("BRAND_PALETTE_MIN_SCORE", "0"))))
+    except ValueError:
+        return 0.0
+
+
+def palette_retries() -> int:
+    """作り直す最大の回数（環境変数 BRAND_PALETTE_RETRIES、既定: 1）"""
+    try:
+        return max(0, int(os.getenv("BRAND_PALETTE_RETRIES", "1")))
+    except ValueError:
+        return 1
@@ -0,0 +1,306 @@
+"""
+トレーナー参照画像の顔切り出し
+プロンプトで再現させたいのは顔なので、参照画像から顔のまわりだけを正方形に切り出して送る。
+送るバイト数が減り、モデルが見る画素のうち顔の占める割合が増える
+
+検出はCPUのみ:
+    - OpenCV（opencv-python-headless）があれば Haar 特徴の顔・目検出。両目が見つかれば目が水平になるよう回転する
+    - なければ NumPy の肌色検出（YCbCr）で顔のおおよその位置を推定する
+
+切り出した画像は元画像の内容の SHA-256 ごとに outputs/cache/faces に保存し、次からはそれを使う
+顔が見つからなかったことも同じキーで記録し、同じ画像で検出をやり直さない（検出の方法が変わったときはやり直す）
+"""
+
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+# キーに含めるバージョン（切り出し方を変えたら上げて、古いキャッシュを使わないようにする）
+CROP_VERSION = 1
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / "outputs" / "cache" / "faces"
+
+# 切り出し後の一辺（px）
+DEFAULT_CROP_SIZE = 768
+
+# 顔の枠の一辺に対して、上下左右に足す余白の割合（髪型・輪郭・首元まで入れる）
+FACE_PADDING = 0.6
+
+# 検出は縮小した画像で行う（長辺）
+DETECT_LONG_EDGE = 1024
+
+JPEG_QUALITY = 90
+
+# これより小さい傾き（度）は回さない（補間で画質が落ちるだけなので）
+MIN_ROTATION = 2.0
+
+
+def face_crop_enabled() -> bool:
+    """環境変数 FACE_CROP=false で無効にできる（その場合は参照画像をそのまま送る）"""
+    return os.getenv("FACE_CROP", "true").lower() != "false"
+
+
+def crop_size() -> int:
+    """切り出し後の一辺（環境変数 FACE_CROP_SIZE、既定: 768）"""
+    try:
+        return max(128, int(os.getenv("FACE_CROP_SIZE", str(DEFAULT_CROP_SIZE))))
+    except ValueError:
+        return DEFAULT_CROP_SIZE
+
+
+_detector_cache: Dict[str, Any] = {}
+
+
+def _cascades() -> Optional[Tuple[Any, Any]]:
+    """OpenCV の顔・目の検出器（OpenCV がない・Haar のファイルがない場合は None）"""
+    if "cascades" not in _detector_cache:
+        try:
+            import cv2
+
+            face = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+            eye = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_eye.xml")
+            _detector_cache["cascades"] = None if face.empty() else (face, eye)
+        except (ImportError, AttributeError):
+            _detector_cache["cascades"] = None
+    return _detector_cache["cascades"]
+
+
+def _detect_opencv(gray: np.ndarray, cascades) -> List[Dict[str, Any]]:
+    """Haar 特徴で顔を探し、顔の上半分で目を探す"""
+    face_cascade, eye_cascade = cascades
+    short_side = min(gray.shape)
+    faces = face_cascade.detectMultiScale(
+        gray, scaleFactor=1.1, minNeighbors=5, minSize=(max(24, short_side // 12),) * 2
+    )
+    found = []
+    for x, y, w, h in faces:
+        face = {"box": (int(x), int(y), int(w), int(h)), "angle": 0.0}
+        eyes = eye_cascade.detectMultiScale(gray[y:y + h * 6 // 10, x:x + w], scaleFactor=1.1, minNeighbors=5)
+        if len(eyes) >= 2:
+            # 大きい順に2つ、左右に並んでいるものを両目とみなす
+            (ax, ay, aw, ah), (bx, by, bw, bh) = sorted(eyes, key=lambda e: -e[2] * e[3])[:2]
+            left = (ax + aw / 2, ay + ah / 2)
+            right = (bx + bw / 2, by + bh / 2)
+            if left[0] > right[0]:
+                left, right = right, left
+            if right[0] - left[0] > w / 5:
+                angle = math.degrees(math.atan2(right[1] - left[1], right[0] - left[0]))
+                # 大きく傾いて見えるのは目の誤検出とみなす
+                if abs(angle) <= 20:
+                    face["angle"] = angle
+        found.append(face)
+    return found
+
+
+def _detect_skin(rgb: np.ndarray) -> List[Dict[str, Any]]:
+    """
+    肌色（YCbCr の Cb 77〜127、Cr 133〜173）の画素が集まっている場所を顔とみなす
+
+    画像の上 7 割で、肌色の列・行の分布が最も濃い範囲を枠にする（首や腕を拾いにくいよう縦横比を顔に近づける）
+    """
+    pixels = rgb.astype(np.float32)
+    r, g, b = pixels[..., 0], pixels[..., 1], pixels[..., 2]
+    cb = 128 - 0.168736 * r - 0.331264 * g + 0.5 * b
+    cr = 128 + 0.5 * r - 0.418688 * g - 0.081312 * b
+    mask = (cb >= 77) & (cb <= 127) & (cr >= 133) & (cr <= 173)
+    mask[int(mask.shape[0] * 0.7):] = False
+    if mask.mean() < 0.01:
+        return []
+
+    def dense_range(counts: np.ndarray) -> Tuple[int, int]:
+        # 最大の位置から、最大値の3割を下回るまで左右に広げる
+        peak = int(np.argmax(counts))
+        threshold = counts[peak] * 0.3
+        start = peak
+        while start > 0 and counts[start - 1] >= threshold:
+            start -= 1
+        end = peak
+        while end < len(counts) - 1 and counts[end + 1] >= threshold:
+            end += 1
+        return start, end + 1
+
+    x0, x1 = dense_range(mask.sum(axis=0))
+    y0, y1 = dense_range(mask[:, x0:x1].sum(axis=1))
+    w = x1 - x0
+    h = min(y1 - y0, int(w * 1.3))
+    if w < 8 or h < 8:
+        return []
+    return [{"box": (x0, y0, w, h), "angle": 0.0}]
+
+
+def detect_face(image) -> Optional[Dict[str, Any]]:
+    """
+    いちばん大きい顔を探す
+
+    Args:
+        image: PIL の画像（RGB）
+
+    Returns:
+        {"box": (x, y, w, h)（元画像の座標）, "angle": 目の傾き（度）, "method": "opencv"|"skin"}。見つからなければ None
+    """
+    from PIL import Image
+
+    scale = min(1.0, DETECT_LONG_EDGE / max(image.size))
+    small = image if scale == 1.0 else image.resize(
+        (round(image.width * scale), round(image.height * scale)), Image.Resampling.BILINEAR
+    )
+
+    cascades = _cascades()
+    if cascades is not None:
+        faces, method = _detect_opencv(np.asarray(small.convert("L")), cascades), "opencv"
+    else:
+        faces, method = _detect_skin(np.asarray(small)), "skin"
+    if not faces:
+        return None
+
+    face = max(faces, key=lambda f: f["box"][2] * f["box"][3])
+    x, y, w, h = (v / scale for v in face["box"])
+    return {"box": (x, y, w, h), "angle": face["angle"], "method": method}
+
+
+def _crop_box(image_size: Tuple[int, int], box: Tuple[float, float, float, float]) -> Tuple[int, int, int, int]:
+    """顔の枠に余白を足した正方形（画像からはみ出す場合は内側にずらし、入らなければ縮める）"""
+    width, height = image_size
+    x, y, w, h = box
+    side = min(max(w, h) * (1 + 2 * FACE_PADDING), width, height)
+    cx, cy = x + w / 2, y + h / 2
+    left = min(max(cx - side / 2, 0), width - side)
+    top = min(max(cy - side / 2, 0), height - side)
+    return round(left), round(top), round(left + side), round(top + side)
+
+
+def _rotated_crop(image, box: Tuple[int, int, int, int], angle: float):
+    """
+    切り出す範囲の中心を軸に angle 度回してから切り出す（目を水平にする）
+
+    回転で空く隅が黒くならないよう、範囲のまわりを端の画素の鏡像で埋めてから回す
+    """
+    from PIL import Image
+
+    left, top, right, bottom = box
+    margin = math.ceil((right - left) * 0.25)
+    pixels = np.asarray(image)[
+        max(top - margin, 0):bottom + margin, max(left - margin, 0):right + margin
+    ]
+    # 画像の端で足りない分だけ鏡像で足す
+    pad_top = margin - min(margin, top)
+    pad_left = margin - min(margin, left)
+    pad_bottom = (bottom - top + 2 * margin) - pixels.shape[0] - pad_top
+    pad_right = (right - left + 2 * margin) - pixels.shape[1] - pad_left
+    pixels = np.pad(pixels, ((pad_top, pad_bottom), (pad_left, pad_right), (0, 0)), mode="reflect")
+    region = Image.fromarray(pixels).rotate(angle, resample=Image.Resampling.BICUBIC)
+    return region.crop((margin, margin, margin + right - left, margin + bottom - top))
+
+
+def cache_path(source_hash: str, size: Optional[int] = None, cache_dir: Optional[Path] = None) -> Path:
+    """元画像の SHA-256 に対応する切り出し画像のパス（まだ作っていなくてもパスは決まる）"""
+    size = size or crop_size()
+    cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+    return cache_dir / f"{source_hash[:32]}_{size}_v{CROP_VERSION}.jpg"
+
+
+def no_face_path(source_hash: str, cache_dir: Optional[Path] = None) -> Path:
+    """元画像の SHA-256 に対応する「顔が見つからなかった」記録のパス（切り出しの一辺によらない）"""
+    cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+    return cache_dir / f"{source_hash[:32]}_v{CROP_VERSION}_noface.json"
+
+
+def _detection_method() -> str:
+    """いま使える検出の方法（"opencv"|"skin"）"""
+    return "opencv" if _cascades() is not None else "skin"
+
+
+def crop_face(
+    path,
+    size: Optional[int] = None,
+    cache_dir: Optional[Path] = None,
+    source_hash: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    参照画像から顔のまわりを切り出す（元画像の内容ごとにキャッシュ）
+
+    Args:
+        path: 参照画像のパス
+        size: 切り出し後の一辺（Noneの場合は crop_size()）
+        cache_dir: キャッシュの保存先（Noneの場合は outputs/cache/faces）
+        source_hash: 元画像の SHA-256（素材のマニフェストにあるもの。Noneの場合はファイルを読んで計算）
+
+    Returns:
+        Dict: {
+            "success": bool,
+            "path": str (成功時。切り出した JPEG),
+            "method": "opencv"|"skin",
+            "box": [left, top, right, bottom]（向きを補正した元画像の座標）,
+            "angle": float（回転した角度。小さい傾きは 0）,
+            "source_bytes": int,
+            "bytes": int,
+            "cached": bool,
+            "no_face": bool (顔が見つからなかった場合に True),
+            "error": str (失敗時。顔が見つからない場合も含む)
+        }
+    """
+    from PIL import Image, ImageOps
+
+    from asset_manifest import file_sha256
+
+    path = Path(path)
+    size = size or crop_size()
+
+    try:
+        source_hash = source_hash or file_sha256(path)
+        target = cache_path(source_hash, size, cache_dir)
+        meta_path = target.with_suffix(".json")
+        if target.exists() and meta_path.exists():
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            return {"success": True, "path": str(target), **meta, "cached": True}
+
+        negative_path = no_face_path(source_hash, cache_dir)
+        if negative_path.exists():
+            negative = json.loads(negative_path.read_text(encoding="utf-8"))
+            # OpenCV を入れたなど、検出の方法が変わっていればやり直す
+            if negative.get("method") == _detection_method():
+                return {"success": False, "no_face": True, "cached": True,
+                        "error": f"顔が見つかりませんでした: {path.name}"}
+
+        with Image.open(path) as opened:
+            # スマートフォンの写真は EXIF の向きを反映してから検出する
+            image = ImageOps.exif_transpose(opened).convert("RGB")
+
+        face = detect_face(image)
+        if face is None:
+            negative_path.parent.mkdir(parents=True, exist_ok=True)
+            negative_path.write_text(json.dumps({"method": _detection_method()}), encoding="utf-8")
+            return {"success": False, "no_face": True, "cached": False,
+                    "error": f"顔が見つかりませんでした: {path.name}"}
+
+        box = _crop_box(image.size, face["box"])
+        angle = face["angle"] if abs(face["angle"]) >= MIN_ROTATION else 0.0
+        if angle:
+            crop = _rotated_crop(image, box, angle)
+        else:
+            crop = image.crop(box)
+        crop = crop.resize((size, size), Image.Resampling.LANCZOS)
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(target.name + f".{threading.get_ident()}.tmp")
+        crop.save(tmp, "JPEG", quality=JPEG_QUALITY, optimize=True)
+        os.replace(tmp, target)
+
+        meta = {
+            "method": face["method"],
+            "box": list(box),
+            "angle": round(angle, 2),
+            "source_bytes": path.stat().st_size,
+            "bytes": target.stat().st_size,
+        }
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+        return {"success": True, "path": str(target), **meta, "cached": False}
+
+    except Exception as e:
+        return {"success": False, "error": f"顔の切り出しに失敗しました: {path.name}: {e}"}
@@ -0,0 +1,164 @@
+"""
+出力画像の書き出し（用途別のエンコード）
+生成直後の画像（PNG）はそのまま画面に表示し、用途ごとの形式（WebP / AVIF / 最適化PNG / JPEG）への
+書き出しはバックグラウンドのワーカーで行う。形式ごとのファイルサイズと所要時間は
+outputs/encode_log.jsonl に記録する
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+# 用途ごとの書き出し設定
+# Instagram・Googleマップ（ビジネスプロフィール）は WebP/AVIF をアップロードできないため JPEG にする
+CHANNEL_PRESETS = {
+    "instagram": {
+        "label": "Instagram（JPEG）",
+        "format": "JPEG",
+        "extension": ".jpg",
+        "mime": "image/jpeg",
+        "options": {"quality": 90, "optimize": True, "progressive": True, "subsampling": "4:2:0"},
+        # 長辺の上限（Instagram の表示は最大 1080px 幅）
+        "max_long_edge": 1440,
+    },
+    "google_map": {
+        "label": "Googleマップ（JPEG）",
+        "format": "JPEG",
+        "extension": ".jpg",
+        "mime": "image/jpeg",
+        "options": {"quality": 85, "optimize": True, "progressive": True},
+        "max_long_edge": 2048,
+    },
+    "web": {
+        "label": "Web・ブログ（WebP）",
+        "format": "WEBP",
+        "extension": ".webp",
+        "mime": "image/webp",
+        "options": {"quality": 82, "method": 6},
+        "max_long_edge": 2048,
+    },
+    "web_avif": {
+        "label": "Web・ブログ（AVIF）",
+        "format": "AVIF",
+        "extension": ".avif",
+        "mime": "image/avif",
+        "options": {"quality": 60, "speed": 6},
+        "max_long_edge": 2048,
+    },
+    "print": {
+        "label": "印刷（最適化PNG・300dpi）",
+        "format": "PNG",
+        "extension": ".png",
+        "mime": "image/png",
+        "options": {"optimize": True, "dpi": (300, 300)},
+        "max_long_edge": None,
+    },
+}
+
+# 生成直後の画像の保存設定（書き出しを待たずに表示するため、圧縮より速さを優先する）
+PRIMARY_PNG_OPTIONS = {"compress_level": 1}
+
+DEFAULT_LOG_PATH = Path(__file__).parent / "outputs" / "encode_log.jsonl"
+
+
+def default_channels() -> List[str]:
+    """環境変数 OUTPUT_ENCODINGS（カンマ区切り）で既定の書き出し先を決める（既定: web）"""
+    value = os.getenv("OUTPUT_ENCODINGS", "web")
+    return [c.strip() for c in value.split(",") if c.strip() in CHANNEL_PRESETS]
+
+
+def encode_image(source_path: str, channel: str, output_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    画像を用途別の形式で書き出す
+
+    Args:
+        source_path: 元画像のパス
+        channel: CHANNEL_PRESETS のキー
+        output_dir: 保存先（既定: 元画像と同じフォルダ）
+
+    Returns:
+        {"success", "channel", "path", "format", "bytes", "source_bytes", "seconds"} または
+        {"success": False, "channel", "error"}
+    """
+    from PIL import Image, features
+
+    preset = CHANNEL_PRESETS[channel]
+    if preset["format"] in ("WEBP", "AVIF") and not features.check(preset["format"].lower()):
+        return {"success": False, "channel": channel, "error": f"この環境の Pillow は {preset['format']} に対応していません"}
+
+    source = Path(source_path)
+    output_path = (Path(output_dir) if output_dir else source.parent) / f"{source.stem}_{channel}{preset['extension']}"
+
+    start = time.perf_counter()
+    try:
+        with Image.open(source) as image:
+            image = image.convert("RGB")
+            max_long_edge = preset.get("max_long_edge")
+            if max_long_edge and max(image.size) > max_long_edge:
+                image.thumbnail((max_long_edge, max_long_edge), Image.Resampling.LANCZOS)
+            image.save(output_path, preset["format"], **preset["options"])
+    except Exception as e:
+        return {"success": False, "channel": channel, "error": str(e)}
+
+    return {
+        "success": True,
+        "channel": channel,
+        "path": str(output_path),
+        "format": preset["format"],
+        "bytes": output_path.stat().st_size,
+        "source_bytes": source.stat().st_size,
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+
+
+class BackgroundEncoder:
+    """
+    書き出しをバックグラウンドで行うワーカー（プロセス内で1つ、全セッション共有）
+
+    Pillow のエンコーダーは処理中に GIL を解放するので、スレッドでも UI の描画を止めない
+    """
+
+    def __init__(self, max_workers: int = 2, log_path: Path = DEFAULT_LOG_PATH):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="encode")
+        self._log_lock = threading.Lock()
+        self.log_path = log_path
+
+    def submit(self, source_path: str, channels: List[str]) -> Dict[str, Future]:
+        """
+        書き出しを予約する
+
+        Returns:
+            {channel: Future（結果は encode_image の戻り値）}
+        """
+        return {
+            channel: self._executor.submit(self._encode_and_log, source_path, channel)
+            for channel in channels if channel in CHANNEL_PRESETS
+        }
+
+    def _encode_and_log(self, source_path: str, channel: str) -> Dict[str, Any]:
+        result = encode_image(source_path, channel)
+        if result["success"]:
+            print(f"🗜️ 書き出し {channel}: {result['bytes'] / 1024:.0f} KB "
+                  f"（元 {result['source_bytes'] / 1024:.0f} KB, {result['seconds'] * 1000:.0f} ms）")
+        else:
+            print(f"⚠️ 書き出しに失敗しました（{channel}）: {result['error']}")
+        self._log({"time": time.time(), "source": source_path, **result})
+        return result
+
+    def _log(self, record: Dict[str, Any]) -> None:
+        """サイズと所要時間を記録する（形式・品質の見直し用）"""
+        try:
+            with self._log_lock:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError:
+            pass
+
+
+ENCODER = BackgroundEncoder()
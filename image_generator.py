@@ -3,8 +3,8 @@ Google Genai API (Gemini 2.0 Flash) を使用した画像生成モジュール
 参照画像（背景・トレーナー）を活用して画像を生成
 """
 
+import io
 import os
-import base64
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, List, Optional
@@ -12,17 +12,28 @@ from google import genai
 from google.genai import types
 
 
+# 採点で選ばれなかった候補のファイル名の先頭（output_index の生成画像の名前に合わないのでギャラリーに出ない）
+CANDIDATE_PREFIX = "firefitness_candidate_"
+
+
 def generate_image_with_gemini(
     prompt: str,
     reference_images: List[Dict[str, Any]],
     aspect_ratio: str = "1:1",
     resolution: str = "2K",
-    output_dir: Optional[Path] = None
+    output_dir: Optional[Path] = None,
+    candidates: int = 1
 ) -> Dict[str, Any]:
     """
     Google Genai API (Gemini 2.0 Flash) を使用して画像を生成
     参照画像対応・高画質
 
+    candidates を2以上にすると、同じ内容で候補を並列に生成し、ローカルで採点（image_scoring）して
+    点数の高い順に返す（image_path は1位の画像）。2位以下は firefitness_candidate_*.png として保存し、
+    ギャラリーの索引（output_index.sync）には取り込まれない
+    生成した画像はすべてブランドカラーへの適合（brand_palette）を調べ、1枚だけのときは
+    BRAND_PALETTE_MIN_SCORE を下回れば作り直す
+
     Args:
         prompt: 画像生成プロンプト（英語）
         reference_images: 参照画像のリスト
@@ -30,12 +41,19 @@ def generate_image_with_gemini(
         aspect_ratio: アスペクト比 (例: "1:1", "16:9")
         resolution: 解像度 ("1K", "2K", "4K")
         output_dir: 出力ディレクトリ（Noneの場合はデフォルト）
+        candidates: 生成する候補の数（1: 従来どおり1枚）
 
     Returns:
         Dict: {
             "success": bool,
             "image_path": Path (成功時),
+            "image_data": bytes (成功時、保存した画像のバイト列。ファイルを読み直さずにロゴの合成などに使う),
             "text_response": str,
+            "candidates": [{"image_path", "rank", "score", "scores", "text_response", "palette"}] (candidates >= 2 のとき、点数の高い順),
+            "failed_candidates": int (candidates >= 2 のとき、生成に失敗した候補の数),
+            "palette": {"score", "distance", "brand_coverage", "ng_coverage", "ng"} (成功時、ブランドカラーへの適合),
+            "palette_ok": bool (成功時、適合が BRAND_PALETTE_MIN_SCORE 以上か),
+            "palette_retries": int (candidates = 1 のとき、適合が低くて作り直した回数),
             "error": str (失敗時)
         }
     """
@@ -110,10 +128,18 @@ def generate_image_with_gemini(
         contents.append(full_prompt)
 
         # 参照画像を追加（トレーナーを先に、背景を後に）
-        # APIの制限を考慮してトレーナー画像は最大3枚に制限
-        limited_trainer_images = trainer_images[:3] if len(trainer_images) > 3 else trainer_images
+        # APIの制限を考慮してトレーナー画像は最大3枚に制限（写りが良く、互いに違う3枚を選ぶ）
+        limited_trainer_images = trainer_images
         if len(trainer_images) > 3:
-            print(f"   ⚠️ トレーナー画像を{len(trainer_images)}枚から3枚に制限しました")
+            from reference_index import REFERENCE_INDEX
+
+            by_path = {str(Path(img["path"])): img for img in trainer_images}
+            chosen = REFERENCE_INDEX.select([Path(img["path"]) for img in trainer_images], 3)
+            limited_trainer_images = [by_path[str(p)] for p in chosen]
+            print(f"   ⚠️ トレーナー画像を{len(trainer_images)}枚から3枚に絞りました: {', '.join(p.name for p in chosen)}")
+
+        from asset_manifest import ASSET_MANIFEST
+        from face_crop import crop_face, face_crop_enabled
 
         for img_info in limited_trainer_images + bg_images:
             image_path = img_info["path"]
@@ -121,18 +147,23 @@ def generate_image_with_gemini(
                 image_path = Path(image_path)
 
             if image_path.exists():
-                with open(image_path, "rb") as f:
-                    image_bytes = f.read()
-
-                suffix = image_path.suffix.lower()
-                mime_types = {
-                    '.jpg': 'image/jpeg',
-                    '.jpeg': 'image/jpeg',
-                    '.png': 'image/png',
-                    '.webp': 'image/webp',
-                    '.gif': 'image/gif'
-                }
-                mime_type = mime_types.get(suffix, 'image/jpeg')
+                # 素材の記録（内容の SHA-256・MIME タイプ）。画像を開かずに済む
+                asset = ASSET_MANIFEST.get(image_path)
+
+                # トレーナー画像は顔のまわりだけを送る（顔が見つからなければ元の画像）
+                if img_info["type"] in ["trainer", "trainer_face"] and face_crop_enabled():
+                    crop = crop_face(image_path, source_hash=asset["sha256"] if asset else None)
+                    if crop["success"]:
+                        print(f"   🙂 顔を切り出し: {image_path.name} ({crop['source_bytes'] // 1024} KB → {crop['bytes'] // 1024} KB, {crop['method']})")
+                        image_path = Path(crop["path"])
+                    else:
+                        print(f"   ⚠️ {crop['error']}（元の画像を送ります）")
+
+                # SDK の Part は bytes しか受け付けない（送信時に base64 にする）ため、ここで1回だけ読む
+                image_bytes = image_path.read_bytes()
+
+                # MIME タイプは素材のマニフェスト（先頭のバイトから判定したもの）を使う
+                mime_type = ASSET_MANIFEST.mime_type(image_path)
 
                 contents.append(types.Part.from_bytes(data=image_bytes, mime_type=mime_type))
                 print(f"   📎 参照画像追加: {img_info['type']} - {image_path.name}")
@@ -141,6 +172,140 @@ def generate_image_with_gemini(
         print(f"   アスペクト比: {aspect_ratio}")
         print(f"   参照画像数: {len(limited_trainer_images + bg_images)} (トレーナー: {len(limited_trainer_images)}, 背景: {len(bg_images)})")
 
+        if candidates <= 1:
+            return _request_with_palette_check(client, contents, output_dir)
+
+        # 候補を並列に生成し、ローカルで採点して並べる
+        from concurrent.futures import ThreadPoolExecutor
+        from image_scoring import rank_images
+
+        print(f"   候補数: {candidates}（並列）")
+        with ThreadPoolExecutor(max_workers=candidates) as pool:
+            results = list(pool.map(lambda i: _request_image(client, contents, output_dir, i + 1), range(candidates)))
+
+        succeeded = [r for r in results if r["success"]]
+        if not succeeded:
+            return {
+                "success": False,
+                "error": results[0].get("error", "画像が生成されませんでした"),
+                "text_response": results[0].get("text_response", "")
+            }
+
+        ranked = rank_images([r["image_path"] for r in succeeded], aspect_ratio)
+        by_path = {r["image_path"]: r for r in succeeded}
+        for candidate in ranked:
+            candidate["text_response"] = by_path[candidate["image_path"]].get("text_response", "")
+            candidate["palette"] = by_path[candidate["image_path"]].get("palette")
+        print("🏅 候補を採点: " + ", ".join(f"{Path(c['image_path']).name}={c['score']:.2f}" for c in ranked))
+
+        # 2位以下はギャラリーに取り込まれないよう名前を変える（promote_candidate で戻せる）
+        for candidate in ranked[1:]:
+            path = Path(candidate["image_path"])
+            candidate["image_path"] = str(path.rename(path.with_name(path.name.replace("firefitness_", CANDIDATE_PREFIX, 1))))
+
+        best = ranked[0]
+        return {
+            "success": True,
+            "image_path": best["image_path"],
+            "image_data": by_path[best["image_path"]]["image_data"],
+            "text_response": best["text_response"],
+            "palette": best["palette"],
+            "palette_ok": _palette_ok(best["palette"]),
+            "candidates": ranked,
+            "failed_candidates": len(results) - len(succeeded)
+        }
+
+    except Exception as e:
+        print(f"❌ エラー発生: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+
+def promote_candidate(image_path: str) -> str:
+    """
+    採点で選ばれなかった候補（firefitness_candidate_*.png）を通常の生成画像の名前に戻す
+
+    Returns:
+        名前を戻したパス（候補の名前でなければそのまま）
+    """
+    path = Path(image_path)
+    if not path.name.startswith(CANDIDATE_PREFIX):
+        return str(path)
+    return str(path.rename(path.with_name(path.name.replace(CANDIDATE_PREFIX, "firefitness_", 1))))
+
+
+def discard_candidates(image_paths: List[str]) -> int:
+    """
+    保存されなかった候補（firefitness_candidate_*.png）を削除する（ギャラリーに保存した候補は名前が戻っているので残る）
+
+    Returns:
+        削除した件数
+    """
+    removed = 0
+    for image_path in image_paths:
+        path = Path(image_path)
+        if not path.name.startswith(CANDIDATE_PREFIX):
+            continue
+        try:
+            path.unlink()
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def _palette_ok(palette: Optional[Dict[str, Any]]) -> bool:
+    """ブランドカラーの適合が BRAND_PALETTE_MIN_SCORE 以上か（調べられなかった画像は合格にする）"""
+    from brand_palette import min_palette_score
+
+    return palette is None or palette["score"] >= min_palette_score()
+
+
+def _request_with_palette_check(client, contents: list, output_dir: Path) -> Dict[str, Any]:
+    """
+    1枚生成し、ブランドカラーの適合が BRAND_PALETTE_MIN_SCORE を下回れば BRAND_PALETTE_RETRIES 回まで作り直す
+    作り直した中でいちばん適合した画像を返し、ほかの画像は削除する
+
+    Returns:
+        _request_image の結果に "palette_ok"（最低点を満たしたか）と "palette_retries"（作り直した回数）を足したもの
+    """
+    from brand_palette import min_palette_score, palette_retries
+
+    result = _request_image(client, contents, output_dir)
+    retries = 0
+    while result["success"] and not _palette_ok(result.get("palette")) and retries < palette_retries():
+        retries += 1
+        print(f"🎨 ブランドカラーの適合が低いため作り直します（{result['palette']['score']:.2f} < {min_palette_score():.2f}、{retries}回目）")
+        retry = _request_image(client, contents, output_dir)
+        if not retry["success"]:
+            break
+        worse, result = sorted([result, retry], key=lambda r: r["palette"]["score"] if r.get("palette") else 1.0)
+        Path(worse["image_path"]).unlink(missing_ok=True)
+
+    if result["success"]:
+        result["palette_ok"] = _palette_ok(result.get("palette"))
+        result["palette_retries"] = retries
+    return result
+
+
+def _request_image(client, contents: list, output_dir: Path, candidate: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Gemini に1回リクエストして画像を保存し、ブランドカラーへの適合（brand_palette）を調べる
+
+    Args:
+        candidate: 複数候補のうちの番号（ログ用。1枚だけのときは None）
+
+    Returns:
+        Dict: {"success": bool, "image_path": str (成功時), "image_data": bytes (成功時、レスポンスのバイト列そのもの),
+               "text_response": str, "palette": brand_palette.analyze_palette の結果 (成功時、調べられなければ None),
+               "error": str (失敗時)}
+    """
+    label = f"[候補{candidate}] " if candidate else ""
+    try:
         # Nano Banana Pro で画像生成
         response = client.models.generate_content(
             model="gemini-3-pro-image-preview",
@@ -150,7 +315,7 @@ def generate_image_with_gemini(
             )
         )
 
-        print(f"📥 レスポンス受信")
+        print(f"📥 {label}レスポンス受信")
 
         # レスポンス処理
         text_response = ""
@@ -160,25 +325,40 @@ def generate_image_with_gemini(
         for part in response.candidates[0].content.parts:
             if part.text is not None:
                 text_response += part.text
-                print(f"📝 テキスト応答: {part.text[:100]}..." if len(part.text) > 100 else f"📝 テキスト応答: {part.text}")
+                print(f"📝 {label}テキスト応答: {part.text[:100]}..." if len(part.text) > 100 else f"📝 {label}テキスト応答: {part.text}")
             elif part.inline_data is not None:
                 # 画像データを保存
                 image_data = part.inline_data.data
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                image_path = output_dir / f"firefitness_{timestamp}.png"
-
-                # バイトデータとして保存
-                with open(image_path, "wb") as f:
-                    f.write(image_data)
+                # 同時セッション・並列の候補で同じ時刻になっても上書きしないよう、既存のファイルがあれば時刻を取り直す
+                while True:
+                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+                    image_path = output_dir / f"firefitness_{timestamp}.png"
+                    try:
+                        with open(image_path, "xb") as f:
+                            f.write(image_data)
+                        break
+                    except FileExistsError:
+                        continue
 
                 image_saved = True
-                print(f"💾 画像保存: {image_path}")
+                print(f"💾 {label}画像保存: {image_path}")
 
         if image_saved:
+            from brand_palette import analyze_palette
+
+            try:
+                # 保存したファイルを読み直さず、レスポンスのバイト列をそのまま PIL に渡す
+                palette = analyze_palette(io.BytesIO(image_data))
+                print(f"🎨 {label}ブランドカラーの適合: {palette['score']:.2f}（NG の色 {palette['ng_coverage']:.0%}）")
+            except Exception as e:
+                print(f"⚠️ {label}ブランドカラーを調べられませんでした: {e}")
+                palette = None
             return {
                 "success": True,
                 "image_path": str(image_path),
-                "text_response": text_response
+                "image_data": image_data,
+                "text_response": text_response,
+                "palette": palette
             }
         else:
             return {
@@ -188,7 +368,7 @@ def generate_image_with_gemini(
             }
 
     except Exception as e:
-        print(f"❌ エラー発生: {str(e)}")
+        print(f"❌ {label}エラー発生: {str(e)}")
         import traceback
         traceback.print_exc()
         return {
@@ -213,6 +393,80 @@ def generate_image_simple(
     )
 
 
+def overlay_logo_on_image(image_path: str, logo_path: Path, position: str = "右下", size: str = "中", padding: int = 20,
+                          image_data: Optional[bytes] = None) -> str:
+    """生成画像にロゴを重ねる
+
+    Args:
+        image_path: 生成された画像のパス
+        logo_path: ロゴ画像のパス
+        position: ロゴの位置（左上、中央上、右上、左中央、中央、右中央、左下、中央下、右下）
+        size: ロゴサイズ（極小、小、中、大、極大）
+        padding: 端からの余白（ピクセル）
+        image_data: 生成された画像のバイト列（generate_image_with_gemini の "image_data"。あればファイルを読み直さない）
+
+    Returns:
+        ロゴを重ねた画像の保存パス
+    """
+    from PIL import Image
+
+    # 画像を開く（4K の画像を RGBA に広げて RGB に戻すと一時的に数百MBになるので、RGB のままロゴだけ重ねる）
+    base_image = Image.open(io.BytesIO(image_data) if image_data is not None else image_path)
+    base_image.load()
+    if base_image.mode in ("RGBA", "LA", "PA") or "transparency" in base_image.info:
+        # 透過のある画像は白背景に重ねる
+        rgba = base_image.convert("RGBA")
+        base_image = Image.new("RGB", rgba.size, (255, 255, 255))
+        base_image.paste(rgba, mask=rgba.getchannel("A"))
+        del rgba
+    elif base_image.mode != "RGB":
+        base_image = base_image.convert("RGB")
+    with Image.open(logo_path) as opened:
+        logo = opened.convert("RGBA")
+
+    # サイズ比率を決定（画像の短辺に対する割合）
+    size_ratios = {
+        "極小": 0.08,
+        "小": 0.12,
+        "中": 0.18,
+        "大": 0.25,
+        "極大": 0.35
+    }
+    ratio = size_ratios.get(size, 0.18)
+
+    # ロゴをリサイズ
+    base_short_side = min(base_image.width, base_image.height)
+    target_width = int(base_short_side * ratio)
+    logo_aspect = logo.height / logo.width
+    target_height = int(target_width * logo_aspect)
+    logo = logo.resize((target_width, target_height), Image.Resampling.LANCZOS)
+
+    # 位置を計算
+    positions = {
+        "左上": (padding, padding),
+        "中央上": ((base_image.width - logo.width) // 2, padding),
+        "右上": (base_image.width - logo.width - padding, padding),
+        "左中央": (padding, (base_image.height - logo.height) // 2),
+        "中央": ((base_image.width - logo.width) // 2, (base_image.height - logo.height) // 2),
+        "右中央": (base_image.width - logo.width - padding, (base_image.height - logo.height) // 2),
+        "左下": (padding, base_image.height - logo.height - padding),
+        "中央下": ((base_image.width - logo.width) // 2, base_image.height - logo.height - padding),
+        "右下": (base_image.width - logo.width - padding, base_image.height - logo.height - padding)
+    }
+    pos = positions.get(position, positions["右下"])
+
+    # ロゴを合成（ロゴの透過をマスクにする）
+    base_image.paste(logo, pos, logo)
+
+    # PNGで保存（すぐ表示するため圧縮は軽くし、用途別の書き出しは image_encoding で行う）
+    from image_encoding import PRIMARY_PNG_OPTIONS
+
+    output_path = image_path.replace(".png", "_with_logo.png")
+    base_image.save(output_path, "PNG", **PRIMARY_PNG_OPTIONS)
+
+    return output_path
+
+
 if __name__ == "__main__":
     from dotenv import load_dotenv
     load_dotenv()
@@ -0,0 +1,147 @@
+"""
+画像の知覚ハッシュ（ほぼ同じ画像の検出）
+dHash（隣り合う画素の明暗）と pHash（低周波の DCT 係数）を NumPy で計算する。
+どちらも 64bit で、ハミング距離が小さいほど見た目が近い
+
+検索には multi-index hashing（ハッシュを区間に分け、どこかの区間が一致するものだけを比べる）を使い、
+全件と比べずに近いハッシュを探す
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+HASH_SIZE = 8
+
+# pHash は 32x32 に縮小してから DCT をかけ、左上 8x8 の低周波成分を使う
+_PHASH_SIZE = HASH_SIZE * 4
+
+# ほぼ同じとみなすハミング距離（64bit 中）。pHash で探し、dHash で確かめる
+PHASH_DISTANCE = 8
+DHASH_DISTANCE = 10
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """n 点の DCT-II 行列（直交）"""
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    matrix = np.sqrt(2 / n) * np.cos(np.pi * (2 * x + 1) * k / (2 * n))
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT = _dct_matrix(_PHASH_SIZE)
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(bits.astype(np.uint8).ravel()).tobytes(), "big")
+
+
+def _grayscale(image, size: Tuple[int, int]) -> np.ndarray:
+    """グレースケールに変換して縮小した画素（float）"""
+    from PIL import Image
+
+    # JPEG は縮小しながら読む（PNG には効かない）
+    image.draft("L", (size[0] * 4, size[1] * 4))
+    gray = image.convert("L").resize(size, Image.Resampling.LANCZOS)
+    return np.asarray(gray, dtype=np.float64)
+
+
+def dhash(image, hash_size: int = HASH_SIZE) -> int:
+    """dHash: (hash_size+1) x hash_size に縮小し、右隣より明るいかどうかを並べる"""
+    pixels = _grayscale(image, (hash_size + 1, hash_size))
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def phash(image, hash_size: int = HASH_SIZE) -> int:
+    """pHash: 32x32 の DCT の左上 hash_size x hash_size が、（直流成分を除いた）中央値より大きいかを並べる"""
+    size = hash_size * 4
+    matrix = _DCT if size == _PHASH_SIZE else _dct_matrix(size)
+    pixels = _grayscale(image, (size, size))
+    low = (matrix @ pixels @ matrix.T)[:hash_size, :hash_size]
+    median = np.median(low.ravel()[1:])
+    return _bits_to_int(low > median)
+
+
+def image_hashes(path) -> Dict[str, int]:
+    """ファイルの pHash と dHash"""
+    from PIL import Image
+
+    with Image.open(path) as image:
+        image.load()
+        return {"phash": phash(image), "dhash": dhash(image)}
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def to_hex(value: int) -> str:
+    """保存用（SQLite の INTEGER は符号付き 64bit なので16進の文字列にする）"""
+    return f"{value:016x}"
+
+
+def from_hex(value: str) -> int:
+    return int(value, 16)
+
+
+class MultiIndex:
+    """
+    ハミング距離で近いハッシュを探す索引（multi-index hashing）
+
+    64bit を max_distance+1 個の区間に分けると、距離が max_distance 以内のハッシュは
+    少なくとも1つの区間が完全に一致する（鳩の巣原理）。区間ごとの辞書で候補を集め、候補だけ距離を計算する。
+    ランダムなハッシュでは候補は全体の約6%（max_distance=8、区間は7〜8bit）
+    """
+
+    def __init__(self, max_distance: int = PHASH_DISTANCE, bits: int = HASH_SIZE * HASH_SIZE):
+        self.max_distance = max_distance
+        count = max_distance + 1
+        width, extra = divmod(bits, count)
+        self._spans = []
+        shift = 0
+        for i in range(count):
+            span = width + (1 if i < extra else 0)
+            self._spans.append((shift, (1 << span) - 1))
+            shift += span
+        self._tables: List[Dict[int, List[Any]]] = [{} for _ in self._spans]
+        self._values: Dict[Any, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, value: int, item: Any) -> None:
+        """item（同じ item は1回だけ）をハッシュ value で登録する"""
+        if item in self._values:
+            self.remove(item)
+        self._values[item] = value
+        for (shift, mask), table in zip(self._spans, self._tables):
+            table.setdefault((value >> shift) & mask, []).append(item)
+
+    def remove(self, item: Any) -> None:
+        value = self._values.pop(item, None)
+        if value is None:
+            return
+        for (shift, mask), table in zip(self._spans, self._tables):
+            bucket = table.get((value >> shift) & mask, [])
+            if item in bucket:
+                bucket.remove(item)
+
+    def search(self, value: int, max_distance: Optional[int] = None) -> List[Tuple[int, Any]]:
+        """
+        距離 max_distance（既定: 作成時の値。それより大きくはできない）以内のものを探す
+
+        Returns:
+            [(距離, item)]（距離の近い順）
+        """
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        candidates = set()
+        for (shift, mask), table in zip(self._spans, self._tables):
+            candidates.update(table.get((value >> shift) & mask, ()))
+        found = []
+        for item in candidates:
+            distance = hamming(value, self._values[item])
+            if distance <= max_distance:
+                found.append((distance, item))
+        return sorted(found, key=lambda f: f[0])
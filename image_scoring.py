@@ -0,0 +1,94 @@
+"""
+生成画像の自動採点（ローカル・NumPy）
+複数の候補を生成したときに、人が見比べる前に並べ替えるための点数をつける
+
+採点項目（いずれも 0〜1）:
+    sharpness: ラプラシアンの分散（ぼけ・のっぺりした画像で小さくなる）
+    aspect: 指定したアスペクト比との近さ（10% ずれると 0）
+    palette: ブランドカラーへの適合（brand_palette。ブランドカラーとの距離と NG の色の少なさ）
+"""
+
+import math
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from brand_palette import analyze_rgb, downscale
+
+
+# 総合点の重み
+SCORE_WEIGHTS = {"sharpness": 0.35, "aspect": 0.25, "palette": 0.4}
+
+# 採点は縮小した画像で行う（長辺）
+SCORING_LONG_EDGE = 512
+
+# sharpness はラプラシアンの分散 v を v / (v + SHARPNESS_HALF) で 0〜1 にする
+SHARPNESS_HALF = 100.0
+
+# アスペクト比のずれ（比の対数）がこれ以上なら aspect=0
+_ASPECT_TOLERANCE = math.log(1.1)
+
+
+def laplacian_variance(gray: np.ndarray) -> float:
+    """4近傍のラプラシアンの分散（gray は float の2次元配列）"""
+    laplacian = (
+        gray[:-2, 1:-1] + gray[2:, 1:-1] + gray[1:-1, :-2] + gray[1:-1, 2:] - 4 * gray[1:-1, 1:-1]
+    )
+    return float(laplacian.var())
+
+
+def aspect_score(width: int, height: int, aspect_ratio: str) -> float:
+    """指定したアスペクト比（"16:9" など）との近さ。指定を読めなければ 1"""
+    try:
+        w, h = (float(v) for v in aspect_ratio.split(":"))
+        target = w / h
+    except (ValueError, ZeroDivisionError):
+        return 1.0
+    error = abs(math.log((width / height) / target))
+    return max(0.0, 1 - error / _ASPECT_TOLERANCE)
+
+
+def score_image(path, aspect_ratio: str = "1:1") -> Dict[str, Any]:
+    """
+    生成画像1枚を採点する
+
+    Returns:
+        {"sharpness", "aspect", "palette", "score", "width", "height"}
+    """
+    from PIL import Image
+
+    with Image.open(path) as image:
+        width, height = image.size
+        rgb = downscale(image, SCORING_LONG_EDGE)
+
+    gray = rgb.astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    variance = laplacian_variance(gray)
+    scores = {
+        "sharpness": variance / (variance + SHARPNESS_HALF),
+        "aspect": aspect_score(width, height, aspect_ratio),
+        "palette": analyze_rgb(rgb)["score"],
+    }
+    total = sum(SCORE_WEIGHTS[k] * v for k, v in scores.items())
+    return {**{k: round(v, 4) for k, v in scores.items()}, "score": round(total, 4), "width": width, "height": height}
+
+
+def rank_images(paths: List[Path], aspect_ratio: str = "1:1") -> List[Dict[str, Any]]:
+    """
+    候補を採点して点数の高い順に並べる
+
+    Returns:
+        [{"image_path": str, "rank": int, "score": float, "scores": {...}}]（読めなかった画像は score=0 で最後）
+    """
+    ranked = []
+    for path in paths:
+        try:
+            scores = score_image(path, aspect_ratio)
+        except Exception as e:
+            print(f"⚠️ 採点できませんでした: {Path(path).name}: {e}")
+            scores = {"score": 0.0}
+        ranked.append({"image_path": str(path), "score": scores.pop("score"), "scores": scores})
+    ranked.sort(key=lambda c: c["score"], reverse=True)
+    for rank, candidate in enumerate(ranked, 1):
+        candidate["rank"] = rank
+    return ranked
@@ -0,0 +1,332 @@
+"""
+新しいトレーナー・店舗の写真の取り込み（受け取りフォルダの監視）
+inbox/ に置いた写真を、向きの補正・JPEG への変換・標準サイズへの縮小・重複の除外をしてから
+assets/trainers/<トレーナー>/ または assets/backgrounds/<店舗>/ に登録する。
+あわせて縮小版・顔切り出し・素材のマニフェストを作っておくので、登録した写真は最初の生成から軽い
+
+置き場所（フォルダ名はトレーナー・店舗の名前でも英字の名前でもよい）:
+    inbox/trainers/okada/IMG_0001.HEIC     → assets/trainers/okada/
+    inbox/岡田/FullSizeRender.jpg           → assets/trainers/okada/
+    inbox/backgrounds/伊福町/IMG_0002.jpg   → assets/backgrounds/ifukucho/
+
+取り込んだ元の写真は inbox/.done/、取り込めなかったものは inbox/.failed/ に移す（理由は .failed/<名前>.txt）
+HEIC は pillow-heif（オプション）がある場合のみ読める
+
+実行例:
+    python ingest.py                 # inbox/ を1回だけ処理
+    python ingest.py --watch         # 新しい写真を待ち続ける（Ctrl+C で終了）
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from asset_manifest import ASSET_MANIFEST, file_sha256
+from ui_catalog import LOCATIONS, TRAINERS
+
+
+BASE_DIR = Path(__file__).parent
+
+DEFAULT_INBOX_DIR = BASE_DIR / "inbox"
+
+# 取り込み済みの元写真の SHA-256 → 登録したパス（同じ写真を置き直しても取り込まない）
+DEFAULT_LOG_PATH = BASE_DIR / "outputs" / "cache" / "ingested.json"
+
+INBOX_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".heic", ".heif"}
+
+# 登録する写真の長辺（これより大きいものは縮小する。参照画像として十分な大きさ）
+CANONICAL_LONG_EDGE = 2048
+
+JPEG_QUALITY = 90
+
+# 書き込み中のファイルを取り込まないよう、サイズと更新時刻がこの秒数変わらなければ取り込む
+STABLE_SECONDS = 2.0
+
+_CATEGORIES = {
+    "trainers": TRAINERS,
+    "backgrounds": LOCATIONS,
+}
+
+
+def heif_available() -> bool:
+    """HEIC を読めるか（pillow-heif があれば Pillow に登録する）"""
+    try:
+        import pillow_heif
+    except ImportError:
+        return False
+    pillow_heif.register_heif_opener()
+    return True
+
+
+def resolve_target(relative: Path) -> Optional[Tuple[str, str]]:
+    """
+    inbox/ からの相対パスを登録先にする
+
+    Returns:
+        ("trainers"|"backgrounds", フォルダ名)。トレーナー・店舗を決められなければ None
+    """
+    parts = relative.parts[:-1]
+    if len(parts) >= 2 and parts[0] in _CATEGORIES:
+        category, name = parts[0], parts[1]
+        names = _CATEGORIES[category]
+        if name in names:
+            return category, names[name]
+        if name in names.values():
+            return category, name
+        return None
+    if len(parts) >= 1:
+        for category, names in _CATEGORIES.items():
+            if parts[0] in names:
+                return category, names[parts[0]]
+            if parts[0] in names.values():
+                return category, parts[0]
+    return None
+
+
+def _display_path(path: Path) -> str:
+    """記録・表示用のパス（プロジェクト内ならプロジェクトからの相対パス）"""
+    return path.relative_to(BASE_DIR).as_posix() if path.is_relative_to(BASE_DIR) else str(path)
+
+
+def _unique_path(directory: Path, stem: str) -> Path:
+    """同じ名前があれば _2, _3… を付ける"""
+    path = directory / f"{stem}.jpg"
+    number = 2
+    while path.exists():
+        path = directory / f"{stem}_{number}.jpg"
+        number += 1
+    return path
+
+
+class Ingester:
+    """受け取りフォルダの写真を素材に取り込む（プロセス内で1つ、スレッドセーフ）"""
+
+    def __init__(
+        self,
+        inbox_dir: Path = DEFAULT_INBOX_DIR,
+        assets_dir: Optional[Path] = None,
+        log_path: Path = DEFAULT_LOG_PATH,
+        workers: int = 0
+    ):
+        self.inbox_dir = Path(inbox_dir)
+        self.assets_dir = Path(assets_dir) if assets_dir else ASSET_MANIFEST.assets_dir
+        self.log_path = Path(log_path)
+        self.workers = workers or os.cpu_count() or 4
+        self._lock = threading.Lock()
+        self._log: Optional[Dict[str, str]] = None
+        # 取り込み中の元写真の SHA-256（同じ回に同じ写真が2枚あった場合に1枚だけ取り込む）
+        self._claimed: set = set()
+        # すでに assets/ にある素材の SHA-256 → パス（手で置いたものと同じ写真を取り込まない）
+        self._known_assets: Dict[str, str] = {}
+        self._heif = heif_available()
+
+    def _load_log(self) -> Dict[str, str]:
+        """取り込み済みの記録を読む（ロック内で呼ぶ）"""
+        if self._log is None:
+            try:
+                self._log = json.loads(self.log_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._log = {}
+        return self._log
+
+    def _save_log(self) -> None:
+        """取り込み済みの記録を書き出す（ロック内で呼ぶ）"""
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.log_path.with_name(self.log_path.name + f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(self._log, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.log_path)
+
+    def pending(self, stable_seconds: float = STABLE_SECONDS) -> List[Path]:
+        """取り込む写真（.done / .failed を除き、stable_seconds 以上更新されていないもの）"""
+        if not self.inbox_dir.exists():
+            return []
+        now = time.time()
+        found = []
+        for path in self.inbox_dir.rglob("*"):
+            relative = path.relative_to(self.inbox_dir)
+            if any(part.startswith(".") for part in relative.parts) or path.suffix.lower() not in INBOX_SUFFIXES:
+                continue
+            try:
+                if now - path.stat().st_mtime >= stable_seconds:
+                    found.append(path)
+            except OSError:
+                continue
+        return sorted(found)
+
+    def _move(self, path: Path, folder: str, reason: str = "") -> None:
+        """元の写真を inbox/.done/ または inbox/.failed/ に移す（inbox/ での位置を保つ）"""
+        target = self.inbox_dir / folder / path.relative_to(self.inbox_dir)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if target.exists():
+            target = target.with_name(f"{target.stem}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}{target.suffix}")
+        shutil.move(str(path), target)
+        if reason:
+            target.with_name(target.name + ".txt").write_text(reason, encoding="utf-8")
+
+    def _fail(self, path: Path, reason: str) -> Dict[str, Any]:
+        print(f"  ❌ {path.name}: {reason}")
+        self._move(path, ".failed", reason)
+        return {"success": False, "source": str(path), "error": reason}
+
+    def ingest_file(self, path: Path) -> Dict[str, Any]:
+        """
+        写真1枚を取り込む
+
+        Returns:
+            Dict: {
+                "success": bool,
+                "source": str,
+                "path": str (取り込んだ素材。重複の場合は以前のもの),
+                "duplicate": bool,
+                "original_bytes": int,
+                "bytes": int,
+                "error": str (失敗時)
+            }
+        """
+        from PIL import Image, ImageOps
+
+        path = Path(path)
+        target = resolve_target(path.relative_to(self.inbox_dir))
+        if target is None:
+            return self._fail(path, "トレーナー・店舗を決められません（inbox/trainers/<名前>/ などに置いてください）")
+        if path.suffix.lower() in (".heic", ".heif") and not self._heif:
+            return self._fail(path, "HEIC を読むには pillow-heif が必要です（pip install pillow-heif）")
+
+        source_hash = file_sha256(path)
+        with self._lock:
+            log = self._load_log()
+            previous = log.get(source_hash) or self._known_assets.get(source_hash)
+            duplicate = source_hash in self._claimed or (previous and (BASE_DIR / previous).exists())
+            if not duplicate:
+                self._claimed.add(source_hash)
+        if duplicate:
+            print(f"  ♻️ {path.name}: 取り込み済みの写真です（{previous or '同じ回の別の写真'}）")
+            self._move(path, ".done")
+            return {"success": True, "source": str(path), "path": previous, "duplicate": True}
+
+        category, name = target
+        directory = self.assets_dir / category / name
+        try:
+            with Image.open(path) as opened:
+                # 向きを画素に反映し、EXIF（位置情報を含む）は持ち込まない
+                image = ImageOps.exif_transpose(opened).convert("RGB")
+            if max(image.size) > CANONICAL_LONG_EDGE:
+                image.thumbnail((CANONICAL_LONG_EDGE, CANONICAL_LONG_EDGE), Image.Resampling.LANCZOS)
+
+            directory.mkdir(parents=True, exist_ok=True)
+            tmp = directory / f".{path.stem}.{threading.get_ident()}.tmp"
+            image.save(tmp, "JPEG", quality=JPEG_QUALITY, optimize=True)
+            with self._lock:
+                output = _unique_path(directory, path.stem)
+                os.replace(tmp, output)
+        except Exception as e:
+            with self._lock:
+                self._claimed.discard(source_hash)
+            return self._fail(path, f"読み込めませんでした（{e}）")
+
+        self._prepare_variants(output, category)
+
+        relative = _display_path(output)
+        with self._lock:
+            self._load_log()[source_hash] = relative
+            self._save_log()
+            self._claimed.discard(source_hash)
+        original_bytes = path.stat().st_size
+        self._move(path, ".done")
+        print(f"  ✅ {path.name} → {category}/{name}/{output.name} ({original_bytes // 1024} KB → {output.stat().st_size // 1024} KB)")
+        return {
+            "success": True,
+            "source": str(path),
+            "path": relative,
+            "duplicate": False,
+            "original_bytes": original_bytes,
+            "bytes": output.stat().st_size,
+        }
+
+    def _prepare_variants(self, output: Path, category: str) -> None:
+        """縮小版・顔切り出し（トレーナー）を作っておく。失敗しても取り込みは成功とする"""
+        from face_crop import crop_face, face_crop_enabled
+        from static_server import THUMBNAIL_WIDTHS, make_thumbnail
+
+        if output.is_relative_to(ASSET_MANIFEST.assets_dir):
+            for width in THUMBNAIL_WIDTHS:
+                try:
+                    make_thumbnail(output, width)
+                except Exception as e:
+                    print(f"  ⚠️ 縮小版を作れませんでした: {output.name}: {e}")
+        if category == "trainers" and face_crop_enabled():
+            result = crop_face(output)
+            if not result["success"]:
+                print(f"  ⚠️ {result['error']}（生成時は写真全体を送ります）")
+
+    def run_once(self, stable_seconds: float = STABLE_SECONDS) -> Dict[str, Any]:
+        """
+        inbox/ の写真をまとめて取り込む（ワーカーで並列に処理）
+
+        Returns:
+            {"success": bool, "ingested": int, "duplicates": int, "failed": int, "seconds": float, "results": [...]}
+        """
+        start = time.perf_counter()
+        paths = self.pending(stable_seconds)
+        if not paths:
+            return {"success": True, "ingested": 0, "duplicates": 0, "failed": 0, "seconds": 0.0, "results": []}
+
+        print(f"📥 {len(paths)}枚を取り込みます（並列 {min(self.workers, len(paths))}）")
+        if self.assets_dir == ASSET_MANIFEST.assets_dir:
+            ASSET_MANIFEST.refresh()
+            self._known_assets = {
+                entry["sha256"]: _display_path(self.assets_dir / entry["path"])
+                for entry in ASSET_MANIFEST.entries()
+            }
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(self.ingest_file, paths))
+
+        # 登録先のフォルダだけマニフェストを更新する
+        for directory in {Path(BASE_DIR / r["path"]).parent for r in results if r["success"] and not r["duplicate"]}:
+            ASSET_MANIFEST.refresh(directory)
+
+        summary = {
+            "ingested": sum(1 for r in results if r["success"] and not r["duplicate"]),
+            "duplicates": sum(1 for r in results if r["success"] and r["duplicate"]),
+            "failed": sum(1 for r in results if not r["success"]),
+        }
+        seconds = time.perf_counter() - start
+        print(f"📦 取り込み {summary['ingested']} / 重複 {summary['duplicates']} / 失敗 {summary['failed']}（{seconds:.2f}秒）")
+        return {"success": summary["failed"] == 0, **summary, "seconds": round(seconds, 3), "results": results}
+
+    def watch(self, interval: float = 2.0, stop: Optional[threading.Event] = None) -> None:
+        """inbox/ を interval 秒ごとに見て、新しい写真を取り込み続ける（stop が立つか Ctrl+C で終了）"""
+        stop = stop or threading.Event()
+        self.inbox_dir.mkdir(parents=True, exist_ok=True)
+        print(f"👀 {self.inbox_dir} を監視しています（Ctrl+C で終了）")
+        try:
+            while not stop.is_set():
+                self.run_once()
+                stop.wait(interval)
+        except KeyboardInterrupt:
+            print("👋 監視を終了しました")
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="受け取りフォルダの写真を素材に取り込む")
+    parser.add_argument("--inbox", default=str(DEFAULT_INBOX_DIR), help="受け取りフォルダ（既定: inbox/）")
+    parser.add_argument("--watch", action="store_true", help="新しい写真を待ち続ける")
+    parser.add_argument("--interval", type=float, default=2.0, help="監視の間隔（秒）")
+    parser.add_argument("--workers", type=int, default=0, help="並列数（既定: CPU 数）")
+    args = parser.parse_args()
+
+    ingester = Ingester(Path(args.inbox), workers=args.workers)
+    if args.watch:
+        ingester.watch(args.interval)
+        sys.exit(0)
+    result = ingester.run_once(stable_seconds=0)
+    sys.exit(0 if result["success"] else 1)
@@ -0,0 +1,304 @@
+"""
+Markdown → HTML 変換（WordPress 投稿用）
+Claude が書くブログ記事で使う記法（見出し・段落・太字/斜体・インラインコード・リンク・
+箇条書き/番号付きリスト（入れ子）・表・引用・区切り線・コードブロック）を1行ずつ1回だけ走査して変換する
+
+正規表現を全文に何度もかける方式と違い、処理時間は入力の長さに比例する。
+テキストはすべて HTML エスケープし、リンクは http(s) / mailto / 相対パスのみ許可する
+"""
+
+import re
+from html import escape
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+# =====================================
+# ブロック要素の判定
+# =====================================
+
+_HEADING = re.compile(r"(#{1,6})\s+(.*)")
+_RULE = re.compile(r"(?:-\s*){3,}$|(?:\*\s*){3,}$|(?:_\s*){3,}$")
+_LIST_ITEM = re.compile(r"( *)([-*+]|\d{1,9}[.)])\s+(.*)")
+_TABLE_SEPARATOR = re.compile(r"\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?\s*$")
+_FENCE = "```"
+
+# リンクとして許可するURL（それ以外はテキストだけ残す）
+_SAFE_URL = re.compile(r"(?:https?://|mailto:|/|#|\./|\.\./)|[^:]*$", re.IGNORECASE)
+
+# インライン要素の開始になりうる文字
+_INLINE_SPECIAL = re.compile(r"[\\`*\[]")
+_ESCAPABLE = set("\\`*_[]()#+-.!|>")
+
+
+# =====================================
+# インライン要素
+# =====================================
+
+def _render_inline(text: str) -> str:
+    """
+    1行分（エスケープ済み）のインライン要素を変換する
+
+    閉じ記号の位置は記号ごとに1回だけ検索して使い回すため、閉じられていない記号が
+    大量にあっても先読みが繰り返されない
+    """
+    out: List[str] = []
+    next_pos = {}
+
+    def find(delim: str, start: int) -> int:
+        pos = next_pos.get(delim)
+        if pos is None or (pos != -1 and pos < start):
+            pos = text.find(delim, start)
+            next_pos[delim] = pos
+        return pos
+
+    i = 0
+    length = len(text)
+    while i < length:
+        match = _INLINE_SPECIAL.search(text, i)
+        if match is None:
+            out.append(text[i:])
+            break
+        start = match.start()
+        out.append(text[i:start])
+        char = text[start]
+        i = start + 1
+
+        if char == "\\":
+            if i < length and text[i] in _ESCAPABLE:
+                out.append(text[i])
+                i += 1
+            else:
+                out.append("\\")
+
+        elif char == "`":
+            end = find("`", i)
+            if end == -1:
+                out.append("`")
+            else:
+                out.append(f"<code>{text[i:end]}</code>")
+                i = end + 1
+
+        elif char == "*":
+            if text.startswith("*", i):
+                end = find("**", i + 1)
+                inner = text[i + 1:end] if end != -1 else ""
+                if inner.strip() and inner == inner.strip():
+                    out.append(f"<strong>{_render_inline(inner)}</strong>")
+                    i = end + 2
+                else:
+                    out.append("**")
+                    i += 1
+            else:
+                end = find("*", i)
+                inner = text[i:end] if end != -1 else ""
+                if inner.strip() and inner == inner.strip():
+                    out.append(f"<em>{_render_inline(inner)}</em>")
+                    i = end + 1
+                else:
+                    out.append("*")
+
+        else:  # "["
+            close = find("]", i)
+            url_end = find(")", close + 2) if close != -1 and text.startswith("(", close + 1) else -1
+            if url_end == -1:
+                out.append("[")
+                continue
+            label = _render_inline(text[i:close])
+            url = text[close + 2:url_end].strip()
+            if _SAFE_URL.match(url):
+                out.append(f'<a href="{url.replace(chr(34), "&quot;")}">{label}</a>')
+            else:
+                out.append(label)
+            i = url_end + 1
+
+    return "".join(out)
+
+
+def _inline(line: str) -> str:
+    return _render_inline(escape(line, quote=False))
+
+
+# =====================================
+# ブロック要素
+# =====================================
+
+def _split_row(line: str) -> List[str]:
+    """表の1行をセルに分ける（先頭・末尾の | は無視）"""
+    row = line.strip()
+    if row.startswith("|"):
+        row = row[1:]
+    if row.endswith("|") and not row.endswith("\\|"):
+        row = row[:-1]
+    return [cell.strip() for cell in re.split(r"(?<!\\)\|", row)]
+
+
+def _is_table_row(line: str) -> bool:
+    return "|" in line and line.strip().startswith("|")
+
+
+def _alignments(separator: str) -> List[Optional[str]]:
+    aligns = []
+    for cell in _split_row(separator):
+        left, right = cell.startswith(":"), cell.endswith(":")
+        aligns.append("center" if left and right else "right" if right else "left" if left else None)
+    return aligns
+
+
+def _cells(line: str, tag: str, aligns: List[Optional[str]]) -> str:
+    cells = []
+    for index, cell in enumerate(_split_row(line)):
+        align = aligns[index] if index < len(aligns) else None
+        style = f' style="text-align: {align}"' if align else ""
+        cells.append(f"<{tag}{style}>{_inline(cell)}</{tag}>")
+    return "<tr>" + "".join(cells) + "</tr>\n"
+
+
+def iter_markdown_html(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Markdown を1行ずつ読み、HTML を少しずつ返す
+
+    Args:
+        lines: Markdown の行（末尾の改行はあってもなくてもよい）
+
+    Yields:
+        HTML の断片（つなげると全体になる）
+    """
+    paragraph: List[str] = []
+    quote: List[str] = []
+    lists: List[Tuple[str, int]] = []   # (ul / ol, インデント)
+    table: Optional[List[Optional[str]]] = None
+    in_code = False
+    blank_in_list = False
+
+    def flush_paragraph() -> Iterator[str]:
+        if paragraph:
+            yield "<p>" + "\n".join(_inline(l) for l in paragraph) + "</p>\n"
+            paragraph.clear()
+
+    def flush_quote() -> Iterator[str]:
+        if quote:
+            yield "<blockquote><p>" + "\n".join(_inline(l) for l in quote) + "</p></blockquote>\n"
+            quote.clear()
+
+    def close_lists(indent: int = -1) -> Iterator[str]:
+        while lists and lists[-1][1] > indent:
+            yield f"</li>\n</{lists.pop()[0]}>\n"
+
+    def close_table() -> Iterator[str]:
+        nonlocal table
+        if table is not None:
+            yield "</tbody>\n</table>\n"
+            table = None
+
+    def close_all() -> Iterator[str]:
+        yield from flush_paragraph()
+        yield from flush_quote()
+        yield from close_lists()
+        yield from close_table()
+
+    for raw in lines:
+        line = raw.rstrip("\r\n").expandtabs(4)
+        stripped = line.strip()
+
+        if in_code:
+            if stripped.startswith(_FENCE):
+                yield "</code></pre>\n"
+                in_code = False
+            else:
+                yield escape(line, quote=False) + "\n"
+            continue
+
+        if not stripped:
+            yield from flush_paragraph()
+            yield from flush_quote()
+            yield from close_table()
+            blank_in_list = bool(lists)
+            continue
+
+        if stripped.startswith(_FENCE):
+            yield from close_all()
+            language = stripped[len(_FENCE):].strip()
+            cls = f' class="language-{escape(language)}"' if language else ""
+            yield f"<pre><code{cls}>"
+            in_code = True
+            continue
+
+        if table is not None:
+            if _is_table_row(line):
+                yield _cells(line, "td", table)
+                continue
+            yield from close_table()
+
+        item = _LIST_ITEM.match(line)
+        if item and not (item.group(2) in ("-", "*") and _RULE.match(stripped)):
+            indent = len(item.group(1))
+            tag = "ul" if item.group(2) in ("-", "*", "+") else "ol"
+            yield from flush_paragraph()
+            yield from flush_quote()
+            yield from close_lists(indent)
+            if lists and lists[-1][1] == indent:
+                if lists[-1][0] == tag:
+                    yield "</li>\n"
+                else:
+                    yield f"</li>\n</{lists.pop()[0]}>\n"
+            if not lists or lists[-1][1] < indent:
+                number = item.group(2)[:-1]
+                start = f' start="{int(number)}"' if tag == "ol" and int(number) != 1 else ""
+                yield ("\n" if lists else "") + f"<{tag}{start}>\n"
+                lists.append((tag, indent))
+            yield "<li>" + _inline(item.group(3))
+            blank_in_list = False
+            continue
+
+        if lists:
+            if line.startswith(" ") and not blank_in_list:
+                # 字下げされた行は直前の項目の続き
+                yield " " + _inline(stripped)
+                continue
+            yield from close_lists()
+        blank_in_list = False
+
+        heading = _HEADING.match(stripped)
+        if heading:
+            yield from close_all()
+            level = len(heading.group(1))
+            yield f"<h{level}>{_inline(heading.group(2))}</h{level}>\n"
+            continue
+
+        if _RULE.match(stripped):
+            yield from close_all()
+            yield "<hr>\n"
+            continue
+
+        if stripped.startswith(">"):
+            yield from flush_paragraph()
+            quote.append(stripped[1:].lstrip())
+            continue
+        yield from flush_quote()
+
+        if paragraph and _TABLE_SEPARATOR.match(stripped) and _is_table_row(paragraph[-1]):
+            # 直前の行が見出し行なら表として始める
+            header = paragraph.pop()
+            yield from flush_paragraph()
+            table = _alignments(stripped)
+            yield "<table>\n<thead>\n" + _cells(header, "th", table) + "</thead>\n<tbody>\n"
+            continue
+
+        paragraph.append(stripped)
+
+    if in_code:
+        yield "</code></pre>\n"
+    yield from close_all()
+
+
+def markdown_to_html(markdown_text: str) -> str:
+    """
+    Markdown を HTML に変換
+
+    Args:
+        markdown_text: 記事本文（Markdown）
+
+    Returns:
+        HTML
+    """
+    return "".join(iter_markdown_html(markdown_text.splitlines())).rstrip("\n")
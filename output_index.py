@@ -0,0 +1,423 @@
+"""
+生成画像の索引（ギャラリー用）
+outputs/ の生成画像を1件1行で SQLite（outputs/index.sqlite）に記録し、モード・日付・トレーナー・店舗で
+絞り込んでページ単位で読む。フォルダを毎回一覧しないので、画像が何千枚あっても1ページ分しか読まない
+
+生成時に add() で記録する。それ以前の画像（索引がなかった頃のもの）は sync() でフォルダから取り込む
+（フォルダの更新時刻が変わっていなければ何もしない）
+
+記録するときに知覚ハッシュ（image_hash）を計算し、ほぼ同じ画像がすでにあれば元の画像に紐づける。
+環境変数 OUTPUT_DEDUP で動作を変えられる（link: 紐づけるだけ / drop: 新しい方を保存しない / off: 調べない）
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+DEFAULT_OUTPUTS_DIR = Path(__file__).parent / "outputs"
+
+# 生成画像のファイル名（書き出し形式・縮小版・ZIPなどは含めない）
+_OUTPUT_NAME = re.compile(r"^firefitness_(\d{8}_\d{6})(?:_\d+)?(_with_logo)?\.png$")
+
+# 自動採点で選ばれず、保存されないまま残った候補（image_generator.CANDIDATE_PREFIX）はこの時間が過ぎたら削除する
+_CANDIDATE_PREFIX = "firefitness_candidate_"
+CANDIDATE_MAX_AGE = timedelta(days=1)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outputs (
+    path TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    mode TEXT NOT NULL DEFAULT 'unknown',
+    trainer TEXT,
+    location TEXT,
+    caption TEXT,
+    prompt TEXT,
+    phash TEXT,
+    dhash TEXT,
+    duplicate_of TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outputs_created ON outputs (created DESC);
+CREATE INDEX IF NOT EXISTS idx_outputs_mode_created ON outputs (mode, created DESC);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# 以前の索引に足す列
+_ADDED_COLUMNS = {"phash": "TEXT", "dhash": "TEXT", "duplicate_of": "TEXT"}
+
+# 一度にハッシュを計算する件数（以前の画像の取り込み時）
+_HASH_BATCH = 50
+
+
+def dedup_mode() -> str:
+    """ほぼ同じ画像の扱い（link / drop / off）"""
+    mode = os.getenv("OUTPUT_DEDUP", "link").lower()
+    return mode if mode in ("link", "drop", "off") else "link"
+
+# 絞り込みに使える列
+FILTER_COLUMNS = ("mode", "trainer", "location")
+
+
+class OutputIndex:
+    """生成画像の索引（プロセス内で共有、スレッドセーフ）"""
+
+    def __init__(self, outputs_dir: Path = DEFAULT_OUTPUTS_DIR, db_path: Optional[Path] = None):
+        self.outputs_dir = Path(outputs_dir)
+        self.db_path = Path(db_path) if db_path else self.outputs_dir / "index.sqlite"
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # image_hash.MultiIndex（NumPy を使うので、初回の検索・記録のときに import して作る）
+        self._hashes = None
+        # path -> (dHash, duplicate_of)
+        self._hash_meta: Dict[str, tuple] = {}
+        self._hashing: Optional[threading.Thread] = None
+        self._hash_checked = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """接続を開く（ロック内で呼ぶ）"""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(outputs)")}
+            with self._conn:
+                for column, column_type in _ADDED_COLUMNS.items():
+                    if column not in columns:
+                        self._conn.execute(f"ALTER TABLE outputs ADD COLUMN {column} {column_type}")
+        return self._conn
+
+    def _hash_index(self):
+        """保存済みのハッシュの検索用索引（image_hash.MultiIndex。ロック内で呼ぶ。初回だけ全件のハッシュを読む）"""
+        from image_hash import MultiIndex, from_hex
+
+        if self._hashes is None:
+            self._hashes = MultiIndex()
+            rows = self._connect().execute(
+                "SELECT path, phash, dhash, duplicate_of FROM outputs WHERE phash IS NOT NULL"
+            )
+            for row in rows:
+                self._hashes.add(from_hex(row["phash"]), row["path"])
+                self._hash_meta[row["path"]] = (from_hex(row["dhash"]), row["duplicate_of"])
+        return self._hashes
+
+    def _find_original(self, relative: str, hashes: Dict[str, int]) -> Optional[tuple]:
+        """
+        ほぼ同じ画像を探す（ロック内で呼ぶ）。pHash で候補を探し、dHash でも近いものに限る
+
+        Returns:
+            (元の画像のパス, pHash の距離) または None。見つけた画像が別の画像の重複なら、その元をたどる
+        """
+        from image_hash import DHASH_DISTANCE, hamming
+
+        for distance, path in self._hash_index().search(hashes["phash"]):
+            if path == relative:
+                continue
+            dhash, duplicate_of = self._hash_meta[path]
+            if hamming(dhash, hashes["dhash"]) <= DHASH_DISTANCE:
+                return duplicate_of or path, distance
+        return None
+
+    def _remember_hashes(self, relative: str, hashes: Dict[str, int], duplicate_of: Optional[str]) -> None:
+        """ロック内で呼ぶ"""
+        self._hash_index().add(hashes["phash"], relative)
+        self._hash_meta[relative] = (hashes["dhash"], duplicate_of)
+
+    def _relative(self, path) -> str:
+        return Path(path).resolve().relative_to(self.outputs_dir.resolve()).as_posix()
+
+    def add(
+        self,
+        path,
+        mode: str,
+        trainer: Optional[str] = None,
+        location: Optional[str] = None,
+        caption: Optional[str] = None,
+        prompt: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        生成画像を記録する（同じパスは上書き）。ほぼ同じ画像がすでにあれば紐づける
+
+        Args:
+            path: outputs/ の中の画像
+            mode: "promo" / "sns" / "carousel"
+            trainer: トレーナー名
+            location: 店舗名
+            caption: シチュエーションや見出しなど、一覧に出す説明
+            prompt: 画像生成に使ったプロンプト
+
+        Returns:
+            {"path", "duplicate_of"（ほぼ同じ元の画像の絶対パス or None）, "distance", "dropped"}
+            dropped が True のときは新しい画像を削除して記録していない
+        """
+        from image_hash import image_hashes, to_hex
+
+        result = {"path": str(path), "duplicate_of": None, "distance": None, "dropped": False}
+        try:
+            relative = self._relative(path)
+        except ValueError:
+            return result
+
+        # 画像の読み込みに時間がかかるのでロックの外で計算する
+        dedup = dedup_mode()
+        hashes = None
+        if dedup != "off":
+            try:
+                hashes = image_hashes(path)
+            except Exception as e:
+                print(f"⚠️ 画像のハッシュを計算できませんでした: {e}")
+
+        with self._lock:
+            conn = self._connect()
+            original = self._find_original(relative, hashes) if hashes else None
+            if original:
+                result["duplicate_of"] = str(self.outputs_dir / original[0])
+                result["distance"] = original[1]
+                print(f"♻️ ほぼ同じ画像があります: {original[0]}（pHash の距離 {original[1]}）")
+                if dedup == "drop":
+                    self._delete_files(path)
+                    result["dropped"] = True
+                    return result
+
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO outputs "
+                    "(path, created, mode, trainer, location, caption, prompt, phash, dhash, duplicate_of) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        relative, Path(path).stat().st_mtime, mode, trainer, location, caption, prompt,
+                        to_hex(hashes["phash"]) if hashes else None,
+                        to_hex(hashes["dhash"]) if hashes else None,
+                        original[0] if original else None,
+                    )
+                )
+                # ロゴを重ねる前の画像は一覧に出さない
+                if relative.endswith("_with_logo.png"):
+                    conn.execute("DELETE FROM outputs WHERE path = ?", (relative.replace("_with_logo.png", ".png"),))
+            if hashes:
+                self._remember_hashes(relative, hashes, original[0] if original else None)
+        return result
+
+    @staticmethod
+    def _delete_files(path) -> None:
+        """重複として保存しない画像（ロゴを重ねる前の画像も）を削除する"""
+        path = Path(path)
+        targets = [path]
+        if path.name.endswith("_with_logo.png"):
+            targets.append(path.with_name(path.name.replace("_with_logo.png", ".png")))
+        for target in targets:
+            try:
+                target.unlink()
+            except OSError:
+                pass
+
+    def hash_missing(self) -> int:
+        """
+        ハッシュのない画像（以前の画像）のハッシュを古い順に計算し、ほぼ同じ画像を紐づける
+        （以前の画像は削除しない）
+
+        Returns:
+            計算した件数
+        """
+        from image_hash import image_hashes, to_hex
+
+        done = 0
+        while True:
+            with self._lock:
+                rows = self._connect().execute(
+                    "SELECT path FROM outputs WHERE phash IS NULL ORDER BY created LIMIT ?", (_HASH_BATCH,)
+                ).fetchall()
+            if not rows:
+                break
+            for row in rows:
+                relative = row["path"]
+                try:
+                    hashes = image_hashes(self.outputs_dir / relative)
+                except Exception:
+                    # 読めない画像は索引から外す
+                    with self._lock, self._connect() as conn:
+                        conn.execute("DELETE FROM outputs WHERE path = ?", (relative,))
+                    continue
+                with self._lock:
+                    original = self._find_original(relative, hashes)
+                    root = original[0] if original else None
+                    with self._connect() as conn:
+                        if root and self._is_older(conn, relative, root):
+                            # 以前の画像の方が古ければ、そちらを元の画像にする
+                            conn.execute(
+                                "UPDATE outputs SET duplicate_of = ? WHERE path = ? OR duplicate_of = ?",
+                                (relative, root, root)
+                            )
+                            for path, (dhash, duplicate_of) in list(self._hash_meta.items()):
+                                if path == root or duplicate_of == root:
+                                    self._hash_meta[path] = (dhash, relative)
+                            root = None
+                        conn.execute(
+                            "UPDATE outputs SET phash = ?, dhash = ?, duplicate_of = ? WHERE path = ?",
+                            (to_hex(hashes["phash"]), to_hex(hashes["dhash"]), root, relative)
+                        )
+                    self._remember_hashes(relative, hashes, root)
+                done += 1
+        if done:
+            print(f"🗂️ 以前の画像 {done}件のハッシュを計算しました")
+        return done
+
+    @staticmethod
+    def _is_older(conn: sqlite3.Connection, path: str, other: str) -> bool:
+        rows = dict(conn.execute("SELECT path, created FROM outputs WHERE path IN (?, ?)", (path, other)).fetchall())
+        return path in rows and other in rows and rows[path] < rows[other]
+
+    def _start_hashing(self) -> None:
+        """以前の画像のハッシュ計算をバックグラウンドで始める（ロック内で呼ぶ。実行中なら何もしない）"""
+        if dedup_mode() == "off" or (self._hashing is not None and self._hashing.is_alive()):
+            return
+        self._hashing = threading.Thread(target=self.hash_missing, name="output-hash", daemon=True)
+        self._hashing.start()
+
+    def sync(self) -> int:
+        """
+        索引にない生成画像を outputs/ から取り込む（モードなどは不明として記録）
+
+        Returns:
+            取り込んだ件数
+        """
+        try:
+            folder_mtime = str(self.outputs_dir.stat().st_mtime_ns)
+        except OSError:
+            return 0
+        with self._lock:
+            conn = self._connect()
+            # ハッシュ導入前に記録した画像が残っていれば計算する（プロセスごとに1回だけ確認）
+            if not self._hash_checked:
+                self._hash_checked = True
+                if conn.execute("SELECT 1 FROM outputs WHERE phash IS NULL LIMIT 1").fetchone():
+                    self._start_hashing()
+            row = conn.execute("SELECT value FROM meta WHERE key = 'folder_mtime'").fetchone()
+            if row and row["value"] == folder_mtime:
+                return 0
+
+            known = {r["path"] for r in conn.execute("SELECT path FROM outputs")}
+            names = set()
+            with_logo = set()
+            expired = datetime.now().timestamp() - CANDIDATE_MAX_AGE.total_seconds()
+            swept = 0
+            for entry in self.outputs_dir.iterdir():
+                if entry.name.startswith(_CANDIDATE_PREFIX):
+                    try:
+                        if entry.stat().st_mtime < expired:
+                            entry.unlink()
+                            swept += 1
+                    except OSError:
+                        pass
+                    continue
+                match = _OUTPUT_NAME.match(entry.name)
+                if match:
+                    names.add(entry.name)
+                    if match.group(2):
+                        with_logo.add(entry.name.replace("_with_logo.png", ".png"))
+
+            added = 0
+            with conn:
+                for name in names - with_logo - known:
+                    created = datetime.strptime(_OUTPUT_NAME.match(name).group(1), "%Y%m%d_%H%M%S").timestamp()
+                    conn.execute(
+                        "INSERT OR IGNORE INTO outputs (path, created) VALUES (?, ?)", (name, created)
+                    )
+                    added += 1
+                if swept:
+                    # 削除でフォルダの更新時刻が変わるので、次の sync で一覧し直さないよう取り直す
+                    folder_mtime = str(self.outputs_dir.stat().st_mtime_ns)
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('folder_mtime', ?)", (folder_mtime,))
+            if added:
+                self._start_hashing()
+        if swept:
+            print(f"🗑️ 保存されなかった古い候補 {swept}件を削除しました")
+        if added:
+            print(f"🗂️ 生成画像の索引に {added}件を取り込みました")
+        return added
+
+    @staticmethod
+    def _where(filters: Dict[str, Any]) -> tuple:
+        clauses, args = [], []
+        for column in FILTER_COLUMNS:
+            if filters.get(column):
+                clauses.append(f"{column} = ?")
+                args.append(filters[column])
+        if filters.get("hide_duplicates"):
+            clauses.append("duplicate_of IS NULL")
+        if filters.get("date_from"):
+            clauses.append("created >= ?")
+            args.append(datetime.combine(filters["date_from"], datetime.min.time()).timestamp())
+        if filters.get("date_to"):
+            clauses.append("created < ?")
+            args.append(datetime.combine(filters["date_to"] + timedelta(days=1), datetime.min.time()).timestamp())
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), args
+
+    def page(self, filters: Optional[Dict[str, Any]] = None, page: int = 1, page_size: int = 24) -> Dict[str, Any]:
+        """
+        新しい順に1ページ分を返す
+
+        Args:
+            filters: mode / trainer / location（完全一致）、date_from / date_to（date、両端を含む）、
+                hide_duplicates（True ならほぼ同じ画像の2枚目以降を除く）
+            page: 1から始まるページ番号
+            page_size: 1ページの件数
+
+        Returns:
+            {"items": [{"path"（絶対パス）, "created", "mode", ...}], "total", "page", "pages"}
+        """
+        where, args = self._where(filters or {})
+        with self._lock:
+            conn = self._connect()
+            total = conn.execute(f"SELECT COUNT(*) FROM outputs{where}", args).fetchone()[0]
+            pages = max(1, -(-total // page_size))
+            page = min(max(1, page), pages)
+            rows = conn.execute(
+                f"SELECT * FROM outputs{where} ORDER BY created DESC LIMIT ? OFFSET ?",
+                [*args, page_size, (page - 1) * page_size]
+            ).fetchall()
+        items = [
+            {
+                **dict(row),
+                "path": str(self.outputs_dir / row["path"]),
+                "duplicate_of": str(self.outputs_dir / row["duplicate_of"]) if row["duplicate_of"] else None,
+            }
+            for row in rows
+        ]
+        return {"items": items, "total": total, "page": page, "pages": pages}
+
+    def values(self, column: str) -> List[str]:
+        """絞り込みの選択肢（記録されている値）"""
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"絞り込みに使えない列です: {column}")
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT DISTINCT {column} FROM outputs WHERE {column} IS NOT NULL ORDER BY {column}"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def remove_missing(self, paths: List[str]) -> None:
+        """ファイルが消えていた画像を索引から除く"""
+        relative = [self._relative(p) for p in paths]
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany("DELETE FROM outputs WHERE path = ?", [(p,) for p in relative])
+                # 消えた画像を元にしていた重複は、それぞれ単独の画像に戻す
+                conn.executemany("UPDATE outputs SET duplicate_of = NULL WHERE duplicate_of = ?", [(p,) for p in relative])
+            for path, (dhash, duplicate_of) in list(self._hash_meta.items()):
+                if duplicate_of in relative:
+                    self._hash_meta[path] = (dhash, None)
+            for path in relative:
+                if self._hashes is not None:
+                    self._hashes.remove(path)
+                self._hash_meta.pop(path, None)
+
+
+# プロセス内で1つだけ使う
+OUTPUT_INDEX = OutputIndex()
@@ -0,0 +1,192 @@
+"""
+プロンプト・コンテンツの先読み（投機的実行）
+フォームの入力が一定時間変わらなければ Claude の呼び出しを裏で始めておき、
+生成ボタンが押されたときに入力が同じなら、その結果をそのまま使う
+
+結果は入力内容のハッシュをキーにして、プロセス内で全セッション共有する
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, CancelledError
+from typing import Any, Callable, Dict, Optional
+
+
+def input_key(kind: str, payload: Dict[str, Any]) -> str:
+    """
+    入力内容からキーを作る（辞書の順序に依存しない）
+
+    Args:
+        kind: 呼び出しの種類（"promo" / "sns" / "carousel" など）
+        payload: Claude に渡す入力
+
+    Returns:
+        SHA-256 の16進文字列
+    """
+    canonical = json.dumps([kind, payload], ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class Prefetcher:
+    """
+    入力ハッシュ → Future のキャッシュ
+
+    schedule() は入力が変わるたびに呼ばれる想定。debounce 秒のあいだ同じ owner（セッション）・
+    同じ kind で別の入力が来なければ実行を始める。途中で入力が変わったものは実行せずに捨てる。
+    """
+
+    def __init__(self, debounce: float = 1.5, max_workers: int = 4, max_entries: int = 64, ttl: float = 600):
+        self.debounce = debounce
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # (owner, kind) → (最新の入力キー, 予約した時刻)。ttl を過ぎたら捨てる（閉じたセッションの分が残らないように）
+        self._latest: Dict[tuple, tuple] = {}
+        self.stats = {"scheduled": 0, "started": 0, "superseded": 0, "hits": 0, "misses": 0}
+
+    def schedule(self, owner: str, kind: str, payload: Dict[str, Any],
+                 func: Callable[..., Any], *args, **kwargs) -> str:
+        """
+        先読みを予約する（同じ入力が予約済み・実行済みなら何もしない）
+
+        Args:
+            owner: 予約元の識別子（セッションごとに1つ）
+            kind: 呼び出しの種類
+            payload: キーに使う入力
+            func, args, kwargs: 実行する関数と引数
+
+        Returns:
+            入力キー
+        """
+        key = input_key(kind, payload)
+        with self._lock:
+            self._latest[(owner, kind)] = (key, time.monotonic())
+            self._evict_expired()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return key
+
+            entry = {
+                "future": Future(),
+                "slot": (owner, kind),
+                "created": time.monotonic(),
+                "call": (func, args, kwargs),
+                "timer": None,
+            }
+            entry["timer"] = threading.Timer(self.debounce, self._start, args=(key, False))
+            entry["timer"].daemon = True
+            self._entries[key] = entry
+            self.stats["scheduled"] += 1
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                if evicted["call"] is not None:
+                    # まだ実行していない予約は取り消す（待っている呼び出し側がいれば None になる）
+                    evicted["timer"].cancel()
+                    evicted["future"].cancel()
+
+        entry["timer"].start()
+        return key
+
+    def result(self, kind: str, payload: Dict[str, Any], timeout: Optional[float] = None,
+               consume: bool = False) -> Optional[Any]:
+        """
+        先読みの結果を取り出す。まだ待機中なら今すぐ実行し、実行中なら終わるまで待つ
+
+        Args:
+            kind, payload: schedule() と同じ入力
+            timeout: 実行中の先読みを待つ最大秒数
+            consume: True なら取り出した結果を捨てる（毎回新しい内容が欲しい場合）
+
+        Returns:
+            結果。先読みしていない・失敗した場合は None（呼び出し側で通常どおり実行する）
+        """
+        key = input_key(kind, payload)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            # ロックを離す前に実行を引き受ける（離したあとで追い出されると、誰も実行しない Future を待つことになる）
+            call = self._claim(key, entry, force=True)
+
+        if call is not None:
+            self._run(entry, call)
+        try:
+            value = entry["future"].result(timeout=timeout)
+        except (CancelledError, Exception):
+            value = None
+
+        with self._lock:
+            if (value is None or consume) and self._entries.get(key) is entry:
+                del self._entries[key]
+            self.stats["hits" if value is not None else "misses"] += 1
+        return value
+
+    def _start(self, key: str, force: bool) -> None:
+        """待機が明けた（または結果を求められた）予約を実行に移す"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            call = self._claim(key, entry, force)
+        if call is not None:
+            self._run(entry, call)
+
+    def _claim(self, key: str, entry: Dict[str, Any], force: bool) -> Optional[tuple]:
+        """
+        待機中の予約の実行を引き受ける（ロック内で呼ぶ）
+
+        Returns:
+            実行する (func, args, kwargs)。実行中・実行済み・入力が変わって捨てた場合は None
+        """
+        if entry["call"] is None:
+            return None
+        if not force and self._latest.get(entry["slot"], (None,))[0] != key:
+            # 待っている間に入力が変わった
+            del self._entries[key]
+            self.stats["superseded"] += 1
+            entry["future"].cancel()
+            return None
+        call, entry["call"] = entry["call"], None
+        self.stats["started"] += 1
+        return call
+
+    def _run(self, entry: Dict[str, Any], call: tuple) -> None:
+        """引き受けた予約を実行スレッドに渡す"""
+        entry["timer"].cancel()
+        future = entry["future"]
+        if not future.set_running_or_notify_cancel():
+            return
+        func, args, kwargs = call
+
+        def run():
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception as e:
+                print(f"⚠️ 先読みに失敗しました: {e}")
+                future.set_exception(e)
+
+        self._executor.submit(run)
+
+    def _evict_expired(self) -> None:
+        """ttl を過ぎた結果と、ttl のあいだ予約のない (owner, kind) の最新の入力を捨てる（ロック内で呼ぶ）"""
+        now = time.monotonic()
+        for key in [k for k, e in self._entries.items() if now - e["created"] > self.ttl and e["call"] is None]:
+            del self._entries[key]
+        for slot in [s for s, (_, scheduled) in self._latest.items() if now - scheduled > self.ttl]:
+            del self._latest[slot]
+
+
+def prefetch_enabled() -> bool:
+    """環境変数 PROMPT_PREFETCH で先読みを切り替える（既定: 有効）"""
+    return os.getenv("PROMPT_PREFETCH", "true").lower() not in ("0", "false", "off", "no")
+
+
+# プロセス内で1つだけ使う
+PREFETCHER = Prefetcher(debounce=float(os.getenv("PROMPT_PREFETCH_DEBOUNCE", "1.5")))
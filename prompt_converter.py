@@ -11,6 +11,8 @@ import anthropic
 from typing import Dict, Any, List
 import json
 
+from structured_output import SNS_CONTENT_SCHEMA, THEME_VARIATIONS_SCHEMA, call_with_schema
+
 # =====================================
 # FIREFITNESSコアバリュー（価値基準）
 # =====================================
@@ -732,7 +734,7 @@ FIREFITNESSの価値観（3軸診断：姿勢・食事・継続）を崩さず
 6. ターゲット層（30-50代、派手さを嫌う層）に響く表現
 
 ## 出力形式
-必ず以下のJSON形式で出力してください（他のテキストは不要）:
+必ず record_sns_content ツールを使い、以下の項目を出力してください:
 {{
     "headline": "メイン見出し（15文字以内推奨）",
     "sub_text": "サブテキスト（30文字以内推奨）",
@@ -769,25 +771,22 @@ FIREFITNESSの価値観（3軸診断：姿勢・食事・継続）を崩さず
 """
 
     try:
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=1000,
+        # スキーマ付きのツールで出力させ、検証する（不正なら1回だけ修正を依頼）
+        content = call_with_schema(
+            client,
+            kind="sns_content",
+            tool_name="record_sns_content",
+            tool_description="SNS投稿1ページ分のコンテンツを記録する",
+            schema=SNS_CONTENT_SCHEMA,
             messages=[
                 {"role": "user", "content": user_message}
             ],
+            max_tokens=1000,
             system=system_prompt
         )
-
-        response_text = message.content[0].text
-
-        # JSONを抽出してパース
-        import re
-        json_match = re.search(r'\{[\s\S]*\}', response_text)
-        if json_match:
-            content = json.loads(json_match.group())
-            return content
-        else:
+        if content is None:
             return _get_fallback_content(theme, page_type)
+        return content
 
     except Exception as e:
         print(f"AI content generation error: {e}")
@@ -876,6 +875,32 @@ def _get_fallback_content(theme: str, page_type: str) -> Dict[str, Any]:
     return fallback_contents.get(page_type, fallback_contents["title"])
 
 
+def generate_carousel_contents(theme: str, page_types: List[str]) -> List[Dict[str, Any]]:
+    """
+    複数ページ投稿の全ページ分のコンテンツを順に生成
+    （前のページの内容を渡して一貫性を保つため、ページ間は直列）
+
+    Args:
+        theme: 投稿テーマ
+        page_types: ページタイプのリスト（title, problem, cause ...）
+
+    Returns:
+        generate_sns_content_with_claude の結果に page_type を加えたもののリスト
+    """
+    contents = []
+    for idx, page_type in enumerate(page_types):
+        content = generate_sns_content_with_claude(
+            theme=theme,
+            page_type=page_type,
+            page_number=idx + 1,
+            total_pages=len(page_types),
+            previous_content=contents
+        )
+        content["page_type"] = page_type
+        contents.append(content)
+    return contents
+
+
 def generate_theme_variations(base_theme: str, count: int = 5) -> List[str]:
     """
     ベーステーマから複数のバリエーションを生成
@@ -900,26 +925,30 @@ def generate_theme_variations(base_theme: str, count: int = 5) -> List[str]:
 ベーステーマから、FIREFITNESSの価値観に合った投稿テーマのバリエーションを生成してください。
 煽らない、寄り添う、共感を得るトーンで。
 
-出力形式：JSON配列のみ（説明不要）
-["テーマ1", "テーマ2", ...]
+出力形式：record_theme_variations ツールの themes に、テーマを配列で入れてください
 """
 
+    # 個数もスキーマで縛る
+    schema = json.loads(json.dumps(THEME_VARIATIONS_SCHEMA))
+    schema["properties"]["themes"]["minItems"] = count
+    schema["properties"]["themes"]["maxItems"] = count
+
     try:
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=500,
+        result = call_with_schema(
+            client,
+            kind="theme_variations",
+            tool_name="record_theme_variations",
+            tool_description="投稿テーマのバリエーションを記録する",
+            schema=schema,
             messages=[
                 {"role": "user", "content": f"ベーステーマ「{base_theme}」から{count}個のバリエーションを生成してください。"}
             ],
+            max_tokens=500,
             system=system_prompt
         )
-
-        response_text = message.content[0].text
-        import re
-        json_match = re.search(r'\[[\s\S]*\]', response_text)
-        if json_match:
-            return json.loads(json_match.group())
-        return [base_theme] * count
+        if result is None:
+            return [base_theme] * count
+        return result["themes"]
 
     except Exception as e:
         print(f"Theme variation generation error: {e}")
@@ -0,0 +1,214 @@
+"""
+トレーナー参照画像の採点と選択
+Gemini に送るトレーナー画像は3枚まで。フォルダの並び順の先頭3枚ではなく、
+写りの良い（ピント・顔の大きさ・明るさ）、かつ互いに違う角度・表情の3枚を選ぶ
+
+採点は画像1枚につき1回だけ行い、outputs/cache/trainer_refs.json に保存する
+（ファイルのサイズ・更新時刻が変わったものだけ採点し直す）
+
+採点項目（いずれも 0〜1）:
+    sharpness: 顔の部分のラプラシアンの分散（ぼけ・手ぶれで小さくなる）
+    face: 顔の枠の幅（px）。切り出し（face_crop）後に顔が引き伸ばされない大きさなら 1
+    exposure: 顔の部分の平均の明るさが中間に近く、白飛び・黒つぶれが少ないほど高い
+顔の向き・表情の違いは、目の高さをそろえた顔の部分を 16x16 に縮小したベクトルの距離で比べる
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from image_scoring import laplacian_variance
+
+
+# キーに含めるバージョン（採点方法を変えたら上げて、古い採点を使わないようにする）
+SCORE_VERSION = 1
+
+DEFAULT_INDEX_PATH = Path(__file__).parent / "outputs" / "cache" / "trainer_refs.json"
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp"}
+
+# 総合点の重み
+QUALITY_WEIGHTS = {"sharpness": 0.4, "face": 0.35, "exposure": 0.25}
+
+# 2枚目以降は「総合点」と「選んだ画像との違い」をこの割合で足して選ぶ
+DIVERSITY_WEIGHT = 0.4
+
+# 顔の枠の幅がこれ以上なら face=1（face_crop の既定で、顔の枠は切り出し後の約 350px になる）
+_FULL_FACE_WIDTH = 350
+
+# sharpness はラプラシアンの分散 v を v / (v + _SHARPNESS_HALF) で 0〜1 にする
+_SHARPNESS_HALF = 100.0
+
+_DESCRIPTOR_SIZE = 16
+
+# 違いがこれ以下なら同じ写真（複製・明るさだけ違うもの）とみなし、ほかに候補がないときだけ選ぶ
+_SAME_PHOTO_DIFFERENCE = 0.01
+
+
+def _signature(path: Path) -> str:
+    stat = path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}:v{SCORE_VERSION}"
+
+
+def score_image(path) -> Dict[str, Any]:
+    """
+    参照画像1枚を採点する
+
+    Returns:
+        {"sharpness", "face", "exposure", "quality", "has_face", "descriptor": [float]}
+    """
+    from PIL import Image, ImageOps
+    from face_crop import detect_face
+
+    with Image.open(path) as opened:
+        image = ImageOps.exif_transpose(opened).convert("RGB")
+
+    face = detect_face(image)
+    if face is None:
+        # 顔が見つからない画像は画像全体で採点する（face=0 なので選ばれにくい）
+        region, face_width = image, 0.0
+    else:
+        x, y, w, h = face["box"]
+        region = image
+        if abs(face["angle"]) > 0:
+            region = image.rotate(face["angle"], resample=Image.Resampling.BILINEAR, center=(x + w / 2, y + h / 2))
+        region = region.crop((round(x), round(y), round(x + w), round(y + h)))
+        face_width = w
+
+    # 大きさの違いで sharpness が変わらないよう、顔の部分は同じ大きさにしてから測る
+    gray = region.convert("L").resize((256, 256), Image.Resampling.BILINEAR)
+    pixels = np.asarray(gray, dtype=np.float32)
+
+    variance = laplacian_variance(pixels)
+    sharpness = variance / (variance + _SHARPNESS_HALF)
+
+    luminance = pixels / 255.0
+    clipped = float(((luminance < 0.02) | (luminance > 0.98)).mean())
+    exposure = max(0.0, 1 - abs(float(luminance.mean()) - 0.5) / 0.5) * (1 - clipped)
+
+    face_score = min(1.0, face_width / _FULL_FACE_WIDTH)
+
+    small = np.asarray(gray.resize((_DESCRIPTOR_SIZE, _DESCRIPTOR_SIZE), Image.Resampling.BOX), dtype=np.float32)
+    small = small.ravel() - small.mean()
+    norm = float(np.linalg.norm(small))
+    descriptor = small / norm if norm > 0 else small
+
+    scores = {"sharpness": sharpness, "face": face_score, "exposure": exposure}
+    quality = sum(QUALITY_WEIGHTS[k] * v for k, v in scores.items())
+    return {
+        **{k: round(v, 4) for k, v in scores.items()},
+        "quality": round(quality, 4),
+        "has_face": face is not None,
+        "descriptor": [round(float(v), 4) for v in descriptor],
+    }
+
+
+def _difference(a: List[float], b: List[float]) -> float:
+    """顔の部分のベクトルの違い（0: 同じ 〜 1: 大きく違う）"""
+    similarity = float(np.dot(a, b))
+    return min(1.0, max(0.0, 1 - similarity))
+
+
+class ReferenceIndex:
+    """トレーナー参照画像の採点結果（JSONに保存、プロセス内で共有、スレッドセーフ）"""
+
+    def __init__(self, index_path: Path = DEFAULT_INDEX_PATH):
+        self.index_path = Path(index_path)
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """保存済みの採点結果を読む（ロック内で呼ぶ）"""
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.index_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self) -> None:
+        """採点結果を書き出す（ロック内で呼ぶ）"""
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_name(self.index_path.name + f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(self._entries, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+    def scores(self, paths: List[Path]) -> Dict[str, Dict[str, Any]]:
+        """
+        画像ごとの採点結果（未採点・変更されたものだけ採点して保存する）
+
+        Returns:
+            {パスの文字列: 採点結果}（読めなかった画像は含めない）
+        """
+        paths = [Path(p).resolve() for p in paths]
+        with self._lock:
+            entries = self._load()
+            result = {}
+            changed = False
+            for path in paths:
+                key = str(path)
+                try:
+                    signature = _signature(path)
+                except OSError:
+                    continue
+                entry = entries.get(key)
+                if entry is None or entry.get("signature") != signature:
+                    try:
+                        entry = {"signature": signature, **score_image(path)}
+                    except Exception as e:
+                        print(f"⚠️ 参照画像を採点できませんでした: {path.name}: {e}")
+                        continue
+                    entries[key] = entry
+                    changed = True
+                result[key] = entry
+            if changed:
+                self._save()
+        return result
+
+    def build(self, directory: Path) -> int:
+        """フォルダ（サブフォルダを含む）の画像を前もって採点する。採点済みの画像の数を返す"""
+        paths = [p for p in Path(directory).rglob("*") if p.suffix.lower() in IMAGE_SUFFIXES]
+        return len(self.scores(paths))
+
+    def select(self, paths: List[Path], count: int = 3) -> List[Path]:
+        """
+        写りが良く、互いに違う count 枚を選ぶ
+
+        1枚目は総合点が最も高いもの。2枚目以降は
+        (1 - DIVERSITY_WEIGHT) × 総合点 + DIVERSITY_WEIGHT × 選んだ画像との違い（最も近いものとの差）
+        が最も大きいものを選ぶ（同じ写真とみなしたもの・採点できなかった画像は最後に回す）
+
+        Returns:
+            選んだパス（選んだ順）
+        """
+        paths = [Path(p) for p in paths]
+        if len(paths) <= count:
+            return paths
+
+        entries = self.scores(paths)
+        scored = [(p, entries[str(p.resolve())]) for p in paths if str(p.resolve()) in entries]
+        unscored = [p for p in paths if str(p.resolve()) not in entries]
+
+        selected: List[tuple] = []
+        remaining = list(scored)
+        while remaining and len(selected) < count:
+            def gain(candidate):
+                _, entry = candidate
+                if not selected:
+                    return entry["quality"]
+                difference = min(_difference(entry["descriptor"], s["descriptor"]) for _, s in selected)
+                score = (1 - DIVERSITY_WEIGHT) * entry["quality"] + DIVERSITY_WEIGHT * difference
+                return score if difference > _SAME_PHOTO_DIFFERENCE else score - 1
+
+            best = max(remaining, key=gain)
+            selected.append(best)
+            remaining.remove(best)
+
+        return [p for p, _ in selected] + unscored[:count - len(selected)]
+
+
+REFERENCE_INDEX = ReferenceIndex()
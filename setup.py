@@ -4,6 +4,7 @@ FIREFITNESS 画像生成ツール - 初期セットアップスクリプト
 """
 
 import os
+import importlib.util
 from pathlib import Path
 
 
@@ -75,15 +76,19 @@ def setup_directories():
     print()
     print("   streamlit run app.py")
     print()
+    print("💡 画像を配置したら、以下で素材の確認とキャッシュの事前作成ができます（初回の生成が速くなります）:")
+    print()
+    print("   python setup.py warm")
+    print()
 
 
 def check_requirements():
-    """必要なパッケージがインストールされているか確認"""
+    """必要なパッケージがインストールされているか確認（importせずに探すだけ）"""
     
     required_packages = [
         "streamlit",
         "anthropic",
-        "google.generativeai",
+        "google.genai",
         "dotenv",
         "PIL"
     ]
@@ -95,16 +100,13 @@ def check_requirements():
     
     for package in required_packages:
         try:
-            if package == "dotenv":
-                __import__("dotenv")
-            elif package == "PIL":
-                __import__("PIL")
-            elif package == "google.generativeai":
-                __import__("google.generativeai")
-            else:
-                __import__(package)
+            found = importlib.util.find_spec(package) is not None
+        except ModuleNotFoundError:
+            # google.genai の親パッケージ google が無い場合など
+            found = False
+        if found:
             print(f"  ✅ {package}")
-        except ImportError:
+        else:
             print(f"  ❌ {package}")
             missing.append(package)
     
@@ -120,12 +122,176 @@ def check_requirements():
         print()
 
 
+# Gemini に参照画像として送れる形式
+SUPPORTED_MIME_TYPES = {"image/jpeg", "image/png", "image/webp"}
+
+
+def _validate_asset(path: Path, entry: dict) -> str:
+    """素材を最後まで展開して確かめる。問題があればその内容（なければ空文字）"""
+    from PIL import Image, ImageOps
+
+    if entry["mime"] is None:
+        return "画像ではありません（ファイルの先頭が画像の形式ではない）"
+    if entry["mime"] not in SUPPORTED_MIME_TYPES:
+        return f"対応していない形式です（{entry['mime']}）"
+    try:
+        with Image.open(path) as image:
+            ImageOps.exif_transpose(image).load()
+    except Exception as e:
+        return f"壊れています（{e}）"
+    return ""
+
+
+def _unsupported_file_problem(other: dict) -> str:
+    """拡張子が対応外のファイル（AssetManifest.other_files の1件）の問題の内容"""
+    suffix = other["suffix"] or "拡張子なし"
+    if other["mime"] is None:
+        return f"画像ではありません（{suffix}）"
+    if other["mime"] in SUPPORTED_MIME_TYPES:
+        return f"拡張子が対応していません（{suffix}、中身は {other['mime']}）。拡張子を直してください"
+    if other["mime"] == "image/heic":
+        return f"対応していない形式です（{suffix}、{other['mime']}）。inbox/ に置くと JPEG に変換して取り込みます"
+    return f"対応していない形式です（{suffix}、{other['mime']}）。JPEG・PNG・WebP に変換してください"
+
+
+def warm_caches(workers: int = 0) -> dict:
+    """
+    初回の生成を速くするための事前準備（python setup.py warm）
+
+    1. 素材のマニフェスト（assets/manifest.json）を作る・更新する
+    2. assets/ のすべてのファイルを一覧し、対応していない拡張子のもの（.heic・.gif・.tiff など）を洗い出す
+    3. すべての素材を並列に展開し、壊れたもの・対応していない形式のものを洗い出す
+    4. 画面表示用の縮小版（outputs/.thumbnails）を作る
+    5. トレーナー画像の顔切り出し（outputs/cache/faces）と採点（outputs/cache/trainer_refs.json）を済ませる
+
+    Args:
+        workers: 並列数（0 の場合は CPU 数）
+
+    Returns:
+        {"success": bool, "stages": [{"name", "seconds", "count"}], "problems": {素材のパス: 内容}}
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    from asset_manifest import ASSET_MANIFEST
+    from face_crop import crop_face, face_crop_enabled
+    from reference_index import REFERENCE_INDEX
+    from static_server import THUMBNAIL_WIDTHS, make_thumbnail
+
+    workers = workers or os.cpu_count() or 4
+    assets_dir = ASSET_MANIFEST.assets_dir
+    stages = []
+    problems = {}
+
+    def stage(name, func):
+        print(f"⏳ {name}...")
+        start = time.perf_counter()
+        count = func()
+        seconds = time.perf_counter() - start
+        stages.append({"name": name, "seconds": round(seconds, 3), "count": count})
+        print(f"  ✅ {name}: {count}件 {seconds:.2f}秒")
+
+    def build_manifest():
+        result = ASSET_MANIFEST.refresh()
+        print(f"     追加 {result['added']} / 更新 {result['updated']} / 削除 {result['removed']}")
+        return result["files"]
+
+    stage("マニフェスト", build_manifest)
+
+    def list_other_files():
+        # マニフェストは対応している拡張子のファイルだけを記録するので、それ以外はここで拾う
+        others = ASSET_MANIFEST.other_files()
+        for other in others:
+            problems[other["path"]] = _unsupported_file_problem(other)
+            print(f"  ❌ {other['path']}: {problems[other['path']]}")
+        return len(others)
+
+    stage("対応外のファイル", list_other_files)
+
+    entries = {assets_dir / entry["path"]: entry for entry in ASSET_MANIFEST.entries()}
+    valid = []
+
+    def validate():
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = dict(zip(entries, pool.map(lambda p: _validate_asset(p, entries[p]), entries)))
+        for path, problem in sorted(results.items()):
+            if problem:
+                problems[path.relative_to(assets_dir).as_posix()] = problem
+                print(f"  ❌ {path.relative_to(assets_dir).as_posix()}: {problem}")
+            else:
+                valid.append(path)
+        return len(results)
+
+    stage("素材の展開・検証", validate)
+
+    def thumbnails():
+        jobs = [(path, width) for path in valid for width in THUMBNAIL_WIDTHS]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(lambda job: make_thumbnail(*job), jobs))
+        return len(jobs)
+
+    stage("縮小版", thumbnails)
+
+    trainers = [p for p in valid if entries[p]["path"].startswith("trainers/")]
+
+    def face_crops():
+        if not face_crop_enabled():
+            print("     FACE_CROP=false のため省略します")
+            return 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda p: crop_face(p, source_hash=entries[p]["sha256"]), trainers))
+        for path, result in zip(trainers, results):
+            if not result["success"]:
+                print(f"  ⚠️ {result['error']}（元の画像を送ります）")
+        return sum(1 for r in results if r["success"])
+
+    stage("顔の切り出し", face_crops)
+    stage("トレーナー画像の採点", lambda: len(REFERENCE_INDEX.scores(trainers)))
+
+    return {"success": not problems, "stages": stages, "problems": problems}
+
+
+def print_warm_report(result: dict) -> None:
+    """warm_caches の結果を表示"""
+    print()
+    print("=" * 60)
+    print()
+    print(f"{'段階':<20} {'件数':>6} {'秒':>8}")
+    for s in result["stages"]:
+        print(f"{s['name']:<20} {s['count']:>6} {s['seconds']:>8.2f}")
+    print(f"{'合計':<20} {'':>6} {sum(s['seconds'] for s in result['stages']):>8.2f}")
+    print()
+    if result["problems"]:
+        print(f"⚠️  問題のある素材が {len(result['problems'])} 件あります（差し替えるか削除してください）")
+        for path, problem in result["problems"].items():
+            print(f"   {path}: {problem}")
+    else:
+        print("✅ すべての素材を確認しました")
+    print()
+
+
 if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="FIREFITNESS 画像生成ツール - セットアップ")
+    parser.add_argument("command", nargs="?", choices=["warm"], help="warm: 素材の検証とキャッシュの事前作成")
+    parser.add_argument("--workers", type=int, default=0, help="warm の並列数（既定: CPU 数）")
+    args = parser.parse_args()
+
     print()
     print("🔥 FIREFITNESS 画像生成ツール - セットアップ")
     print("=" * 60)
     print()
-    
+
+    if args.command == "warm":
+        from dotenv import load_dotenv
+
+        load_dotenv(Path(__file__).parent / ".env")
+        result = warm_caches(args.workers)
+        print_warm_report(result)
+        sys.exit(0 if result["success"] else 1)
+
     setup_directories()
     
     print()
@@ -0,0 +1,259 @@
+"""
+生成画像の配信（キャッシュ付きの静的ファイルサーバー）
+outputs/ と assets/ のファイル、およびその縮小版（WebP）を別ポートのHTTPサーバーから返す。
+画面には画像のバイト列ではなくURLだけを渡すので、リランのたびに画像を送り直さずに済み、
+ブラウザやプロキシは ETag・Cache-Control に従ってキャッシュする
+
+URL:
+    /files/<root>/<パス>                  元のファイル（?download=<ファイル名> で保存ダイアログ）
+    /thumbs/<幅>/<root>/<パス>            縮小版（THUMBNAIL_WIDTHS のいずれか、outputs/.thumbnails に保存）
+
+root は outputs / assets。URL に ?v=<ETag> を付けるので、内容が変われば別のURLになる
+返すのは画像（SERVED_SUFFIXES）だけ。索引・キャッシュ・書き出しのZIP（cache/・exports/・ドットで始まる名前）は返さない
+"""
+
+import hashlib
+import mimetypes
+import os
+import shutil
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+
+BASE_DIR = Path(__file__).parent
+
+ROOTS = {
+    "outputs": BASE_DIR / "outputs",
+    "assets": BASE_DIR / "assets",
+}
+
+THUMBNAIL_DIR = ROOTS["outputs"] / ".thumbnails"
+
+# 画面表示用（一覧の小さい画像 / 生成結果の表示）
+THUMBNAIL_WIDTHS = (320, 1280)
+
+DEFAULT_PORT = 8765
+
+# 配信する拡張子（index.sqlite・キャッシュの JSON・ログなどは返さない）
+SERVED_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp", ".avif")
+
+# この名前のフォルダの中は配信しない（記事のキャッシュ・投稿の記録・書き出しのZIP）
+PRIVATE_DIRS = ("cache", "exports")
+
+# ?v=<ETag> 付きのURLは内容が変わらないので長くキャッシュしてよい
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("image/avif", ".avif")
+
+
+def server_enabled() -> bool:
+    """
+    配信サーバーを使うか（使わないときは画像を Streamlit から直接送る）
+
+    既定では使わない。localhost のURLはアプリと同じ端末のブラウザからしか開けず、
+    Streamlit Community Cloud などにデプロイすると画像が表示されなくなるため。
+    STATIC_SERVER=true で有効にする。STATIC_SERVER を指定せず STATIC_BASE_URL だけを指定した場合も有効にする
+    """
+    default = "true" if os.getenv("STATIC_BASE_URL") else "false"
+    return os.getenv("STATIC_SERVER", default).lower() == "true"
+
+
+def etag_for(path: Path) -> str:
+    """サイズと更新時刻から ETag を作る（中身を読まない）"""
+    stat = path.stat()
+    return hashlib.blake2b(f"{stat.st_size}:{stat.st_mtime_ns}".encode(), digest_size=8).hexdigest()
+
+
+def _split_root(path: Path) -> Optional[tuple]:
+    """配信できる場所なら (root名, root からの相対パス) を返す"""
+    resolved = Path(path).resolve()
+    for name, root in ROOTS.items():
+        try:
+            return name, resolved.relative_to(root.resolve())
+        except ValueError:
+            continue
+    return None
+
+
+def _servable(relative: Path) -> bool:
+    """配信してよいファイルか（画像の拡張子で、ドットで始まる名前・cache・exports を含まない）"""
+    if relative.suffix.lower() not in SERVED_SUFFIXES:
+        return False
+    return not any(part.startswith(".") or part in PRIVATE_DIRS for part in relative.parts)
+
+
+def _resolve(root: str, relative: str) -> Optional[Path]:
+    """URL のパスを実際のファイルにする（root の外を指すもの・配信しないファイルは None）"""
+    if root not in ROOTS:
+        return None
+    base = ROOTS[root].resolve()
+    path = (base / relative).resolve()
+    if not path.is_relative_to(base) or not _servable(path.relative_to(base)) or not path.is_file():
+        return None
+    return path
+
+
+def make_thumbnail(source: Path, width: int) -> Path:
+    """縮小版（WebP）を作る。元のファイルより新しいものがあればそれを使う"""
+    from PIL import Image
+
+    root, relative = _split_root(source)
+    target = THUMBNAIL_DIR / str(width) / root / relative.with_suffix(relative.suffix + ".webp")
+    if target.exists() and target.stat().st_mtime_ns >= source.stat().st_mtime_ns:
+        return target
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + f".{threading.get_ident()}.tmp")
+    with Image.open(source) as image:
+        image = image.convert("RGB")
+        if image.width > width:
+            image.thumbnail((width, width * image.height // image.width), Image.Resampling.LANCZOS)
+        image.save(tmp, "WEBP", quality=80, method=4)
+    os.replace(tmp, target)
+    return target
+
+
+class StaticFileHandler(BaseHTTPRequestHandler):
+    """/files・/thumbs の GET / HEAD（If-None-Match に 304 で応える）"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _send_status(self, status: int) -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _serve(self, send_body: bool) -> None:
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        parts = [unquote(p) for p in url.path.split("/") if p]
+
+        # 縮小版の ETag は元のファイルから作る（縮小版を作る前に 304 を返せる）
+        width = None
+        if len(parts) >= 3 and parts[0] == "files":
+            source = _resolve(parts[1], "/".join(parts[2:]))
+        elif len(parts) >= 4 and parts[0] == "thumbs" and parts[1].isdigit() and int(parts[1]) in THUMBNAIL_WIDTHS:
+            width = int(parts[1])
+            source = _resolve(parts[2], "/".join(parts[3:]))
+        else:
+            source = None
+        if source is None:
+            self._send_status(404)
+            return
+
+        etag = etag_for(source)
+        # URL の v が今の内容と同じなら長くキャッシュさせる（古い v なら毎回確認させる）
+        cache_control = IMMUTABLE_CACHE_CONTROL if query.get("v", [""])[0] == etag else REVALIDATE_CACHE_CONTROL
+        if f'"{etag}"' in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", f'"{etag}"')
+            self.send_header("Cache-Control", cache_control)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        try:
+            path = make_thumbnail(source, width) if width else source
+        except Exception as e:
+            print(f"⚠️ 縮小版を作れませんでした: {source.name}: {e}")
+            self._send_status(500)
+            return
+
+        size = path.stat().st_size
+        self.send_response(200)
+        self.send_header("Content-Type", mimetypes.guess_type(path.name)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(size))
+        self.send_header("ETag", f'"{etag}"')
+        self.send_header("Cache-Control", cache_control)
+        self.send_header("Last-Modified", formatdate(source.stat().st_mtime, usegmt=True))
+        download = query.get("download", [""])[0]
+        if download:
+            self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{quote(download)}")
+        self.end_headers()
+
+        if send_body:
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, self.wfile, 64 * 1024)
+
+
+_server: Dict[str, Any] = {}
+_server_lock = threading.Lock()
+
+
+def ensure_server() -> Optional[str]:
+    """
+    配信サーバーを（プロセス内で1回だけ）起動し、ブラウザから見たURLを返す
+
+    環境変数:
+        STATIC_SERVER_PORT: 待ち受けるポート（既定: 8765）
+        STATIC_SERVER_BIND: 待ち受けるアドレス（既定: 127.0.0.1。別の端末から使う場合は 0.0.0.0）
+        STATIC_BASE_URL: ブラウザから見たURL（既定: http://localhost:<ポート>。リバースプロキシの後ろに置く場合に指定）
+
+    Returns:
+        ベースURL。無効（既定）・起動に失敗した場合は None
+    """
+    if not server_enabled():
+        return None
+    with _server_lock:
+        if "base_url" not in _server:
+            port = int(os.getenv("STATIC_SERVER_PORT", str(DEFAULT_PORT)))
+            try:
+                server = ThreadingHTTPServer((os.getenv("STATIC_SERVER_BIND", "127.0.0.1"), port), StaticFileHandler)
+            except OSError as e:
+                print(f"⚠️ 画像配信サーバーを起動できませんでした（ポート {port}）: {e}")
+                _server["base_url"] = None
+                return None
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name="static-server", daemon=True).start()
+            _server["server"] = server
+            _server["base_url"] = os.getenv("STATIC_BASE_URL", f"http://localhost:{server.server_address[1]}").rstrip("/")
+            print(f"🖼️ 画像配信サーバー: {_server['base_url']}")
+        return _server["base_url"]
+
+
+def file_url(path, download: Optional[str] = None) -> Optional[str]:
+    """
+    ファイルの配信URL
+
+    Args:
+        path: outputs/ または assets/ の中の画像
+        download: 指定すると、このファイル名で保存させるURLにする
+
+    Returns:
+        URL。配信できない場合（画像でない・cache/ や exports/ の中など）は None（呼び出し側で Streamlit から直接送る）
+    """
+    base_url = ensure_server()
+    location = _split_root(path) if base_url else None
+    if location is None or not _servable(location[1]) or not Path(path).is_file():
+        return None
+    root, relative = location
+    url = f"{base_url}/files/{root}/{quote(relative.as_posix())}?v={etag_for(Path(path))}"
+    if download:
+        url += f"&download={quote(download)}"
+    return url
+
+
+def thumbnail_url(path, width: int) -> Optional[str]:
+    """縮小版の配信URL（width は THUMBNAIL_WIDTHS のいずれか）"""
+    base_url = ensure_server()
+    location = _split_root(path) if base_url else None
+    if location is None or width not in THUMBNAIL_WIDTHS or not _servable(location[1]) or not Path(path).is_file():
+        return None
+    root, relative = location
+    return f"{base_url}/thumbs/{width}/{root}/{quote(relative.as_posix())}?v={etag_for(Path(path))}"
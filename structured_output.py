@@ -0,0 +1,246 @@
+"""
+Claude のツール呼び出しを使った構造化出力
+自由文から正規表現で JSON を抜き出す代わりに、スキーマを持つツールを強制的に使わせて
+結果を検証する。検証に失敗したときは、エラー内容だけを伝える修正依頼を1回だけ送る。
+
+成功・修正・失敗の回数は種類ごとに集計し、parse_metrics() で取得できる
+"""
+
+import threading
+from typing import Any, Dict, List, Optional
+
+
+# =====================================
+# スキーマ定義
+# =====================================
+
+SNS_CONTENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "headline": {"type": "string", "description": "メイン見出し（15文字以内推奨）"},
+        "sub_text": {"type": "string", "description": "サブテキスト（30文字以内推奨）"},
+        "accent_text": {"type": "string", "description": "強調したいキーワード（5文字以内）"},
+        "body_points": {
+            "type": "array",
+            "items": {"type": "string"},
+            "minItems": 1,
+            "description": "本文ポイント（箇条書き用）"
+        },
+        "cta_text": {"type": "string", "description": "行動喚起テキスト（CTAページ用）"},
+        "icon_suggestion": {"type": "string", "description": "推奨アイコン種類"},
+        "layout_suggestion": {"type": "string", "description": "推奨レイアウト"}
+    },
+    "required": [
+        "headline", "sub_text", "accent_text", "body_points",
+        "cta_text", "icon_suggestion", "layout_suggestion"
+    ]
+}
+
+THEME_VARIATIONS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "themes": {
+            "type": "array",
+            "items": {"type": "string"},
+            "minItems": 1,
+            "description": "投稿テーマのバリエーション"
+        }
+    },
+    "required": ["themes"]
+}
+
+BLOG_ARTICLE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string", "description": "記事タイトル（SEOを意識した魅力的なタイトル）"},
+        "content": {"type": "string", "description": "記事本文（Markdown形式、見出しは##や###を使用）"},
+        "meta_description": {"type": "string", "description": "メタディスクリプション（120文字以内）"},
+        "used_keywords": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "実際に使用したキーワードのリスト"
+        }
+    },
+    "required": ["title", "content", "meta_description", "used_keywords"]
+}
+
+# ストリーミング出力の末尾のメタ情報（BLOG_META_MARKER の後のJSON）
+BLOG_META_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "meta_description": BLOG_ARTICLE_SCHEMA["properties"]["meta_description"],
+        "used_keywords": BLOG_ARTICLE_SCHEMA["properties"]["used_keywords"],
+    },
+    "required": ["meta_description", "used_keywords"]
+}
+
+
+# =====================================
+# 検証
+# =====================================
+
+_JSON_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+}
+
+
+def validate(data: Any, schema: Dict[str, Any], path: str = "$") -> List[str]:
+    """
+    JSON Schema のサブセット（type / properties / required / items / minItems / maxItems / enum）で検証
+
+    Returns:
+        エラーメッセージのリスト（空なら妥当）
+    """
+    expected = schema.get("type")
+    if expected:
+        # bool は int のサブクラスなので数値としては扱わない
+        wrong_type = not isinstance(data, _JSON_TYPES[expected]) or (
+            expected in ("integer", "number") and isinstance(data, bool)
+        )
+        if wrong_type:
+            return [f"{path}: {expected} であるべきところが {type(data).__name__} です"]
+
+    errors = []
+    if "enum" in schema and data not in schema["enum"]:
+        errors.append(f"{path}: {schema['enum']} のいずれかである必要があります")
+
+    if expected == "object":
+        for key in schema.get("required", []):
+            if key not in data:
+                errors.append(f"{path}.{key}: 必須項目がありません")
+        for key, sub_schema in schema.get("properties", {}).items():
+            if key in data:
+                errors.extend(validate(data[key], sub_schema, f"{path}.{key}"))
+
+    if expected == "array":
+        if len(data) < schema.get("minItems", 0):
+            errors.append(f"{path}: {schema['minItems']} 件以上必要です（{len(data)} 件）")
+        if "maxItems" in schema and len(data) > schema["maxItems"]:
+            errors.append(f"{path}: {schema['maxItems']} 件以下にしてください（{len(data)} 件）")
+        if "items" in schema:
+            for i, item in enumerate(data):
+                errors.extend(validate(item, schema["items"], f"{path}[{i}]"))
+
+    return errors
+
+
+# =====================================
+# 集計
+# =====================================
+
+_metrics_lock = threading.Lock()
+_metrics: Dict[str, Dict[str, int]] = {}
+
+
+def record_outcome(kind: str, outcome: str) -> None:
+    """結果を集計する（outcome: ok / repaired / failed）"""
+    with _metrics_lock:
+        counts = _metrics.setdefault(kind, {"calls": 0, "ok": 0, "repaired": 0, "failed": 0})
+        counts["calls"] += 1
+        counts[outcome] += 1
+
+
+def parse_metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    種類ごとの構造化出力の結果を返す
+
+    Returns:
+        {kind: {"calls", "ok", "repaired", "failed", "failure_rate", "repair_rate"}}
+    """
+    with _metrics_lock:
+        snapshot = {kind: dict(counts) for kind, counts in _metrics.items()}
+    for counts in snapshot.values():
+        calls = counts["calls"] or 1
+        counts["failure_rate"] = round(counts["failed"] / calls, 4)
+        counts["repair_rate"] = round(counts["repaired"] / calls, 4)
+    return snapshot
+
+
+def reset_metrics() -> None:
+    """集計をリセット（ベンチマーク用）"""
+    with _metrics_lock:
+        _metrics.clear()
+
+
+# =====================================
+# 呼び出し
+# =====================================
+
+def _tool_input(message, tool_name: str) -> Optional[Dict[str, Any]]:
+    """応答から指定ツールの入力を取り出す"""
+    for block in message.content:
+        if getattr(block, "type", None) == "tool_use" and block.name == tool_name:
+            return block.input
+    return None
+
+
+def call_with_schema(
+    client,
+    kind: str,
+    tool_name: str,
+    tool_description: str,
+    schema: Dict[str, Any],
+    messages: List[Dict[str, Any]],
+    model: str = "claude-sonnet-4-20250514",
+    max_tokens: int = 1000,
+    system: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    ツールの使用を強制して構造化出力を得る。検証に失敗したら修正依頼を1回だけ送る
+
+    Args:
+        client: anthropic.Anthropic
+        kind: 集計用の種類名（"sns_content" など）
+        tool_name: ツール名
+        tool_description: ツールの説明
+        schema: ツールの input_schema（検証にも使う）
+        messages: 送るメッセージ
+        model, max_tokens, system: messages.create にそのまま渡す
+
+    Returns:
+        検証済みの辞書。修正後も不正なら None（呼び出し側のフォールバックに任せる）
+    """
+    request = {
+        "model": model,
+        "max_tokens": max_tokens,
+        "tools": [{"name": tool_name, "description": tool_description, "input_schema": schema}],
+        "tool_choice": {"type": "tool", "name": tool_name},
+    }
+    if system:
+        request["system"] = system
+
+    message = client.messages.create(messages=messages, **request)
+    data = _tool_input(message, tool_name)
+    errors = validate(data, schema) if data is not None else [f"{tool_name} ツールが使われていません"]
+    if not errors:
+        record_outcome(kind, "ok")
+        return data
+
+    # 全体を作り直すのではなく、どこが不正かだけを伝えて出し直してもらう
+    print(f"⚠️ 構造化出力の検証エラー（{kind}）: {errors}")
+    tool_use = next((b for b in message.content if getattr(b, "type", None) == "tool_use"), None)
+    error_text = "次の点を修正して、同じツールでもう一度出力してください:\n" + "\n".join(f"- {e}" for e in errors)
+    if tool_use is not None:
+        repair_turn = [{"type": "tool_result", "tool_use_id": tool_use.id, "is_error": True, "content": error_text}]
+    else:
+        repair_turn = error_text
+
+    message = client.messages.create(
+        messages=messages + [
+            {"role": "assistant", "content": message.content},
+            {"role": "user", "content": repair_turn}
+        ],
+        **request
+    )
+    data = _tool_input(message, tool_name)
+    if data is not None and not validate(data, schema):
+        record_outcome(kind, "repaired")
+        return data
+
+    record_outcome(kind, "failed")
+    return None
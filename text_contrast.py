@@ -0,0 +1,231 @@
+"""
+SNS 画像の文字の読みやすさ（ローカル・NumPy）
+生成画像の中の文字がありそうな領域を推定し、文字と周りの背景の輝度コントラスト（WCAG のコントラスト比）を測る
+
+- 縮小した画像を CELL 四方のセルに分け、エッジが密でセル内の明暗が2色にはっきり分かれるセルを文字のセルとする
+- 横につながった文字のセルをまとめて領域にする（1行の見出し・本文のかたまり）
+- 領域の画素を明るさで2つに分け（大津の方法）、少ない方を文字、多い方を背景としてコントラスト比を出す
+
+WCAG の基準: 4.5 以上（通常の文字 AA）、3.0 以上（大きな文字 AA）、7.0 以上（AAA）
+SNS の見出しは大きな文字なので 3.0 を読める目安にする（LEGIBLE_CONTRAST）
+"""
+
+import math
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Union
+
+import numpy as np
+
+from brand_palette import downscale
+
+
+# 解析は縮小した画像で行う（長辺）
+ANALYSIS_LONG_EDGE = 512
+
+# 文字領域を探すセルの一辺（縮小後の px）
+CELL = 8
+
+# 隣の画素との明るさ（0〜1）の差がこれ以上ならエッジ（読みにくい薄い文字も拾えるよう低めにする）
+EDGE_THRESHOLD = 0.06
+
+# エッジの画素がこの割合以上のセルを文字の候補にする
+EDGE_DENSITY = 0.12
+
+# セル内の明るさの幅（最大 - 最小）がこれ以上ないと文字にしない（のっぺりした面を除く）
+CELL_RANGE = 0.1
+
+# セル内で明るさが中間（幅の 30〜70%）の画素がこの割合を超えたら文字にしない
+# 文字は線と背景の2色にはっきり分かれるが、写真の細かな模様・ノイズは中間の明るさが多い
+MAX_MIDTONE = 0.35
+
+# 領域とみなす最小のセル数と、横幅の最小のセル数
+MIN_REGION_CELLS = 6
+MIN_REGION_WIDTH = 3
+
+# 文字の色として使う、文字側の画素の分位（背景から遠い側から数えた %）
+TEXT_PERCENTILE = 10
+
+# 読めるとみなすコントラスト比（WCAG の大きな文字 AA）
+LEGIBLE_CONTRAST = 3.0
+
+WCAG_LEVELS = [(7.0, "AAA"), (4.5, "AA"), (3.0, "AA Large")]
+
+# sRGB（0〜255）→ 相対輝度の線形値
+_LINEAR = np.where(
+    np.arange(256) / 255.0 <= 0.04045,
+    np.arange(256) / 255.0 / 12.92,
+    ((np.arange(256) / 255.0 + 0.055) / 1.055) ** 2.4,
+).astype(np.float32)
+_LUMINANCE_WEIGHTS = np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+
+
+def contrast_ratio(l1: float, l2: float) -> float:
+    """WCAG のコントラスト比（l1・l2 は相対輝度 0〜1）"""
+    high, low = max(l1, l2), min(l1, l2)
+    return (high + 0.05) / (low + 0.05)
+
+
+def wcag_level(ratio: float) -> str:
+    return next((level for threshold, level in WCAG_LEVELS if ratio >= threshold), "不合格")
+
+
+def relative_luminance(rgb: np.ndarray) -> np.ndarray:
+    """0〜255 の (H, W, 3) 配列を相対輝度（0〜1）の (H, W) 配列にする"""
+    return _LINEAR[rgb] @ _LUMINANCE_WEIGHTS
+
+
+def text_cells(gray: np.ndarray) -> np.ndarray:
+    """
+    文字がありそうなセルの真偽値の (行, 列) 配列
+
+    gray は 0〜1 の明るさ（ガンマ補正後。人の見た目に近いのでエッジの判定に使う）
+    """
+    rows, cols = gray.shape[0] // CELL, gray.shape[1] // CELL
+    gray = gray[:rows * CELL, :cols * CELL]
+
+    edges = np.zeros(gray.shape, dtype=bool)
+    edges[:, 1:] |= np.abs(np.diff(gray, axis=1)) >= EDGE_THRESHOLD
+    edges[1:, :] |= np.abs(np.diff(gray, axis=0)) >= EDGE_THRESHOLD
+
+    blocks = gray.reshape(rows, CELL, cols, CELL)
+    density = edges.reshape(rows, CELL, cols, CELL).mean(axis=(1, 3))
+    low = blocks.min(axis=(1, 3))
+    spread = blocks.max(axis=(1, 3)) - low
+    level = (blocks - low[:, None, :, None]) / np.maximum(spread, 1e-6)[:, None, :, None]
+    midtone = ((level > 0.3) & (level < 0.7)).mean(axis=(1, 3))
+    cells = (density >= EDGE_DENSITY) & (spread >= CELL_RANGE) & (midtone <= MAX_MIDTONE)
+
+    # 文字と文字のすき間を埋める（左右1セル）
+    bridged = cells.copy()
+    bridged[:, 1:-1] |= cells[:, :-2] & cells[:, 2:]
+    return bridged
+
+
+def _label_regions(cells: np.ndarray) -> List[Dict[str, int]]:
+    """つながった（上下左右）セルのかたまりの外接矩形（セル単位）"""
+    seen = np.zeros_like(cells)
+    regions = []
+    for start in zip(*np.nonzero(cells)):
+        if seen[start]:
+            continue
+        seen[start] = True
+        stack, count = [start], 0
+        top, left, bottom, right = start[0], start[1], start[0], start[1]
+        while stack:
+            r, c = stack.pop()
+            count += 1
+            top, bottom, left, right = min(top, r), max(bottom, r), min(left, c), max(right, c)
+            for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                if 0 <= nr < cells.shape[0] and 0 <= nc < cells.shape[1] and cells[nr, nc] and not seen[nr, nc]:
+                    seen[nr, nc] = True
+                    stack.append((nr, nc))
+        if count >= MIN_REGION_CELLS and right - left + 1 >= MIN_REGION_WIDTH:
+            regions.append({"top": int(top), "left": int(left), "bottom": int(bottom) + 1, "right": int(right) + 1, "cells": count})
+    return regions
+
+
+def _otsu_split(values: np.ndarray) -> float:
+    """大津の方法で2つに分けるしきい値（values は 0〜1）"""
+    histogram, edges = np.histogram(values, bins=64, range=(0.0, 1.0))
+    centers = (edges[:-1] + edges[1:]) / 2
+    weight = np.cumsum(histogram)
+    total = weight[-1]
+    mean = np.cumsum(histogram * centers)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = ((mean[-1] * weight / total - mean) ** 2 / (weight * (total - weight)))[:-1]
+    if np.isnan(between).all():
+        return 0.5
+    return float(edges[1:-1][np.nanargmax(between)])
+
+
+def analyze_rgb(rgb: np.ndarray) -> Dict[str, Any]:
+    """
+    縮小済みの画像（0〜255 の (H, W, 3) 配列）の文字領域とコントラストを調べる
+
+    Returns:
+        {
+            "regions": [{"box": (left, top, right, bottom) 画像に対する割合 0〜1, "area", "contrast",
+                         "level", "text_luminance", "background_luminance"}]（面積の大きい順）,
+            "min_contrast": 領域のうち最も低いコントラスト比（文字が見つからなければ None）,
+            "headline_contrast": 最も大きい領域（見出し）のコントラスト比,
+            "legible": すべての領域が LEGIBLE_CONTRAST 以上か（文字が見つからなければ None）,
+            "score": 0〜1（最も低いコントラスト比を 1〜7 の対数で割り当てたもの。文字がなければ None）
+        }
+    """
+    gray = rgb.astype(np.float32) @ (_LUMINANCE_WEIGHTS / 255.0)
+    luminance = relative_luminance(rgb)
+    height, width = gray.shape
+
+    regions = []
+    for region in _label_regions(text_cells(gray)):
+        top, left = region["top"] * CELL, region["left"] * CELL
+        bottom, right = region["bottom"] * CELL, region["right"] * CELL
+        values = luminance[top:bottom, left:right].ravel()
+        # 大津の方法は見た目の明るさで分ける（線形の輝度だと暗い側に偏る）
+        split = gray[top:bottom, left:right].ravel() >= _otsu_split(gray[top:bottom, left:right].ravel())
+        bright, dark = values[split], values[~split]
+        if not len(bright) or not len(dark):
+            continue
+        # 文字は線が細いので画素の少ない方を文字、多い方を背景とする
+        # 文字の輪郭は縮小・アンチエイリアスで背景と混ざるので、文字の色は背景から最も遠い側（TEXT_PERCENTILE）で取る
+        if len(bright) < len(dark):
+            text_luminance = float(np.percentile(bright, 100 - TEXT_PERCENTILE))
+            background_luminance = float(np.median(dark))
+        else:
+            text_luminance = float(np.percentile(dark, TEXT_PERCENTILE))
+            background_luminance = float(np.median(bright))
+        ratio = contrast_ratio(text_luminance, background_luminance)
+        regions.append({
+            "box": (round(left / width, 3), round(top / height, 3), round(right / width, 3), round(bottom / height, 3)),
+            "area": round((bottom - top) * (right - left) / (width * height), 4),
+            "contrast": round(ratio, 2),
+            "level": wcag_level(ratio),
+            "text_luminance": round(text_luminance, 4),
+            "background_luminance": round(background_luminance, 4),
+        })
+
+    regions.sort(key=lambda r: r["area"], reverse=True)
+    if not regions:
+        return {"regions": [], "min_contrast": None, "headline_contrast": None, "legible": None, "score": None}
+    min_contrast = min(r["contrast"] for r in regions)
+    return {
+        "regions": regions,
+        "min_contrast": min_contrast,
+        "headline_contrast": regions[0]["contrast"],
+        "legible": min_contrast >= LEGIBLE_CONTRAST,
+        "score": round(min(1.0, math.log(min_contrast) / math.log(7.0)), 4),
+    }
+
+
+def analyze_legibility(source: Union[str, Path, BinaryIO, Any]) -> Dict[str, Any]:
+    """
+    画像ファイル（パス・ファイルオブジェクト、または PIL の画像）の文字の読みやすさを調べる
+
+    Returns:
+        analyze_rgb と同じ辞書
+    """
+    from PIL import Image
+
+    if isinstance(source, Image.Image):
+        return analyze_rgb(downscale(source, ANALYSIS_LONG_EDGE))
+    with Image.open(source) as image:
+        return analyze_rgb(downscale(image, ANALYSIS_LONG_EDGE))
+
+
+def rank_legibility(paths: List[Path]) -> List[Dict[str, Any]]:
+    """
+    複数の画像（カルーセルの全ページなど）を読みにくい順に並べる
+
+    Returns:
+        [{"image_path": str, **analyze_rgb の結果}]（文字が見つからない画像・読めなかった画像は最後）
+    """
+    results = []
+    for path in paths:
+        try:
+            result = analyze_legibility(path)
+        except Exception as e:
+            print(f"⚠️ 文字のコントラストを調べられませんでした: {Path(path).name}: {e}")
+            result = {"regions": [], "min_contrast": None, "headline_contrast": None, "legible": None, "score": None}
+        results.append({"image_path": str(path), **result})
+    results.sort(key=lambda r: (r["min_contrast"] is None, r["min_contrast"] or 0))
+    return results
@@ -0,0 +1,1160 @@
+"""
+UIカタログ（静的データ）
+見出し・サブテキスト・ページ構成・ブログ構成・アイコン・CSS などの定数をまとめたモジュール
+
+Streamlit はリランのたびに app.py を先頭から実行し直すため、app.py に直接書いた
+リテラルは毎回作り直される。ここに置いたものはプロセスごとに一度だけ組み立てられ、
+全セッションで共有されるので、テンプレート類は読み取り専用にしている。
+"""
+
+import re
+from functools import lru_cache
+from types import MappingProxyType
+
+
+def _freeze(value):
+    """dict / list を読み取り専用（MappingProxyType / tuple）に変換する"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _minify_css(css: str) -> str:
+    """コメントと余分な空白を取り除く（リランごとにブラウザへ送るサイズを減らす）"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return css.strip()
+
+
+# =====================================
+# カスタムCSS（テック系企業風・ネイビーベース）
+# =====================================
+
+CUSTOM_CSS = _minify_css("""
+<style>
+    /* ===== 基本設定 ===== */
+    @import url('https://fonts.googleapis.com/css2?family=Noto+Sans+JP:wght@300;400;500;700&display=swap');
+
+    .stApp {
+        background: linear-gradient(135deg, #0a1628 0%, #0d2b45 50%, #0f3352 100%);
+        font-family: 'Noto Sans JP', -apple-system, BlinkMacSystemFont, sans-serif;
+    }
+
+    /* ===== サイドバー ===== */
+    section[data-testid="stSidebar"] {
+        background: linear-gradient(180deg, #0d2b45 0%, #081c30 100%);
+        border-right: 1px solid rgba(255, 107, 53, 0.2);
+    }
+
+    section[data-testid="stSidebar"] .stMarkdown {
+        color: #e8eef4;
+    }
+
+    section[data-testid="stSidebar"] h1,
+    section[data-testid="stSidebar"] h2,
+    section[data-testid="stSidebar"] h3 {
+        color: #ffffff !important;
+        font-weight: 500;
+        letter-spacing: 0.02em;
+    }
+
+    section[data-testid="stSidebar"] .stSelectbox label,
+    section[data-testid="stSidebar"] .stMultiSelect label,
+    section[data-testid="stSidebar"] .stCheckbox label,
+    section[data-testid="stSidebar"] .stRadio label {
+        color: #ffffff !important;
+        font-weight: 500;
+    }
+
+    section[data-testid="stSidebar"] hr {
+        border-color: rgba(255, 107, 53, 0.3);
+    }
+
+    /* ===== メインコンテンツ ===== */
+    .main .block-container {
+        padding-top: 2rem;
+    }
+
+    /* ヘッダー */
+    .main-header {
+        color: #ffffff;
+        font-size: 2rem;
+        font-weight: 700;
+        letter-spacing: 0.05em;
+        margin-bottom: 0.25rem;
+        text-shadow: 0 2px 4px rgba(0,0,0,0.3);
+    }
+
+    .sub-header {
+        color: rgba(255, 255, 255, 0.85);
+        font-size: 0.95rem;
+        font-weight: 400;
+        letter-spacing: 0.03em;
+        margin-bottom: 2rem;
+    }
+
+    /* 見出し */
+    .stMarkdown h1, .stMarkdown h2, .stMarkdown h3 {
+        color: #ffffff !important;
+        font-weight: 500;
+    }
+
+    .stMarkdown p, .stMarkdown li {
+        color: #ffffff;
+    }
+
+    /* ===== タブ ===== */
+    .stTabs [data-baseweb="tab-list"] {
+        background: rgba(13, 43, 69, 0.6);
+        border-radius: 8px 8px 0 0;
+        padding: 0.5rem 0.5rem 0;
+        gap: 4px;
+        border-bottom: 2px solid rgba(255, 107, 53, 0.4);
+    }
+
+    .stTabs [data-baseweb="tab"] {
+        background: transparent;
+        color: rgba(255, 255, 255, 0.6);
+        border: none;
+        border-radius: 6px 6px 0 0;
+        padding: 0.75rem 1.5rem;
+        font-weight: 500;
+        font-size: 0.9rem;
+        letter-spacing: 0.02em;
+        transition: all 0.2s ease;
+    }
+
+    .stTabs [data-baseweb="tab"]:hover {
+        background: rgba(255, 107, 53, 0.15);
+        color: #ffffff;
+    }
+
+    .stTabs [aria-selected="true"] {
+        background: rgba(255, 107, 53, 0.25) !important;
+        color: #ff6b35 !important;
+        border-bottom: 2px solid #ff6b35;
+    }
+
+    .stTabs [data-baseweb="tab-panel"] {
+        background: rgba(8, 28, 48, 0.5);
+        border-radius: 0 0 8px 8px;
+        padding: 1.5rem;
+        border: 1px solid rgba(255, 107, 53, 0.1);
+        border-top: none;
+    }
+
+    /* ===== フォーム要素 ===== */
+    .stSelectbox > div > div,
+    .stMultiSelect > div > div,
+    .stTextInput > div > div > input,
+    .stTextArea > div > div > textarea {
+        background: rgba(8, 28, 48, 0.8) !important;
+        border: 1px solid rgba(255, 107, 53, 0.2) !important;
+        border-radius: 6px !important;
+        color: #ffffff !important;
+        transition: all 0.2s ease;
+    }
+
+    .stSelectbox > div > div:hover,
+    .stMultiSelect > div > div:hover,
+    .stTextInput > div > div > input:hover,
+    .stTextArea > div > div > textarea:hover {
+        border-color: rgba(255, 107, 53, 0.5) !important;
+    }
+
+    .stSelectbox > div > div:focus-within,
+    .stMultiSelect > div > div:focus-within,
+    .stTextInput > div > div > input:focus,
+    .stTextArea > div > div > textarea:focus {
+        border-color: #ff6b35 !important;
+        box-shadow: 0 0 0 2px rgba(255, 107, 53, 0.2) !important;
+    }
+
+    .stSelectbox label,
+    .stMultiSelect label,
+    .stTextInput label,
+    .stTextArea label,
+    .stSlider label,
+    .stCheckbox label {
+        color: #ffffff !important;
+        font-weight: 500;
+        font-size: 0.9rem;
+    }
+
+    /* プレースホルダー */
+    .stTextInput > div > div > input::placeholder,
+    .stTextArea > div > div > textarea::placeholder {
+        color: rgba(184, 201, 217, 0.5) !important;
+    }
+
+    /* チェックボックス - ラベルテキストを白色に強制 */
+    .stCheckbox label,
+    .stCheckbox label span,
+    .stCheckbox label p,
+    .stCheckbox > label > span,
+    .stCheckbox [data-testid="stCheckbox"] label,
+    div[data-testid="stCheckbox"] label,
+    div[data-testid="stCheckbox"] label span,
+    div[data-testid="stCheckbox"] p {
+        color: #ffffff !important;
+    }
+
+    /* ラジオボタン - ラベルテキストを白色に強制 */
+    .stRadio label,
+    .stRadio label span,
+    .stRadio label p,
+    .stRadio > label > span,
+    div[data-testid="stRadio"] label,
+    div[data-testid="stRadio"] label span,
+    div[data-testid="stRadio"] p {
+        color: #ffffff !important;
+    }
+
+    /* スライダー */
+    .stSlider > div > div > div > div {
+        background: #ff6b35 !important;
+    }
+
+    /* ===== ボタン ===== */
+    .stButton > button {
+        background: linear-gradient(135deg, #ff6b35 0%, #e55a2b 100%);
+        color: #ffffff;
+        font-weight: 600;
+        border: none;
+        border-radius: 6px;
+        padding: 0.75rem 2rem;
+        font-size: 0.95rem;
+        letter-spacing: 0.03em;
+        transition: all 0.3s ease;
+        box-shadow: 0 4px 15px rgba(255, 107, 53, 0.3);
+    }
+
+    .stButton > button:hover {
+        background: linear-gradient(135deg, #ff7a4a 0%, #ff6b35 100%);
+        box-shadow: 0 6px 20px rgba(255, 107, 53, 0.4);
+        transform: translateY(-1px);
+    }
+
+    .stButton > button:active {
+        transform: translateY(0);
+    }
+
+    /* プライマリボタン */
+    .stButton > button[kind="primary"] {
+        background: linear-gradient(135deg, #ff6b35 0%, #e55a2b 100%);
+    }
+
+    /* ===== 情報ボックス ===== */
+    .stAlert {
+        background: rgba(13, 43, 69, 0.8) !important;
+        border: 1px solid rgba(255, 107, 53, 0.3) !important;
+        border-radius: 8px !important;
+        color: #e8eef4 !important;
+    }
+
+    .stAlert > div {
+        color: #e8eef4 !important;
+    }
+
+    /* 成功メッセージ */
+    .stSuccess {
+        background: rgba(39, 174, 96, 0.15) !important;
+        border: 1px solid rgba(39, 174, 96, 0.4) !important;
+    }
+
+    /* エラーメッセージ */
+    .stError {
+        background: rgba(231, 76, 60, 0.15) !important;
+        border: 1px solid rgba(231, 76, 60, 0.4) !important;
+    }
+
+    /* 警告メッセージ */
+    .stWarning {
+        background: rgba(241, 196, 15, 0.15) !important;
+        border: 1px solid rgba(241, 196, 15, 0.4) !important;
+    }
+
+    /* ===== エキスパンダー ===== */
+    .streamlit-expanderHeader {
+        background: rgba(13, 43, 69, 0.6) !important;
+        border: 1px solid rgba(255, 107, 53, 0.2) !important;
+        border-radius: 6px !important;
+        color: #ffffff !important;
+        font-weight: 500;
+    }
+
+    .streamlit-expanderHeader:hover {
+        border-color: rgba(255, 107, 53, 0.4) !important;
+    }
+
+    .streamlit-expanderContent {
+        background: rgba(8, 28, 48, 0.5) !important;
+        border: 1px solid rgba(255, 107, 53, 0.1) !important;
+        border-top: none !important;
+        border-radius: 0 0 6px 6px !important;
+    }
+
+    /* ===== 区切り線 ===== */
+    hr {
+        border-color: rgba(255, 107, 53, 0.2) !important;
+    }
+
+    /* ===== スピナー ===== */
+    .stSpinner > div {
+        border-top-color: #ff6b35 !important;
+    }
+
+    /* ===== ダウンロードボタン ===== */
+    .stDownloadButton > button {
+        background: transparent !important;
+        border: 2px solid #ff6b35 !important;
+        color: #ff6b35 !important;
+    }
+
+    .stDownloadButton > button:hover {
+        background: rgba(255, 107, 53, 0.1) !important;
+    }
+
+    /* ===== コードブロック ===== */
+    .stCodeBlock {
+        background: rgba(8, 28, 48, 0.9) !important;
+        border: 1px solid rgba(255, 107, 53, 0.2) !important;
+        border-radius: 6px !important;
+    }
+
+    /* ===== 全般的なテキスト要素を白色に ===== */
+    .stCaption,
+    .stCaption p,
+    div[data-testid="stCaptionContainer"] p,
+    .element-container p,
+    .stMarkdown small,
+    .stMarkdown em {
+        color: rgba(255, 255, 255, 0.8) !important;
+    }
+
+    /* ヘルプテキスト */
+    .stTooltipIcon,
+    div[data-testid="tooltipHoverTarget"] {
+        color: rgba(255, 255, 255, 0.6) !important;
+    }
+
+    /* 全てのspan, pタグのデフォルト色 */
+    .main .block-container span,
+    .main .block-container p {
+        color: #ffffff;
+    }
+
+    /* セレクトボックスの選択値 */
+    .stSelectbox > div > div,
+    .stMultiSelect > div > div {
+        color: #ffffff !important;
+    }
+
+    /* ===== 画像 ===== */
+    .stImage {
+        border-radius: 8px;
+        overflow: hidden;
+        box-shadow: 0 4px 20px rgba(0, 0, 0, 0.3);
+    }
+
+    /* ===== ラジオボタン ===== */
+    .stRadio > div {
+        background: transparent;
+    }
+
+    .stRadio > div > label {
+        color: #ffffff !important;
+    }
+
+    .stRadio > div > label > div {
+        color: #ffffff !important;
+    }
+
+    /* ラジオボタンのオプションテキスト */
+    .stRadio [data-baseweb="radio"] > div {
+        color: #ffffff !important;
+    }
+
+    /* ===== カスタムクラス ===== */
+    .tech-card {
+        background: rgba(13, 43, 69, 0.7);
+        border: 1px solid rgba(255, 107, 53, 0.2);
+        border-radius: 8px;
+        padding: 1.5rem;
+        margin: 1rem 0;
+        backdrop-filter: blur(10px);
+    }
+
+    .accent-text {
+        color: #ff6b35;
+        font-weight: 600;
+    }
+
+    .muted-text {
+        color: rgba(255, 255, 255, 0.8);
+        font-size: 0.85rem;
+    }
+
+    /* フッター */
+    .footer-text {
+        color: rgba(255, 255, 255, 0.6);
+        font-size: 0.8rem;
+        text-align: center;
+        padding: 2rem 0;
+        border-top: 1px solid rgba(255, 107, 53, 0.1);
+        margin-top: 2rem;
+    }
+
+    /* ===== マルチセレクトのタグ ===== */
+    .stMultiSelect [data-baseweb="tag"] {
+        background: rgba(255, 107, 53, 0.2) !important;
+        border: 1px solid rgba(255, 107, 53, 0.4) !important;
+        color: #ffffff !important;
+    }
+
+    /* ===== セレクトボックスのドロップダウン ===== */
+    [data-baseweb="popover"] {
+        background: #0d2b45 !important;
+        border: 1px solid rgba(255, 107, 53, 0.3) !important;
+    }
+
+    [data-baseweb="menu"] {
+        background: #0d2b45 !important;
+    }
+
+    [data-baseweb="menu"] li {
+        color: #ffffff !important;
+    }
+
+    /* セレクトボックスの選択されたテキスト */
+    .stSelectbox [data-baseweb="select"] > div {
+        color: #ffffff !important;
+    }
+
+    /* セレクトボックスのプレースホルダーとテキスト */
+    [data-baseweb="select"] span {
+        color: #ffffff !important;
+    }
+
+    /* Expander内のテキスト */
+    .streamlit-expanderContent p,
+    .streamlit-expanderContent li,
+    .streamlit-expanderContent span {
+        color: #ffffff !important;
+    }
+
+    /* info, success, warning, errorメッセージ内のテキスト */
+    .stAlert p {
+        color: #ffffff !important;
+    }
+
+    /* スライダーの値表示 */
+    .stSlider > div > div > div > span {
+        color: #ffffff !important;
+    }
+
+    /* トグルボタンのテキスト */
+    .stToggle label span {
+        color: #ffffff !important;
+    }
+
+    [data-baseweb="menu"] li:hover {
+        background: rgba(255, 107, 53, 0.2) !important;
+    }
+</style>
+""")
+
+# =====================================
+# 定数定義
+# =====================================
+
+TRAINERS = {
+    "岡田": "okada",
+    "山本": "yamamoto",
+    "板倉": "itakura",
+    "葛本": "kuzumoto"
+}
+
+LOCATIONS = {
+    "島田本町": "shimadahonmachi",
+    "伊福町": "ifukucho"
+}
+
+# ギャラリーで絞り込むモード（output_index に記録する mode）
+OUTPUT_MODES = {
+    "promo": "宣材写真",
+    "sns": "SNS投稿",
+    "carousel": "Instagram複数ページ",
+    "unknown": "不明（以前の画像）"
+}
+
+# 宣材写真用シチュエーション
+SITUATIONS = {
+    "カウンセリング・相談": "consultation",
+    "姿勢チェック・診断": "posture_check",
+    "セッション風景（落ち着いた雰囲気）": "training_session",
+    "食事相談・説明": "nutrition_counseling",
+    "施設内観（人物なし）": "interior",
+    "図解・インフォグラフィック": "infographic",
+    "目標達成で喜ぶ風景": "goal_achievement"
+}
+
+# SNS投稿タイプ
+SNS_POST_TYPES = {
+    "Google Map": {
+        "月曜：3軸診断の紹介": "3axis_intro",
+        "火曜：お客様の成果報告": "customer_success",
+        "水曜：施設・設備の紹介": "facility_intro",
+        "木曜：トレーナー紹介": "trainer_intro",
+        "金曜：よくある質問": "faq",
+        "土曜：健康・運動の豆知識": "health_tips",
+        "日曜：空き状況・キャンペーン": "availability"
+    },
+    "Instagram": {
+        "教育系：セルフチェック・知識": "education",
+        "共感系：悩み→解決": "empathy",
+        "信頼系：お客様の声・実績": "trust"
+    }
+}
+
+# =====================================
+# Instagram複数ページ投稿用定義
+# =====================================
+
+# 投稿テーマ（大カテゴリ）
+INSTAGRAM_THEMES = {
+    "ジム継続の悩み": "gym_continuation",
+    "ダイエットの悩み": "diet_problem",
+    "姿勢改善": "posture_improvement",
+    "3軸診断の解説": "3axis_explanation",
+    "食事・栄養": "nutrition",
+    "運動習慣づくり": "exercise_habit",
+    "年代別のお悩み": "age_specific",
+    "お客様の声・成果": "customer_voice",
+    "トレーナー紹介": "trainer_intro",
+    "よくある質問": "faq",
+    "施設・設備紹介": "facility",
+    "キャンペーン・お知らせ": "campaign"
+}
+
+# 見出しテンプレート（テーマごと）
+HEADLINE_TEMPLATES = _freeze({
+    "ジム継続の悩み": [
+        "「ジムが続かない」本当の理由",
+        "なぜ3ヶ月で挫折するのか",
+        "意志が弱いから続かない？",
+        "ジム選びで失敗する人の特徴",
+        "続けられる人と続けられない人の違い",
+        "週1回でも効果は出る？",
+        "モチベーションが続かない時の対処法",
+        "「忙しい」は言い訳じゃない",
+        "完璧主義がジム継続を妨げる",
+        "パーソナルと24時間ジムの違い"
+    ],
+    "ダイエットの悩み": [
+        "食べないダイエットが失敗する理由",
+        "リバウンドを繰り返す人の共通点",
+        "糖質制限は本当に効果的？",
+        "40代からのダイエットが難しい理由",
+        "痩せたいのに痩せられない本当の原因",
+        "体重が減らない停滞期の乗り越え方",
+        "「食べてないのに太る」の真実",
+        "ダイエット成功に必要な3つのこと",
+        "極端な食事制限のリスク",
+        "健康的に痩せるペースとは"
+    ],
+    "姿勢改善": [
+        "デスクワークで姿勢が悪くなる理由",
+        "猫背を治すと印象が変わる",
+        "肩こり・腰痛と姿勢の関係",
+        "反り腰チェック方法",
+        "巻き肩の原因と改善法",
+        "ストレートネックのリスク",
+        "姿勢改善で得られる5つのメリット",
+        "座り方を変えるだけで変わる",
+        "姿勢と自律神経の関係",
+        "30秒でできる姿勢チェック"
+    ],
+    "3軸診断の解説": [
+        "3軸診断とは？",
+        "姿勢軸：体の土台を整える",
+        "食事軸：無理なく続ける食習慣",
+        "継続軸：習慣化のメカニズム",
+        "なぜ3軸が必要なのか",
+        "1軸だけでは効果が出ない理由",
+        "3軸診断の流れ",
+        "診断結果の見方",
+        "あなたに合ったアプローチ",
+        "3軸で変わった人の声"
+    ],
+    "食事・栄養": [
+        "タンパク質、足りてますか？",
+        "1日に必要なタンパク質量",
+        "プロテインは必要？",
+        "コンビニで選ぶ高タンパク食",
+        "外食でも太らない選び方",
+        "お酒とダイエットの関係",
+        "間食をやめられない時の対処法",
+        "朝食を抜くとどうなる？",
+        "水分摂取の重要性",
+        "食事記録をつけるメリット"
+    ],
+    "運動習慣づくり": [
+        "運動が苦手でも大丈夫",
+        "週何回運動すればいい？",
+        "朝と夜、どちらが効果的？",
+        "筋トレと有酸素運動の違い",
+        "自宅でできる簡単エクササイズ",
+        "運動を習慣化するコツ",
+        "「時間がない」を解決する方法",
+        "運動嫌いが運動好きになるまで",
+        "続けやすい運動の選び方",
+        "パーソナルトレーニングのメリット"
+    ],
+    "年代別のお悩み": [
+        "30代からの体型変化",
+        "40代、代謝が落ちてきた",
+        "50代からでも遅くない",
+        "産後の体型戻し",
+        "更年期と体重の関係",
+        "30代男性の健康管理",
+        "40代ビジネスマンの運動習慣",
+        "シニア世代の筋力維持",
+        "年齢に合った運動強度",
+        "世代別おすすめトレーニング"
+    ],
+    "お客様の声・成果": [
+        "3ヶ月で-5kg達成",
+        "姿勢が変わって肩こり改善",
+        "服のサイズが2サイズダウン",
+        "体重より見た目が変わった",
+        "運動習慣が身についた",
+        "食事の意識が変わった",
+        "自分に自信が持てるように",
+        "周りから「痩せた？」と言われる",
+        "健康診断の数値が改善",
+        "リバウンドしなくなった"
+    ],
+    "トレーナー紹介": [
+        "トレーナー紹介：岡田",
+        "トレーナー紹介：山本",
+        "トレーナー紹介：板倉",
+        "トレーナー紹介：葛本",
+        "私がトレーナーになった理由",
+        "得意な指導スタイル",
+        "お客様へのメッセージ",
+        "トレーナーの1日",
+        "資格・経歴紹介",
+        "トレーニングへのこだわり"
+    ],
+    "よくある質問": [
+        "Q. どれくらいで効果が出る？",
+        "Q. 運動経験がなくても大丈夫？",
+        "Q. 食事制限は厳しい？",
+        "Q. 週1回でも効果はある？",
+        "Q. 予約は取りやすい？",
+        "Q. キャンセルはできる？",
+        "Q. 持ち物は何が必要？",
+        "Q. 無料カウンセリングの内容は？",
+        "Q. 料金プランについて",
+        "Q. 他のジムとの違いは？"
+    ],
+    "施設・設備紹介": [
+        "完全個室でプライベート空間",
+        "最新のトレーニング機器",
+        "清潔で快適な空間",
+        "シャワー・更衣室完備",
+        "駅から徒歩〇分の好立地",
+        "駐車場完備で車でも安心",
+        "島田本町店のご紹介",
+        "伊福町店のご紹介",
+        "店内ツアー",
+        "こだわりの設備"
+    ],
+    "キャンペーン・お知らせ": [
+        "今週の空き状況",
+        "新規入会キャンペーン",
+        "期間限定特別プラン",
+        "無料カウンセリング受付中",
+        "友達紹介キャンペーン",
+        "年末年始の営業案内",
+        "GW特別プログラム",
+        "夏までに変わりたい方へ",
+        "新トレーナー加入のお知らせ",
+        "営業時間変更のお知らせ"
+    ]
+})
+
+# サブテキストテンプレート
+SUBTEXT_TEMPLATES = _freeze({
+    "問題提起": [
+        "こんな悩みありませんか？",
+        "こんな経験ありませんか？",
+        "当てはまる方は要注意",
+        "心当たりはありませんか？",
+        "実は多くの方が悩んでいます"
+    ],
+    "原因説明": [
+        "その原因は...",
+        "実は〇〇が原因かも",
+        "知っていましたか？",
+        "多くの人が知らない事実",
+        "専門家が解説します"
+    ],
+    "解決策提示": [
+        "解決策は3つ",
+        "ポイントは〇〇",
+        "まずはここから始めよう",
+        "簡単にできる方法",
+        "FIREFITNESSなら解決できます"
+    ],
+    "メリット訴求": [
+        "こんなメリットがあります",
+        "〇〇で得られる効果",
+        "変化を実感できる",
+        "多くの方が効果を実感",
+        "始めて良かったの声多数"
+    ],
+    "行動喚起": [
+        "まずは無料カウンセリングへ",
+        "お気軽にご相談ください",
+        "今すぐ始めませんか？",
+        "変わるなら今です",
+        "一歩踏み出してみませんか？"
+    ],
+    "数値・実績": [
+        "平均-5kg達成",
+        "継続率90%以上",
+        "満足度98%",
+        "累計〇〇名が体験",
+        "3ヶ月で効果を実感"
+    ],
+    "リスト形式": [
+        "①〇〇\n②〇〇\n③〇〇",
+        "・ポイント1\n・ポイント2\n・ポイント3",
+        "STEP1→STEP2→STEP3",
+        "Before → After",
+        "原因 → 対策 → 結果"
+    ]
+})
+
+# アクセントテキストテンプレート
+ACCENT_TEMPLATES = [
+    "意志の弱さではありません",
+    "それ、間違いかもしれません",
+    "実は逆効果です",
+    "ここが重要ポイント",
+    "多くの人が見落としがち",
+    "プロが教える秘訣",
+    "これが成功の鍵",
+    "今すぐチェック",
+    "無料カウンセリング受付中",
+    "期間限定",
+    "先着〇名様限定",
+    "お見逃しなく",
+    "詳しくはプロフィールから",
+    "保存してあとで見返そう",
+    "友達にもシェアしてね"
+]
+
+# ページタイプ定義（1〜8ページ目）
+PAGE_TYPES = _freeze({
+    1: {
+        "name": "タイトルページ",
+        "description": "目を引くタイトルで興味を惹く",
+        "layouts": ["テキスト中心（シンプル）", "写真メイン＋テキスト"]
+    },
+    2: {
+        "name": "問題提起ページ",
+        "description": "読者の悩みに共感する",
+        "layouts": ["テキスト中心（シンプル）", "カード型（情報整理）"]
+    },
+    3: {
+        "name": "原因説明ページ",
+        "description": "なぜその問題が起きるのか解説",
+        "layouts": ["図解・インフォグラフィック", "ステップ・手順説明"]
+    },
+    4: {
+        "name": "解決策ページ",
+        "description": "具体的な解決方法を提示",
+        "layouts": ["ステップ・手順説明", "図解・インフォグラフィック"]
+    },
+    5: {
+        "name": "詳細説明ページ",
+        "description": "ポイントを詳しく解説",
+        "layouts": ["カード型（情報整理）", "図解・インフォグラフィック"]
+    },
+    6: {
+        "name": "実績・証拠ページ",
+        "description": "お客様の声や数値で信頼性UP",
+        "layouts": ["引用・お客様の声", "ビフォーアフター風（数値）"]
+    },
+    7: {
+        "name": "まとめページ",
+        "description": "ポイントを簡潔にまとめる",
+        "layouts": ["テキスト中心（シンプル）", "カード型（情報整理）"]
+    },
+    8: {
+        "name": "CTA（行動喚起）ページ",
+        "description": "次のアクションを促す",
+        "layouts": ["テキスト中心（シンプル）", "写真メイン＋テキスト"]
+    }
+})
+
+# ページ構成プリセット
+PAGE_PRESETS = {
+    "3ページ構成（シンプル）": [1, 4, 8],
+    "4ページ構成（基本）": [1, 2, 4, 8],
+    "5ページ構成（標準）": [1, 2, 3, 4, 8],
+    "6ページ構成（詳細）": [1, 2, 3, 4, 6, 8],
+    "7ページ構成（充実）": [1, 2, 3, 4, 5, 6, 8],
+    "8ページ構成（フル）": [1, 2, 3, 4, 5, 6, 7, 8]
+}
+
+# アイコンタイプ選択肢
+ICON_TYPES = [
+    "なし",
+    "3軸アイコン（姿勢・食事・継続）",
+    "チェックマーク",
+    "番号リスト（1,2,3...）",
+    "矢印・フロー",
+    "人物シルエット",
+    "ダンベル・運動器具",
+    "フォーク・ナイフ（食事）",
+    "時計・カレンダー",
+    "グラフ・チャート",
+    "星・評価マーク",
+    "ハート・健康",
+    "脳・メンタル",
+    "体のパーツ（筋肉・骨格）",
+    "吹き出し・会話",
+    "メダル・達成",
+    "スマホ・デジタル",
+    "ビル・店舗"
+]
+
+# フォントスタイル選択肢
+FONT_STYLES = [
+    "ゴシック体（モダン）",
+    "明朝体（上品）",
+    "丸ゴシック（親しみやすい）",
+    "太ゴシック（力強い）",
+    "細ゴシック（洗練）",
+    "手書き風（カジュアル）"
+]
+
+# 装飾要素選択肢
+DECORATION_OPTIONS = [
+    "なし",
+    "吹き出し",
+    "引用符",
+    "アンダーライン",
+    "背景図形（四角）",
+    "背景図形（丸）",
+    "枠線",
+    "影付き",
+    "グラデーション背景",
+    "ドット模様",
+    "ストライプ模様"
+]
+
+# 枠線スタイル選択肢
+BORDER_STYLES = [
+    "なし",
+    "細い枠（ネイビー）",
+    "細い枠（オレンジ）",
+    "細い枠（白）",
+    "太い枠（ネイビー）",
+    "太い枠（オレンジ）",
+    "角丸枠（ネイビー）",
+    "角丸枠（オレンジ）",
+    "ダブルライン",
+    "点線",
+    "破線"
+]
+
+# 雰囲気選択肢
+MOOD_OPTIONS = [
+    "落ち着いた・信頼感",
+    "やや落ち着いた",
+    "ニュートラル",
+    "やや活気ある",
+    "活気ある・エネルギッシュ",
+    "高級感・プレミアム",
+    "親しみやすい・カジュアル",
+    "シンプル・ミニマル",
+    "情熱的・モチベーション"
+]
+
+# 色の強さ選択肢
+COLOR_INTENSITY_OPTIONS = [
+    "淡い・パステル",
+    "やや淡い",
+    "標準",
+    "やや濃い",
+    "濃い・ビビッド"
+]
+
+# SNS投稿用レイアウトスタイル
+LAYOUT_STYLES = {
+    "テキスト中心（シンプル）": "text_centered",
+    "図解・インフォグラフィック": "infographic",
+    "写真メイン＋テキスト": "photo_with_text",
+    "カード型（情報整理）": "card_layout",
+    "引用・お客様の声": "testimonial",
+    "ステップ・手順説明": "step_by_step",
+    "ビフォーアフター風（数値）": "before_after_numbers",
+    "Q&A形式": "qa_format"
+}
+
+# テキスト配置オプション
+TEXT_POSITIONS = {
+    "上部": "top",
+    "中央": "center",
+    "下部": "bottom",
+    "左上": "top_left",
+    "右上": "top_right",
+    "左下": "bottom_left",
+    "右下": "bottom_right"
+}
+
+# テキストサイズ
+TEXT_SIZES = {
+    "極小": "xs",
+    "小": "small",
+    "中": "medium",
+    "大": "large",
+    "特大": "xl",
+    "極大": "xxl"
+}
+
+# 背景スタイル
+BACKGROUND_STYLES = {
+    "単色（白）": {"type": "solid", "color": "#ffffff", "opacity": 100},
+    "単色（ダークネイビー）": {"type": "solid", "color": "#0d2b45", "opacity": 100},
+    "単色（ライトグレー）": {"type": "solid", "color": "#f5f5f5", "opacity": 100},
+    "グラデーション（ネイビー→白）": {"type": "gradient", "colors": ["#0d2b45", "#ffffff"], "opacity": 100},
+    "グラデーション（オレンジ→白）": {"type": "gradient", "colors": ["#ff6b35", "#ffffff"], "opacity": 100},
+    "写真背景（透明度50%）": {"type": "photo", "color": "#000000", "opacity": 50},
+    "写真背景（透明度30%）": {"type": "photo", "color": "#000000", "opacity": 30},
+    "写真背景（透明度70%）": {"type": "photo", "color": "#000000", "opacity": 70},
+    "写真背景（白オーバーレイ50%）": {"type": "photo", "color": "#ffffff", "opacity": 50},
+}
+
+# アスペクト比
+ASPECT_RATIOS = {
+    "1:1（正方形・Instagram）": "1:1",
+    "4:5（縦長・Instagram）": "4:5",
+    "9:16（ストーリー・リール）": "9:16",
+    "16:9（横長）": "16:9",
+    "4:3（Google Map推奨）": "4:3",
+    "3:2": "3:2"
+}
+
+CLIENT_TYPES = {
+    "なし（人物なし）": None,
+    "30代女性": "30s_female",
+    "30代男性": "30s_male",
+    "40代女性": "40s_female",
+    "40代男性ビジネスマン": "40s_businessman",
+    "50代女性": "50s_female",
+    "50代男性": "50s_male",
+    "シニア女性（60代以上）": "senior_female",
+    "シニア男性（60代以上）": "senior_male",
+    "主婦層": "housewife"
+}
+
+# ブランドカラー
+BRAND_COLORS = {
+    "ダークネイビー（メイン）": "#0d2b45",
+    "オレンジ（アクセント）": "#ff6b35",
+    "白": "#ffffff",
+    "ライトグレー": "#f5f5f5",
+    "黒": "#000000"
+}
+
+# =====================================
+# ブログ投稿用定義
+# =====================================
+
+# ブログ記事カテゴリ
+BLOG_CATEGORIES = {
+    "ダイエット・体重管理": "diet",
+    "姿勢改善・体の歪み": "posture",
+    "筋力トレーニング": "strength",
+    "食事・栄養": "nutrition",
+    "運動習慣・継続のコツ": "habit",
+    "お客様の声・成功事例": "testimonial",
+    "健康・ウェルネス": "wellness",
+    "よくある質問": "faq",
+    "トレーナー紹介": "trainer",
+    "施設・サービス紹介": "facility"
+}
+
+# ブログ記事トーン
+BLOG_TONES = {
+    "専門的・信頼感": "professional",
+    "親しみやすい・カジュアル": "friendly",
+    "やる気を引き出す・モチベーション": "motivational",
+    "教育的・わかりやすい": "educational"
+}
+
+# ブログ記事構成テンプレート
+BLOG_STRUCTURES = _freeze({
+    "問題提起→解決策": {
+        "description": "読者の悩みを明確にし、解決策を提示する構成",
+        "sections": ["導入（問題提起）", "原因の説明", "解決策", "実践のポイント", "まとめ・CTA"]
+    },
+    "ハウツー・手順説明": {
+        "description": "ステップバイステップで方法を説明する構成",
+        "sections": ["導入", "準備・前提条件", "手順1", "手順2", "手順3", "注意点", "まとめ"]
+    },
+    "比較・検討": {
+        "description": "複数の選択肢を比較し、最適解を提示する構成",
+        "sections": ["導入", "選択肢Aの説明", "選択肢Bの説明", "比較表", "おすすめ", "まとめ"]
+    },
+    "お客様事例紹介": {
+        "description": "実際のお客様の変化・成功を紹介する構成",
+        "sections": ["導入", "お客様の悩み", "取り組み内容", "結果・変化", "お客様の声", "まとめ・CTA"]
+    },
+    "Q&A形式": {
+        "description": "よくある質問に答える形式の構成",
+        "sections": ["導入", "Q1", "Q2", "Q3", "Q4", "Q5", "まとめ"]
+    }
+})
+
+# ブログ記事の長さ
+BLOG_LENGTHS = {
+    "短め（800〜1200字）": "short",
+    "標準（1500〜2000字）": "medium",
+    "長め（2500〜3500字）": "long"
+}
+
+# キーワード（SEO用）
+BLOG_KEYWORDS = [
+    "パーソナルトレーニング",
+    "岡山 ジム",
+    "ダイエット",
+    "姿勢改善",
+    "3軸診断",
+    "筋トレ",
+    "体重管理",
+    "健康",
+    "運動習慣",
+    "個室ジム",
+    "マンツーマン指導",
+    "食事指導"
+]
+
+# カテゴリごとのおすすめトピック
+BLOG_TOPICS = _freeze({
+    "ダイエット・体重管理": [
+        "食べないダイエットが失敗する理由",
+        "リバウンドを繰り返す人の共通点",
+        "40代からのダイエットが難しい理由",
+        "健康的に痩せるペースとは",
+        "停滞期の乗り越え方"
+    ],
+    "姿勢改善・体の歪み": [
+        "デスクワークで姿勢が悪くなる理由",
+        "猫背を治すと印象が変わる",
+        "肩こり・腰痛と姿勢の関係",
+        "反り腰チェック方法",
+        "姿勢改善で得られるメリット"
+    ],
+    "筋力トレーニング": [
+        "筋トレ初心者が最初にやるべきこと",
+        "週何回筋トレすればいい？",
+        "自重トレーニングと器具トレーニングの違い",
+        "筋トレと有酸素運動の組み合わせ方",
+        "年齢別おすすめトレーニング"
+    ],
+    "食事・栄養": [
+        "タンパク質、足りてますか？",
+        "プロテインは必要？",
+        "コンビニで選ぶ高タンパク食",
+        "外食でも太らない選び方",
+        "朝食を抜くとどうなる？"
+    ],
+    "運動習慣・継続のコツ": [
+        "運動が苦手でも大丈夫",
+        "週何回運動すればいい？",
+        "運動を習慣化するコツ",
+        "「時間がない」を解決する方法",
+        "モチベーションが続かない時の対処法"
+    ],
+    "お客様の声・成功事例": [
+        "3ヶ月で-5kg達成された○○様",
+        "姿勢改善で肩こりが解消した事例",
+        "運動習慣が身についたお客様の声",
+        "体型変化を実感されたお客様",
+        "リバウンドしなくなった事例"
+    ],
+    "健康・ウェルネス": [
+        "運動と睡眠の関係",
+        "ストレス解消と運動の効果",
+        "健康診断の数値を改善する方法",
+        "自律神経を整える運動",
+        "免疫力を高める生活習慣"
+    ],
+    "よくある質問": [
+        "どれくらいで効果が出る？",
+        "運動経験がなくても大丈夫？",
+        "食事制限は厳しい？",
+        "週1回でも効果はある？",
+        "無料カウンセリングの内容は？"
+    ],
+    "トレーナー紹介": [
+        "トレーナーになった理由",
+        "得意な指導スタイル",
+        "お客様へのメッセージ",
+        "資格・経歴紹介",
+        "トレーニングへのこだわり"
+    ],
+    "施設・サービス紹介": [
+        "完全個室でプライベート空間",
+        "最新のトレーニング機器",
+        "清潔で快適な空間",
+        "アクセス・駐車場情報",
+        "料金プランのご案内"
+    ]
+})
+
+# =====================================
+# SVGアイコン定義
+# =====================================
+ICONS = _freeze({
+    "fire": '''<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M8.5 14.5A2.5 2.5 0 0 0 11 12c0-1.38-.5-2-1-3-1.072-2.143-.224-4.054 2-6 .5 2.5 2 4.9 4 6.5 2 1.6 3 3.5 3 5.5a7 7 0 1 1-14 0c0-1.153.433-2.294 1-3a2.5 2.5 0 0 0 2.5 2.5z"/></svg>''',
+    "settings": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="12" cy="12" r="3"/><path d="M19.4 15a1.65 1.65 0 0 0 .33 1.82l.06.06a2 2 0 0 1 0 2.83 2 2 0 0 1-2.83 0l-.06-.06a1.65 1.65 0 0 0-1.82-.33 1.65 1.65 0 0 0-1 1.51V21a2 2 0 0 1-2 2 2 2 0 0 1-2-2v-.09A1.65 1.65 0 0 0 9 19.4a1.65 1.65 0 0 0-1.82.33l-.06.06a2 2 0 0 1-2.83 0 2 2 0 0 1 0-2.83l.06-.06a1.65 1.65 0 0 0 .33-1.82 1.65 1.65 0 0 0-1.51-1H3a2 2 0 0 1-2-2 2 2 0 0 1 2-2h.09A1.65 1.65 0 0 0 4.6 9a1.65 1.65 0 0 0-.33-1.82l-.06-.06a2 2 0 0 1 0-2.83 2 2 0 0 1 2.83 0l.06.06a1.65 1.65 0 0 0 1.82.33H9a1.65 1.65 0 0 0 1-1.51V3a2 2 0 0 1 2-2 2 2 0 0 1 2 2v.09a1.65 1.65 0 0 0 1 1.51 1.65 1.65 0 0 0 1.82-.33l.06-.06a2 2 0 0 1 2.83 0 2 2 0 0 1 0 2.83l-.06.06a1.65 1.65 0 0 0-.33 1.82V9a1.65 1.65 0 0 0 1.51 1H21a2 2 0 0 1 2 2 2 2 0 0 1-2 2h-.09a1.65 1.65 0 0 0-1.51 1z"/></svg>''',
+    "building": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="4" y="2" width="16" height="20" rx="2" ry="2"/><path d="M9 22v-4h6v4"/><path d="M8 6h.01"/><path d="M16 6h.01"/><path d="M12 6h.01"/><path d="M12 10h.01"/><path d="M12 14h.01"/><path d="M16 10h.01"/><path d="M16 14h.01"/><path d="M8 10h.01"/><path d="M8 14h.01"/></svg>''',
+    "user": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M19 21v-2a4 4 0 0 0-4-4H9a4 4 0 0 0-4 4v2"/><circle cx="12" cy="7" r="4"/></svg>''',
+    "image": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="3" y="3" width="18" height="18" rx="2" ry="2"/><circle cx="8.5" cy="8.5" r="1.5"/><polyline points="21 15 16 10 5 21"/></svg>''',
+    "camera": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M14.5 4h-5L7 7H4a2 2 0 0 0-2 2v9a2 2 0 0 0 2 2h16a2 2 0 0 0 2-2V9a2 2 0 0 0-2-2h-3l-2.5-3z"/><circle cx="12" cy="13" r="3"/></svg>''',
+    "share": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="18" cy="5" r="3"/><circle cx="6" cy="12" r="3"/><circle cx="18" cy="19" r="3"/><line x1="8.59" y1="13.51" x2="15.42" y2="17.49"/><line x1="15.41" y1="6.51" x2="8.59" y2="10.49"/></svg>''',
+    "sliders": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><line x1="4" y1="21" x2="4" y2="14"/><line x1="4" y1="10" x2="4" y2="3"/><line x1="12" y1="21" x2="12" y2="12"/><line x1="12" y1="8" x2="12" y2="3"/><line x1="20" y1="21" x2="20" y2="16"/><line x1="20" y1="12" x2="20" y2="3"/><line x1="1" y1="14" x2="7" y2="14"/><line x1="9" y1="8" x2="15" y2="8"/><line x1="17" y1="16" x2="23" y2="16"/></svg>''',
+    "edit": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M11 4H4a2 2 0 0 0-2 2v14a2 2 0 0 0 2 2h14a2 2 0 0 0 2-2v-7"/><path d="M18.5 2.5a2.121 2.121 0 0 1 3 3L12 15l-4 1 1-4 9.5-9.5z"/></svg>''',
+    "type": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><polyline points="4 7 4 4 20 4 20 7"/><line x1="9" y1="20" x2="15" y2="20"/><line x1="12" y1="4" x2="12" y2="20"/></svg>''',
+    "palette": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="13.5" cy="6.5" r=".5"/><circle cx="17.5" cy="10.5" r=".5"/><circle cx="8.5" cy="7.5" r=".5"/><circle cx="6.5" cy="12.5" r=".5"/><path d="M12 2C6.5 2 2 6.5 2 12s4.5 10 10 10c.926 0 1.648-.746 1.648-1.688 0-.437-.18-.835-.437-1.125-.29-.289-.438-.652-.438-1.125a1.64 1.64 0 0 1 1.668-1.668h1.996c3.051 0 5.555-2.503 5.555-5.555C21.965 6.012 17.461 2 12 2z"/></svg>''',
+    "layout": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="3" y="3" width="18" height="18" rx="2" ry="2"/><line x1="3" y1="9" x2="21" y2="9"/><line x1="9" y1="21" x2="9" y2="9"/></svg>''',
+    "grid": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="3" y="3" width="7" height="7"/><rect x="14" y="3" width="7" height="7"/><rect x="14" y="14" width="7" height="7"/><rect x="3" y="14" width="7" height="7"/></svg>''',
+    "download": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"/><polyline points="7 10 12 15 17 10"/><line x1="12" y1="15" x2="12" y2="3"/></svg>''',
+    "book": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M4 19.5A2.5 2.5 0 0 1 6.5 17H20"/><path d="M6.5 2H20v20H6.5A2.5 2.5 0 0 1 4 19.5v-15A2.5 2.5 0 0 1 6.5 2z"/></svg>''',
+    "zap": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><polygon points="13 2 3 14 12 14 11 22 21 10 12 10 13 2"/></svg>''',
+    "check": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><polyline points="20 6 9 17 4 12"/></svg>''',
+    "sparkles": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="m12 3-1.912 5.813a2 2 0 0 1-1.275 1.275L3 12l5.813 1.912a2 2 0 0 1 1.275 1.275L12 21l1.912-5.813a2 2 0 0 1 1.275-1.275L21 12l-5.813-1.912a2 2 0 0 1-1.275-1.275L12 3Z"/><path d="M5 3v4"/><path d="M19 17v4"/><path d="M3 5h4"/><path d="M17 19h4"/></svg>''',
+    "send": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><line x1="22" y1="2" x2="11" y2="13"/><polygon points="22 2 15 22 11 13 2 9 22 2"/></svg>''',
+    "file-text": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M14 2H6a2 2 0 0 0-2 2v16a2 2 0 0 0 2 2h12a2 2 0 0 0 2-2V8z"/><polyline points="14 2 14 8 20 8"/><line x1="16" y1="13" x2="8" y2="13"/><line x1="16" y1="17" x2="8" y2="17"/><polyline points="10 9 9 9 8 9"/></svg>''',
+    "globe": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="12" cy="12" r="10"/><line x1="2" y1="12" x2="22" y2="12"/><path d="M12 2a15.3 15.3 0 0 1 4 10 15.3 15.3 0 0 1-4 10 15.3 15.3 0 0 1-4-10 15.3 15.3 0 0 1 4-10z"/></svg>''',
+    "calendar": '''<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="3" y="4" width="18" height="18" rx="2" ry="2"/><line x1="16" y1="2" x2="16" y2="6"/><line x1="8" y1="2" x2="8" y2="6"/><line x1="3" y1="10" x2="21" y2="10"/></svg>''',
+})
+
+
+@lru_cache(maxsize=None)
+def icon(name: str, color: str = "#ff6b35", size: int = 18) -> str:
+    """SVGアイコンをHTMLとして返す（name, color, size ごとに一度だけ組み立てる）"""
+    svg = ICONS.get(name, "")
+    styled_svg = svg.replace('width="18"', f'width="{size}"').replace('height="18"', f'height="{size}"').replace('width="24"', f'width="{size}"').replace('height="24"', f'height="{size}"')
+    return f'<span style="display: inline-flex; align-items: center; color: {color}; margin-right: 0.5rem;">{styled_svg}</span>'
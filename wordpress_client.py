@@ -0,0 +1,273 @@
+"""
+WordPress REST API クライアント
+接続プールを持つ requests.Session を使い回し、タイムアウト・リトライ付きで
+記事（下書き）の投稿、メディア（アイキャッチ画像）のアップロード、複数記事の一括投稿を行う
+"""
+
+import mimetypes
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from markdown_html import markdown_to_html
+
+
+# 接続 / 読み取りのタイムアウト（秒）
+DEFAULT_TIMEOUT = (5, 60)
+
+# 一時的なエラーとして再試行するステータス（Retry-After があれば従う）
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# POST（投稿・メディアのアップロード）を再試行するステータス。Retry-After が付いているときだけ再試行する
+# 500・502・504 はサーバーが記事やメディアを作ったあとに返すことがあり、送り直すと下書きが重複する
+POST_RETRY_STATUSES = (429, 503)
+
+
+class PostSafeRetry(Retry):
+    """
+    POST の重複を避ける Retry
+
+    GET・PUT・DELETE は RETRY_STATUSES で再試行し、POST は POST_RETRY_STATUSES に Retry-After が
+    付いているとき（サーバーが処理せずに断ったことがはっきりしているとき）だけ再試行する
+    """
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if method.upper() == "POST" and not (status_code in POST_RETRY_STATUSES and has_retry_after):
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def api_base_from_url(url: str) -> str:
+    """
+    UIで入力されたURLから REST API のベース（.../wp-json/wp/v2）を求める
+
+    投稿エンドポイント（.../wp/v2/posts）、APIベース、サイトのトップURLのいずれでもよい
+    """
+    url = url.rstrip("/")
+    if url.endswith("/posts"):
+        return url[:-len("/posts")]
+    if "/wp-json" in url:
+        return url
+    return url + "/wp-json/wp/v2"
+
+
+class WordPressClient:
+    """
+    1つの WordPress サイトへの接続をまとめるクライアント
+
+    Session はスレッド間で共有し、接続プールの大きさ（pool_size）が一括投稿の同時実行数の上限になる
+    """
+
+    def __init__(
+        self,
+        url: str,
+        username: str,
+        password: str,
+        timeout: tuple = DEFAULT_TIMEOUT,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        pool_size: int = 4
+    ):
+        self.api_base = api_base_from_url(url)
+        self.timeout = timeout
+        self.pool_size = pool_size
+
+        retry = PostSafeRetry(
+            total=max_retries,
+            # 接続できなかったときはリクエストを送っていないので、POST も再試行してよい
+            connect=max_retries,
+            # 送信後の読み取り失敗（タイムアウトなど）はサーバーが処理済みかもしれないので、どのメソッドも再試行しない
+            read=0,
+            status=max_retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "POST", "PUT", "DELETE"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.auth = (username, password)
+        self.session.headers.update({"Accept": "application/json"})
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        """API を呼び出し、成功なら {"success": True, "data": ...} を返す"""
+        try:
+            response = self.session.request(
+                method, f"{self.api_base}/{path}", timeout=self.timeout, **kwargs
+            )
+        except requests.RequestException as e:
+            return {"success": False, "error": str(e)}
+
+        if response.status_code in (200, 201):
+            return {"success": True, "data": response.json()}
+        return {
+            "success": False,
+            "error": f"ステータスコード: {response.status_code}, 詳細: {response.text[:500]}"
+        }
+
+    def upload_media(
+        self,
+        image: Union[bytes, str, Path],
+        filename: Optional[str] = None,
+        mime_type: Optional[str] = None,
+        alt_text: str = "",
+        title: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        画像をメディアライブラリにアップロード
+
+        Args:
+            image: 画像のバイト列またはファイルパス
+            filename: 保存するファイル名（パスを渡した場合は省略可）
+            mime_type: 省略時はファイル名から推定
+            alt_text: 代替テキスト
+            title: メディアのタイトル
+
+        Returns:
+            {"success": True, "media_id": int, "source_url": str} または {"success": False, "error": str}
+        """
+        if isinstance(image, (str, Path)):
+            path = Path(image)
+            filename = filename or path.name
+            image = path.read_bytes()
+        filename = filename or "image.png"
+        mime_type = mime_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+        # 日本語のファイル名も通るように RFC 5987 形式で送る
+        disposition = f"attachment; filename=\"{quote(filename)}\"; filename*=UTF-8''{quote(filename)}"
+        result = self._request(
+            "POST", "media",
+            data=image,
+            headers={"Content-Type": mime_type, "Content-Disposition": disposition}
+        )
+        if not result["success"]:
+            return result
+
+        media = result["data"]
+        fields = {key: value for key, value in (("alt_text", alt_text), ("title", title)) if value}
+        if fields:
+            # 代替テキストはアップロード後の更新でしか設定できない
+            self._request("POST", f"media/{media['id']}", json=fields)
+        return {"success": True, "media_id": media.get("id"), "source_url": media.get("source_url")}
+
+    def create_post(
+        self,
+        title: str,
+        html_content: str,
+        excerpt: str = "",
+        status: str = "draft",
+        featured_media: Optional[int] = None,
+        **fields
+    ) -> Dict[str, Any]:
+        """
+        記事を作成
+
+        Args:
+            title: タイトル
+            html_content: 本文（HTML）
+            excerpt: 抜粋（メタディスクリプション）
+            status: "draft" / "publish" など
+            featured_media: アイキャッチ画像のメディアID
+            fields: categories / tags など、そのまま送る項目
+
+        Returns:
+            {"success": True, "post_id": int, "post_url": str} または {"success": False, "error": str}
+        """
+        post_data = {"title": title, "content": html_content, "status": status, "excerpt": excerpt, **fields}
+        if featured_media:
+            post_data["featured_media"] = featured_media
+
+        result = self._request("POST", "posts", json=post_data)
+        if not result["success"]:
+            return result
+        return {"success": True, "post_id": result["data"].get("id"), "post_url": result["data"].get("link")}
+
+    def post_article(
+        self,
+        title: str,
+        content: str,
+        meta_description: str = "",
+        featured_image: Union[bytes, str, Path, None] = None,
+        featured_image_name: Optional[str] = None,
+        status: str = "draft"
+    ) -> Dict[str, Any]:
+        """
+        Markdown の記事を HTML に変換して投稿（アイキャッチ画像があれば先にアップロード）
+
+        Returns:
+            create_post と同じ形式（media_id を追加）
+        """
+        media_id = None
+        if featured_image is not None:
+            media = self.upload_media(featured_image, filename=featured_image_name, alt_text=title)
+            if not media["success"]:
+                return {"success": False, "error": f"アイキャッチ画像のアップロードに失敗しました: {media['error']}"}
+            media_id = media["media_id"]
+
+        result = self.create_post(
+            title=title,
+            html_content=markdown_to_html(content),
+            excerpt=meta_description,
+            status=status,
+            featured_media=media_id
+        )
+        result["media_id"] = media_id
+        return result
+
+    def bulk_post(self, articles: List[Dict[str, Any]], max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        複数の記事を並列に下書き投稿
+
+        Args:
+            articles: post_article の引数の辞書のリスト（title, content, meta_description, featured_image ...）
+            max_workers: 同時実行数（既定: 接続プールの大きさ。プールより大きくはしない）
+
+        Returns:
+            articles と同じ順番の結果のリスト
+        """
+        workers = min(max_workers or self.pool_size, self.pool_size, max(len(articles), 1))
+
+        def post_one(article):
+            try:
+                return self.post_article(**article)
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wp-post") as executor:
+            return list(executor.map(post_one, articles))
+
+
+_clients_lock = threading.Lock()
+
+
+@lru_cache(maxsize=8)
+def _cached_client(url: str, username: str, password: str) -> WordPressClient:
+    return WordPressClient(url, username, password)
+
+
+def get_wordpress_client(url: str, username: str, password: str) -> WordPressClient:
+    """
+    同じ投稿先・ユーザーのクライアントを使い回す（Streamlit のリランをまたいで接続を再利用する）
+    """
+    with _clients_lock:
+        return _cached_client(api_base_from_url(url), username, password)